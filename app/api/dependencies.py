@@ -6,8 +6,9 @@ Provides dependency injection for protected routes.
 
 import structlog
 from typing import Optional
-from fastapi import HTTPException, status, Request
+from fastapi import Depends, HTTPException, status, Request
 from app.services.auth_service import auth_service
+from app.services.rate_limiter import get_rate_limiter
 from app.config import settings
 from supabase import create_client, Client
 
@@ -162,3 +163,33 @@ async def require_onboarding_completed(user: dict = None) -> dict:
         )
 
     return user
+
+
+def rate_limit(route: str):
+    """
+    Dependency factory enforcing a route's quotas (see ROUTE_QUOTAS).
+
+    Usage:
+        @router.post("/message", dependencies=[Depends(rate_limit("coach_message"))])
+
+    Raises:
+        HTTPException 429: With Retry-After if the user or route quota is spent
+    """
+    async def check_rate_limit(request: Request, user: dict = Depends(get_current_user)) -> dict:
+        result = await get_rate_limiter().check_route(route, user["id"])
+        if not result.allowed:
+            logger.warning(
+                "rate_limit_exceeded",
+                route=route,
+                user_id=user["id"],
+                path=request.url.path,
+                retry_after=result.retry_after_header
+            )
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many requests. Please slow down.",
+                headers={"Retry-After": result.retry_after_header},
+            )
+        return user
+
+    return check_rate_limit
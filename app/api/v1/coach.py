@@ -5,11 +5,13 @@ Main API for the AI fitness coach.
 Handles message sending, log confirmation, and conversation management.
 """
 
+import asyncio
+import json
 import structlog
 from typing import List, Optional
 from datetime import datetime
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Header, Query
+from fastapi.responses import JSONResponse, StreamingResponse
 
 from app.api.v1.schemas.coach_schemas import (
     MessageRequest,
@@ -29,13 +31,15 @@ from app.api.v1.schemas.coach_schemas import (
     ArchiveConversationRequest,
     ArchiveConversationResponse
 )
-from app.api.dependencies import get_current_user
+from app.api.dependencies import get_current_user, rate_limit
 from app.services.supabase_service import supabase_service
 from app.services.nutrition_service import nutrition_service
 from app.services.activity_service import activity_service
 from app.services.body_metrics_service import body_metrics_service
 from app.services.unified_coach_service import get_unified_coach_service
 from app.services.meal_item_transformer import get_meal_item_transformer
+from app.services.turn_coordinator import ConversationBusyError, get_turn_coordinator, turn_key
+from app.services.write_behind import WriteBehindError, get_message_writer
 from app.utils.coach_messages import generate_log_confirmation_message, generate_chat_response
 from uuid import UUID
 
@@ -69,6 +73,15 @@ def get_supabase():
 # MESSAGE ENDPOINTS
 # ============================================================================
 
+# Returned when the conversation's previous turn is still running
+CONVERSATION_BUSY_MESSAGE = "Your previous message is still being processed. Please try again shortly."
+
+
+def _is_final_reply(result: dict) -> bool:
+    """Whether a turn's result is replayed to duplicates (failed/degraded turns are retried)."""
+    return bool(result.get("success")) and not (result.get("degraded") or result.get("rate_limited"))
+
+
 @router.post("/test-message")
 async def test_message(
     request: MessageRequest,
@@ -89,12 +102,13 @@ async def test_message(
     }
 
 
-@router.post("/message")
+@router.post("/message", dependencies=[Depends(rate_limit("coach_message"))])
 async def send_message(
     request: MessageRequest,
     background_tasks: BackgroundTasks,
     current_user = Depends(get_current_user),
-    supabase = Depends(get_supabase)
+    supabase = Depends(get_supabase),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255)
 ):
     """
     Send a message to the AI coach.
@@ -105,6 +119,10 @@ async def send_message(
     - Prompt injection protection
     - 3-tier memory system
     - Multi-language support
+
+    Duplicate submissions (same Idempotency-Key, or the same message
+    resent within seconds) get the original turn's reply instead of
+    starting another; turns in a conversation run one at a time.
     """
     try:
         user_id = current_user["id"]
@@ -119,18 +137,27 @@ async def send_message(
 
         # Process message through UnifiedCoachService (THE BRAIN)
         coach = get_unified_coach()
-        result = await coach.process_message(
-            user_id=user_id,
-            message=request.message,
-            conversation_id=request.conversation_id,
-            image_base64=None,  # Future: handle image uploads
-            background_tasks=background_tasks
+        key, replay_ttl = turn_key(user_id, "message", request.conversation_id, request.message, idempotency_key)
+        result = await get_turn_coordinator().run(
+            key,
+            request.conversation_id or f"user:{user_id}",
+            lambda: coach.process_message(
+                user_id=user_id,
+                message=request.message,
+                conversation_id=request.conversation_id,
+                image_base64=None,  # Future: handle image uploads
+                background_tasks=background_tasks
+            ),
+            replay_ttl,
+            is_final=_is_final_reply
         )
 
         logger.info("coach_response_ready", user_id=user_id[:8])
 
         return result
 
+    except ConversationBusyError:
+        raise HTTPException(status_code=409, detail=CONVERSATION_BUSY_MESSAGE)
     except Exception as e:
         logger.error("coach_message_failed", error=str(e), error_type=type(e).__name__, exc_info=True)
         raise HTTPException(
@@ -139,6 +166,96 @@ async def send_message(
         )
 
 
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.post("/message/stream", dependencies=[Depends(rate_limit("coach_message"))])
+async def send_message_stream(
+    request: MessageRequest,
+    background_tasks: BackgroundTasks,
+    current_user = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key", max_length=255)
+):
+    """
+    Send a message to the AI coach and stream the reply (Server-Sent Events).
+
+    Events: conversation, ack, tool_start, tool_end, token, done, error.
+    The message is persisted once the stream completes, even if the client
+    disconnects early.
+
+    A duplicate submission (see /message) waits for the original turn and
+    receives its conversation, full text (one token event) and done events.
+    """
+    user_id = current_user["id"]
+
+    logger.info(
+        "coach_stream_message_received",
+        user_id=user_id[:8],
+        message_length=len(request.message) if request.message else 0,
+        has_conversation_id=bool(request.conversation_id)
+    )
+
+    coach = get_unified_coach()
+    key, replay_ttl = turn_key(user_id, "stream", request.conversation_id, request.message, idempotency_key)
+    live: asyncio.Queue = asyncio.Queue()
+    started = False
+
+    async def stream_turn() -> list:
+        """Forward events live; return the events replayed to duplicates."""
+        nonlocal started
+        started = True
+        replay = []
+        async for item in coach.process_message_stream(
+            user_id=user_id,
+            message=request.message,
+            conversation_id=request.conversation_id,
+            image_base64=None,  # Future: handle image uploads
+            background_tasks=background_tasks
+        ):
+            live.put_nowait(item)
+            if item["event"] == "done":
+                replay.append({"event": "token", "data": {"text": item["data"]["message"], "iteration": 0}})
+            if item["event"] in ("conversation", "done", "error"):
+                replay.append(item)
+        return replay
+
+    async def event_stream():
+        turn = asyncio.create_task(get_turn_coordinator().run(
+            key,
+            request.conversation_id or f"user:{user_id}",
+            stream_turn,
+            replay_ttl,
+            is_final=lambda replay: bool(replay) and replay[-1]["event"] == "done"
+        ))
+        turn.add_done_callback(lambda _: live.put_nowait(None))
+
+        while (item := await live.get()) is not None:
+            yield _sse(item["event"], item["data"])
+
+        try:
+            replay = turn.result()
+        except ConversationBusyError:
+            yield _sse("error", {"message": CONVERSATION_BUSY_MESSAGE, "busy": True})
+            return
+        except Exception as e:
+            logger.error("coach_stream_failed", error=str(e), error_type=type(e).__name__, exc_info=True)
+            yield _sse("error", {"message": f"Failed to process message: {str(e)}"})
+            return
+
+        if not started:  # Coalesced onto an earlier submission
+            for item in replay:
+                yield _sse(item["event"], item["data"])
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=background_tasks
+    )
+
+
 # ============================================================================
 # QUICK ENTRY LOG ENDPOINTS
 # ============================================================================
@@ -788,6 +905,16 @@ async def get_conversation_messages(
     try:
         user_id = current_user["id"]
 
+        # Messages from a turn that just finished may still be queued (write-behind)
+        try:
+            await get_message_writer().flush(conversation_id)
+        except WriteBehindError as e:
+            logger.error(f"[CoachAPI] ❌ Messages not yet saved: {e}")
+            raise HTTPException(
+                status_code=503,
+                detail="Recent messages are still being saved. Please try again shortly."
+            )
+
         # Verify conversation belongs to user
         conv_response = supabase.table("coach_conversations")\
             .select("id")\
@@ -4,12 +4,14 @@ Consultation API Endpoints
 Exposes the ConsultationAIService for frontend integration.
 """
 
+import json
 import structlog
 from fastapi import APIRouter, HTTPException, status, Depends, Request
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from typing import Optional
 
-from app.api.dependencies import get_current_user
+from app.api.dependencies import get_current_user, rate_limit
 from app.services.consultation_ai_service import ConsultationAIService
 
 logger = structlog.get_logger()
@@ -36,6 +38,7 @@ class SendMessageRequest(BaseModel):
 
 @router.post(
     "/consultation/start",
+    dependencies=[Depends(rate_limit("consultation"))],
     status_code=status.HTTP_200_OK,
     summary="Start AI consultation session (GATED)",
     description="Start consultation session. Requires consultation_enabled=true on user profile."
@@ -146,6 +149,7 @@ async def start_consultation(
 
 @router.post(
     "/consultation/message",
+    dependencies=[Depends(rate_limit("consultation"))],
     status_code=status.HTTP_200_OK,
     summary="Send message in consultation",
     description="Send a user message and get AI response"
@@ -211,8 +215,55 @@ async def send_consultation_message(
         )
 
 
+def _sse(event: str, data: dict) -> str:
+    """Format one Server-Sent Event."""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+
+@router.post(
+    "/consultation/message/stream",
+    dependencies=[Depends(rate_limit("consultation"))],
+    summary="Send message in consultation (streaming)",
+    description="Send a user message and stream the AI response as Server-Sent Events"
+)
+async def send_consultation_message_stream(
+    request_data: SendMessageRequest,
+    user: dict = Depends(get_current_user)
+):
+    """
+    Send a message in an active consultation session and stream the reply.
+
+    Events: token (reply text as generated), done (same body as
+    /consultation/message; its message replaces the streamed text), error.
+    """
+    service = ConsultationAIService()
+
+    async def event_stream():
+        async for item in service.process_message_stream(
+            user_id=user["id"],
+            session_id=request_data.session_id,
+            message=request_data.message
+        ):
+            if item["event"] == "done":
+                logger.info(
+                    "consultation_message_processed",
+                    user_id=user["id"],
+                    session_id=request_data.session_id,
+                    extracted_items=item["data"].get("extracted_items", 0),
+                    section=item["data"].get("current_section")
+                )
+            yield _sse(item["event"], item["data"])
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
 @router.post(
     "/consultation/{session_id}/complete",
+    dependencies=[Depends(rate_limit("consultation"))],
     status_code=status.HTTP_200_OK,
     summary="Mark consultation as complete and generate program",
     description="Mark consultation session as completed, update user profile, and automatically generate personalized 2-week program"
@@ -5,7 +5,7 @@ Handles food search, retrieval, and custom food creation.
 """
 
 import structlog
-from fastapi import APIRouter, HTTPException, status, Depends
+from fastapi import APIRouter, HTTPException, status, Depends, Request
 from typing import List, Optional
 from uuid import UUID
 
@@ -13,9 +13,12 @@ from app.models.nutrition import (
     Food,
     FoodServing,
     FoodSearchResponse,
+    FoodSuggestion,
+    FoodTypeaheadResponse,
     CreateCustomFoodRequest,
 )
 from app.services.nutrition_service import nutrition_service
+from app.services.food_typeahead_service import food_typeahead_service
 from app.api.dependencies import get_current_user
 
 logger = structlog.get_logger()
@@ -91,6 +94,78 @@ async def search_foods(
         )
 
 
+@router.get(
+    "/foods/typeahead",
+    response_model=FoodTypeaheadResponse,
+    status_code=status.HTTP_200_OK,
+    summary="Food typeahead",
+    description="Lightweight per-keystroke autocomplete (id, name, brand, kcal/100g)",
+)
+async def typeahead_foods(
+    request: Request,
+    q: str,
+    limit: int = 8,
+    current_user: dict = Depends(get_current_user),
+) -> FoodTypeaheadResponse:
+    """
+    Autocomplete foods and quick meals for the food picker.
+
+    Served from an in-memory index (no per-keystroke database queries once warm).
+    Personal matches (quick meals, custom foods, recent foods) come first.
+
+    Clients should abort the previous request on each keystroke. If a newer
+    keystroke arrives while this one is still waiting on data, the response
+    is returned early with superseded=true and no suggestions.
+
+    Args:
+        q: Partial query (minimum 1 character)
+        limit: Maximum number of suggestions (default 8, max 20)
+        current_user: Authenticated user
+
+    Returns:
+        Minimal suggestions for the picker
+    """
+    if not q.strip():
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Search query must be at least 1 character",
+        )
+
+    if limit < 1 or limit > 20:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Limit must be between 1 and 20",
+        )
+
+    try:
+        suggestions, superseded = await food_typeahead_service.suggest(
+            user_id=current_user["id"],
+            query=q,
+            limit=limit,
+        )
+
+        # Client already moved on (aborted fetch) - skip building the payload
+        if superseded or await request.is_disconnected():
+            return FoodTypeaheadResponse(query=q, suggestions=[], superseded=True)
+
+        return FoodTypeaheadResponse(
+            query=q,
+            suggestions=[FoodSuggestion(**s) for s in suggestions],
+        )
+
+    except Exception as e:
+        logger.error(
+            "foods_typeahead_error",
+            query=q,
+            user_id=current_user["id"],
+            error=str(e),
+        )
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to load suggestions",
+        )
+
+
 @router.get(
     "/foods/recent",
     response_model=List[Food],
@@ -301,6 +376,9 @@ async def create_custom_food(
             user_id=current_user["id"],
         )
 
+        # New custom food must show up in the user's typeahead immediately
+        food_typeahead_service.invalidate_user(current_user["id"])
+
         return food
 
     except ValueError as e:
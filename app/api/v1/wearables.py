@@ -13,7 +13,7 @@ import structlog
 from fastapi import APIRouter, HTTPException, status, Depends, Query
 from pydantic import BaseModel, Field
 
-from app.api.dependencies import get_current_user
+from app.api.dependencies import get_current_user, rate_limit
 from app.services.wearables.wearable_sync_service import wearable_sync_service
 from app.core.celery_app import celery_app
 from app.config import settings
@@ -52,6 +52,7 @@ async def connect_wearable_account(
 
 @router.post(
     "/wearables/{provider}/sync",
+    dependencies=[Depends(rate_limit("wearable_sync"))],
     status_code=status.HTTP_202_ACCEPTED,
     summary="Trigger wearable sync",
     description="Enqueue a background sync job for the configured provider",
@@ -89,6 +90,7 @@ async def get_wearable_status(current_user: dict = Depends(get_current_user)):
 
 @router.post(
     "/wearables/{provider}/sync-inline",
+    dependencies=[Depends(rate_limit("wearable_sync"))],
     status_code=status.HTTP_200_OK,
     summary="Trigger wearable sync inline (dev)",
     description="Runs sync synchronously for development/testing without Celery",
@@ -42,9 +42,13 @@ class Settings(BaseSettings):
     # AI Provider Selection (adapter pattern)
     LLM_PROVIDER: str = "openrouter"  # "openrouter" (default, 95% cheaper) or "anthropic"
     LLM_MODEL: str | None = None  # Override default model for provider (optional)
+    LLM_HEDGE_MODEL: str | None = None  # OpenRouter model to hedge slow coach calls to (unset = no hedging)
+    LLM_HEDGE_MAX_RATIO: float = 0.1  # Max hedged requests per request (caps the extra cost)
 
     # Redis
     REDIS_URL: str = "redis://localhost:6379"
+    RATE_LIMIT_REDIS_URL: str | None = None  # Shared rate-limit buckets (unset = per-process only)
+    COACH_LOCK_REDIS_URL: str | None = None  # Coach turn locks/idempotency across instances (unset = per-process only)
 
     # Celery
     CELERY_BROKER_URL: str = "redis://localhost:6379/0"
@@ -54,6 +58,7 @@ class Settings(BaseSettings):
     JWT_SECRET: str
     JWT_ALGORITHM: str = "HS256"
     CRON_SECRET: str | None = None
+    SECURITY_RULES_PATH: str | None = None  # JSON prompt-injection ruleset override (hot-reloaded)
     WEBHOOK_SECRET: str | None = None
 
     # Monitoring
@@ -70,6 +75,11 @@ class Settings(BaseSettings):
     # Background Jobs
     ENABLE_BACKGROUND_JOBS: bool = False  # Enable background jobs in development (default: production only)
 
+    # Coach memory (Tier 3 semantic search)
+    EMBEDDING_PROVIDER: str = "openai"  # "openai" or "local" (deterministic hashing stand-in, no API key)
+    VECTOR_INDEX_DIR: str | None = None  # Persist per-user vector indexes here (memory-mapped); None = memory only
+    VECTOR_INDEX_QUANTIZE: bool = False  # Store index vectors as int8 (~4x smaller)
+
     @property
     def cors_origins_list(self) -> List[str]:
         """Parse CORS_ORIGINS comma-separated string into list."""
@@ -5,13 +5,15 @@ Configured via environment variables:
   - CELERY_BROKER_URL / REDIS_URL
   - CELERY_RESULT_BACKEND / REDIS_URL
 
-Tasks are discovered from workers.coach_tasks.
+Tasks are discovered from workers.coach_tasks, workers.conversation_tasks
+and workers.food_tasks.
 """
 
 from __future__ import annotations
 
 import os
 from celery import Celery
+from celery.schedules import crontab
 
 
 broker_url = os.getenv("CELERY_BROKER_URL", os.getenv("REDIS_URL", "redis://localhost:6379/0"))
@@ -21,7 +23,7 @@ celery_app = Celery(
     "ultimate_coach",
     broker=broker_url,
     backend=result_backend,
-    include=["workers.coach_tasks"],
+    include=["workers.coach_tasks", "workers.conversation_tasks", "workers.food_tasks"],
 )
 
 celery_app.conf.update(
@@ -38,3 +40,18 @@ celery_app.conf.update(
     broker_pool_limit=int(os.getenv("CELERY_BROKER_POOL_LIMIT", "5")),
     worker_concurrency=int(os.getenv("CELERY_WORKER_CONCURRENCY", "2")),
 )
+
+celery_app.conf.beat_schedule = {
+    "embed-pending-messages": {
+        "task": "coach.embed_pending_messages",
+        "schedule": 10.0,  # Micro-batch window for message embeddings
+    },
+    "refresh-food-popularity": {
+        "task": "foods.refresh_popularity",
+        "schedule": crontab(minute=15),  # Hourly, off the top of the hour
+    },
+    "export-food-catalog-snapshot": {
+        "task": "foods.export_catalog_snapshot",
+        "schedule": crontab(hour=4, minute=0),  # 4 AM daily (low traffic)
+    },
+}
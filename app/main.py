@@ -117,10 +117,10 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
         from app.services.supabase_service import SupabaseService
         from app.services.system_prompt_generator import init_system_prompt_generator
         from app.services.behavioral_tracker import init_behavioral_tracker
-        from anthropic import Anthropic
+        from ultimate_ai_consultation.libs.llm_clients import get_anthropic_client
 
         supabase = SupabaseService()
-        anthropic_client = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+        anthropic_client = get_anthropic_client(settings.ANTHROPIC_API_KEY)
 
         # Initialize system prompt generator
         init_system_prompt_generator(
@@ -171,6 +171,20 @@ async def lifespan(app: FastAPI) -> AsyncGenerator[None, None]:
     except Exception as e:
         logger.warning("background_jobs_shutdown_failed", error=str(e))
 
+    # Persist queued coach messages before exiting
+    try:
+        from app.services.write_behind import get_message_writer
+        await get_message_writer().close()
+    except Exception as e:
+        logger.warning("message_writer_shutdown_failed", error=str(e))
+
+    # Close pooled LLM connections
+    try:
+        from ultimate_ai_consultation.libs.llm_clients import close_pools
+        await close_pools()
+    except Exception as e:
+        logger.warning("llm_pools_shutdown_failed", error=str(e))
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -297,6 +311,8 @@ async def http_exception_handler(request, exc: FastAPIHTTPException):
         "Access-Control-Allow-Methods": "*",
         "Access-Control-Allow-Headers": "*",
     }
+    # Keep headers the exception set (Retry-After, WWW-Authenticate)
+    headers.update(exc.headers or {})
 
     return JSONResponse(
         status_code=exc.status_code,
@@ -99,6 +99,30 @@ class FoodSearchResponse(BaseModel):
     total: int
 
 
+class FoodSuggestion(BaseModel):
+    """
+    Lightweight typeahead suggestion (no servings, no full nutrition).
+
+    source is one of: food (public catalog), custom (user's own food),
+    recent (recently logged by user), quick_meal (user's quick meal).
+    """
+    id: UUID
+    name: str
+    brand_name: Optional[str] = None
+    calories_per_100g: Optional[float] = None  # None for quick meals
+    source: str = "food"
+
+
+class FoodTypeaheadResponse(BaseModel):
+    """Response for food typeahead endpoint."""
+    query: str
+    suggestions: List[FoodSuggestion]
+    superseded: bool = Field(
+        default=False,
+        description="True if a newer keystroke from the same user replaced this request",
+    )
+
+
 class CreateCustomFoodRequest(BaseModel):
     """
     Request to create a custom food with a single serving size.
@@ -22,6 +22,8 @@ import structlog
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from app.errors import DatabaseError, ConversationNotFoundError
+from app.services.conversation_memory_service import importance_tags
+from app.services.token_budget import count_tokens
 
 logger = structlog.get_logger()
 
@@ -299,6 +301,8 @@ class ConversationManager:
             "conversation_id": conversation_id,
             "role": role,
             "content": content,
+            "token_count": count_tokens(content),
+            "importance_tags": importance_tags(content),
             "metadata": metadata or {},
             "created_at": datetime.utcnow().isoformat()
         }).execute()
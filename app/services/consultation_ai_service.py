@@ -5,24 +5,43 @@ Natural conversation interface that extracts structured data and populates
 relational database with precise foreign keys.
 
 Architecture:
-- Claude 3.5 Sonnet with tool calling
+- Claude 3.5 Sonnet with tool calling (async client, streamed replies)
+- Independent tool calls run concurrently; inserts batched per table
 - Real-time database search and insertion
 - Section-specific system prompts
 - Conversation history management
 """
 
+import asyncio
+import json
 import structlog
-from typing import Any, Dict, List, Optional
+from typing import Any, AsyncIterator, Dict, List, Optional
 from uuid import UUID, uuid4
-from datetime import datetime
+from datetime import datetime, timedelta, timezone
 
-from anthropic import Anthropic
 from app.config import settings
 from app.services.supabase_service import SupabaseService
 from app.services.consultation_security import ConsultationSecurity, ConsultationSecurityError
+from ultimate_ai_consultation.libs.llm_clients import get_async_anthropic_client
 
 logger = structlog.get_logger()
 
+# Insert tools → table they write to (one multi-row insert per table per turn)
+INSERT_TOOL_TABLES = {
+    "insert_user_training_modality": "user_training_modalities",
+    "insert_user_familiar_exercise": "user_familiar_exercises",
+    "insert_user_training_availability": "user_training_availability",
+    "insert_user_preferred_meal_time": "user_preferred_meal_times",
+    "insert_user_typical_meal_food": "user_typical_meal_foods",
+    "insert_user_upcoming_event": "user_upcoming_events",
+    "insert_user_improvement_goal": "user_improvement_goals",
+    "insert_user_difficulty": "user_difficulties",
+    "insert_user_non_negotiable": "user_non_negotiables",
+}
+
+# In-flight streaming turns (kept referenced until they finish)
+_turn_tasks: set = set()
+
 
 class ConsultationAIService:
     """
@@ -34,7 +53,7 @@ class ConsultationAIService:
         if not settings.ANTHROPIC_API_KEY:
             raise ValueError("ANTHROPIC_API_KEY not configured")
 
-        self.anthropic = Anthropic(api_key=settings.ANTHROPIC_API_KEY)
+        self.anthropic = get_async_anthropic_client(settings.ANTHROPIC_API_KEY)
         self.db = SupabaseService()
         self.model = "claude-3-5-sonnet-20241022"
         self.security = ConsultationSecurity()
@@ -60,15 +79,69 @@ class ConsultationAIService:
         Returns:
             Dict with AI response, extracted items count, and progress
         """
+        result: Dict[str, Any] = {}
+        async for item in self._turn_events(user_id, session_id, message):
+            if item["event"] in ("done", "error"):
+                result = item["data"]
+        return result
+
+    async def process_message_stream(
+        self,
+        user_id: str,
+        session_id: str,
+        message: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Process a consultation message, streaming the reply.
+
+        Yields {"event": ..., "data": ...} items:
+        - token: {"text", "iteration"} reply text as it is generated
+          (iteration 2 is the reply after tool use)
+        - done: the process_message result (its message is the validated
+          reply and replaces the streamed text)
+        - error: {"success": False, "error", "message"}
+
+        The turn runs in its own task, so it is persisted even if the client
+        disconnects before the stream ends.
+        """
+        queue: asyncio.Queue = asyncio.Queue()
+
+        async def run_turn():
+            try:
+                async for item in self._turn_events(user_id, session_id, message):
+                    queue.put_nowait(item)
+            finally:
+                queue.put_nowait(None)
+
+        task = asyncio.create_task(run_turn())
+        _turn_tasks.add(task)
+        task.add_done_callback(_turn_tasks.discard)
+
+        while True:
+            item = await queue.get()
+            if item is None:
+                return
+            yield item
+
+    async def _turn_events(
+        self,
+        user_id: str,
+        session_id: str,
+        message: str
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Run one consultation turn, yielding process_message_stream items."""
         try:
-            # Get session and validate
-            session = await self._get_session(session_id)
+            received_at = datetime.now(timezone.utc)
+
+            # Session, history and progress summary (what data has been collected so far)
+            session, history, progress = await asyncio.gather(
+                self._get_session(session_id),
+                self._get_conversation_history(session_id),
+                self._get_consultation_progress(session_id)
+            )
             if not session:
                 raise ValueError(f"Consultation session {session_id} not found")
 
-            # Get conversation history
-            history = await self._get_conversation_history(session_id)
-
             # SECURITY: Validate user message
             try:
                 self.security.validate_user_message(
@@ -79,14 +152,12 @@ class ConsultationAIService:
                 )
             except ConsultationSecurityError as e:
                 logger.warning(f"Security validation failed: {e}")
-                return {
+                yield {"event": "error", "data": {
                     "success": False,
                     "error": "security_violation",
                     "message": str(e)
-                }
-
-            # Get progress summary (what data has been collected so far)
-            progress = await self._get_consultation_progress(session_id)
+                }}
+                return
 
             # Build system prompt for current section
             current_section = session.get("current_section", "training_modalities")
@@ -101,70 +172,64 @@ class ConsultationAIService:
             ]
 
             # Call Claude with tool access
-            response = self.anthropic.messages.create(
-                model=self.model,
-                max_tokens=4096,
+            response = None
+            async for item in self._stream_completion(
+                iteration=1,
                 system=system_prompt,
                 messages=messages,
                 tools=self._get_tools(),
                 tool_choice={"type": "auto"}
-            )
+            ):
+                if item["event"] == "message":
+                    response = item["data"]
+                else:
+                    yield item
 
             # Process tool calls (database operations)
             extracted_items = []
             if response.stop_reason == "tool_use":
-                for content_block in response.content:
-                    if content_block.type == "tool_use":
-                        # SECURITY: Validate tool call before execution
-                        try:
-                            self.security.validate_tool_call(
-                                tool_name=content_block.name,
-                                tool_input=content_block.input,
-                                current_section=current_section,
-                                user_id=user_id
-                            )
-                        except ConsultationSecurityError as e:
-                            logger.error(f"Tool validation failed: {e}")
-                            # Log security event
-                            self.security.log_security_event(
-                                event_type="invalid_tool_call",
-                                user_id=user_id,
-                                session_id=session_id,
-                                details={
-                                    "tool_name": content_block.name,
-                                    "tool_input": content_block.input,
-                                    "error": str(e)
-                                }
-                            )
-                            # Skip this tool call
-                            continue
-
-                        tool_result = await self._execute_tool(
-                            tool_name=content_block.name,
-                            tool_input=content_block.input,
-                            user_id=user_id
-                        )
-                        extracted_items.append(tool_result)
-
-                        # Continue conversation with tool results
-                        messages.append({"role": "assistant", "content": response.content})
-                        messages.append({
-                            "role": "user",
-                            "content": [{
-                                "type": "tool_result",
-                                "tool_use_id": content_block.id,
-                                "content": str(tool_result)
-                            }]
-                        })
+                tool_blocks = [block for block in response.content if block.type == "tool_use"]
+
+                # SECURITY: Validate tool calls before execution
+                allowed = [
+                    block for block in tool_blocks
+                    if self._tool_call_allowed(block, current_section, user_id, session_id)
+                ]
+                results = dict(zip(
+                    (block.id for block in allowed),
+                    await self._execute_tools(allowed, user_id)
+                ))
+                extracted_items = list(results.values())
+
+                # Continue conversation with tool results (every tool_use needs a result)
+                messages.append({"role": "assistant", "content": response.content})
+                messages.append({
+                    "role": "user",
+                    "content": [
+                        {
+                            "type": "tool_result",
+                            "tool_use_id": block.id,
+                            "content": str(results.get(block.id, {
+                                "tool": block.name,
+                                "success": False,
+                                "error": "Tool call rejected"
+                            }))
+                        }
+                        for block in tool_blocks
+                    ]
+                })
 
                 # Get final response after tool use
-                response = self.anthropic.messages.create(
-                    model=self.model,
-                    max_tokens=4096,
+                async for item in self._stream_completion(
+                    iteration=2,
                     system=system_prompt,
                     messages=messages,
                     tools=self._get_tools()
-                )
+                ):
+                    if item["event"] == "message":
+                        response = item["data"]
+                    else:
+                        yield item
 
             # Extract text from response
             assistant_message = self._extract_text_from_response(response)
@@ -182,29 +247,29 @@ class ConsultationAIService:
                 )
                 assistant_message = "I'm processing your information. Let's continue with the next question."
 
-            # Save messages to database
-            await self._save_user_message(session_id, user_id, message)
-            await self._save_assistant_message(
-                session_id,
-                user_id,
-                assistant_message,
-                extracted_items
-            )
-
             # Check if section is complete
             section_complete = self._is_section_complete(current_section, extracted_items)
             if section_complete:
                 next_section = self._get_next_section(current_section)
                 progress_percentage = self._calculate_progress(next_section)
-                await self._update_session(
-                    session_id,
-                    current_section=next_section,
-                    progress_percentage=progress_percentage
-                )
-                current_section = next_section  # Update to new section
             else:
+                next_section = None
                 progress_percentage = session.get("progress_percentage", 0)
 
+            # Save the turn: both messages in one insert, alongside the session update
+            await self._save_turn(
+                session_id,
+                user_id,
+                message,
+                received_at,
+                assistant_message,
+                extracted_items,
+                next_section=next_section,
+                progress_percentage=progress_percentage if section_complete else None
+            )
+            if section_complete:
+                current_section = next_section  # Update to new section
+
             # Calculate sections completed and total
             sections = [
                 "training_modalities",
@@ -222,7 +287,7 @@ class ConsultationAIService:
 
             total_sections = len(sections)
 
-            return {
+            yield {"event": "done", "data": {
                 "success": True,
                 "message": assistant_message,
                 "extracted_items": len(extracted_items),
@@ -231,15 +296,58 @@ class ConsultationAIService:
                 "total_sections": total_sections,
                 "progress_percentage": progress_percentage,
                 "session_id": session_id
-            }
+            }}
 
         except Exception as e:
             logger.error(f"Error processing consultation message: {e}", exc_info=True)
-            return {
+            yield {"event": "error", "data": {
                 "success": False,
                 "error": str(e),
                 "message": "I'm having trouble processing that. Could you try rephrasing?"
-            }
+            }}
+
+    async def _stream_completion(self, iteration: int, **params) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Stream one Claude call: token items for its text, then a final
+        {"event": "message", "data": <Message>} item.
+        """
+        guard = self.security.stream_guard()
+        async with self.anthropic.messages.stream(model=self.model, max_tokens=4096, **params) as stream:
+            async for text in stream.text_stream:
+                safe = guard.feed(text)
+                if safe:
+                    yield {"event": "token", "data": {"text": safe, "iteration": iteration}}
+            response = await stream.get_final_message()
+
+        rest = guard.finish()
+        if rest:
+            yield {"event": "token", "data": {"text": rest, "iteration": iteration}}
+        yield {"event": "message", "data": response}
+
+    def _tool_call_allowed(self, block, current_section: str, user_id: str, session_id: str) -> bool:
+        """Validate a tool call; rejected calls are logged as security events."""
+        try:
+            self.security.validate_tool_call(
+                tool_name=block.name,
+                tool_input=block.input,
+                current_section=current_section,
+                user_id=user_id
+            )
+            return True
+        except ConsultationSecurityError as e:
+            logger.error(f"Tool validation failed: {e}")
+            # Log security event
+            self.security.log_security_event(
+                event_type="invalid_tool_call",
+                user_id=user_id,
+                session_id=session_id,
+                details={
+                    "tool_name": block.name,
+                    "tool_input": block.input,
+                    "error": str(e)
+                }
+            )
+            return False
 
     # ========================================================================
     # SYSTEM PROMPTS (Section-Specific)
@@ -277,7 +385,6 @@ CRITICAL RULES:
 
         # Add progress summary if available
         if progress:
-            import json
             base_prompt += "\n\n--- DATA ALREADY COLLECTED ---\n"
             base_prompt += f"{json.dumps(progress, indent=2)}\n"
             base_prompt += "\nIMPORTANT: Review the data above. Do NOT ask for information that has already been collected.\n"
@@ -964,6 +1071,31 @@ This section should feel like a deep conversation about their relationship with
     # TOOL EXECUTION
     # ========================================================================
 
+    async def _execute_tools(self, tool_blocks: List[Any], user_id: str) -> List[Dict[str, Any]]:
+        """
+        Execute a turn's tool calls concurrently.
+
+        Searches run in parallel; inserts are grouped per table into one
+        multi-row insert. Results are returned in tool_blocks order.
+        """
+        jobs = []  # (indexes into tool_blocks, awaitable returning results for them)
+        inserts: Dict[str, List[int]] = {}
+        for i, block in enumerate(tool_blocks):
+            if block.name in INSERT_TOOL_TABLES:
+                inserts.setdefault(block.name, []).append(i)
+            else:
+                jobs.append(([i], self._execute_tool(block.name, block.input, user_id)))
+        for tool_name, indexes in inserts.items():
+            inputs = [tool_blocks[i].input for i in indexes]
+            jobs.append((indexes, asyncio.to_thread(self._insert_rows, tool_name, inputs, user_id)))
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(tool_blocks)
+        outputs = await asyncio.gather(*(job for _, job in jobs))
+        for (indexes, _), output in zip(jobs, outputs):
+            for i, result in zip(indexes, output if isinstance(output, list) else [output]):
+                results[i] = result
+        return results
+
     async def _execute_tool(
         self,
         tool_name: str,
@@ -973,6 +1105,15 @@ This section should feel like a deep conversation about their relationship with
         """
         Execute a tool call - either search database or insert data.
         """
+        return await asyncio.to_thread(self._run_tool, tool_name, tool_input, user_id)
+
+    def _run_tool(
+        self,
+        tool_name: str,
+        tool_input: Dict[str, Any],
+        user_id: str
+    ) -> Dict[str, Any]:
+        """Blocking tool execution (runs in a worker thread)."""
         try:
             logger.info(f"Executing tool: {tool_name} with input: {tool_input}")
 
@@ -1047,113 +1188,8 @@ This section should feel like a deep conversation about their relationship with
                 }
 
             # INSERT TOOLS
-            elif tool_name == "insert_user_training_modality":
-                data = {"user_id": user_id, **tool_input}
-                response = self.db.client.table("user_training_modalities")\
-                    .insert(data)\
-                    .execute()
-
-                return {
-                    "tool": "insert_user_training_modality",
-                    "success": True,
-                    "id": response.data[0]["id"]
-                }
-
-            elif tool_name == "insert_user_familiar_exercise":
-                data = {"user_id": user_id, **tool_input}
-                response = self.db.client.table("user_familiar_exercises")\
-                    .insert(data)\
-                    .execute()
-
-                return {
-                    "tool": "insert_user_familiar_exercise",
-                    "success": True,
-                    "id": response.data[0]["id"]
-                }
-
-            elif tool_name == "insert_user_training_availability":
-                data = {"user_id": user_id, **tool_input}
-                response = self.db.client.table("user_training_availability")\
-                    .insert(data)\
-                    .execute()
-
-                return {
-                    "tool": "insert_user_training_availability",
-                    "success": True,
-                    "id": response.data[0]["id"]
-                }
-
-            elif tool_name == "insert_user_preferred_meal_time":
-                data = {"user_id": user_id, **tool_input}
-                response = self.db.client.table("user_preferred_meal_times")\
-                    .insert(data)\
-                    .execute()
-
-                return {
-                    "tool": "insert_user_preferred_meal_time",
-                    "success": True,
-                    "id": response.data[0]["id"]
-                }
-
-            elif tool_name == "insert_user_typical_meal_food":
-                data = {"user_id": user_id, **tool_input}
-                response = self.db.client.table("user_typical_meal_foods")\
-                    .insert(data)\
-                    .execute()
-
-                return {
-                    "tool": "insert_user_typical_meal_food",
-                    "success": True,
-                    "id": response.data[0]["id"]
-                }
-
-            elif tool_name == "insert_user_upcoming_event":
-                data = {"user_id": user_id, **tool_input}
-                response = self.db.client.table("user_upcoming_events")\
-                    .insert(data)\
-                    .execute()
-
-                return {
-                    "tool": "insert_user_upcoming_event",
-                    "success": True,
-                    "id": response.data[0]["id"]
-                }
-
-            elif tool_name == "insert_user_improvement_goal":
-                data = {"user_id": user_id, **tool_input}
-                response = self.db.client.table("user_improvement_goals")\
-                    .insert(data)\
-                    .execute()
-
-                return {
-                    "tool": "insert_user_improvement_goal",
-                    "success": True,
-                    "id": response.data[0]["id"]
-                }
-
-            elif tool_name == "insert_user_difficulty":
-                data = {"user_id": user_id, **tool_input}
-                response = self.db.client.table("user_difficulties")\
-                    .insert(data)\
-                    .execute()
-
-                return {
-                    "tool": "insert_user_difficulty",
-                    "success": True,
-                    "id": response.data[0]["id"]
-                }
-
-            elif tool_name == "insert_user_non_negotiable":
-                data = {"user_id": user_id, **tool_input}
-                response = self.db.client.table("user_non_negotiables")\
-                    .insert(data)\
-                    .execute()
-
-                return {
-                    "tool": "insert_user_non_negotiable",
-                    "success": True,
-                    "id": response.data[0]["id"]
-                }
+            elif tool_name in INSERT_TOOL_TABLES:
+                return self._insert_rows(tool_name, [tool_input], user_id)[0]
 
             else:
                 raise ValueError(f"Unknown tool: {tool_name}")
@@ -1166,17 +1202,47 @@ This section should feel like a deep conversation about their relationship with
                 "error": str(e)
             }
 
+    def _insert_rows(
+        self,
+        tool_name: str,
+        tool_inputs: List[Dict[str, Any]],
+        user_id: str
+    ) -> List[Dict[str, Any]]:
+        """
+        Insert tool calls' rows into their table in one statement.
+
+        If a multi-row insert fails, rows are retried one by one so a single
+        bad row doesn't lose the rest.
+        """
+        rows = [{"user_id": user_id, **tool_input} for tool_input in tool_inputs]
+        try:
+            response = self.db.client.table(INSERT_TOOL_TABLES[tool_name])\
+                .insert(rows)\
+                .execute()
+            return [
+                {"tool": tool_name, "success": True, "id": row["id"]}
+                for row in response.data
+            ]
+        except Exception as e:
+            if len(rows) > 1:
+                logger.warning(f"Batch insert failed for {tool_name}, retrying rows individually: {e}")
+                return [self._insert_rows(tool_name, [tool_input], user_id)[0] for tool_input in tool_inputs]
+            logger.error(f"Tool execution error for {tool_name}: {e}", exc_info=True)
+            return [{"tool": tool_name, "success": False, "error": str(e)}]
+
     # ========================================================================
     # HELPER METHODS
     # ========================================================================
 
     async def _get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
         """Get consultation session by ID."""
-        response = self.db.client.table("consultation_sessions")\
-            .select("*")\
-            .eq("id", session_id)\
-            .single()\
-            .execute()
+        response = await asyncio.to_thread(
+            self.db.client.table("consultation_sessions")
+            .select("*")
+            .eq("id", session_id)
+            .single()
+            .execute
+        )
         return response.data if response.data else None
 
     async def _update_session(
@@ -1193,44 +1259,97 @@ This section should feel like a deep conversation about their relationship with
             updates["progress_percentage"] = progress_percentage
 
         if updates:
-            self.db.client.table("consultation_sessions")\
-                .update(updates)\
-                .eq("id", session_id)\
-                .execute()
+            await asyncio.to_thread(
+                self.db.client.table("consultation_sessions")
+                .update(updates)
+                .eq("id", session_id)
+                .execute
+            )
 
     async def _get_conversation_history(self, session_id: str) -> List[Dict[str, Any]]:
         """Get conversation history for session."""
-        response = self.db.client.table("consultation_messages")\
-            .select("*")\
-            .eq("session_id", session_id)\
-            .order("created_at")\
-            .execute()
+        response = await asyncio.to_thread(
+            self.db.client.table("consultation_messages")
+            .select("*")
+            .eq("session_id", session_id)
+            .order("created_at")
+            .execute
+        )
 
         return response.data if response.data else []
 
     async def _get_consultation_progress(self, session_id: str) -> Dict[str, Any]:
         """Get progress summary showing what data has been collected."""
         try:
-            response = self.db.client.rpc("get_consultation_progress", {"p_session_id": session_id}).execute()
+            response = await asyncio.to_thread(
+                self.db.client.rpc("get_consultation_progress", {"p_session_id": session_id}).execute
+            )
             return response.data if response.data else {}
         except Exception as e:
             logger.warning(f"Error getting consultation progress: {e}")
             return {}
 
-    async def _save_user_message(self, session_id: str, user_id: str, message: str):
-        """Save user message to database."""
-        data = {
+    def _message_row(
+        self,
+        session_id: str,
+        user_id: str,
+        role: str,
+        content: str,
+        extracted_items: Optional[List[Dict[str, Any]]] = None,
+        created_at: Optional[datetime] = None
+    ) -> Dict[str, Any]:
+        """Build a consultation_messages row."""
+        row = {
             "session_id": session_id,
             "user_id": user_id,
-            "role": "user",
-            "content": message
+            "role": role,
+            "content": content
         }
+        if role == "assistant":
+            row["extracted_data"] = json.dumps(extracted_items or [])
+            row["ai_model"] = self.model
+        if created_at is not None:
+            # Explicit timestamps keep turn order when rows share one insert
+            row["created_at"] = created_at.isoformat()
+        return row
+
+    async def _save_messages(self, rows: List[Dict[str, Any]]):
+        """Insert consultation messages in one statement."""
+        await asyncio.to_thread(
+            self.db.client.table("consultation_messages")
+            .insert(rows)
+            .execute
+        )
+
+    async def _save_turn(
+        self,
+        session_id: str,
+        user_id: str,
+        message: str,
+        received_at: datetime,
+        assistant_message: str,
+        extracted_items: List[Dict[str, Any]],
+        next_section: Optional[str] = None,
+        progress_percentage: Optional[int] = None
+    ):
+        """Persist a turn: one messages insert and (if progressed) the session update, concurrently."""
+        rows = [
+            self._message_row(session_id, user_id, "user", message, created_at=received_at),
+            self._message_row(
+                session_id, user_id, "assistant", assistant_message, extracted_items,
+                created_at=max(datetime.now(timezone.utc), received_at + timedelta(microseconds=1))
+            )
+        ]
+        await asyncio.gather(
+            self._save_messages(rows),
+            self._update_session(
+                session_id,
+                current_section=next_section,
+                progress_percentage=progress_percentage
+            )
+        )
 
-        self.db.client.table("consultation_messages")\
-            .insert(data)\
-            .execute()
-
-        logger.info(f"User message saved (session: {session_id})")
+        logger.info(f"Consultation turn saved with {len(extracted_items)} extracted items (session: {session_id})")
 
     async def _save_assistant_message(
         self,
@@ -1240,20 +1359,9 @@ This section should feel like a deep conversation about their relationship with
         extracted_items: List[Dict[str, Any]]
     ):
         """Save assistant message and extracted data."""
-        import json
-
-        data = {
-            "session_id": session_id,
-            "user_id": user_id,
-            "role": "assistant",
-            "content": message,
-            "extracted_data": json.dumps(extracted_items),
-            "ai_model": self.model
-        }
-
-        self.db.client.table("consultation_messages")\
-            .insert(data)\
-            .execute()
+        await self._save_messages([
+            self._message_row(session_id, user_id, "assistant", message, extracted_items)
+        ])
 
         logger.info(f"Assistant message saved with {len(extracted_items)} extracted items")
 
@@ -1367,13 +1475,9 @@ This section should feel like a deep conversation about their relationship with
         """
         try:
             # Fetch all consultation messages
-            messages_result = self.db.client.table("consultation_messages")\
-                .select("*")\
-                .eq("session_id", session_id)\
-                .order("created_at")\
-                .execute()
+            consultation_messages = await self._get_conversation_history(session_id)
 
-            if not messages_result.data or len(messages_result.data) == 0:
+            if not consultation_messages:
                 logger.warning(
                     "no_consultation_messages_found",
                     session_id=session_id[:8],
@@ -1383,7 +1487,7 @@ This section should feel like a deep conversation about their relationship with
 
             # Build conversation transcript
             transcript = []
-            for msg in messages_result.data:
+            for msg in consultation_messages:
                 role = "User" if msg["role"] == "user" else "AI"
                 content = msg["content"]
                 transcript.append(f"{role}: {content}")
@@ -1431,7 +1535,7 @@ IMPORTANT:
 - Natural language, not bullet points"""
 
             # Call Claude to generate profile
-            response = self.anthropic.messages.create(
+            response = await self.anthropic.messages.create(
                 model="claude-3-5-sonnet-20241022",
                 max_tokens=500,
                 temperature=0.7,
@@ -33,6 +33,15 @@ class ConsultationSecurity:
     MAX_MESSAGES_PER_MINUTE = 10
     MAX_MESSAGES_PER_SESSION = 200
 
+    # Markers of system prompt leakage in assistant output
+    LEAKED_PROMPT_MARKERS = [
+        "SYSTEM:",
+        "[SYSTEM]",
+        "INTERNAL:",
+        "DEBUG:",
+        "--- DATA ALREADY COLLECTED ---",
+    ]
+
     # Prompt injection patterns
     INJECTION_PATTERNS = [
         # Direct system prompt override attempts
@@ -322,15 +331,7 @@ class ConsultationSecurity:
 
         # 2. Remove any accidental system prompt leakage
         # (shouldn't happen, but defense in depth)
-        leaked_prompt_markers = [
-            "SYSTEM:",
-            "[SYSTEM]",
-            "INTERNAL:",
-            "DEBUG:",
-            "--- DATA ALREADY COLLECTED ---",
-        ]
-
-        for marker in leaked_prompt_markers:
+        for marker in self.LEAKED_PROMPT_MARKERS:
             if marker in message:
                 logger.error(f"System prompt leakage detected: {marker}")
                 # Remove everything after the marker
@@ -345,6 +346,10 @@ class ConsultationSecurity:
     # BEHAVIOR GUARDRAILS
     # ========================================================================
 
+    def stream_guard(self) -> "AssistantStreamGuard":
+        """Guard for streaming an assistant reply before it can be validated."""
+        return AssistantStreamGuard(self.LEAKED_PROMPT_MARKERS)
+
     def get_safety_postamble(self) -> str:
         """
         Safety instructions appended to system prompt.
@@ -428,6 +433,48 @@ You: "I can't execute database queries directly, but I can help you with your fi
         # - Rate limit or ban repeat offenders
 
 
+class AssistantStreamGuard:
+    """
+    Filters streamed assistant text before the full reply can be validated.
+
+    Text is released as it arrives, except for a tail that could be the start
+    of a leakage marker; once a marker appears nothing more is released. The
+    validated reply (validate_assistant_message) remains authoritative.
+    """
+
+    def __init__(self, markers: List[str]):
+        self.markers = markers
+        self.holdback = max(len(marker) for marker in markers) - 1
+        self.text = ""
+        self.released = 0
+        self.blocked = False
+
+    def feed(self, delta: str) -> str:
+        """Add a delta; returns the text that is safe to release now."""
+        self.text += delta
+        if self.blocked:
+            return ""
+
+        leaks = [self.text.find(marker) for marker in self.markers if marker in self.text]
+        if leaks:
+            self.blocked = True
+            end = min(leaks)
+        else:
+            end = len(self.text) - self.holdback
+        return self._release(end)
+
+    def finish(self) -> str:
+        """Release whatever is still held back at the end of the stream."""
+        return "" if self.blocked else self._release(len(self.text))
+
+    def _release(self, end: int) -> str:
+        if end <= self.released:
+            return ""
+        chunk = self.text[self.released:end]
+        self.released = end
+        return chunk
+
+
 # ========================================================================
 # USAGE EXAMPLE
 # ========================================================================
@@ -2,54 +2,84 @@
 Conversation Memory Service - 3-TIER MEMORY ARCHITECTURE
 
 Provides conversation context using intelligent retrieval:
-- TIER 1: Last 10 messages (always included - working memory)
-- TIER 2: Keyword-matched messages from 11-50 (important context)
+- SUMMARY: Rolling summary of older messages
+  (maintained in the background by coach.summarize_conversation)
+- TIER 1: Every message the summary doesn't cover yet (working memory,
+  newest first within budget), so nothing falls between the two
+- TIER 2: Messages tagged as important at write time, anywhere in the
+  conversation before Tier 1 (important context)
 - TIER 3: Semantic search (via tool, not here)
 
 This ensures AI remembers:
+- Older conversation, compactly (summary)
 - Recent conversation (Tier 1)
 - Important user info like allergies, injuries, goals (Tier 2)
 - Anything from history when asked (Tier 3 - tool-based)
+
+Everything is packed into token_budget, so prompt size stays flat as
+conversations grow. Token counts come from the tokenizer and are stored
+per message at write time (coach_messages.token_count), so packing is a
+sum, not a re-measure.
 """
 
 import structlog
 import re
 from typing import Dict, Any, List, Optional
 
+from app.services.conversation_summary_service import SUMMARY_MAX_BATCH, SUMMARY_WINDOW
+from app.services.token_budget import count_tokens, pack_optimal, pack_recent, sum_message_tokens
+
 logger = structlog.get_logger()
 
-# Keywords that indicate IMPORTANT user information
-# These trigger automatic retrieval from message history
-IMPORTANT_KEYWORDS = [
+# Keywords that indicate IMPORTANT user information, by tag.
+# Messages are tagged once when saved (coach_messages.importance_tags), so
+# Tier 2 is an indexed lookup instead of a regex rescan of history.
+IMPORTANT_KEYWORDS = {
     # Medical/Health
-    r'\b(allerg\w*|injur\w*|hurt|pain|doctor|prescribed|condition|disease|diagnos\w*)\b',
+    "medical": r'\b(allerg\w*|injur\w*|hurt|pain|doctor|prescribed|condition|disease|diagnos\w*)\b',
 
     # Physical limitations
-    r'\b(can\'t|cannot|unable|avoid|shouldn\'t|bad knee|bad back|bad shoulder)\b',
+    "limitation": r'\b(can\'t|cannot|unable|avoid|shouldn\'t|bad knee|bad back|bad shoulder)\b',
 
     # Dietary restrictions
-    r'\b(vegan|vegetarian|kosher|halal|gluten|lactose|intoleran\w*|sensitivity)\b',
+    "dietary": r'\b(vegan|vegetarian|kosher|halal|gluten|lactose|intoleran\w*|sensitivity)\b',
 
     # Goals (important for personalization)
-    r'\b(goal|target|want to|trying to|aiming|objective|plan to)\b',
+    "goal": r'\b(goal|target|want to|trying to|aiming|objective|plan to)\b',
 
     # Strong preferences
-    r'\b(hate|love|favorite|prefer|always|never)\b',
+    "preference": r'\b(hate|love|favorite|prefer|always|never)\b',
 
     # Life context
-    r'\b(pregnant|breastfeed|work schedule|shift work|travel\w*)\b',
-]
+    "life_context": r'\b(pregnant|breastfeed|work schedule|shift work|travel\w*)\b',
+}
 
 # Compile regex patterns
-IMPORTANT_PATTERNS = [re.compile(pattern, re.IGNORECASE) for pattern in IMPORTANT_KEYWORDS]
+IMPORTANT_PATTERNS = {tag: re.compile(pattern, re.IGNORECASE) for tag, pattern in IMPORTANT_KEYWORDS.items()}
+
+# Unsummarized messages loaded for Tier 1: the summary window plus a
+# summarizer backlog (older ones still reach the prompt through Tier 2)
+TIER1_MAX_MESSAGES = SUMMARY_WINDOW + SUMMARY_MAX_BATCH
+TIER2_MAX_CANDIDATES = 64  # Newest tagged messages considered for packing
+
+
+def importance_tags(text: str) -> Optional[List[str]]:
+    """
+    Important-information tags for a message (e.g. ["medical", "goal"]).
+
+    Returns None rather than an empty list, so the partial index on
+    coach_messages only covers tagged messages.
+    """
+    tags = [tag for tag, pattern in IMPORTANT_PATTERNS.items() if pattern.search(text or "")]
+    return tags or None
 
 
 class ConversationMemoryService:
     """
     3-Tier conversation memory for smart context retrieval.
 
-    TIER 1: Working memory (last 10 messages)
-    TIER 2: Important context (keyword-matched from 11-50)
+    TIER 1: Working memory (messages newer than the summary)
+    TIER 2: Important context (tagged messages older than Tier 1)
     TIER 3: Long-term semantic search (tool-based, not here)
     """
 
@@ -66,8 +96,11 @@ class ConversationMemoryService:
         """
         Get conversation context using 3-tier strategy.
 
-        TIER 1: Last 10 messages (always included - working memory)
-        TIER 2: Keyword-matched important messages from 11-50
+        SUMMARY: Rolling summary of older messages (packed first)
+        TIER 1: Messages after the summary's watermark, newest first,
+                while they fit the budget
+        TIER 2: Messages tagged important (any age before Tier 1), optimal
+                subset for the remaining budget (most messages, then newest)
         TIER 3: Semantic search (handled via tool, not here)
 
         Args:
@@ -78,6 +111,7 @@ class ConversationMemoryService:
 
         Returns:
             {
+                "summary": str | None,  # Older messages, summarized
                 "recent_messages": [...],  # Tier 1
                 "important_context": [...],  # Tier 2
                 "token_count": int,
@@ -89,18 +123,30 @@ class ConversationMemoryService:
 
         try:
             # ================================================================
-            # TIER 1: Working Memory (Last 10 messages - ALWAYS included)
+            # SUMMARY: Older messages, folded up to summarized_through
             # ================================================================
-            tier1_response = self.supabase.table("coach_messages")\
-                .select("id, role, content, created_at")\
-                .eq("conversation_id", conversation_id)\
+            summary_row = self._get_summary_row(conversation_id)
+            summary = summary_row.get("summary") or None
+            summarized_through = summary_row.get("summarized_through")
+
+            # ================================================================
+            # TIER 1: Working Memory (everything the summary doesn't cover;
+            # partial summary batches wait here instead of vanishing)
+            # ================================================================
+            tier1_query = self.supabase.table("coach_messages")\
+                .select("id, role, content, created_at, token_count")\
+                .eq("conversation_id", conversation_id)
+            if summarized_through:
+                tier1_query = tier1_query.gt("created_at", summarized_through)
+            tier1_response = tier1_query\
                 .order("created_at", desc=True)\
-                .limit(10)\
+                .limit(TIER1_MAX_MESSAGES)\
                 .execute()
 
-            if not tier1_response.data:
+            if not tier1_response.data and not summary:
                 logger.info("[ConversationMemory] No previous messages found")
                 return {
+                    "summary": None,
                     "recent_messages": [],
                     "important_context": [],
                     "token_count": 0,
@@ -108,47 +154,56 @@ class ConversationMemoryService:
                     "has_important_keywords": False
                 }
 
-            # Reverse to chronological order
-            tier1_messages = list(reversed(tier1_response.data))
-            tier1_tokens = sum(len(m["content"]) // 4 for m in tier1_messages)
+            summary_tokens = count_tokens(summary) if summary else 0
+
+            # Pack newest first (most relevant), returned in chronological order
+            tier1_messages = pack_recent(tier1_response.data, token_budget - summary_tokens)
+            tier1_tokens = sum_message_tokens(tier1_messages)
 
             logger.info(
-                f"[ConversationMemory] ✅ Tier 1: {len(tier1_messages)} messages, "
-                f"{tier1_tokens} tokens"
+                f"[ConversationMemory] ✅ Tier 1: {len(tier1_messages)}/{len(tier1_response.data)} messages, "
+                f"{tier1_tokens} tokens (summary: {summary_tokens} tokens)"
             )
 
             # ================================================================
-            # TIER 2: Important Context (Keyword matching in messages 11-50)
+            # TIER 2: Important Context (tagged messages older than Tier 1)
             # ================================================================
             tier2_messages = []
             tier2_tokens = 0
-            has_important_keywords = self._has_important_keywords(current_message)
+            has_important_keywords = importance_tags(current_message) is not None
+            # Summarized, dropped for budget, or beyond the Tier 1 load
+            has_older_messages = (
+                summarized_through is not None
+                or len(tier1_messages) < len(tier1_response.data)
+                or len(tier1_response.data) >= TIER1_MAX_MESSAGES
+            )
 
-            if has_important_keywords and tier1_tokens < token_budget - 200:
+            if (
+                has_important_keywords
+                and has_older_messages
+                and tier1_messages
+                and summary_tokens + tier1_tokens < token_budget - 200
+            ):
                 logger.info("[ConversationMemory] 🔍 Current message has important keywords - checking history")
 
-                # Get messages 11-50
+                # Tagged at write time; served by the partial index (migration 049)
                 tier2_response = self.supabase.table("coach_messages")\
-                    .select("id, role, content, created_at")\
+                    .select("id, role, content, created_at, token_count")\
                     .eq("conversation_id", conversation_id)\
+                    .not_.is_("importance_tags", "null")\
+                    .lt("created_at", tier1_messages[0]["created_at"])\
                     .order("created_at", desc=True)\
-                    .range(10, 49)\
+                    .limit(TIER2_MAX_CANDIDATES)\
                     .execute()
 
                 if tier2_response.data:
-                    # Filter for messages with important keywords
-                    for msg in tier2_response.data:
-                        if self._has_important_keywords(msg["content"]):
-                            tier2_messages.append(msg)
-
-                            # Check token budget
-                            msg_tokens = len(msg["content"]) // 4
-                            if tier1_tokens + tier2_tokens + msg_tokens > token_budget:
-                                break
-                            tier2_tokens += msg_tokens
-
-                    # Reverse to chronological
-                    tier2_messages = list(reversed(tier2_messages))
+                    # Best subset for the remaining budget (chronological)
+                    tier2_messages = pack_optimal(
+                        tier2_response.data,
+                        token_budget - summary_tokens - tier1_tokens,
+                        max_candidates=TIER2_MAX_CANDIDATES
+                    )
+                    tier2_tokens = sum_message_tokens(tier2_messages)
 
                     logger.info(
                         f"[ConversationMemory] ✅ Tier 2: Found {len(tier2_messages)} important messages, "
@@ -158,9 +213,11 @@ class ConversationMemoryService:
             # ================================================================
             # Format Response
             # ================================================================
-            total_tokens = tier1_tokens + tier2_tokens
+            total_tokens = summary_tokens + tier1_tokens + tier2_tokens
 
             return {
+                "summary": summary,
+                "summary_tokens": summary_tokens,
                 "recent_messages": tier1_messages,
                 "important_context": tier2_messages,
                 "token_count": total_tokens,
@@ -173,6 +230,7 @@ class ConversationMemoryService:
         except Exception as e:
             logger.error(f"[ConversationMemory] ❌ Failed to get context: {e}", exc_info=True)
             return {
+                "summary": None,
                 "recent_messages": [],
                 "important_context": [],
                 "token_count": 0,
@@ -180,17 +238,6 @@ class ConversationMemoryService:
                 "has_important_keywords": False
             }
 
-    def _has_important_keywords(self, text: str) -> bool:
-        """
-        Check if text contains important keywords.
-
-        Returns True if text mentions allergies, injuries, goals, etc.
-        """
-        for pattern in IMPORTANT_PATTERNS:
-            if pattern.search(text):
-                return True
-        return False
-
     async def get_conversation_summary(
         self,
         conversation_id: str
@@ -198,8 +245,9 @@ class ConversationMemoryService:
         """
         Get conversation summary (if available).
 
-        For long conversations (>20 messages), we generate summaries
-        to save tokens on future requests.
+        Messages that aged out of Tier 1 are folded into a running summary
+        in the background (see ConversationSummaryService), to save tokens
+        on future requests.
 
         Args:
             conversation_id: Conversation UUID
@@ -207,15 +255,20 @@ class ConversationMemoryService:
         Returns:
             Summary text or None
         """
-        try:
-            # TODO: Implement conversation summarization
-            # Query conversation_summaries table
-            # Return most recent summary
+        return self._get_summary_row(conversation_id).get("summary") or None
 
-            return None
+    def _get_summary_row(self, conversation_id: str) -> Dict[str, Any]:
+        """summary and summarized_through ({} if there is no summary yet)."""
+        try:
+            response = self.supabase.table("conversation_summaries")\
+                .select("summary, summarized_through")\
+                .eq("conversation_id", conversation_id)\
+                .limit(1)\
+                .execute()
+            return response.data[0] if response.data else {}
         except Exception as e:
             logger.error(f"[ConversationMemory] Failed to get summary: {e}")
-            return None
+            return {}
 
 
 # Singleton
@@ -0,0 +1,223 @@
+"""
+Conversation Summary Service - rolling summaries for coach memory.
+
+Messages older than the last SUMMARY_WINDOW are folded, a batch at a time,
+into one running summary per conversation (conversation_summaries,
+migration 047):
+
+    new summary = LLM(previous summary + newly aged-out messages)
+
+The summary is updated incrementally (never re-reads summarized messages)
+by the Celery task coach.summarize_conversation, so prompt size stays flat
+as a conversation grows. ConversationMemoryService reads it and sends every
+message after summarized_through verbatim, so messages waiting for a full
+batch are never missing from the prompt.
+"""
+
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+import structlog
+
+logger = structlog.get_logger()
+
+SUMMARY_WINDOW = 10  # Tier 1 size: newer messages are sent verbatim
+SUMMARY_MIN_BATCH = 6  # Aged-out messages needed before an LLM call
+SUMMARY_MAX_BATCH = 40  # Messages folded per LLM call
+SUMMARY_MAX_ROUNDS = 5  # Batches per run (catch-up for long backlogs)
+SUMMARY_MAX_TOKENS = 350
+SUMMARY_MESSAGE_CHARS = 1200  # Long replies are clipped in the transcript
+
+SUMMARY_MODEL = "deepseek/deepseek-v3.1-terminus:exacto"
+
+SUMMARY_PROMPT = """You maintain the long-term memory of a fitness and nutrition coaching conversation.
+
+Update the running summary with the new messages. Keep:
+- Facts about the user: goals, allergies, injuries, dietary restrictions, preferences, schedule
+- Decisions, plans and commitments made in the conversation
+- Open questions or follow-ups the coach promised
+
+Drop greetings, small talk and nutrition numbers that were already logged.
+Write terse bullet points in the conversation's language, at most 200 words.
+Output only the updated summary.
+
+<previous_summary>
+{summary}
+</previous_summary>
+
+<new_messages>
+{transcript}
+</new_messages>"""
+
+
+class ConversationSummaryService:
+    """Incrementally maintains conversation_summaries."""
+
+    def __init__(self, supabase_client, llm_client=None, model: str = SUMMARY_MODEL):
+        self.supabase = supabase_client
+        self._llm_client = llm_client
+        self.model = model
+
+    @property
+    def llm_client(self):
+        """OpenRouter client (OpenAI SDK format), created on first use."""
+        if self._llm_client is None:
+            from app.config import settings
+            from app.services.llm_adapter import create_llm_adapter
+
+            self._llm_client = create_llm_adapter(
+                "openrouter",
+                api_key=settings.OPENROUTER_API_KEY,
+                model=self.model
+            ).client
+        return self._llm_client
+
+    def get_summary(self, conversation_id: str) -> Optional[Dict[str, Any]]:
+        """Current summary row (None if the conversation has none yet)."""
+        response = self.supabase.table("conversation_summaries")\
+            .select("conversation_id, summary, token_count, summarized_through, summarized_message_count, cost_usd")\
+            .eq("conversation_id", conversation_id)\
+            .limit(1)\
+            .execute()
+        return response.data[0] if response.data else None
+
+    def _window_start(self, conversation_id: str) -> Optional[str]:
+        """created_at of the oldest Tier 1 message (None if the window isn't full)."""
+        response = self.supabase.table("coach_messages")\
+            .select("created_at")\
+            .eq("conversation_id", conversation_id)\
+            .order("created_at", desc=True)\
+            .range(SUMMARY_WINDOW - 1, SUMMARY_WINDOW - 1)\
+            .execute()
+        return response.data[0]["created_at"] if response.data else None
+
+    def _aged_out_messages(
+        self,
+        conversation_id: str,
+        window_start: str,
+        summarized_through: Optional[str]
+    ) -> List[Dict[str, Any]]:
+        """Oldest unsummarized messages that are no longer in Tier 1."""
+        query = self.supabase.table("coach_messages")\
+            .select("id, user_id, role, content, ai_model, created_at")\
+            .eq("conversation_id", conversation_id)\
+            .lt("created_at", window_start)
+        if summarized_through:
+            query = query.gt("created_at", summarized_through)
+
+        response = query.order("created_at").limit(SUMMARY_MAX_BATCH).execute()
+        return response.data or []
+
+    @staticmethod
+    def _format_transcript(messages: List[Dict[str, Any]]) -> str:
+        lines = []
+        for msg in messages:
+            if msg.get("role") not in ("user", "assistant") or msg.get("ai_model") == "quick_ack":
+                continue
+            content = str(msg.get("content") or "").strip()
+            if len(content) > SUMMARY_MESSAGE_CHARS:
+                content = content[:SUMMARY_MESSAGE_CHARS] + "…"
+            lines.append(f"{msg['role'].upper()}: {content}")
+        return "\n".join(lines)
+
+    async def _summarize(self, previous: str, transcript: str) -> Dict[str, Any]:
+        response = await self.llm_client.chat.completions.create(
+            model=self.model,
+            max_tokens=SUMMARY_MAX_TOKENS,
+            temperature=0.2,
+            messages=[{
+                "role": "user",
+                "content": SUMMARY_PROMPT.format(summary=previous or "(none yet)", transcript=transcript)
+            }]
+        )
+
+        usage = response.usage
+        input_tokens = usage.prompt_tokens if usage else 0
+        output_tokens = usage.completion_tokens if usage else 0
+        return {
+            "summary": (response.choices[0].message.content or "").strip(),
+            "token_count": output_tokens,
+            # DeepSeek v3.1 via OpenRouter ($0.14 / $0.28 per 1M tokens)
+            "cost_usd": input_tokens / 1_000_000 * 0.14 + output_tokens / 1_000_000 * 0.28
+        }
+
+    async def update_summary(self, conversation_id: str) -> Dict[str, Any]:
+        """
+        Fold messages that aged out of Tier 1 into the running summary.
+
+        No-op (no LLM call) until at least SUMMARY_MIN_BATCH messages are
+        waiting. Long backlogs are processed oldest first, SUMMARY_MAX_BATCH
+        messages per LLM call.
+
+        Returns:
+            {"updated": bool, "messages_folded": int, "summary": str | None}
+        """
+        row = self.get_summary(conversation_id)
+        summary = row["summary"] if row else ""
+        summarized_through = row["summarized_through"] if row else None
+        summarized_count = row["summarized_message_count"] if row else 0
+        cost_usd = float(row.get("cost_usd") or 0) if row else 0.0
+
+        window_start = self._window_start(conversation_id)
+        if window_start is None:
+            return {"updated": False, "messages_folded": 0, "summary": summary or None}
+
+        folded = 0
+        user_id = None
+        for _ in range(SUMMARY_MAX_ROUNDS):
+            batch = self._aged_out_messages(conversation_id, window_start, summarized_through)
+            if len(batch) < SUMMARY_MIN_BATCH:
+                break
+
+            transcript = self._format_transcript(batch)
+            if transcript:
+                result = await self._summarize(summary, transcript)
+                summary = result["summary"] or summary
+                token_count = result["token_count"]
+                cost_usd += result["cost_usd"]
+            else:
+                token_count = row["token_count"] if row else 0
+
+            summarized_through = batch[-1]["created_at"]
+            summarized_count += len(batch)
+            folded += len(batch)
+            user_id = batch[-1]["user_id"]
+
+            self.supabase.table("conversation_summaries").upsert({
+                "conversation_id": conversation_id,
+                "user_id": user_id,
+                "summary": summary,
+                "token_count": token_count,
+                "summarized_through": summarized_through,
+                "summarized_message_count": summarized_count,
+                "ai_model": self.model,
+                "cost_usd": round(cost_usd, 6),
+                "updated_at": datetime.utcnow().isoformat()
+            }, on_conflict="conversation_id").execute()
+
+            if len(batch) < SUMMARY_MAX_BATCH:
+                break
+
+        if folded:
+            logger.info(
+                "conversation_summary_updated",
+                conversation_id=conversation_id[:8],
+                messages_folded=folded,
+                summarized_message_count=summarized_count
+            )
+
+        return {"updated": folded > 0, "messages_folded": folded, "summary": summary or None}
+
+
+# Singleton
+_conversation_summary: Optional[ConversationSummaryService] = None
+
+def get_conversation_summary_service(supabase_client=None) -> ConversationSummaryService:
+    """Get singleton ConversationSummaryService instance."""
+    global _conversation_summary
+    if _conversation_summary is None:
+        if supabase_client is None:
+            from app.services.supabase_service import get_service_client
+            supabase_client = get_service_client()
+        _conversation_summary = ConversationSummaryService(supabase_client)
+    return _conversation_summary
@@ -0,0 +1,401 @@
+"""
+Embedding Service - text embeddings for coach memory.
+
+Coach messages are embedded with OpenAI text-embedding-3-small, truncated
+to 384 dimensions (coach_message_embeddings.embedding is vector(384)).
+The same model embeds search queries, so query and message vectors are
+comparable.
+
+Messages are embedded in micro-batches, not one request per message:
+
+    coach reply → EmbeddingQueue (Redis list)
+                → coach.embed_pending_messages (every few seconds, or as
+                  soon as EMBEDDING_FLUSH_SIZE messages are waiting)
+                → EmbeddingPipeline: dedupe by content hash, one embeddings
+                  request per EMBEDDING_BATCH_SIZE texts (or
+                  EMBEDDING_MAX_REQUEST_TOKENS), bulk insert, append to the
+                  per-user vector index
+
+Inputs are truncated to EMBEDDING_CONTENT_CHARS. A request the API rejects
+is split until the bad input is isolated; rejected inputs and messages
+that keep failing (EMBEDDING_MAX_ATTEMPTS runs) go to a dead-letter list
+instead of blocking the queue. Insert chunks the database refuses (e.g. a
+message whose coach_messages row hasn't been written) are split the same
+way, so only the bad rows are re-queued.
+
+EMBEDDING_PROVIDER=local swaps in HashingEmbedder, a deterministic
+stand-in that needs no API key (tests, local development).
+"""
+
+import hashlib
+import json
+import re
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+EMBEDDING_MODEL = "text-embedding-3-small"  # $0.02/M tokens
+EMBEDDING_DIMENSIONS = 384
+EMBEDDING_COST_PER_TOKEN = 0.02 / 1_000_000
+
+EMBEDDING_BATCH_SIZE = 2048  # OpenAI embeddings input-array limit
+EMBEDDING_MAX_REQUEST_TOKENS = 250_000  # Under the API's 300k tokens per request
+EMBEDDING_MAX_ATTEMPTS = 5  # Runs a message may fail before it is dead-lettered
+EMBEDDING_FLUSH_SIZE = 64  # Queue length that triggers an immediate flush
+EMBEDDING_MAX_PENDING = 8192  # Messages drained per pipeline run
+EMBEDDING_INSERT_CHUNK = 500  # Rows per bulk insert
+EMBEDDING_CONTENT_CHARS = 2000  # Embedded text and coach_message_embeddings.content_text
+EMBEDDING_HASH_CACHE_SIZE = 10_000
+
+EMBEDDING_QUEUE_KEY = "coach:embedding_queue"
+EMBEDDING_DEAD_LETTER_KEY = "coach:embedding_queue:dead"
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+def estimate_tokens(text: str) -> int:
+    """Upper-bound token estimate (~3 chars per token; tokenizer not needed)."""
+    return len(text) // 3 + 1
+
+
+def is_rejected_input(error: Exception) -> bool:
+    """Whether the API rejected the request itself (400), so retrying it as is won't help."""
+    return getattr(error, "status_code", None) == 400
+
+
+def is_refused_row(error: Exception) -> bool:
+    """Whether the database refused the rows themselves (integrity/data error, e.g. a foreign key)."""
+    return str(getattr(error, "code", None) or "").startswith(("22", "23"))
+
+
+def content_hash(text: str) -> str:
+    """Dedupe key: identical content (ignoring case/whitespace) embeds once."""
+    normalized = " ".join(text.lower().split())
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+class OpenAIEmbedder:
+    """OpenAI embeddings (sync client: used from Celery workers and tool threads)."""
+
+    model = EMBEDDING_MODEL
+    dimensions = EMBEDDING_DIMENSIONS
+
+    def __init__(self, api_key: Optional[str] = None):
+        from ultimate_ai_consultation.libs.llm_clients import get_openai_client
+
+        if api_key is None:
+            from app.config import settings
+            api_key = settings.OPENAI_API_KEY
+        self.client = get_openai_client(api_key)
+
+    def embed(self, texts: List[str]) -> Tuple[List[List[float]], int]:
+        """
+        Embed texts in one request.
+
+        Returns:
+            (vectors in input order, tokens used)
+        """
+        response = self.client.embeddings.create(
+            model=self.model,
+            input=texts,
+            dimensions=self.dimensions
+        )
+        vectors = [item.embedding for item in sorted(response.data, key=lambda item: item.index)]
+        return vectors, response.usage.total_tokens
+
+
+class HashingEmbedder:
+    """
+    Deterministic local stand-in (feature hashing of words).
+
+    Texts sharing words get similar vectors, which is enough for tests and
+    local development; no API key, no cost.
+    """
+
+    model = "local-hashing"
+    dimensions = EMBEDDING_DIMENSIONS
+
+    def embed(self, texts: List[str]) -> Tuple[List[List[float]], int]:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        tokens_used = 0
+        for row, text in enumerate(texts):
+            words = _TOKEN.findall(text.lower())
+            tokens_used += len(words)
+            for word in words:
+                digest = hashlib.blake2b(word.encode("utf-8"), digest_size=8).digest()
+                bucket = int.from_bytes(digest[:4], "little") % self.dimensions
+                vectors[row, bucket] += 1.0 if digest[4] & 1 else -1.0
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return vectors.tolist(), tokens_used
+
+
+class EmbeddingQueue:
+    """Messages waiting to be embedded (Redis list shared by API and workers)."""
+
+    def __init__(self, redis_client=None, key: str = EMBEDDING_QUEUE_KEY):
+        self._redis = redis_client
+        self.key = key
+        self.dead_letter_key = EMBEDDING_DEAD_LETTER_KEY if key == EMBEDDING_QUEUE_KEY else f"{key}:dead"
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            import redis
+            from app.config import settings
+
+            self._redis = redis.Redis.from_url(settings.REDIS_URL)
+        return self._redis
+
+    def push(self, *items: Dict[str, Any]) -> int:
+        """Enqueue messages ({message_id, user_id, role, content}); returns queue length."""
+        return self.redis.rpush(self.key, *[json.dumps(item) for item in items])
+
+    def pop_batch(self, count: int) -> List[Dict[str, Any]]:
+        """Dequeue up to count messages, oldest first."""
+        raw = self.redis.lpop(self.key, count) or []
+        return [json.loads(item) for item in raw]
+
+    def retry(self, items: Sequence[Dict[str, Any]], error: str) -> Tuple[int, int]:
+        """
+        Re-enqueue failed messages with their attempt count bumped; messages
+        out of attempts go to the dead-letter list.
+
+        Returns:
+            (requeued, dead-lettered)
+        """
+        retry, dead = [], []
+        for item in items:
+            item = {**item, "attempts": item.get("attempts", 0) + 1, "last_error": error[:500]}
+            (retry if item["attempts"] < EMBEDDING_MAX_ATTEMPTS else dead).append(item)
+        if retry:
+            self.push(*retry)
+        if dead:
+            self.dead_letter(*dead)
+        return len(retry), len(dead)
+
+    def dead_letter(self, *items: Dict[str, Any]) -> None:
+        """Park messages that can't be embedded (inspect/replay by hand)."""
+        self.redis.rpush(self.dead_letter_key, *[json.dumps(item) for item in items])
+
+    def __len__(self) -> int:
+        return self.redis.llen(self.key)
+
+
+class EmbeddingPipeline:
+    """Embeds queued messages in batches and stores them with bulk inserts."""
+
+    def __init__(
+        self,
+        supabase_client,
+        embedder=None,
+        batch_size: int = EMBEDDING_BATCH_SIZE,
+        vector_index=None
+    ):
+        self.supabase = supabase_client
+        self.embedder = embedder or get_embedder()
+        self.batch_size = batch_size
+        self.vector_index = vector_index
+        # content hash -> vector, so repeated content across runs embeds once
+        self._recent: "OrderedDict[str, List[float]]" = OrderedDict()
+
+    def _already_embedded(self, message_ids: List[str]) -> set:
+        response = self.supabase.table("coach_message_embeddings")\
+            .select("message_id")\
+            .in_("message_id", message_ids)\
+            .execute()
+        return {row["message_id"] for row in response.data or []}
+
+    def _batches(self, hashes: List[str], texts_by_hash: Dict[str, str]) -> List[List[str]]:
+        """Split hashes into requests capped by input count and estimated tokens."""
+        batches: List[List[str]] = []
+        batch: List[str] = []
+        batch_tokens = 0
+        for h in hashes:
+            tokens = estimate_tokens(texts_by_hash[h])
+            if batch and (len(batch) >= self.batch_size or batch_tokens + tokens > EMBEDDING_MAX_REQUEST_TOKENS):
+                batches.append(batch)
+                batch, batch_tokens = [], 0
+            batch.append(h)
+            batch_tokens += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    def _embed_batch(
+        self,
+        hashes: List[str],
+        texts_by_hash: Dict[str, str],
+        vectors: Dict[str, List[float]],
+        rejected: set
+    ) -> Tuple[int, int]:
+        """
+        Embed one request; if the API rejects it, split until the bad
+        inputs are isolated (added to rejected). Other errors propagate.
+
+        Returns:
+            (tokens used, API calls)
+        """
+        try:
+            batch_vectors, tokens_used = self.embedder.embed([texts_by_hash[h] for h in hashes])
+        except Exception as e:
+            if not is_rejected_input(e):
+                raise
+            if len(hashes) == 1:
+                logger.warning("embedding_input_rejected", content_hash=hashes[0][:12], error=str(e))
+                rejected.add(hashes[0])
+                return 0, 1
+            middle = len(hashes) // 2
+            left = self._embed_batch(hashes[:middle], texts_by_hash, vectors, rejected)
+            right = self._embed_batch(hashes[middle:], texts_by_hash, vectors, rejected)
+            return left[0] + right[0], 1 + left[1] + right[1]
+
+        for h, vector in zip(hashes, batch_vectors):
+            vectors[h] = vector
+            self._recent[h] = vector
+        return tokens_used, 1
+
+    def _insert_rows(self, rows: List[Dict[str, Any]], stored: List[Dict[str, Any]], refused: set) -> None:
+        """
+        Bulk insert rows; if the database refuses them, split until the bad
+        rows are isolated (message IDs added to refused). Other errors propagate.
+        """
+        try:
+            result = self.supabase.table("coach_message_embeddings").insert(rows).execute()
+        except Exception as e:
+            if not is_refused_row(e):
+                raise
+            if len(rows) == 1:
+                logger.warning("embedding_row_refused", message_id=rows[0]["message_id"], error=str(e))
+                refused.add(rows[0]["message_id"])
+                return
+            middle = len(rows) // 2
+            self._insert_rows(rows[:middle], stored, refused)
+            self._insert_rows(rows[middle:], stored, refused)
+            return
+        stored.extend(result.data or [])
+
+    def _embed_unique(self, texts_by_hash: Dict[str, str]) -> Tuple[Dict[str, List[float]], int, int, set]:
+        """
+        Vectors for each content hash (cached ones skip the API).
+
+        Returns:
+            (vectors by hash, tokens used, API calls, rejected hashes)
+        """
+        vectors = {h: self._recent[h] for h in texts_by_hash if h in self._recent}
+        missing = [h for h in texts_by_hash if h not in vectors]
+
+        tokens_used = 0
+        api_calls = 0
+        rejected: set = set()
+        for hashes in self._batches(missing, texts_by_hash):
+            batch_tokens, batch_calls = self._embed_batch(hashes, texts_by_hash, vectors, rejected)
+            tokens_used += batch_tokens
+            api_calls += batch_calls
+
+        for h in vectors:
+            self._recent.move_to_end(h)
+        while len(self._recent) > EMBEDDING_HASH_CACHE_SIZE:
+            self._recent.popitem(last=False)
+        return vectors, tokens_used, api_calls, rejected
+
+    def run(self, items: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Embed and store queued messages.
+
+        Returns:
+            {"stored": int, "embedded": int, "api_calls": int, "tokens_used": int,
+             "cost_usd": float, "rejected": [items the API rejected],
+             "refused": [items whose row the database refused]}
+        """
+        pending = list({item["message_id"]: item for item in items if item.get("content")}.values())
+        if pending:
+            done = self._already_embedded([item["message_id"] for item in pending])
+            pending = [item for item in pending if item["message_id"] not in done]
+        if not pending:
+            return {
+                "stored": 0, "embedded": 0, "api_calls": 0, "tokens_used": 0, "cost_usd": 0.0,
+                "rejected": [], "refused": []
+            }
+
+        texts_by_hash: Dict[str, str] = {}
+        hash_by_id: Dict[str, str] = {}
+        for item in pending:
+            h = hash_by_id[item["message_id"]] = content_hash(item["content"])
+            texts_by_hash.setdefault(h, item["content"][:EMBEDDING_CONTENT_CHARS])
+
+        cached = {h for h in texts_by_hash if h in self._recent}
+        vectors, tokens_used, api_calls, rejected_hashes = self._embed_unique(texts_by_hash)
+        embedded = sum(1 for h in vectors if h not in cached)
+        cost_usd = tokens_used * EMBEDDING_COST_PER_TOKEN
+        cost_per_text = cost_usd / embedded if embedded else 0.0
+
+        rejected = [item for item in pending if hash_by_id[item["message_id"]] in rejected_hashes]
+        rows = []
+        charged = set()
+        for item in pending:
+            item_hash = hash_by_id[item["message_id"]]
+            if item_hash in rejected_hashes:
+                continue
+            rows.append({
+                "message_id": item["message_id"],
+                "user_id": item["user_id"],
+                "role": item.get("role") or "assistant",
+                "embedding": vectors[item_hash],
+                "content_text": item["content"][:EMBEDDING_CONTENT_CHARS],
+                "embedding_model": self.embedder.model,
+                "embedding_cost_usd": round(cost_per_text, 6) if item_hash not in charged | cached else 0,
+                "importance_score": 0.5,  # Neutral - updated by the importance task
+                "is_archived": False
+            })
+            charged.add(item_hash)
+
+        stored: List[Dict[str, Any]] = []
+        refused_ids: set = set()
+        for start in range(0, len(rows), EMBEDDING_INSERT_CHUNK):
+            self._insert_rows(rows[start:start + EMBEDDING_INSERT_CHUNK], stored, refused_ids)
+
+        if self.vector_index is not None:
+            by_user: Dict[str, List[Dict[str, Any]]] = {}
+            for row in stored:
+                by_user.setdefault(row["user_id"], []).append(row)
+            for user_id, user_rows in by_user.items():
+                try:
+                    self.vector_index.add_embeddings(user_id, user_rows)
+                except Exception as e:
+                    logger.warning("vector_index_update_failed", user_id=user_id[:8], error=str(e))
+
+        return {
+            "stored": len(stored),
+            "embedded": embedded,
+            "api_calls": api_calls,
+            "tokens_used": tokens_used,
+            "cost_usd": round(cost_usd, 6),
+            "rejected": rejected,
+            "refused": [item for item in pending if item["message_id"] in refused_ids]
+        }
+
+
+# Singletons
+_embedder = None
+_embedding_queue: Optional[EmbeddingQueue] = None
+
+def get_embedder():
+    """Get singleton embedder (EMBEDDING_PROVIDER: "openai" or "local")."""
+    global _embedder
+    if _embedder is None:
+        from app.config import settings
+
+        _embedder = HashingEmbedder() if settings.EMBEDDING_PROVIDER == "local" else OpenAIEmbedder()
+    return _embedder
+
+
+def get_embedding_queue() -> EmbeddingQueue:
+    """Get singleton EmbeddingQueue instance."""
+    global _embedding_queue
+    if _embedding_queue is None:
+        _embedding_queue = EmbeddingQueue()
+    return _embedding_queue
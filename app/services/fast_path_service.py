@@ -0,0 +1,276 @@
+"""
+Fast Path Service - answers that need no LLM call
+
+Two deterministic lanes in front of the coach's LLM chat:
+- canned: messages that are nothing but acknowledgements, greetings,
+  thanks or goodbyes ("thanks!", "ok cool", "bye coach") → i18n canned
+  response
+- data: short questions about the user's own totals ("how much protein
+  today?", "what are my calories yesterday") → get_daily_nutrition_summary
+  rendered through i18n templates
+
+route() is pure pattern matching. Each match carries a confidence, and
+only matches at or above the lane threshold are returned; everything else
+(and any render that can't be completed) falls through to the LLM.
+"""
+
+import re
+import structlog
+from datetime import date, timedelta
+from typing import Any, Dict, List, NamedTuple, Optional
+
+logger = structlog.get_logger()
+
+CANNED_LANE = "canned"
+DATA_LANE = "data"
+
+CANNED_MIN_CONFIDENCE = 0.8
+DATA_MIN_CONFIDENCE = 0.8
+
+CANNED_MAX_WORDS = 6
+DATA_MAX_WORDS = 12
+
+# Intent → phrases (normalized: lowercase, no punctuation). A message is
+# canned only if it is made up entirely of these phrases and fillers.
+CANNED_PHRASES = {
+    "canned.goodbye": [
+        "bye", "goodbye", "bye bye", "see you", "see ya", "see you later", "later", "cya",
+        "good night", "gn", "tchau", "ate logo", "adios", "hasta luego", "au revoir",
+    ],
+    "canned.thanks": [
+        "thanks", "thank you", "thx", "ty", "tysm", "thanks a lot", "many thanks",
+        "obrigado", "obrigada", "valeu", "gracias", "muchas gracias", "merci",
+    ],
+    "canned.acknowledgment": [
+        "ok", "okay", "k", "kk", "got it", "understood", "cool", "nice", "great", "perfect",
+        "awesome", "sounds good", "will do", "noted", "entendi", "beleza", "vale", "perfecto",
+        "d'accord",
+    ],
+    "canned.greeting": [
+        "hi", "hello", "hey", "hey there", "sup", "yo", "oi", "ola", "olá", "hola", "salut",
+        "good morning", "good afternoon", "good evening", "bom dia", "boa tarde", "buenos dias",
+        "buenos días",
+    ],
+}
+# When a message mixes intents ("ok thanks bye"), the first listed wins
+CANNED_PRIORITY = list(CANNED_PHRASES)
+
+# Words that may pad a canned message; each one costs confidence
+CANNED_FILLERS = {"so", "much", "very", "again", "man", "bro", "coach", "dude", "buddy", "all", "lol", "haha", "a", "lot"}
+CANNED_FILLER_PENALTY = 0.05
+# "ok" right after the coach asked something is an answer, not small talk
+ANSWER_PENALTY = 0.5
+
+DATA_TOOL = "get_daily_nutrition_summary"
+
+NUTRIENT_PATTERNS = {
+    "calories": re.compile(r"\b(calories|calorie|cals|kcals?|calorias|calorías)\b"),
+    "protein": re.compile(r"\b(protein|proteins|proteina|proteína)\b"),
+    "carbs": re.compile(r"\b(carbs|carb|carbohydrates?|carboidratos|carbohidratos)\b"),
+    "fat": re.compile(r"\b(fat|fats|gordura|grasa|grasas)\b"),
+}
+DATA_QUESTION = re.compile(
+    r"^(how much|how many|what'?s my|what is my|what are my|whats my|show me my|show my|"
+    r"quanto|quanta|quantas|quantos|cuanto|cuánto|cuanta|cuánta|cuantas|cuántas|cuantos|cuántos)\b"
+)
+DATA_SELF = re.compile(r"\b(my|i|i've|ive|have i|did i|eu|meu|minha|mi|mis)\b")
+DATA_TODAY = re.compile(r"\b(today|so far|hoje|hoy)\b")
+DATA_YESTERDAY = re.compile(r"\b(yesterday|ontem|ayer)\b")
+# Advice, targets, foods or comparisons need the coach, not a number
+DATA_BLOCKERS = re.compile(
+    r"\b(should|why|need|needs|enough|recommend|suggest|can|could|would|better|more|less|left|"
+    r"remaining|plan|per|in|on|from|vs|versus|week|month|average|burn|burned|burnt)\b"
+)
+
+DATA_BASE_CONFIDENCE = 0.6
+DATA_DAY_BONUS = 0.2
+DATA_SELF_BONUS = 0.2
+
+# English fallbacks (translations are seeded by migrations/050_fast_path_translations.sql)
+FAST_PATH_TEMPLATES = {
+    "fast_path.day.today": "Today",
+    "fast_path.day.yesterday": "Yesterday",
+    "fast_path.calories": "{day}: {value} kcal of your {goal} kcal goal ({percent}%).",
+    "fast_path.protein": "{day}: {value}g protein of your {goal}g goal ({percent}%).",
+    "fast_path.carbs": "{day}: {value}g carbs.",
+    "fast_path.fat": "{day}: {value}g fat.",
+    "fast_path.nothing_logged": "{day}: no meals logged.",
+}
+CANNED_FALLBACKS = {
+    "canned.greeting": "Hey! 💪 What can I do for you?",
+    "canned.thanks": "Anytime! 🔥",
+    "canned.goodbye": "See you later! 💯",
+    "canned.acknowledgment": "Got it! 💪",
+}
+
+_NON_WORD = re.compile(r"[^\w\s']+", re.UNICODE)
+_DIGIT = re.compile(r"\d")
+
+
+class FastPathMatch(NamedTuple):
+    """A message the fast path can answer without the LLM."""
+
+    lane: str  # CANNED_LANE or DATA_LANE
+    intent: str  # canned translation key, or "nutrition_summary"
+    confidence: float
+    tool_name: Optional[str] = None
+    tool_input: Optional[Dict[str, Any]] = None
+    nutrients: tuple = ()
+    day: str = "today"
+
+
+def normalize_message(message: str) -> str:
+    """Lowercase, punctuation/emoji stripped, whitespace collapsed."""
+    return " ".join(_NON_WORD.sub(" ", message.lower()).split())
+
+
+class FastPathService:
+    """Routes trivial and data-lookup messages around the LLM."""
+
+    def __init__(self, i18n_service):
+        self.i18n = i18n_service
+        self._phrases: Dict[tuple, str] = {
+            tuple(phrase.split()): key
+            for key, phrases in CANNED_PHRASES.items()
+            for phrase in phrases
+        }
+        self._longest_phrase = max(len(words) for words in self._phrases)
+
+    def route(self, message: str, previous_reply: Optional[str] = None) -> Optional[FastPathMatch]:
+        """
+        Match a message to a lane.
+
+        Args:
+            message: User's message
+            previous_reply: Coach's last message, if known (an acknowledgement
+                of a question is an answer and goes to the LLM)
+
+        Returns:
+            FastPathMatch at or above its lane's threshold, or None (use the LLM)
+        """
+        text = normalize_message(message)
+        if not text or _DIGIT.search(text):
+            return None
+
+        match = self._match_canned(text, previous_reply) or self._match_data(text)
+        if match is None:
+            return None
+
+        threshold = CANNED_MIN_CONFIDENCE if match.lane == CANNED_LANE else DATA_MIN_CONFIDENCE
+        if match.confidence < threshold:
+            logger.info("fast_path_below_threshold", lane=match.lane, intent=match.intent, confidence=match.confidence)
+            return None
+        return match
+
+    def _match_canned(self, text: str, previous_reply: Optional[str]) -> Optional[FastPathMatch]:
+        words = text.split()
+        if len(words) > CANNED_MAX_WORDS:
+            return None
+
+        intents = set()
+        fillers = 0
+        i = 0
+        while i < len(words):
+            for size in range(min(self._longest_phrase, len(words) - i), 0, -1):
+                key = self._phrases.get(tuple(words[i:i + size]))
+                if key:
+                    intents.add(key)
+                    i += size
+                    break
+            else:
+                if words[i] not in CANNED_FILLERS:
+                    return None
+                fillers += 1
+                i += 1
+
+        if not intents:
+            return None
+
+        intent = next(key for key in CANNED_PRIORITY if key in intents)
+        confidence = 1.0 - CANNED_FILLER_PENALTY * fillers
+        if intent == "canned.acknowledgment" and previous_reply and previous_reply.rstrip().endswith("?"):
+            confidence *= ANSWER_PENALTY
+        return FastPathMatch(CANNED_LANE, intent, round(confidence, 2))
+
+    def _match_data(self, text: str) -> Optional[FastPathMatch]:
+        words = text.split()
+        if len(words) > DATA_MAX_WORDS or not DATA_QUESTION.search(text):
+            return None
+
+        nutrients = tuple(name for name, pattern in NUTRIENT_PATTERNS.items() if pattern.search(text))
+        if not nutrients:
+            return None
+
+        # "in total" is the only harmless use of a blocked preposition
+        if DATA_BLOCKERS.search(text.replace("in total", "")):
+            return None
+
+        yesterday = bool(DATA_YESTERDAY.search(text))
+        confidence = DATA_BASE_CONFIDENCE
+        if yesterday or DATA_TODAY.search(text):
+            confidence += DATA_DAY_BONUS
+        if DATA_SELF.search(text):
+            confidence += DATA_SELF_BONUS
+
+        tool_input = {"date": (date.today() - timedelta(days=1)).isoformat()} if yesterday else {}
+        return FastPathMatch(
+            DATA_LANE,
+            "nutrition_summary",
+            round(confidence, 2),
+            tool_name=DATA_TOOL,
+            tool_input=tool_input,
+            nutrients=nutrients,
+            day="yesterday" if yesterday else "today"
+        )
+
+    def render(self, match: FastPathMatch, language: str = 'en', tool_result: Any = None) -> Optional[str]:
+        """
+        Answer text for a match, or None if it can't be rendered (use the LLM).
+
+        Args:
+            match: Result of route()
+            language: User's language
+            tool_result: Result of match.tool_name (data lane)
+        """
+        if match.lane == CANNED_LANE:
+            return self.i18n.t(match.intent, language, fallback=CANNED_FALLBACKS.get(match.intent))
+
+        if not isinstance(tool_result, dict) or "error" in tool_result or "totals" not in tool_result:
+            return None
+
+        day = self._t(f"fast_path.day.{match.day}", language)
+        if not tool_result.get("meal_count"):
+            return self._t("fast_path.nothing_logged", language, {"day": day})
+
+        totals = tool_result["totals"]
+        goals = tool_result.get("goals") or {}
+        progress = tool_result.get("progress") or {}
+        lines: List[str] = []
+        for nutrient in match.nutrients:
+            if nutrient == "calories":
+                params = {"value": totals.get("calories"), "goal": goals.get("calories"), "percent": progress.get("calories_percent")}
+            elif nutrient == "protein":
+                params = {"value": totals.get("protein_g"), "goal": goals.get("protein_g"), "percent": progress.get("protein_percent")}
+            else:
+                params = {"value": totals.get(f"{nutrient}_g")}
+            if any(value is None for value in params.values()):
+                return None
+            lines.append(self._t(f"fast_path.{nutrient}", language, {"day": day, **params}))
+        return " ".join(lines)
+
+    def _t(self, key: str, language: str, params: Optional[Dict[str, Any]] = None) -> str:
+        return self.i18n.t(key, language, params, fallback=FAST_PATH_TEMPLATES[key])
+
+
+# Singleton
+_fast_path_service: Optional[FastPathService] = None
+
+def get_fast_path_service(i18n_service=None) -> FastPathService:
+    """Get singleton FastPathService instance."""
+    global _fast_path_service
+    if _fast_path_service is None:
+        if i18n_service is None:
+            from app.services.i18n_service import get_i18n_service
+            i18n_service = get_i18n_service()
+        _fast_path_service = FastPathService(i18n_service)
+    return _fast_path_service
@@ -0,0 +1,155 @@
+"""
+Food Catalog Service
+
+Exports and loads the public food catalog snapshot
+(ultimate_ai_consultation/libs/food_catalog.py) so processes don't page
+through Supabase on cold start:
+
+- export_snapshot(): one full fetch of public foods + servings, written as a
+  versioned, memory-mappable snapshot (Celery task foods.export_catalog_snapshot).
+- get_public_rows(): newest snapshot on disk plus a delta fetch of foods with
+  updated_at newer than the snapshot version. Snapshot foods that are no
+  longer public (deleted or unpublished) are dropped using an id-only fetch
+  of the public catalog. If no snapshot exists yet the first caller exports
+  one, and other processes on the host reuse it.
+
+supabase-py is sync, so fetches, snapshot writes and row materialization
+run in a worker thread, not on the event loop.
+"""
+
+import asyncio
+import threading
+from typing import Any, Dict, List, Optional, Set
+
+import structlog
+
+from app.services.supabase_service import supabase_service
+from ultimate_ai_consultation.libs.food_catalog import (
+    FoodCatalogSnapshot,
+    default_snapshot_dir,
+    write_snapshot,
+)
+
+logger = structlog.get_logger()
+
+CATALOG_PAGE_SIZE = 1000
+CATALOG_COLUMNS = (
+    "id, name, name_pt, brand_name, food_type, dietary_flags, "
+    "calories_per_100g, protein_g_per_100g, carbs_g_per_100g, fat_g_per_100g, "
+    "fiber_g_per_100g, sugar_g_per_100g, sodium_mg_per_100g, "
+    "is_public, verified, usage_count, created_at, updated_at, food_servings(*)"
+)
+
+
+class FoodCatalogService:
+    """Snapshot export plus snapshot + delta reads of the public food catalog."""
+
+    def __init__(self, client=None, directory: Optional[str] = None):
+        self._client = client
+        self.directory = directory or default_snapshot_dir()
+        self._snapshot: Optional[FoodCatalogSnapshot] = None
+        self._export_lock = threading.Lock()
+
+    @property
+    def client(self):
+        return self._client or supabase_service.client
+
+    def _fetch_public_foods(
+        self,
+        updated_after: Optional[str] = None,
+        columns: str = CATALOG_COLUMNS
+    ) -> List[Dict[str, Any]]:
+        """Page through public foods (with servings), optionally only newer rows."""
+        rows: List[Dict[str, Any]] = []
+        start = 0
+        while True:
+            query = (
+                self.client.table("foods")
+                .select(columns)
+                .eq("is_public", True)
+            )
+            if updated_after:
+                query = query.gt("updated_at", updated_after)
+            response = query.order("id").range(start, start + CATALOG_PAGE_SIZE - 1).execute()
+
+            page = response.data or []
+            rows.extend(page)
+            if len(page) < CATALOG_PAGE_SIZE:
+                return rows
+            start += CATALOG_PAGE_SIZE
+
+    def _fetch_public_ids(self) -> Set[str]:
+        """Ids of every public food (cheap: one column, no servings)."""
+        return {str(row["id"]) for row in self._fetch_public_foods(columns="id")}
+
+    async def export_snapshot(self) -> FoodCatalogSnapshot:
+        """Fetch the full public catalog and publish it as a new snapshot."""
+        return await asyncio.to_thread(self._export_snapshot)
+
+    def _export_snapshot(self) -> FoodCatalogSnapshot:
+        rows = self._fetch_public_foods()
+        path = write_snapshot(self.directory, rows)
+        self._snapshot = FoodCatalogSnapshot(path)
+
+        logger.info(
+            "food_catalog_snapshot_exported",
+            path=path,
+            foods=len(self._snapshot),
+            version=self._snapshot.meta["version"],
+        )
+        return self._snapshot
+
+    def load_snapshot(self) -> Optional[FoodCatalogSnapshot]:
+        """Newest snapshot on disk (re-checked on every call, mapped once per version)."""
+        latest = FoodCatalogSnapshot.load_latest(self.directory)
+        if latest is None:
+            return self._snapshot
+        if self._snapshot is None or latest.path != self._snapshot.path:
+            self._snapshot = latest
+        return self._snapshot
+
+    async def get_public_rows(self, with_servings: bool = True) -> List[Dict[str, Any]]:
+        """
+        All public foods rows: snapshot rows overlaid with the delta fetch,
+        minus foods that are no longer public.
+
+        Rows are plain dicts shaped like Supabase foods rows.
+        """
+        return await asyncio.to_thread(self._public_rows, with_servings)
+
+    def _public_rows(self, with_servings: bool) -> List[Dict[str, Any]]:
+        snapshot = self.load_snapshot()
+        if snapshot is None:
+            with self._export_lock:
+                snapshot = self.load_snapshot() or self._export_snapshot()
+            # Freshly exported: nothing newer to fetch
+            return list(snapshot.iter_rows(with_servings))
+
+        delta = self._fetch_public_foods(updated_after=snapshot.meta["version"])
+        public_ids = self._fetch_public_ids()
+
+        if not with_servings:
+            delta = [{k: v for k, v in row.items() if k != "food_servings"} for row in delta]
+
+        overrides = {str(row["id"]): row for row in delta}
+        rows: List[Dict[str, Any]] = []
+        removed = 0
+        for row in snapshot.iter_rows(with_servings):
+            if row["id"] not in public_ids:
+                removed += 1  # Deleted or unpublished since the export
+            elif row["id"] not in overrides:
+                rows.append(row)
+        rows.extend(overrides.values())
+
+        if delta or removed:
+            logger.info(
+                "food_catalog_delta_applied",
+                snapshot_foods=len(snapshot),
+                delta_foods=len(delta),
+                removed_foods=removed,
+            )
+        return rows
+
+
+# Singleton instance
+food_catalog_service = FoodCatalogService()
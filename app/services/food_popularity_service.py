@@ -0,0 +1,90 @@
+"""
+Food Popularity Service
+
+Read side of the offline food ranking signals (migrations/046_food_popularity.sql).
+
+The Celery beat task foods.refresh_popularity (workers/food_tasks.py)
+recomputes food_popularity from meal_items over rolling windows, globally and
+per profile language. This service only loads the precomputed scores into
+memory so search ranking never aggregates meal_items or sorts by usage_count
+at request time.
+"""
+
+from typing import Dict, Optional
+
+import structlog
+
+from app.services.supabase_service import supabase_service
+
+logger = structlog.get_logger()
+
+GLOBAL_LOCALE = "global"
+POPULARITY_PAGE_SIZE = 1000
+
+
+class FoodPopularityService:
+    """Loads precomputed popularity scores: {locale: {food_id: score}}."""
+
+    def __init__(self, client=None):
+        self._client = client
+
+    @property
+    def client(self):
+        return self._client or supabase_service.client
+
+    async def load_scores(self) -> Dict[str, Dict[str, float]]:
+        """
+        Page through food_popularity.
+
+        Returns an empty mapping if the table is missing or empty, in which case
+        callers fall back to foods.usage_count.
+        """
+        scores: Dict[str, Dict[str, float]] = {}
+        start = 0
+        try:
+            while True:
+                response = (
+                    self.client.table("food_popularity")
+                    .select("food_id, locale, score")
+                    .range(start, start + POPULARITY_PAGE_SIZE - 1)
+                    .execute()
+                )
+                page = response.data or []
+                for row in page:
+                    locale = row.get("locale") or GLOBAL_LOCALE
+                    scores.setdefault(locale, {})[str(row["food_id"])] = float(row.get("score") or 0)
+                if len(page) < POPULARITY_PAGE_SIZE:
+                    break
+                start += POPULARITY_PAGE_SIZE
+        except Exception as e:
+            logger.warning("food_popularity_load_failed", error=str(e))
+            return {}
+
+        logger.info(
+            "food_popularity_loaded",
+            locales=len(scores),
+            foods=len(scores.get(GLOBAL_LOCALE, {})),
+        )
+        return scores
+
+    async def get_user_locale(self, user_id: str) -> Optional[str]:
+        """Profile language used as the per-locale ranking key (None if unknown)."""
+        try:
+            response = (
+                self.client.table("profiles")
+                .select("language")
+                .eq("id", str(user_id))
+                .limit(1)
+                .execute()
+            )
+        except Exception as e:
+            logger.warning("food_popularity_locale_failed", user_id=str(user_id), error=str(e))
+            return None
+
+        if response.data:
+            return response.data[0].get("language")
+        return None
+
+
+# Singleton instance
+food_popularity_service = FoodPopularityService()
@@ -0,0 +1,417 @@
+"""
+Food Typeahead Service
+
+Lightweight autocomplete for the food picker. Unlike /foods/search it never
+builds full Food models or hits Supabase per keystroke:
+
+- Public foods live in an in-memory prefix index (sorted token list + bisect),
+  built from the food catalog snapshot (+ delta) and refreshed in the
+  background (30min TTL).
+- Ranking uses the offline popularity scores (global and per profile
+  language) from food_popularity_service, loaded with the index.
+- The user's personal lane (quick meals, custom foods, recent foods) is loaded
+  once and cached for a short TTL.
+- Each keystroke bumps a per-user generation counter. A request that is
+  overtaken by a newer keystroke while waiting on data returns early with
+  superseded=True instead of doing (and serializing) stale work.
+
+Suggestions only carry id, name, brand and kcal per 100g.
+"""
+
+import asyncio
+import bisect
+import heapq
+import time
+import unicodedata
+from typing import Any, Dict, List, Optional, Tuple
+
+import structlog
+
+from app.services.cache_service import get_cache_service
+from app.services.food_catalog_service import food_catalog_service
+from app.services.food_popularity_service import GLOBAL_LOCALE, food_popularity_service
+from app.services.nutrition_service import nutrition_service
+from app.services.supabase_service import supabase_service
+
+logger = structlog.get_logger()
+
+INDEX_TTL_SECONDS = 1800  # Same as food database TTL in cache_service
+USER_LANE_TTL_SECONDS = 120
+USER_LOCALE_TTL_SECONDS = 3600
+INDEX_PAGE_SIZE = 1000
+MIN_QUERY_LENGTH = 1
+
+# Personal suggestions are ranked above any public food
+_SOURCE_BOOST = {"quick_meal": 3.0, "custom": 2.5, "recent": 2.0, "food": 0.0}
+
+
+def normalize_text(text: Optional[str]) -> str:
+    """Lowercase and strip accents so 'Pão' matches 'pao'."""
+    if not text:
+        return ""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: Optional[str]) -> List[str]:
+    """Split normalized text into alphanumeric tokens."""
+    normalized = normalize_text(text)
+    cleaned = "".join(ch if ch.isalnum() else " " for ch in normalized)
+    return cleaned.split()
+
+
+def _matches(query_tokens: List[str], name_tokens: List[str]) -> bool:
+    """Every query token must prefix-match some token of the name."""
+    return all(
+        any(token.startswith(q) for token in name_tokens)
+        for q in query_tokens
+    )
+
+
+class FoodPrefixIndex:
+    """
+    Immutable prefix index over public foods.
+
+    Entries are stored as parallel lists (compact, no per-food objects).
+    Token lookups are O(log n) via bisect on a sorted token list.
+
+    popularity is {locale: {food_id: score}} as loaded by
+    food_popularity_service; without it ranking falls back to usage_count.
+    """
+
+    def __init__(
+        self,
+        rows: List[Dict[str, Any]],
+        popularity: Optional[Dict[str, Dict[str, float]]] = None,
+    ):
+        popularity = popularity or {}
+        global_scores = popularity.get(GLOBAL_LOCALE)
+
+        self.ids: List[str] = []
+        self.names: List[str] = []
+        self.brands: List[Optional[str]] = []
+        self.kcal: List[Optional[float]] = []
+        self.rank: List[float] = []
+        self._normalized_names: List[str] = []
+        self._locale_rank: Dict[str, Dict[int, float]] = {}
+
+        pairs: List[Tuple[str, int]] = []
+        for row in rows:
+            if not row.get("id") or not row.get("name"):
+                continue
+
+            idx = len(self.ids)
+            self.ids.append(str(row["id"]))
+            self.names.append(row["name"])
+            self.brands.append(row.get("brand_name"))
+            kcal = row.get("calories_per_100g")
+            self.kcal.append(float(kcal) if kcal is not None else None)
+            food_id = self.ids[idx]
+            self.rank.append(self.static_rank(
+                row,
+                global_scores.get(food_id, 0.0) if global_scores else None,
+            ))
+            for locale, scores in popularity.items():
+                if locale != GLOBAL_LOCALE and food_id in scores:
+                    self._locale_rank.setdefault(locale, {})[idx] = scores[food_id]
+            self._normalized_names.append(normalize_text(row["name"]))
+
+            tokens = set(tokenize(row["name"]))
+            tokens.update(tokenize(row.get("name_pt")))
+            tokens.update(tokenize(row.get("brand_name")))
+            pairs.extend((token, idx) for token in tokens)
+
+        pairs.sort()
+        self._tokens = [token for token, _ in pairs]
+        self._refs = [idx for _, idx in pairs]
+
+    @staticmethod
+    def static_rank(row: Dict[str, Any], popularity: Optional[float] = None) -> float:
+        """
+        Query-independent popularity score.
+
+        Uses the precomputed popularity score when signals are loaded
+        (verified only breaks ties), otherwise usage_count (+50 if verified).
+        """
+        if popularity is not None:
+            return popularity + (0.5 if row.get("verified") else 0.0)
+        usage = row.get("usage_count") or 0
+        return float(usage) + (50.0 if row.get("verified") else 0.0)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _lookup_prefix(self, prefix: str) -> set:
+        """Entry indexes having a token that starts with prefix."""
+        start = bisect.bisect_left(self._tokens, prefix)
+        end = bisect.bisect_left(self._tokens, prefix + "\uffff", lo=start)
+        return set(self._refs[start:end])
+
+    def search(self, query: str, limit: int, locale: Optional[str] = None) -> List[Dict[str, Any]]:
+        """
+        Return up to limit suggestions whose tokens prefix-match every query token.
+
+        Foods popular in the given locale (profile language) rank first.
+        """
+        query_tokens = tokenize(query)
+        if not query_tokens:
+            return []
+
+        # Start from the most selective (longest) token
+        query_tokens.sort(key=len, reverse=True)
+        candidates = self._lookup_prefix(query_tokens[0])
+        for token in query_tokens[1:]:
+            if not candidates:
+                break
+            candidates &= self._lookup_prefix(token)
+
+        normalized_query = normalize_text(query).strip()
+        locale_rank = self._locale_rank.get(locale, {}) if locale else {}
+
+        def score(idx: int) -> Tuple[bool, float, float, int]:
+            # Name-prefix matches first, then locale and global popularity, then shorter names
+            return (
+                self._normalized_names[idx].startswith(normalized_query),
+                locale_rank.get(idx, 0.0),
+                self.rank[idx],
+                -len(self.names[idx]),
+            )
+
+        best = heapq.nlargest(limit, candidates, key=score)
+        return [
+            {
+                "id": self.ids[idx],
+                "name": self.names[idx],
+                "brand_name": self.brands[idx],
+                "calories_per_100g": self.kcal[idx],
+                "source": "food",
+            }
+            for idx in best
+        ]
+
+
+class FoodTypeaheadService:
+    """Serves typeahead suggestions from memory; see module docstring."""
+
+    def __init__(self):
+        self.cache = get_cache_service()
+        self._index: Optional[FoodPrefixIndex] = None
+        self._index_loaded_at: float = 0.0
+        self._index_lock = asyncio.Lock()
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._user_loads: Dict[str, asyncio.Task] = {}
+        self._generations: Dict[str, int] = {}
+
+    # =====================================================
+    # Public index
+    # =====================================================
+
+    async def _fetch_public_food_rows(self) -> List[Dict[str, Any]]:
+        """Public foods from the catalog snapshot, paging Supabase only if that fails."""
+        try:
+            return await food_catalog_service.get_public_rows(with_servings=False)
+        except Exception as e:
+            logger.warning("food_typeahead_catalog_snapshot_failed", error=str(e))
+
+        # Select only the columns the index needs
+        rows: List[Dict[str, Any]] = []
+        start = 0
+        while True:
+            response = (
+                supabase_service.client.table("foods")
+                .select("id, name, name_pt, brand_name, calories_per_100g, usage_count, verified")
+                .eq("is_public", True)
+                .range(start, start + INDEX_PAGE_SIZE - 1)
+                .execute()
+            )
+            page = response.data or []
+            rows.extend(page)
+            if len(page) < INDEX_PAGE_SIZE:
+                return rows
+            start += INDEX_PAGE_SIZE
+
+    async def _build_index(self) -> FoodPrefixIndex:
+        started = time.perf_counter()
+        rows = await self._fetch_public_food_rows()
+        popularity = await food_popularity_service.load_scores()
+        index = FoodPrefixIndex(rows, popularity)
+        self._index = index
+        self._index_loaded_at = time.monotonic()
+
+        logger.info(
+            "food_typeahead_index_built",
+            foods=len(index),
+            popularity_signals=bool(popularity),
+            duration_ms=round((time.perf_counter() - started) * 1000, 1),
+        )
+        return index
+
+    async def refresh_index(self) -> FoodPrefixIndex:
+        """(Re)build the public food index."""
+        async with self._index_lock:
+            return await self._build_index()
+
+    async def _get_index(self) -> FoodPrefixIndex:
+        """Return the index, loading it on first use and refreshing stale ones in background."""
+        if self._index is None:
+            async with self._index_lock:
+                # Double-check: a concurrent request may have built it meanwhile
+                if self._index is None:
+                    return await self._build_index()
+            return self._index
+
+        is_stale = time.monotonic() - self._index_loaded_at > INDEX_TTL_SECONDS
+        if is_stale and (self._refresh_task is None or self._refresh_task.done()):
+            # Stale-while-revalidate: keep serving the old index
+            self._refresh_task = asyncio.create_task(self.refresh_index())
+
+        return self._index
+
+    # =====================================================
+    # Personal lane (quick meals, custom foods, recent foods)
+    # =====================================================
+
+    async def _load_user_entries(self, user_id: str) -> List[Dict[str, Any]]:
+        entries: List[Dict[str, Any]] = []
+
+        try:
+            quick_meals = (
+                supabase_service.client.table("quick_meals")
+                .select("id, name")
+                .eq("user_id", user_id)
+                .order("is_favorite", desc=True)
+                .order("usage_count", desc=True)
+                .limit(50)
+                .execute()
+            )
+            entries.extend(
+                {"id": row["id"], "name": row["name"], "brand_name": None,
+                 "calories_per_100g": None, "source": "quick_meal"}
+                for row in quick_meals.data or []
+            )
+        except Exception as e:
+            logger.warning("food_typeahead_quick_meals_failed", user_id=user_id, error=str(e))
+
+        try:
+            custom_foods = (
+                supabase_service.client.table("foods")
+                .select("id, name, brand_name, calories_per_100g")
+                .eq("created_by", user_id)
+                .limit(200)
+                .execute()
+            )
+            entries.extend(
+                {**row, "source": "custom"} for row in custom_foods.data or []
+            )
+        except Exception as e:
+            logger.warning("food_typeahead_custom_foods_failed", user_id=user_id, error=str(e))
+
+        recent_foods = await nutrition_service.get_recent_foods(user_id=user_id, limit=20)
+        entries.extend(
+            {"id": str(food.id), "name": food.name, "brand_name": food.brand_name,
+             "calories_per_100g": float(food.calories_per_100g), "source": "recent"}
+            for food in recent_foods
+        )
+
+        for entry in entries:
+            entry["id"] = str(entry["id"])
+            entry["_tokens"] = tokenize(entry["name"]) + tokenize(entry.get("brand_name"))
+
+        return entries
+
+    async def _get_user_entries(self, user_id: str) -> List[Dict[str, Any]]:
+        """Cached personal lane; concurrent keystrokes share one in-flight load."""
+        cache_key = f"typeahead_user:{user_id}"
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached
+
+        task = self._user_loads.get(user_id)
+        if task is None:
+            task = asyncio.create_task(self._load_user_entries(user_id))
+            self._user_loads[user_id] = task
+            task.add_done_callback(lambda _: self._user_loads.pop(user_id, None))
+
+        # Shield so a cancelled keystroke doesn't cancel the shared load
+        entries = await asyncio.shield(task)
+        self.cache.set(cache_key, entries, ttl=USER_LANE_TTL_SECONDS)
+        return entries
+
+    async def _get_user_locale(self, user_id: str) -> Optional[str]:
+        """Cached profile language for per-locale ranking."""
+        cache_key = f"typeahead_locale:{user_id}"
+        cached = self.cache.get(cache_key)
+        if cached is not None:
+            return cached or None
+
+        locale = await food_popularity_service.get_user_locale(user_id)
+        # Cache misses as "" so unknown locales don't re-query every keystroke
+        self.cache.set(cache_key, locale or "", ttl=USER_LOCALE_TTL_SECONDS)
+        return locale
+
+    def invalidate_user(self, user_id: str) -> None:
+        """Drop the cached personal lane (e.g. after creating a custom food)."""
+        self.cache.delete(f"typeahead_user:{user_id}")
+
+    # =====================================================
+    # Suggestions
+    # =====================================================
+
+    def _begin_request(self, user_id: str) -> int:
+        generation = self._generations.get(user_id, 0) + 1
+        self._generations[user_id] = generation
+        return generation
+
+    def is_superseded(self, user_id: str, generation: int) -> bool:
+        """True if a newer keystroke from the same user has arrived."""
+        return self._generations.get(user_id, 0) != generation
+
+    async def suggest(
+        self,
+        user_id: str,
+        query: str,
+        limit: int = 8,
+        locale: Optional[str] = None,
+    ) -> Tuple[List[Dict[str, Any]], bool]:
+        """
+        Return (suggestions, superseded).
+
+        Personal matches come first, then public foods, deduplicated by id.
+        locale defaults to the user's profile language.
+        """
+        user_id = str(user_id)
+        generation = self._begin_request(user_id)
+
+        if len(query.strip()) < MIN_QUERY_LENGTH:
+            return [], False
+
+        index = await self._get_index()
+        user_entries = await self._get_user_entries(user_id)
+        if locale is None:
+            locale = await self._get_user_locale(user_id)
+
+        if self.is_superseded(user_id, generation):
+            return [], True
+
+        query_tokens = tokenize(query)
+        personal = [
+            entry for entry in user_entries
+            if _matches(query_tokens, entry["_tokens"])
+        ]
+        personal.sort(key=lambda entry: _SOURCE_BOOST.get(entry["source"], 0.0), reverse=True)
+
+        suggestions: List[Dict[str, Any]] = []
+        seen_ids = set()
+        for entry in personal + index.search(query, limit, locale=locale):
+            if entry["id"] in seen_ids:
+                continue
+            seen_ids.add(entry["id"])
+            suggestions.append({k: v for k, v in entry.items() if not k.startswith("_")})
+            if len(suggestions) >= limit:
+                break
+
+        return suggestions, False
+
+
+# Singleton instance
+food_typeahead_service = FoodTypeaheadService()
@@ -10,14 +10,25 @@ Architecture:
 - Concrete implementations: OpenRouterAdapter, AnthropicAdapter
 - Automatic tool format conversion
 - Provider-specific cost tracking
+- Clients come from the shared factory (ultimate_ai_consultation/libs/llm_clients.py):
+  pooled keep-alive connections, jittered retries and a per-provider circuit breaker
+- HedgedChatClient: latency-aware dispatch across two OpenAI-format adapters
+  (hedge to the secondary when the first token is late, fall back on errors)
 """
 
+import asyncio
+import threading
+import time
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
-from openai import AsyncOpenAI
-from anthropic import AsyncAnthropic
+from bisect import bisect_left
+from collections import deque
+from types import SimpleNamespace
+from typing import List, Dict, Any, NamedTuple, Optional, Tuple
 import structlog
 
+from app.services.prompt_cache import CACHE_CONTROL, build_cached_messages, build_cached_system
+from ultimate_ai_consultation.libs.llm_clients import get_async_anthropic_client, get_async_openai_client
+
 logger = structlog.get_logger()
 
 
@@ -63,14 +74,7 @@ class OpenRouterAdapter(LLMAdapter):
 
     def __init__(self, api_key: str, model: str = "deepseek/deepseek-v3.1-terminus:exacto"):
         self.model = model
-        self.client = AsyncOpenAI(
-            api_key=api_key,
-            base_url="https://openrouter.ai/api/v1",
-            default_headers={
-                "HTTP-Referer": "https://sharpened.app",
-                "X-Title": "SHARPENED Ultimate Coach"
-            }
-        )
+        self.client = get_async_openai_client(api_key, provider="openrouter")
         logger.info(
             "llm_adapter_initialized",
             provider="openrouter",
@@ -87,11 +91,11 @@ class OpenRouterAdapter(LLMAdapter):
     ) -> Any:
         """Create completion using OpenAI format."""
 
-        # OpenAI format: system prompt goes as first message
-        openai_messages = []
+        # OpenAI format: system prompt goes as first message (with prompt-cache breakpoints)
         if system_prompt:
-            openai_messages.append({"role": "system", "content": system_prompt})
-        openai_messages.extend(messages)
+            openai_messages = build_cached_messages(system_prompt, messages, self.model)
+        else:
+            openai_messages = list(messages)
 
         # Convert tools to OpenAI format if needed
         openai_tools = self._convert_tools_to_openai_format(tools)
@@ -137,16 +141,8 @@ class OpenRouterAdapter(LLMAdapter):
         return self.model
 
     def calculate_cost(self, input_tokens: int, output_tokens: int) -> float:
-        """
-        Calculate cost for DeepSeek v3.1 via OpenRouter.
-
-        Pricing:
-        - Input: $0.14 per 1M tokens
-        - Output: $0.28 per 1M tokens
-        """
-        input_cost = (input_tokens / 1_000_000) * 0.14
-        output_cost = (output_tokens / 1_000_000) * 0.28
-        return input_cost + output_cost
+        """Calculate cost at this model's OpenRouter price (see MODEL_PRICES_PER_1M)."""
+        return chat_cost(self.model, input_tokens, output_tokens)
 
 
 class AnthropicAdapter(LLMAdapter):
@@ -161,7 +157,7 @@ class AnthropicAdapter(LLMAdapter):
 
     def __init__(self, api_key: str, model: str = "claude-3-5-sonnet-20241022"):
         self.model = model
-        self.client = AsyncAnthropic(api_key=api_key)
+        self.client = get_async_anthropic_client(api_key)
         logger.info(
             "llm_adapter_initialized",
             provider="anthropic",
@@ -177,11 +173,16 @@ class AnthropicAdapter(LLMAdapter):
     ) -> Any:
         """Create completion using Anthropic format."""
 
-        # Anthropic format: system prompt is separate parameter
+        # Anthropic format: system prompt is separate parameter.
+        # Cache breakpoints on the last tool and the system prompt cache the
+        # tools + system prefix across iterations.
+        if tools:
+            tools = tools[:-1] + [{**tools[-1], "cache_control": CACHE_CONTROL}]
+
         response = await self.client.messages.create(
             model=self.model,
             max_tokens=max_tokens,
-            system=system_prompt or "",
+            system=build_cached_system(system_prompt) if system_prompt else "",
             messages=messages,
             tools=tools  # Anthropic tools are already in correct format
         )
@@ -227,3 +228,315 @@ def create_llm_adapter(provider: str, **kwargs) -> LLMAdapter:
         return AnthropicAdapter(**kwargs)
     else:
         raise ValueError(f"Unknown LLM provider: {provider}")
+
+
+# ============================================================================
+# HEDGED DISPATCH
+# ============================================================================
+
+# Latency histogram buckets: 50ms growing by 25% per bucket (~5 minutes at the top)
+LATENCY_BUCKETS = tuple(0.05 * 1.25 ** i for i in range(40))
+LATENCY_WINDOW_SECONDS = 300.0
+LATENCY_WINDOW_SAMPLES = 512
+
+# Hedge deadline = p95 of the leading route, clamped; defaults until enough samples
+HEDGE_PERCENTILE = 0.95
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 1.0
+HEDGE_MAX_DELAY = 15.0
+HEDGE_DEFAULT_DELAY = {"stream": 4.0, "complete": 12.0}
+
+# Lead with the secondary while the primary's p95 is this many times worse
+ROUTE_SWITCH_RATIO = 2.0
+
+# Hedges allowed per request (token bucket), and how many may be saved up
+HEDGE_MAX_RATIO = 0.1
+HEDGE_BURST = 5.0
+
+# OpenRouter list prices, USD per 1M tokens: (input, cached input, output).
+# Variants (":exacto", ":floor") share their base model's price; unknown
+# models are priced as DeepSeek v3.1.
+MODEL_PRICES_PER_1M: Dict[str, Tuple[float, float, float]] = {
+    "deepseek/deepseek-v3.1-terminus": (0.14, 0.014, 0.28),
+    "openai/gpt-4o-mini": (0.15, 0.075, 0.60),
+    "anthropic/claude-3.5-haiku": (0.80, 0.08, 4.00),
+    "google/gemini-2.0-flash-001": (0.10, 0.025, 0.40),
+}
+DEFAULT_MODEL_PRICES_PER_1M = MODEL_PRICES_PER_1M["deepseek/deepseek-v3.1-terminus"]
+
+
+def chat_cost(model: Optional[str], input_tokens: int, output_tokens: int, cache_read_tokens: int = 0) -> float:
+    """USD cost of one chat call (cache_read_tokens are part of input_tokens)."""
+    input_price, cached_price, output_price = MODEL_PRICES_PER_1M.get(
+        (model or "").split(":")[0], DEFAULT_MODEL_PRICES_PER_1M
+    )
+    cache_read_tokens = min(cache_read_tokens, input_tokens)
+    return (
+        (input_tokens - cache_read_tokens) / 1_000_000 * input_price
+        + cache_read_tokens / 1_000_000 * cached_price
+        + output_tokens / 1_000_000 * output_price
+    )
+
+
+class HedgeOutcome(NamedTuple):
+    """
+    Which route answered a hedged call (set as .hedge_outcome on the result).
+
+    abandoned is the model of the route that was racing and got cancelled:
+    it was sent the same prompt, so its input tokens are billed too.
+    """
+
+    model: str
+    abandoned: Optional[str] = None
+
+
+class LatencyHistogram:
+    """
+    Sliding-window latency histogram.
+
+    Samples older than window_seconds (or beyond max_samples) drop out, so
+    a route that stops receiving traffic falls back below HEDGE_MIN_SAMPLES
+    instead of being judged on stale numbers.
+    """
+
+    def __init__(self, window_seconds: float = LATENCY_WINDOW_SECONDS, max_samples: int = LATENCY_WINDOW_SAMPLES):
+        self.window_seconds = window_seconds
+        self._samples: deque = deque(maxlen=max_samples)  # (timestamp, bucket)
+        self._counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float) -> None:
+        bucket = bisect_left(LATENCY_BUCKETS, seconds)
+        with self._lock:
+            if len(self._samples) == self._samples.maxlen:
+                self._counts[self._samples[0][1]] -= 1
+            self._samples.append((time.monotonic(), bucket))
+            self._counts[bucket] += 1
+
+    def _expire(self) -> None:
+        cutoff = time.monotonic() - self.window_seconds
+        while self._samples and self._samples[0][0] < cutoff:
+            self._counts[self._samples.popleft()[1]] -= 1
+
+    @property
+    def count(self) -> int:
+        with self._lock:
+            self._expire()
+            return len(self._samples)
+
+    def percentile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-th percentile, or None if empty."""
+        with self._lock:
+            self._expire()
+            if not self._samples:
+                return None
+            rank = q * len(self._samples)
+            seen = 0
+            for bucket, count in enumerate(self._counts):
+                seen += count
+                if seen >= rank and count:
+                    return LATENCY_BUCKETS[min(bucket, len(LATENCY_BUCKETS) - 1)]
+        return LATENCY_BUCKETS[-1]
+
+
+class HedgeBudget:
+    """Token bucket capping hedged requests to a fraction of all requests."""
+
+    def __init__(self, ratio: float = HEDGE_MAX_RATIO, burst: float = HEDGE_BURST):
+        self.ratio = ratio
+        self.burst = burst
+        self._tokens = burst
+        self._lock = threading.Lock()
+
+    def record_request(self) -> None:
+        with self._lock:
+            self._tokens = min(self.burst, self._tokens + self.ratio)
+
+    def try_acquire(self) -> bool:
+        with self._lock:
+            if self._tokens < 1.0:
+                return False
+            self._tokens -= 1.0
+            return True
+
+
+class _Route:
+    """One adapter as a dispatch target, with per-call-kind latency histograms."""
+
+    def __init__(self, adapter: LLMAdapter, model: Optional[str]):
+        self.adapter = adapter
+        self.model = model  # None: use the caller's model
+        self.name = adapter.get_model_name()
+        self.latency = {"stream": LatencyHistogram(), "complete": LatencyHistogram()}
+
+    def p95(self, kind: str) -> Optional[float]:
+        histogram = self.latency[kind]
+        if histogram.count < HEDGE_MIN_SAMPLES:
+            return None
+        return histogram.percentile(HEDGE_PERCENTILE)
+
+
+class HedgedChatClient:
+    """
+    Latency-aware drop-in for an AsyncOpenAI client's chat.completions.create.
+
+    Each call goes to the leading route (normally the primary). If no first
+    token (stream) or response (non-stream) has arrived by the leader's p95
+    latency, the same request is hedged to the other route and whichever
+    finishes first wins; the loser is cancelled. Hedges are capped by a
+    HedgeBudget. If the leader fails before its deadline the other route is
+    tried straight away (fallback, not counted against the budget).
+
+    Both adapters must speak the OpenAI chat format (OpenRouterAdapter). The
+    primary keeps the caller's model; the secondary always uses its own.
+    Results carry a HedgeOutcome (.hedge_outcome) so callers can price the
+    route that answered, plus the one that was abandoned.
+    """
+
+    def __init__(
+        self,
+        primary: LLMAdapter,
+        secondary: Optional[LLMAdapter] = None,
+        max_hedge_ratio: float = HEDGE_MAX_RATIO
+    ):
+        for adapter in (primary, secondary):
+            if adapter is not None and not hasattr(adapter.client, "chat"):
+                raise ValueError(f"{adapter.get_provider_name()} adapter has no OpenAI-format chat API")
+
+        self.primary = _Route(primary, model=None)
+        self.secondary = _Route(secondary, model=secondary.model) if secondary else None
+        self.budget = HedgeBudget(max_hedge_ratio)
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def _routes(self, kind: str) -> Tuple[_Route, Optional[_Route]]:
+        """(leader, other): the primary unless its p95 is much worse than the secondary's."""
+        if self.secondary is None:
+            return self.primary, None
+        primary_p95 = self.primary.p95(kind)
+        secondary_p95 = self.secondary.p95(kind)
+        if primary_p95 and secondary_p95 and primary_p95 > ROUTE_SWITCH_RATIO * secondary_p95:
+            return self.secondary, self.primary
+        return self.primary, self.secondary
+
+    @staticmethod
+    def hedge_delay(route: _Route, kind: str) -> float:
+        p95 = route.p95(kind)
+        if p95 is None:
+            return HEDGE_DEFAULT_DELAY[kind]
+        return min(HEDGE_MAX_DELAY, max(HEDGE_MIN_DELAY, p95))
+
+    async def create(self, **kwargs) -> Any:
+        """Same signature as AsyncOpenAI().chat.completions.create."""
+        kind = "stream" if kwargs.get("stream") else "complete"
+        leader, other = self._routes(kind)
+        self.budget.record_request()
+
+        leader_task = asyncio.ensure_future(self._call(leader, kind, kwargs))
+        tasks = {leader_task: leader}
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay(leader, kind))
+            if done:
+                if leader_task.exception() is None or other is None:
+                    return self._unwrap(leader_task.result(), kind, HedgeOutcome(self._model(leader, kwargs)))
+                logger.warning("llm_fallback", route=leader.name, to=other.name, error=str(leader_task.exception()))
+                error = leader_task.exception()
+                tasks = {}
+            elif other is None or not self.budget.try_acquire():
+                # Still in tasks, so a cancelled caller cancels it too
+                return self._unwrap(await leader_task, kind, HedgeOutcome(self._model(leader, kwargs)))
+            else:
+                logger.info("llm_hedge_fired", route=leader.name, to=other.name, kind=kind)
+                error = None
+
+            tasks[asyncio.ensure_future(self._call(other, kind, kwargs))] = other
+            winner, result = await self._first_success(tasks, error)
+            racers = [self._model(route, kwargs) for route in tasks.values() if route is not winner]
+            outcome = HedgeOutcome(self._model(winner, kwargs), racers[0] if racers else None)
+            return self._unwrap(result, kind, outcome)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def _first_success(self, tasks: Dict[asyncio.Future, _Route], error: Optional[BaseException]) -> Tuple[_Route, Any]:
+        """(route, result) of the first task to succeed; the first error if all fail."""
+        pending = set(tasks)
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            winners = [task for task in done if task.exception() is None]
+            if winners:
+                for loser in winners[1:]:
+                    await self._discard(loser.result())
+                return tasks[winners[0]], winners[0].result()
+            error = error or next(iter(done)).exception()
+        raise error
+
+    @staticmethod
+    def _model(route: _Route, kwargs: Dict[str, Any]) -> str:
+        return route.model or kwargs["model"]
+
+    async def _call(self, route: _Route, kind: str, kwargs: Dict[str, Any]) -> Any:
+        """
+        Send the request on a route. Streams are opened and read up to the
+        first chunk, so "done" means the first token has arrived.
+        """
+        request = {**kwargs, "model": self._model(route, kwargs)}
+        started = time.monotonic()
+        stream = None
+        try:
+            result = await route.adapter.client.chat.completions.create(**request)
+            if kind == "stream":
+                stream = result
+                try:
+                    result = (stream, await stream.__anext__())
+                except StopAsyncIteration:
+                    result = (stream, None)
+        except asyncio.CancelledError:
+            # Lost the race: the elapsed time is a lower bound on this route's latency
+            route.latency[kind].record(time.monotonic() - started)
+            if stream is not None:
+                await self._discard((stream, None))
+            raise
+        route.latency[kind].record(time.monotonic() - started)
+        return result
+
+    @staticmethod
+    def _unwrap(result: Any, kind: str, outcome: HedgeOutcome) -> Any:
+        if kind == "stream":
+            stream, first_chunk = result
+            result = _ReplayStream(stream, first_chunk)
+        try:
+            result.hedge_outcome = outcome
+        except (AttributeError, TypeError, ValueError):
+            pass  # Response type doesn't take extra attributes
+        return result
+
+    @staticmethod
+    async def _discard(result: Any) -> None:
+        if isinstance(result, tuple):
+            try:
+                await result[0].close()
+            except Exception:
+                pass
+
+
+class _ReplayStream:
+    """Async iterator yielding an already-read first chunk, then the rest of the stream."""
+
+    def __init__(self, stream: Any, first_chunk: Any):
+        self._stream = stream
+        self._first = first_chunk
+        self._started = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> Any:
+        if not self._started:
+            self._started = True
+            if self._first is None:
+                raise StopAsyncIteration
+            return self._first
+        return await self._stream.__anext__()
+
+    async def close(self) -> None:
+        await self._stream.close()
@@ -7,6 +7,10 @@ Uses Claude 3.5 Haiku to detect and extract structured log data:
 - Measurements: "I weigh 80kg now"
 
 This is used by the coach's log mode for quick data entry.
+
+Text-only extractions run at temperature 0 and go through the shared LLM
+response cache: "2 eggs and toast" at breakfast time is extracted once,
+not once per user.
 """
 
 import structlog
@@ -14,8 +18,31 @@ from typing import Dict, Any, Optional, List
 import json
 from datetime import datetime
 
+from ultimate_ai_consultation.libs.llm_cache import cache_key, get_response_cache
+
 logger = structlog.get_logger()
 
+LOG_EXTRACTION_MODEL = "claude-3-5-haiku-20241022"
+LOG_EXTRACTION_VISION_MODEL = "claude-3-5-sonnet-20241022"
+# Bump whenever the extraction prompt changes (invalidates cached responses)
+LOG_EXTRACTION_PROMPT_VERSION = "log-extraction-v1"
+
+# Claude 3.5 Haiku list price, for cache savings accounting
+HAIKU_COST_PER_INPUT_TOKEN = 0.80 / 1_000_000
+HAIKU_COST_PER_OUTPUT_TOKEN = 4.00 / 1_000_000
+
+
+def part_of_day(now: datetime) -> str:
+    """Coarse time of day - all the prompt needs to infer a meal_type."""
+    hour = now.hour
+    if 5 <= hour < 11:
+        return "morning"
+    if 11 <= hour < 16:
+        return "afternoon"
+    if 16 <= hour < 22:
+        return "evening"
+    return "night"
+
 
 class LogExtractionService:
     """
@@ -297,38 +324,63 @@ Return JSON with log_type, confidence, and structured_data."""
                 }
             ]
         else:
+            # Part of day instead of a timestamp keeps the prompt (and cache key) stable
+            time_of_day = part_of_day(datetime.now())
             user_prompt_text = f"""Analyze this message and extract any loggable fitness data:
 
 "{message}"
 
-Current time: {datetime.now().isoformat()}
+Current time of day: {time_of_day}
 
 Return JSON with log_type, confidence, and structured_data."""
 
             user_content = user_prompt_text
 
+        response_cache = get_response_cache()
+        key = None
+        if not image_base64:
+            key = cache_key(LOG_EXTRACTION_MODEL, LOG_EXTRACTION_PROMPT_VERSION, f"{time_of_day}\n{message}")
+
         try:
-            response = self.anthropic.messages.create(
-                model="claude-3-5-haiku-20241022" if not image_base64 else "claude-3-5-sonnet-20241022",  # Use Sonnet for vision
-                max_tokens=1000 if image_base64 else 500,  # More tokens for photo analysis
-                temperature=0.1,
-                system=system_prompt,
-                messages=[
-                    {"role": "user", "content": user_content}
-                ]
-            )
-
-            response_text = response.content[0].text.strip()
-
-            # Remove markdown code blocks if present
-            if response_text.startswith("```"):
-                response_text = response_text.split("```")[1]
-                if response_text.startswith("json"):
-                    response_text = response_text[4:]
-                response_text = response_text.strip()
+            response = None
+            cached = response_cache.get(key) if key else None
+            if cached is not None:
+                response_text = cached.text
+                logger.info("[LogExtraction] ♻️ Cache hit")
+            else:
+                response = self.anthropic.messages.create(
+                    model=LOG_EXTRACTION_VISION_MODEL if image_base64 else LOG_EXTRACTION_MODEL,  # Use Sonnet for vision
+                    max_tokens=1000 if image_base64 else 500,  # More tokens for photo analysis
+                    temperature=0.1 if image_base64 else 0,  # Text extraction is deterministic (cacheable)
+                    system=system_prompt,
+                    messages=[
+                        {"role": "user", "content": user_content}
+                    ]
+                )
+
+                response_text = response.content[0].text.strip()
+
+                # Remove markdown code blocks if present
+                if response_text.startswith("```"):
+                    response_text = response_text.split("```")[1]
+                    if response_text.startswith("json"):
+                        response_text = response_text[4:]
+                    response_text = response_text.strip()
 
             extraction = json.loads(response_text)
 
+            # Only parseable responses are cached
+            if key and response is not None:
+                usage = response.usage
+                response_cache.put(
+                    key,
+                    response_text,
+                    input_tokens=usage.input_tokens,
+                    output_tokens=usage.output_tokens,
+                    cost_usd=usage.input_tokens * HAIKU_COST_PER_INPUT_TOKEN
+                    + usage.output_tokens * HAIKU_COST_PER_OUTPUT_TOKEN
+                )
+
             # Handle multi-logging response format
             if extraction is None or extraction == "null":
                 logger.info("[LogExtraction] ❌ No loggable data detected (null response)")
@@ -451,8 +503,8 @@ def get_log_extraction_service(anthropic_client=None) -> LogExtractionService:
     global _log_extraction_service
     if _log_extraction_service is None:
         if anthropic_client is None:
-            from anthropic import Anthropic
             import os
-            anthropic_client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+            from ultimate_ai_consultation.libs.llm_clients import get_anthropic_client
+            anthropic_client = get_anthropic_client(os.getenv("ANTHROPIC_API_KEY"))
         _log_extraction_service = LogExtractionService(anthropic_client)
     return _log_extraction_service
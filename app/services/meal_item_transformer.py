@@ -12,6 +12,9 @@ Flow:
    - Returns proper serving-based OR gram-based logging format
 3. nutrition_service.create_meal() receives proper format
 
+Nutrition for all matched items is computed in one vectorized pass by
+nutrition_kernel, and foods are fetched through its by-id cache.
+
 NEW in v2.0:
 - Common units support (pieces, cups, scoops, etc.)
 - User history weighting (frequently logged foods ranked higher)
@@ -21,9 +24,10 @@ NEW in v2.0:
 
 import structlog
 from typing import List, Dict, Any, Optional, Tuple
-from decimal import Decimal
 from datetime import datetime, timedelta
 
+from app.services.nutrition_kernel import nutrition_kernel
+
 logger = structlog.get_logger()
 
 
@@ -73,7 +77,7 @@ class MealItemTransformerService:
         """
         logger.info(f"[MealTransformer] 🔄 Transforming {len(foods)} foods to items (v2.0)")
 
-        items = []
+        resolved = []  # (food, serving, quantity, grams) - nutrition computed after the loop
         missing_foods = []
 
         for idx, food_data in enumerate(foods):
@@ -120,25 +124,38 @@ class MealItemTransformerService:
             if unit and unit not in ["grams", "g"]:
                 serving = self._find_matching_serving(food, unit, quantity)
 
-            # STEP 3: Calculate nutrition (serving-based or gram-based)
+            # STEP 3: Resolve grams (serving-based or gram-based)
             if serving:
                 # SERVING-BASED LOGGING
                 logger.info(
                     f"[MealTransformer] 📦 Using serving: "
                     f"{serving['serving_size']} {serving['serving_unit']}"
                 )
-                item = self._calculate_serving_based_item(food, serving, quantity)
+                grams = float(quantity) * float(serving['grams_per_serving'])
             else:
                 # GRAM-BASED LOGGING (fallback)
                 grams = estimated_grams if estimated_grams else 100
                 logger.info(f"[MealTransformer] ⚖️ Using gram-based: {grams}g")
-                item = self._calculate_gram_based_item(food, grams)
+
+            resolved.append((food, serving, quantity, grams))
+
+        # STEP 4: Calculate nutrition for all items in one vectorized pass
+        item_macros, _ = nutrition_kernel.calculate_items(
+            [food for food, _, _, _ in resolved],
+            [grams for _, _, _, grams in resolved],
+        )
+
+        items = []
+        for (food, serving, quantity, grams), macros in zip(resolved, item_macros):
+            if serving:
+                item = self._calculate_serving_based_item(food, serving, quantity, macros)
+            else:
+                item = self._calculate_gram_based_item(food, grams, macros)
 
             logger.info(
                 f"[MealTransformer] 📊 Calculated: "
                 f"{item['calories']}cal, {item['protein_g']}g protein"
             )
-
             items.append(item)
 
         logger.info(
@@ -354,17 +371,12 @@ class MealItemTransformerService:
             Food dict with servings, or None if not found
         """
         try:
-            result = self.supabase.table("foods")\
-                .select("*, food_servings(*)")\
-                .eq("id", food_id)\
-                .single()\
-                .execute()
+            # Cached by id (shared row - copy before reshaping)
+            row = nutrition_kernel.get_foods(self.supabase, [food_id]).get(str(food_id))
 
-            if result.data:
-                food = result.data
-                # Extract servings from nested response
-                servings_data = food.pop("food_servings", [])
-                food['servings'] = servings_data if servings_data else []
+            if row:
+                food = {k: v for k, v in row.items() if k != "food_servings"}
+                food['servings'] = list(row.get("food_servings") or [])
                 return food
 
             return None
@@ -536,10 +548,11 @@ class MealItemTransformerService:
         self,
         food: Dict[str, Any],
         serving: Dict[str, Any],
-        quantity: float
+        quantity: float,
+        macros: Optional[Dict[str, float]] = None
     ) -> Dict[str, Any]:
         """
-        Calculate nutrition for serving-based logging.
+        Build a meal item for serving-based logging.
 
         CRITICAL: This creates serving-based format where:
         - quantity = number of servings (e.g., 2 for "2 bananas")
@@ -552,6 +565,7 @@ class MealItemTransformerService:
             food: Food dict from database
             serving: Matched serving dict
             quantity: Number of servings
+            macros: Precomputed item macros from nutrition_kernel (computed here if None)
 
         Returns:
             Meal item dict for serving-based logging
@@ -560,18 +574,14 @@ class MealItemTransformerService:
         grams = float(quantity) * float(serving['grams_per_serving'])
 
         # Calculate nutrition from per_100g values
-        multiplier = Decimal(str(grams)) / Decimal("100")
-
-        calories = float(Decimal(str(food['calories_per_100g'])) * multiplier)
-        protein_g = float(Decimal(str(food['protein_g_per_100g'])) * multiplier)
-        carbs_g = float(Decimal(str(food['carbs_g_per_100g'])) * multiplier)
-        fat_g = float(Decimal(str(food['fat_g_per_100g'])) * multiplier)
+        if macros is None:
+            (macros,), _ = nutrition_kernel.calculate_items([food], [grams])
 
         # Round for display
-        calories_rounded = round(calories)
-        protein_g_rounded = round(protein_g, 1)
-        carbs_g_rounded = round(carbs_g, 1)
-        fat_g_rounded = round(fat_g, 1)
+        calories_rounded = round(macros["calories"])
+        protein_g_rounded = round(macros["protein_g"], 1)
+        carbs_g_rounded = round(macros["carbs_g"], 1)
+        fat_g_rounded = round(macros["fat_g"], 1)
 
         # Build display label
         display_label = None
@@ -597,16 +607,18 @@ class MealItemTransformerService:
     def _calculate_gram_based_item(
         self,
         food: Dict[str, Any],
-        grams: float
+        grams: float,
+        macros: Optional[Dict[str, float]] = None
     ) -> Dict[str, Any]:
         """
-        Calculate nutrition for gram-based logging.
+        Build a meal item for gram-based logging.
 
-        Uses THE SAME LOGIC as nutrition_service.create_meal() for gram-based items.
+        Uses THE SAME KERNEL as nutrition_service.create_meal() (nutrition_kernel).
 
         Args:
             food: Food dict from database
             grams: Amount in grams
+            macros: Precomputed item macros from nutrition_kernel (computed here if None)
 
         Returns:
             Meal item dict ready for create_meal()
@@ -616,19 +628,15 @@ class MealItemTransformerService:
         # For gram-based: quantity = grams, serving_id = null
 
         # Calculate nutrition from per_100g values
-        multiplier = Decimal(str(grams)) / Decimal("100")
-
-        calories = float(Decimal(str(food['calories_per_100g'])) * multiplier)
-        protein_g = float(Decimal(str(food['protein_g_per_100g'])) * multiplier)
-        carbs_g = float(Decimal(str(food['carbs_g_per_100g'])) * multiplier)
-        fat_g = float(Decimal(str(food['fat_g_per_100g'])) * multiplier)
+        if macros is None:
+            (macros,), _ = nutrition_kernel.calculate_items([food], [grams])
 
         # Round for display
         # Backend will recalculate, but we provide reasonable values for preview
-        calories_rounded = round(calories)
-        protein_g_rounded = round(protein_g, 1)
-        carbs_g_rounded = round(carbs_g, 1)
-        fat_g_rounded = round(fat_g, 1)
+        calories_rounded = round(macros["calories"])
+        protein_g_rounded = round(macros["protein_g"], 1)
+        carbs_g_rounded = round(macros["carbs_g"], 1)
+        fat_g_rounded = round(macros["fat_g"], 1)
 
         return {
             "food_id": food['id'],
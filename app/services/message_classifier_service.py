@@ -5,14 +5,26 @@ Classifies user messages as CHAT or LOG using Claude 3.5 Haiku.
 Critical for routing messages to correct handler in unified Coach interface.
 
 Uses Claude 3.5 Haiku: Fast, cheap, high-quality classification
+Runs at temperature 0 behind the shared LLM response cache, so recurring
+messages ("thanks", "2 eggs and toast") are classified once.
 """
 
 import structlog
 from typing import Dict, Any
 import json
 
+from ultimate_ai_consultation.libs.llm_cache import cache_key, get_response_cache
+
 logger = structlog.get_logger()
 
+CLASSIFIER_MODEL = "claude-3-5-haiku-20241022"
+# Bump whenever the classification prompt changes (invalidates cached responses)
+CLASSIFIER_PROMPT_VERSION = "message-classifier-v1"
+
+# Claude 3.5 Haiku list price, for cache savings accounting
+HAIKU_COST_PER_INPUT_TOKEN = 0.80 / 1_000_000
+HAIKU_COST_PER_OUTPUT_TOKEN = 4.00 / 1_000_000
+
 
 class MessageClassifierService:
     """
@@ -144,21 +156,38 @@ IMPORTANT: If user includes an image with minimal text or food-related text, it'
 
 Return JSON classification."""
 
-        try:
-            # Call Claude 3.5 Haiku
-            response = self.anthropic.messages.create(
-                model="claude-3-5-haiku-20241022",
-                max_tokens=150,
-                temperature=0.1,  # Low temperature for consistent classification
-                system=system_prompt,
-                messages=[
-                    {"role": "user", "content": user_prompt}
-                ]
-            )
+        response_cache = get_response_cache()
+        key = cache_key(CLASSIFIER_MODEL, CLASSIFIER_PROMPT_VERSION, user_prompt)
 
-            # Parse JSON response
-            response_text = response.content[0].text.strip()
-            classification = json.loads(response_text)
+        try:
+            cached = response_cache.get(key)
+            if cached is not None:
+                classification = json.loads(cached.text)
+            else:
+                # Call Claude 3.5 Haiku
+                response = self.anthropic.messages.create(
+                    model=CLASSIFIER_MODEL,
+                    max_tokens=150,
+                    temperature=0,  # Deterministic classification (cacheable)
+                    system=system_prompt,
+                    messages=[
+                        {"role": "user", "content": user_prompt}
+                    ]
+                )
+
+                # Parse JSON response
+                response_text = response.content[0].text.strip()
+                classification = json.loads(response_text)
+
+                usage = response.usage
+                response_cache.put(
+                    key,
+                    response_text,
+                    input_tokens=usage.input_tokens,
+                    output_tokens=usage.output_tokens,
+                    cost_usd=usage.input_tokens * HAIKU_COST_PER_INPUT_TOKEN
+                    + usage.output_tokens * HAIKU_COST_PER_OUTPUT_TOKEN
+                )
 
             logger.info(
                 f"[Classifier] ✅ Result: is_log={classification['is_log']}, "
@@ -204,9 +233,9 @@ def get_message_classifier(anthropic_client=None):
     global _classifier_service
     if _classifier_service is None:
         if anthropic_client is None:
-            # Import Anthropic client
-            from anthropic import Anthropic
+            # Shared pooled Anthropic client
             import os
-            anthropic_client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+            from ultimate_ai_consultation.libs.llm_clients import get_anthropic_client
+            anthropic_client = get_anthropic_client(os.getenv("ANTHROPIC_API_KEY"))
         _classifier_service = MessageClassifierService(anthropic_client)
     return _classifier_service
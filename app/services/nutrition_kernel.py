@@ -0,0 +1,228 @@
+"""
+Nutrition Kernel
+
+Shared macro math for meals and quick meals (single source of truth for
+"per_100g × grams / 100").
+
+- Per-100g macros of the referenced foods are packed into one float64
+  matrix (n_foods × 4: calories, protein, carbs, fat).
+- Item macros and meal totals are computed in one vectorized pass.
+- Food rows (with embedded food_servings) are cached by id, and cache misses
+  are fetched in ONE batched query, so logging a multi-item meal or
+  recomputing totals never issues per-item lookups.
+
+Callers keep their own validation (serving ownership, quantity limits);
+the kernel only does lookups and arithmetic.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+import structlog
+
+logger = structlog.get_logger()
+
+PER_100G_COLUMNS = (
+    "calories_per_100g",
+    "protein_g_per_100g",
+    "carbs_g_per_100g",
+    "fat_g_per_100g",
+)
+MACRO_KEYS = ("calories", "protein_g", "carbs_g", "fat_g")
+
+# Nothing in the app updates or deletes foods rows (edits come from admin
+# tooling or data fixes directly in the database), so no write path can
+# invalidate this per-process cache; the TTL bounds how long a corrected
+# food keeps its old macros
+FOOD_CACHE_TTL_SECONDS = 300
+FOOD_CACHE_MAX_ENTRIES = 5000
+
+
+class FoodRowCache:
+    """Bounded LRU cache of foods rows (with food_servings) keyed by food_id."""
+
+    def __init__(self, max_entries: int = FOOD_CACHE_MAX_ENTRIES, ttl: int = FOOD_CACHE_TTL_SECONDS):
+        self._rows: "OrderedDict[str, Tuple[Dict[str, Any], float]]" = OrderedDict()
+        self._max_entries = max_entries
+        self._ttl = ttl
+        self._lock = threading.Lock()
+
+    def get_many(self, food_ids: Iterable[str]) -> Tuple[Dict[str, Dict[str, Any]], List[str]]:
+        """Return (found rows by id, missing ids)."""
+        found: Dict[str, Dict[str, Any]] = {}
+        missing: List[str] = []
+        now = time.monotonic()
+
+        with self._lock:
+            for food_id in food_ids:
+                entry = self._rows.get(food_id)
+                if entry is None or entry[1] < now:
+                    self._rows.pop(food_id, None)
+                    missing.append(food_id)
+                    continue
+                self._rows.move_to_end(food_id)
+                found[food_id] = entry[0]
+
+        return found, missing
+
+    def put_many(self, rows: Iterable[Dict[str, Any]]) -> None:
+        expires_at = time.monotonic() + self._ttl
+        with self._lock:
+            for row in rows:
+                food_id = str(row["id"])
+                self._rows[food_id] = (row, expires_at)
+                self._rows.move_to_end(food_id)
+            while len(self._rows) > self._max_entries:
+                self._rows.popitem(last=False)
+
+    def invalidate(self, food_id: str) -> None:
+        with self._lock:
+            self._rows.pop(str(food_id), None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._rows.clear()
+
+
+class NutritionKernel:
+    """Vectorized nutrition math plus a batched, cached food lookup."""
+
+    def __init__(self, cache: Optional[FoodRowCache] = None):
+        self.cache = cache or FoodRowCache()
+
+    # =====================================================
+    # Food lookup
+    # =====================================================
+
+    def get_foods(self, client, food_ids: Iterable[Any]) -> Dict[str, Dict[str, Any]]:
+        """
+        Get foods rows (with food_servings) by id.
+
+        Cached rows are served from memory; all misses are fetched with a
+        single IN query. Returned rows are shared - do not mutate them.
+        Foods that don't exist are simply absent from the result.
+        """
+        ids = list(dict.fromkeys(str(food_id) for food_id in food_ids))
+        found, missing = self.cache.get_many(ids)
+
+        if missing:
+            response = (
+                client.table("foods")
+                .select("*, food_servings(*)")
+                .in_("id", missing)
+                .execute()
+            )
+            rows = [
+                {**row, "food_servings": row.get("food_servings") or []}
+                for row in response.data or []
+            ]
+            self.cache.put_many(rows)
+            found.update((str(row["id"]), row) for row in rows)
+
+        return found
+
+    def remember_foods(
+        self,
+        food_rows: Iterable[Dict[str, Any]],
+        servings: Optional[Iterable[Dict[str, Any]]] = None,
+    ) -> None:
+        """Seed the cache with freshly inserted foods (and their servings)."""
+        servings_by_food: Dict[str, List[Dict[str, Any]]] = {}
+        for serving in servings or []:
+            servings_by_food.setdefault(str(serving["food_id"]), []).append(serving)
+
+        self.cache.put_many(
+            {**row, "food_servings": servings_by_food.get(str(row["id"]), [])}
+            for row in food_rows
+        )
+
+    def forget_food(self, food_id: Any) -> None:
+        """Drop a food from the cache (call from any path that updates or deletes a foods row)."""
+        self.cache.invalidate(str(food_id))
+
+    # =====================================================
+    # Arithmetic
+    # =====================================================
+
+    @staticmethod
+    def macro_matrix(foods: Sequence[Mapping[str, Any]]) -> np.ndarray:
+        """Pack per-100g macros into an (n, 4) float64 matrix (missing values → 0)."""
+        matrix = np.zeros((len(foods), len(PER_100G_COLUMNS)), dtype=np.float64)
+        for row_idx, food in enumerate(foods):
+            for col_idx, column in enumerate(PER_100G_COLUMNS):
+                value = food.get(column)
+                if value is not None:
+                    matrix[row_idx, col_idx] = float(value)
+        return matrix
+
+    @staticmethod
+    def compute(per_100g: np.ndarray, grams: Sequence[Any]) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Scale per-100g macros by grams.
+
+        Returns (item_macros (n, 4), totals (4,)).
+        """
+        grams_vector = np.asarray([float(g) for g in grams], dtype=np.float64)
+        item_macros = per_100g * (grams_vector / 100.0)[:, None]
+        return item_macros, item_macros.sum(axis=0)
+
+    @classmethod
+    def calculate_items(
+        cls,
+        foods: Sequence[Mapping[str, Any]],
+        grams: Sequence[Any],
+    ) -> Tuple[List[Dict[str, float]], Dict[str, float]]:
+        """
+        Compute macros for item i = foods[i] eaten in grams[i].
+
+        Returns (per-item macro dicts, meal totals dict).
+        """
+        if not foods:
+            return [], dict.fromkeys(MACRO_KEYS, 0.0)
+
+        item_macros, totals = cls.compute(cls.macro_matrix(foods), grams)
+        items = [dict(zip(MACRO_KEYS, row.tolist())) for row in item_macros]
+        return items, dict(zip(MACRO_KEYS, totals.tolist()))
+
+    @staticmethod
+    def per_100g_from_totals(
+        totals: Sequence[Mapping[str, Any]],
+        grams: Sequence[Any],
+    ) -> List[Dict[str, float]]:
+        """
+        Inverse of calculate_items: derive per-100g values from item totals
+        (used when the AI provides totals for a portion).
+        """
+        if not totals:
+            return []
+
+        matrix = np.asarray(
+            [[float(item.get(key) or 0) for key in MACRO_KEYS] for item in totals],
+            dtype=np.float64,
+        )
+        grams_vector = np.asarray([float(g) for g in grams], dtype=np.float64)
+        per_100g = matrix / grams_vector[:, None] * 100.0
+        return [dict(zip(PER_100G_COLUMNS, row.tolist())) for row in per_100g]
+
+    @staticmethod
+    def sum_items(items: Sequence[Any]) -> Dict[str, float]:
+        """Sum stored item macros (dicts or MealItem-like objects) into meal totals."""
+        if not items:
+            return dict.fromkeys(MACRO_KEYS, 0.0)
+
+        def value(item: Any, key: str) -> float:
+            raw = item.get(key) if isinstance(item, Mapping) else getattr(item, key, None)
+            return float(raw or 0)
+
+        matrix = np.asarray(
+            [[value(item, key) for key in MACRO_KEYS] for item in items],
+            dtype=np.float64,
+        )
+        return dict(zip(MACRO_KEYS, matrix.sum(axis=0).tolist()))
+
+
+# Singleton instance
+nutrition_kernel = NutritionKernel()
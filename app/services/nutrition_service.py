@@ -17,6 +17,7 @@ from typing import List, Optional, Dict
 from uuid import UUID
 
 from app.services.supabase_service import supabase_service
+from app.services.nutrition_kernel import nutrition_kernel
 from app.models.nutrition import (
     Food,
     FoodServing,
@@ -235,29 +236,8 @@ class NutritionService:
                     )
                     return []
 
-            foods = []
-
-            # Add public foods
-            for row in public_response.data:
-                servings_data = row.pop("food_servings", [])
-                food = Food(**row)
-
-                # If we didn't get servings in the query, fetch them separately
-                if not servings_data and food.id:
-                    try:
-                        servings_response = (
-                            supabase_service.client.table("food_servings")
-                            .select("*")
-                            .eq("food_id", str(food.id))
-                            .execute()
-                        )
-                        servings_data = servings_response.data
-                    except Exception:
-                        # Skip servings if fetch fails
-                        pass
-
-                food.servings = [FoodServing(**s) for s in servings_data]
-                foods.append(food)
+            # Collect raw rows first; models are built in one pass below
+            rows = list(public_response.data or [])
 
             # Search user's custom foods if user_id provided
             if user_id:
@@ -304,28 +284,10 @@ class NutritionService:
                         )
                         custom_response = type('obj', (object,), {'data': []})()  # Empty response
 
-                for row in custom_response.data:
-                    servings_data = row.pop("food_servings", [])
-                    food = Food(**row)
-
-                    # If we didn't get servings in the query, fetch them separately
-                    if not servings_data and food.id:
-                        try:
-                            servings_response = (
-                                supabase_service.client.table("food_servings")
-                                .select("*")
-                                .eq("food_id", str(food.id))
-                                .execute()
-                            )
-                            servings_data = servings_response.data
-                        except Exception:
-                            # Skip servings if fetch fails
-                            pass
-
-                    food.servings = [FoodServing(**s) for s in servings_data]
-                    foods.append(food)
-
-            return foods[:limit]  # Limit total results
+                rows.extend(custom_response.data or [])
+
+            # Limit total results before fetching servings for them
+            return self._build_foods_with_servings(rows[:limit])
 
         except SearchQueryTooShortError:
             raise
@@ -333,6 +295,55 @@ class NutritionService:
             logger.error("search_foods_error", query=query, error=str(e))
             raise SearchFailedError(query, original_error=str(e))
 
+    def _food_from_row(self, row: Dict) -> Food:
+        """Build a Food model from a (possibly shared/cached) foods row without mutating it."""
+        food = Food(**{k: v for k, v in row.items() if k != "food_servings"})
+        food.servings = [FoodServing(**s) for s in row.get("food_servings") or []]
+        return food
+
+    def _build_foods_with_servings(self, rows: List[Dict]) -> List[Food]:
+        """
+        Build Food models (with servings) from foods rows in a single pass.
+
+        Rows whose embedded food_servings came back empty (e.g. the non-JSONB
+        fallback select) get their servings from ONE batched food_servings
+        query for the whole result page instead of one query per food.
+        """
+        missing_ids = list(dict.fromkeys(
+            str(row["id"]) for row in rows
+            if row.get("id") and not row.get("food_servings")
+        ))
+
+        servings_by_food: Dict[str, List[Dict]] = {}
+        if missing_ids:
+            try:
+                servings_response = (
+                    supabase_service.client.table("food_servings")
+                    .select("*")
+                    .in_("food_id", missing_ids)
+                    .execute()
+                )
+                for serving in servings_response.data or []:
+                    servings_by_food.setdefault(str(serving["food_id"]), []).append(serving)
+            except Exception as e:
+                # Skip servings if fetch fails (same behavior as before batching)
+                logger.warning(
+                    "search_foods_servings_batch_failed",
+                    food_count=len(missing_ids),
+                    error=str(e)
+                )
+
+        foods = []
+        for row in rows:
+            servings_data = row.pop("food_servings", None) or servings_by_food.get(
+                str(row.get("id")), []
+            )
+            food = Food(**row)
+            food.servings = [FoodServing(**s) for s in servings_data]
+            foods.append(food)
+
+        return foods
+
     async def get_food(
         self,
         food_id: UUID,
@@ -613,7 +624,9 @@ class NutritionService:
         - Gram amount: max 10,000g (10kg) per item
         - Serving ownership: serving_id must belong to food_id
 
-        PERFORMANCE: Batches all food fetches in a single query (fixes N+1 issue).
+        PERFORMANCE: Foods come from nutrition_kernel's food cache; misses are
+        fetched in a single batched query (fixes N+1 issue). Item macros and
+        meal totals are computed in one vectorized pass.
 
         See: NUTRITION_LOGGING_ARCHITECTURE.md for complete documentation
 
@@ -631,23 +644,15 @@ class NutritionService:
             logged_at = datetime.utcnow()
 
         try:
-            # === FIX N+1 QUERY: Batch fetch all foods at once ===
-            food_ids = list(set(item.food_id for item in items))  # Deduplicate
-
-            # Single query for all foods
-            foods_query = (
-                supabase_service.client.table("foods")
-                .select("*, food_servings(*)")
-                .in_("id", [str(fid) for fid in food_ids])
-                .execute()
+            # === FIX N+1 QUERY: Cached + batched fetch of all foods at once ===
+            food_rows = nutrition_kernel.get_foods(
+                supabase_service.client, (item.food_id for item in items)
             )
 
             # Build foods map for O(1) lookup
             foods_map: Dict[UUID, Food] = {}
-            for row in foods_query.data:
-                servings_data = row.pop("food_servings", [])
-                food = Food(**row)
-                food.servings = [FoodServing(**s) for s in servings_data]
+            for row in food_rows.values():
+                food = self._food_from_row(row)
 
                 # Check user access
                 if not food.is_public and food.created_by != user_id:
@@ -656,12 +661,7 @@ class NutritionService:
                 foods_map[food.id] = food  # food.id is already UUID
             # === End N+1 fix ===
 
-            # Validate and calculate totals
-            total_calories = Decimal("0")
-            total_protein = Decimal("0")
-            total_carbs = Decimal("0")
-            total_fat = Decimal("0")
-
+            # Validate items and resolve grams (nutrition is computed below in one pass)
             validated_items = []
 
             for idx, item in enumerate(items):
@@ -746,46 +746,44 @@ class NutritionService:
                     # Example: 2 servings × 118g/serving = 236g
                     grams = item.quantity * serving.grams_per_serving
 
-                # ======================================================
-                # AUTHORITATIVE CALCULATION (Single Source of Truth)
-                # ======================================================
-                # ALWAYS calculate nutrition from grams - DON'T TRUST FRONTEND
-                # Frontend values are for preview only, backend recalculates everything
-                #
-                # All foods store nutrition as per_100g in database
-                # Formula: (grams / 100) × per_100g_value
-                #
-                # Example: 236g banana with 89 cal/100g
-                #   multiplier = 236 / 100 = 2.36
-                #   calories = 89 × 2.36 = 210
-                #
-                # See: NUTRITION_LOGGING_ARCHITECTURE.md - Frontend/Backend Contract
-                # ======================================================
-                multiplier = grams / Decimal("100")
-                item_calories = food.calories_per_100g * multiplier
-                item_protein = food.protein_g_per_100g * multiplier
-                item_carbs = food.carbs_g_per_100g * multiplier
-                item_fat = food.fat_g_per_100g * multiplier
-
-                total_calories += item_calories
-                total_protein += item_protein
-                total_carbs += item_carbs
-                total_fat += item_fat
-
                 validated_items.append(
                     {
                         "food": food,
                         "serving": serving,  # Can be None for gram-based logging
                         "quantity": item.quantity,
                         "grams": grams,
-                        "calories": item_calories,
-                        "protein_g": item_protein,
-                        "carbs_g": item_carbs,
-                        "fat_g": item_fat,
                         "display_order": idx,
                     }
                 )
 
+            # ======================================================
+            # AUTHORITATIVE CALCULATION (Single Source of Truth)
+            # ======================================================
+            # ALWAYS calculate nutrition from grams - DON'T TRUST FRONTEND
+            # Frontend values are for preview only, backend recalculates everything
+            #
+            # All foods store nutrition as per_100g in database
+            # Formula: (grams / 100) × per_100g_value
+            #
+            # Example: 236g banana with 89 cal/100g
+            #   multiplier = 236 / 100 = 2.36
+            #   calories = 89 × 2.36 = 210
+            #
+            # All items are computed in one vectorized pass (nutrition_kernel).
+            # See: NUTRITION_LOGGING_ARCHITECTURE.md - Frontend/Backend Contract
+            # ======================================================
+            item_macros, totals = nutrition_kernel.calculate_items(
+                [food_rows[str(v["food"].id)] for v in validated_items],
+                [v["grams"] for v in validated_items],
+            )
+            for validated, macros in zip(validated_items, item_macros):
+                validated.update(macros)
+
+            total_calories = totals["calories"]
+            total_protein = totals["protein_g"]
+            total_carbs = totals["carbs_g"]
+            total_fat = totals["fat_g"]
+
             # Create meal
             meal_data = {
                 "user_id": str(user_id),
@@ -1038,19 +1036,16 @@ class NutritionService:
 
             # Recalculate meal totals
             remaining_items = [item for item in meal.items if item.id != item_id]
-            new_total_calories = sum(item.calories for item in remaining_items)
-            new_total_protein = sum(item.protein_g for item in remaining_items)
-            new_total_carbs = sum(item.carbs_g for item in remaining_items)
-            new_total_fat = sum(item.fat_g for item in remaining_items)
+            new_totals = nutrition_kernel.sum_items(remaining_items)
 
             # Update meal totals
             update_response = (
                 supabase_service.client.table("meals")
                 .update({
-                    "total_calories": float(new_total_calories),
-                    "total_protein_g": float(new_total_protein),
-                    "total_carbs_g": float(new_total_carbs),
-                    "total_fat_g": float(new_total_fat),
+                    "total_calories": new_totals["calories"],
+                    "total_protein_g": new_totals["protein_g"],
+                    "total_carbs_g": new_totals["carbs_g"],
+                    "total_fat_g": new_totals["fat_g"],
                     "updated_at": datetime.utcnow().isoformat()
                 })
                 .eq("id", str(meal_id))
@@ -1125,21 +1120,15 @@ class NutritionService:
                     detail="Food item not found in meal"
                 )
 
-            # Get food data
-            food_response = (
-                supabase_service.client.table("foods")
-                .select("*, food_servings(*)")
-                .eq("id", str(current_item.food_id))
-                .execute()
-            )
+            # Get food data (cached by id)
+            food_row = nutrition_kernel.get_foods(
+                supabase_service.client, [current_item.food_id]
+            ).get(str(current_item.food_id))
 
-            if not food_response.data:
+            if not food_row:
                 raise FoodNotFoundError(str(current_item.food_id))
 
-            food_data = food_response.data[0]
-            servings_data = food_data.pop("food_servings", [])
-            food = Food(**food_data)
-            food.servings = [FoodServing(**s) for s in servings_data]
+            food = self._food_from_row(food_row)
 
             # Determine new values
             # Frontend always sends quantity + serving_id together, so if quantity is updated,
@@ -1187,11 +1176,11 @@ class NutritionService:
                 grams = new_quantity * serving.grams_per_serving
 
             # Calculate nutrition
-            factor = grams / Decimal("100")
-            new_calories = food.calories_per_100g * factor
-            new_protein = food.protein_g_per_100g * factor
-            new_carbs = food.carbs_g_per_100g * factor
-            new_fat = food.fat_g_per_100g * factor
+            (new_macros,), _ = nutrition_kernel.calculate_items([food_row], [grams])
+            new_calories = new_macros["calories"]
+            new_protein = new_macros["protein_g"]
+            new_carbs = new_macros["carbs_g"]
+            new_fat = new_macros["fat_g"]
 
             # Update display fields
             new_display_unit = updates.display_unit if updates.display_unit else (
@@ -1228,39 +1217,20 @@ class NutritionService:
                     detail="Failed to update item"
                 )
 
-            # Recalculate meal totals
-            updated_meal_items = []
-            for item in meal.items:
-                if item.id == item_id:
-                    # Use new values
-                    updated_meal_items.append({
-                        "calories": new_calories,
-                        "protein_g": new_protein,
-                        "carbs_g": new_carbs,
-                        "fat_g": new_fat
-                    })
-                else:
-                    # Keep existing values
-                    updated_meal_items.append({
-                        "calories": item.calories,
-                        "protein_g": item.protein_g,
-                        "carbs_g": item.carbs_g,
-                        "fat_g": item.fat_g
-                    })
-
-            new_total_calories = sum(Decimal(str(i["calories"])) for i in updated_meal_items)
-            new_total_protein = sum(Decimal(str(i["protein_g"])) for i in updated_meal_items)
-            new_total_carbs = sum(Decimal(str(i["carbs_g"])) for i in updated_meal_items)
-            new_total_fat = sum(Decimal(str(i["fat_g"])) for i in updated_meal_items)
+            # Recalculate meal totals (updated item uses new values)
+            new_totals = nutrition_kernel.sum_items([
+                new_macros if item.id == item_id else item
+                for item in meal.items
+            ])
 
             # Update meal totals
             meal_update_response = (
                 supabase_service.client.table("meals")
                 .update({
-                    "total_calories": float(new_total_calories),
-                    "total_protein_g": float(new_total_protein),
-                    "total_carbs_g": float(new_total_carbs),
-                    "total_fat_g": float(new_total_fat),
+                    "total_calories": new_totals["calories"],
+                    "total_protein_g": new_totals["protein_g"],
+                    "total_carbs_g": new_totals["carbs_g"],
+                    "total_fat_g": new_totals["fat_g"],
                     "updated_at": datetime.utcnow().isoformat()
                 })
                 .eq("id", str(meal_id))
@@ -1320,21 +1290,15 @@ class NutritionService:
                     detail="Meal not found"
                 )
 
-            # Get food data
-            food_response = (
-                supabase_service.client.table("foods")
-                .select("*, food_servings(*)")
-                .eq("id", str(item.food_id))
-                .execute()
-            )
+            # Get food data (cached by id)
+            food_row = nutrition_kernel.get_foods(
+                supabase_service.client, [item.food_id]
+            ).get(str(item.food_id))
 
-            if not food_response.data:
+            if not food_row:
                 raise FoodNotFoundError(str(item.food_id))
 
-            food_data = food_response.data[0]
-            servings_data = food_data.pop("food_servings", [])
-            food = Food(**food_data)
-            food.servings = [FoodServing(**s) for s in servings_data]
+            food = self._food_from_row(food_row)
 
             # Validate and calculate (same logic as create_meal)
             if item.serving_id is None:
@@ -1368,11 +1332,11 @@ class NutritionService:
                 grams = item.quantity * serving.grams_per_serving
 
             # Calculate nutrition
-            factor = grams / Decimal("100")
-            calories = food.calories_per_100g * factor
-            protein = food.protein_g_per_100g * factor
-            carbs = food.carbs_g_per_100g * factor
-            fat = food.fat_g_per_100g * factor
+            (macros,), _ = nutrition_kernel.calculate_items([food_row], [grams])
+            calories = macros["calories"]
+            protein = macros["protein_g"]
+            carbs = macros["carbs_g"]
+            fat = macros["fat_g"]
 
             # Determine display order (append to end)
             display_order = item.display_order if item.display_order is not None else len(meal.items)
@@ -1406,10 +1370,10 @@ class NutritionService:
                 )
 
             # Recalculate meal totals
-            new_total_calories = meal.total_calories + calories
-            new_total_protein = meal.total_protein_g + protein
-            new_total_carbs = meal.total_carbs_g + carbs
-            new_total_fat = meal.total_fat_g + fat
+            new_total_calories = float(meal.total_calories) + calories
+            new_total_protein = float(meal.total_protein_g) + protein
+            new_total_carbs = float(meal.total_carbs_g) + carbs
+            new_total_fat = float(meal.total_fat_g) + fat
 
             # Update meal totals
             update_response = (
@@ -0,0 +1,213 @@
+"""
+Pattern Scanner - single-pass multi-pattern matching
+
+Compiles a ruleset of (regex, attack_type) pairs into one scanner:
+- Each rule's required literals ("ignore ", "base64", "system:") are
+  extracted from its parsed regex and merged into a trie-shaped regex (the
+  automaton). One scan of the lowercased text finds every trigger present.
+- Only rules whose triggers fired (plus the few rules with no extractable
+  literal) run their full regex to confirm and locate the match.
+
+A plain "a|b|c" alternation makes Python's backtracking engine try every
+branch at every position, so its cost grows with the ruleset; the trie
+shares prefixes, so benign text costs about the same however many rules
+there are.
+"""
+
+import re
+from typing import Dict, FrozenSet, List, NamedTuple, Optional, Sequence, Set, Tuple
+
+try:
+    from re import _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_parse
+
+_LITERAL = sre_parse.LITERAL
+_AT = sre_parse.AT
+_IN = sre_parse.IN
+_BRANCH = sre_parse.BRANCH
+_SUBPATTERN = sre_parse.SUBPATTERN
+_REPEATS = (sre_parse.MAX_REPEAT, sre_parse.MIN_REPEAT)
+
+
+class ScanMatch(NamedTuple):
+    """Leftmost rule match in a scanned text."""
+
+    attack_type: str
+    matched_text: str
+    position: int
+
+
+def required_literals(pattern: str, flags: int = 0) -> Optional[FrozenSet[str]]:
+    """
+    Literals of which every match of pattern contains at least one.
+
+    Returns:
+        Lowercased literal set, or None if none can be extracted (the rule
+        must then always be checked)
+    """
+    found = _required(sre_parse.parse(pattern, flags))
+    return frozenset(literal.lower() for literal in found) if found else None
+
+
+def max_match_length(pattern: str, flags: int = 0, cap: int = 256) -> int:
+    """Longest text pattern can match, capped (unbounded repeats give cap)."""
+    return min(sre_parse.parse(pattern, flags).getwidth()[1], cap)
+
+
+# Cap on the strings a fully literal run expands to ("(a|b)(c|d)" → 4)
+MAX_EXACT_STRINGS = 64
+
+
+def _score(literals: Set[str]) -> Tuple[int, int]:
+    # Prefer the longest shortest literal, then fewer literals
+    return min(len(literal) for literal in literals), -len(literals)
+
+
+def _exact(op, av) -> Optional[Set[str]]:
+    """The finite set of strings a node matches exactly, if it is fully literal."""
+    if op is _LITERAL:
+        return {chr(av)}
+    if op is _SUBPATTERN:
+        return _exact_sequence(av[-1])
+    if op is _BRANCH:
+        alternatives = [_exact_sequence(branch) for branch in av[1]]
+        if all(alternative is not None for alternative in alternatives):
+            union = set().union(*alternatives)
+            return union if len(union) <= MAX_EXACT_STRINGS else None
+    if op is _IN and all(member_op is _LITERAL for member_op, _ in av):
+        return {chr(value) for _, value in av}
+    return None
+
+
+def _exact_sequence(items) -> Optional[Set[str]]:
+    strings = {""}
+    for op, av in items:
+        if op is _AT:
+            continue
+        exact = _exact(op, av)
+        if exact is None or len(strings) * len(exact) > MAX_EXACT_STRINGS:
+            return None
+        strings = {prefix + suffix for prefix in strings for suffix in exact}
+    return strings
+
+
+def _required(items) -> Optional[Set[str]]:
+    """
+    Best literal set for a sequence: runs of adjacent fully literal nodes
+    are expanded to their strings ("(system|admin):" → {"system:", "admin:"});
+    other nodes contribute what they require themselves.
+    """
+    best: Optional[Set[str]] = None
+    run = {""}
+
+    def consider(candidate: Optional[Set[str]]) -> None:
+        nonlocal best
+        if candidate and all(candidate) and (best is None or _score(candidate) > _score(best)):
+            best = candidate
+
+    for op, av in items:
+        if op is _AT:
+            continue  # Zero-width (\b, ^): the literals around it stay adjacent
+
+        exact = _exact(op, av)
+        if exact is not None and len(run) * len(exact) <= MAX_EXACT_STRINGS:
+            run = {prefix + suffix for prefix in run for suffix in exact}
+            continue
+
+        consider(run)
+        run = {""}
+        if exact is not None:
+            run = exact
+        elif op is _SUBPATTERN:
+            consider(_required(av[-1]))
+        elif op is _BRANCH:
+            alternatives = [_required(branch) for branch in av[1]]
+            if all(alternatives):
+                consider(set().union(*alternatives))
+        elif op in _REPEATS and av[0] >= 1:
+            consider(_required(av[2]))
+
+    consider(run)
+    return best
+
+
+def _trie_pattern(words: Sequence[str]) -> str:
+    """Regex matching any of words, factored into a prefix trie."""
+    trie: Dict[str, dict] = {}
+    for word in words:
+        node = trie
+        for char in word:
+            node = node.setdefault(char, {})
+        node[""] = {}
+
+    def build(node: Dict[str, dict]) -> str:
+        branches = [re.escape(char) + build(child) for char, child in sorted(node.items()) if char]
+        if not branches:
+            return ""
+        body = branches[0] if len(branches) == 1 else f"(?:{'|'.join(branches)})"
+        return f"(?:{body})?" if "" in node else body
+
+    return build(trie)
+
+
+class PatternScanner:
+    """
+    Immutable compiled ruleset.
+
+    Build a new scanner to change rules; swapping the reference is atomic,
+    so a scanner can be replaced while others are scanning.
+    """
+
+    def __init__(self, rules: Sequence[Tuple[str, str]], flags: int = re.IGNORECASE):
+        """
+        Args:
+            rules: (regex, attack_type) pairs; earlier rules win ties
+            flags: Regex flags for every rule
+
+        Raises:
+            re.error: If a rule doesn't compile
+        """
+        self.rules = [(re.compile(pattern, flags), attack_type) for pattern, attack_type in rules]
+        self.max_match_length = max((max_match_length(pattern, flags) for pattern, _ in rules), default=0)
+
+        self._triggers: Dict[str, List[int]] = {}
+        self._unfiltered: List[int] = []
+        for index, (pattern, _) in enumerate(rules):
+            literals = required_literals(pattern, flags)
+            if literals is None:
+                self._unfiltered.append(index)
+                continue
+            for literal in literals:
+                self._triggers.setdefault(literal, []).append(index)
+
+        # Lookahead finds triggers at every position, including overlapping ones
+        self._automaton = re.compile(f"(?=({_trie_pattern(list(self._triggers))}))") if self._triggers else None
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def candidates(self, text: str) -> Set[int]:
+        """Indexes of rules that could match text (one automaton pass)."""
+        candidates = set(self._unfiltered)
+        if self._automaton is not None:
+            for match in self._automaton.finditer(text.lower()):
+                found = match.group(1)
+                # The trie matches the longest trigger here; shorter ones may prefix it
+                for end in range(1, len(found) + 1):
+                    candidates.update(self._triggers.get(found[:end], ()))
+        return candidates
+
+    def scan(self, text: str) -> Optional[ScanMatch]:
+        """Leftmost match of any rule, or None."""
+        best = None
+        for index in sorted(self.candidates(text)):
+            pattern, attack_type = self.rules[index]
+            match = pattern.search(text)
+            if match and (best is None or match.start() < best[0].start()):
+                best = (match, attack_type)
+
+        if best is None:
+            return None
+        match, attack_type = best
+        return ScanMatch(attack_type, match.group(0), match.start())
@@ -0,0 +1,109 @@
+"""
+Prompt Cache - Provider-side prompt prefix caching helpers.
+
+Every agentic iteration resends the system prompt, the tool list and the
+conversation so far. Providers cache a repeated request prefix if it is
+byte-identical, so requests are laid out as:
+
+    tools (compiled once by the tool registry)
+    → system prompt                      [breakpoint 1]
+    → conversation history + new message [breakpoint 2]
+    → this turn's tool calls/results (uncached tail)
+
+Breakpoints are explicit `cache_control` markers for providers that need
+them (Anthropic, Gemini; OpenRouter forwards them). Other providers
+(DeepSeek, OpenAI) cache prefixes automatically, so they get plain messages
+with the same layout.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+
+CACHE_CONTROL = {"type": "ephemeral"}
+
+# Models that need explicit cache_control breakpoints
+_CACHE_CONTROL_MODEL_PREFIXES = ("anthropic/", "claude-", "google/gemini")
+
+
+def supports_cache_control(model: str) -> bool:
+    """True if the model needs explicit cache_control breakpoints."""
+    return model.lower().startswith(_CACHE_CONTROL_MODEL_PREFIXES)
+
+
+def _with_breakpoint(message: Dict[str, Any]) -> Dict[str, Any]:
+    """Copy of a message with cache_control on its last content part."""
+    content = message.get("content")
+    if isinstance(content, str):
+        parts = [{"type": "text", "text": content}]
+    elif isinstance(content, list) and content:
+        parts = [dict(part) for part in content]
+    else:
+        return message
+
+    parts[-1]["cache_control"] = CACHE_CONTROL
+    return {**message, "content": parts}
+
+
+def build_cached_messages(
+    system_prompt: str,
+    messages: List[Dict[str, Any]],
+    model: str
+) -> List[Dict[str, Any]]:
+    """
+    OpenAI-format messages with the system prompt first and cache breakpoints.
+
+    The caller's messages are not modified. Breakpoints (if the model needs
+    them) go on the system prompt and on the last user message, so later
+    iterations of the same turn re-read everything up to the new message.
+    """
+    system_message = {"role": "system", "content": system_prompt}
+    if not supports_cache_control(model):
+        return [system_message] + messages
+
+    last_user = max(
+        (i for i, message in enumerate(messages) if message.get("role") == "user"),
+        default=None
+    )
+    cached = [_with_breakpoint(system_message)]
+    for i, message in enumerate(messages):
+        cached.append(_with_breakpoint(message) if i == last_user else message)
+    return cached
+
+
+def build_cached_system(system_prompt: str) -> List[Dict[str, Any]]:
+    """Anthropic Messages API system blocks with a cache breakpoint."""
+    return [{"type": "text", "text": system_prompt, "cache_control": CACHE_CONTROL}]
+
+
+def _usage_value(usage: Any, name: str) -> Optional[int]:
+    if usage is None:
+        return None
+    value = usage.get(name) if isinstance(usage, dict) else getattr(usage, name, None)
+    return value if isinstance(value, int) else None
+
+
+def cache_token_usage(usage: Any) -> Tuple[int, int]:
+    """
+    Prompt-cache tokens reported by the provider.
+
+    Understands OpenRouter/OpenAI (prompt_tokens_details), DeepSeek
+    (prompt_cache_hit_tokens) and Anthropic (cache_read/creation_input_tokens).
+
+    Returns:
+        (cache_read_tokens, cache_write_tokens)
+    """
+    details = getattr(usage, "prompt_tokens_details", None)
+    if isinstance(usage, dict):
+        details = usage.get("prompt_tokens_details")
+
+    read = (
+        _usage_value(details, "cached_tokens")
+        or _usage_value(usage, "prompt_cache_hit_tokens")
+        or _usage_value(usage, "cache_read_input_tokens")
+        or 0
+    )
+    write = (
+        _usage_value(details, "cache_write_tokens")
+        or _usage_value(usage, "cache_creation_input_tokens")
+        or 0
+    )
+    return read, write
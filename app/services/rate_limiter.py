@@ -0,0 +1,258 @@
+"""
+Rate Limiter - atomic token buckets shared across workers
+
+Every quota is a token bucket: `limit` requests of burst, refilled evenly
+over `period` seconds. A request checks all of its buckets (per user and
+route-wide) at once and consumes from them only if every one has a token,
+so a rejected request never eats into another quota.
+
+Backends:
+- Redis (RATE_LIMIT_REDIS_URL): one Lua script per check, so the
+  read-refill-consume step is atomic across API workers, Celery and
+  instances; the clock is Redis' own TIME, so hosts can't disagree
+- in-process (unset, or while Redis is unreachable): same algorithm
+  under a lock, per process
+
+Redis errors fall back to the in-process buckets for a short cooldown
+rather than failing requests or letting them through unlimited.
+"""
+
+import math
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional, Sequence, Tuple
+
+import structlog
+
+logger = structlog.get_logger()
+
+
+class Quota(NamedTuple):
+    """`limit` requests per `period` seconds (also the burst size)."""
+
+    limit: int
+    period: float
+
+    @property
+    def rate(self) -> float:
+        return self.limit / self.period
+
+
+class RateLimitResult(NamedTuple):
+    """Outcome of a check; remaining is for the tightest bucket."""
+
+    allowed: bool
+    limit: int
+    remaining: int
+    retry_after: float
+
+    @property
+    def retry_after_header(self) -> str:
+        """Whole seconds for the Retry-After header (at least 1)."""
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+# Quotas per route: "user" applies to each user, "route" to all users together
+# (caps total LLM spend on the route whatever the number of users)
+ROUTE_QUOTAS: Dict[str, Dict[str, Quota]] = {
+    "coach_message": {"user": Quota(20, 60), "route": Quota(600, 60)},
+    "consultation": {"user": Quota(20, 60), "route": Quota(300, 60)},
+    "wearable_sync": {"user": Quota(10, 3600), "route": Quota(500, 3600)},
+}
+
+KEY_PREFIX = "ratelimit:"
+
+# Seconds to use the in-process buckets after a Redis error
+REDIS_RETRY_SECONDS = 30.0
+
+# In-process buckets kept before full (idle) ones are pruned
+MAX_MEMORY_BUCKETS = 10000
+
+Bucket = Tuple[str, Quota]
+
+# KEYS: bucket keys; ARGV: cost, then limit and rate for each key.
+# Returns {allowed, tokens left in the tightest bucket, retry_after} as
+# strings (Lua numbers would be truncated to integers).
+TOKEN_BUCKET_SCRIPT = """
+local cost = tonumber(ARGV[1])
+local time = redis.call('TIME')
+local now = tonumber(time[1]) + tonumber(time[2]) / 1000000
+local levels = {}
+local allowed = 1
+local retry_after = 0
+local remaining = nil
+
+for i, key in ipairs(KEYS) do
+  local limit = tonumber(ARGV[i * 2])
+  local rate = tonumber(ARGV[i * 2 + 1])
+  local state = redis.call('HMGET', key, 'tokens', 'ts')
+  local tokens = tonumber(state[1]) or limit
+  local ts = tonumber(state[2]) or now
+  tokens = math.min(limit, tokens + math.max(0, now - ts) * rate)
+  levels[i] = tokens
+  if tokens < cost then
+    allowed = 0
+    retry_after = math.max(retry_after, (cost - tokens) / rate)
+  end
+end
+
+for i, key in ipairs(KEYS) do
+  local limit = tonumber(ARGV[i * 2])
+  local rate = tonumber(ARGV[i * 2 + 1])
+  local tokens = levels[i]
+  if allowed == 1 then
+    tokens = tokens - cost
+  end
+  if remaining == nil or tokens < remaining then
+    remaining = tokens
+  end
+  redis.call('HSET', key, 'tokens', tokens, 'ts', now)
+  -- Expire once the bucket would be full again (an absent key is a full bucket)
+  redis.call('PEXPIRE', key, math.ceil((limit - tokens) / rate * 1000) + 1000)
+end
+
+return {tostring(allowed), tostring(remaining), tostring(retry_after)}
+"""
+
+
+def _result(buckets: Sequence[Bucket], allowed: bool, remaining: float, retry_after: float) -> RateLimitResult:
+    limit = min(quota.limit for _, quota in buckets)
+    return RateLimitResult(allowed, limit, max(0, math.floor(remaining)), retry_after)
+
+
+class _MemoryBackend:
+    """Same token-bucket algorithm as the Lua script, per process."""
+
+    def __init__(self):
+        self._buckets: Dict[str, Tuple[float, float]] = {}  # key -> (tokens, updated_at)
+        self._lock = threading.Lock()
+
+    def check(self, buckets: Sequence[Bucket], cost: int = 1) -> RateLimitResult:
+        with self._lock:
+            now = time.monotonic()
+            levels = []
+            retry_after = 0.0
+            for key, quota in buckets:
+                tokens, updated_at = self._buckets.get(key, (quota.limit, now))
+                tokens = min(quota.limit, tokens + (now - updated_at) * quota.rate)
+                levels.append(tokens)
+                if tokens < cost:
+                    retry_after = max(retry_after, (cost - tokens) / quota.rate)
+
+            allowed = retry_after == 0
+            if allowed:
+                levels = [tokens - cost for tokens in levels]
+            for (key, _), tokens in zip(buckets, levels):
+                self._buckets[key] = (tokens, now)
+
+            if len(self._buckets) > MAX_MEMORY_BUCKETS:
+                self._prune(now)
+
+        return _result(buckets, allowed, min(levels), retry_after)
+
+    def _prune(self, now: float) -> None:
+        # A bucket that has refilled holds no state worth keeping; quotas
+        # aren't stored, so use the longest period as the refill bound
+        horizon = max(quota.period for quotas in ROUTE_QUOTAS.values() for quota in quotas.values())
+        self._buckets = {
+            key: state for key, state in self._buckets.items()
+            if now - state[1] < horizon
+        }
+
+
+class RateLimiter:
+    """Atomic multi-bucket rate limiter (Redis, with in-process fallback)."""
+
+    def __init__(self, redis_url: Optional[str] = None):
+        """
+        Args:
+            redis_url: redis://... for limits shared by every worker;
+                None = in-process only
+        """
+        self.redis_url = redis_url
+        self._memory = _MemoryBackend()
+        self._redis_down_until = 0.0
+        self._sync_script = None
+        self._async_script = None
+        if redis_url:
+            import redis
+            import redis.asyncio
+
+            options = {"socket_timeout": 0.5, "socket_connect_timeout": 0.5}
+            self._sync_script = redis.Redis.from_url(redis_url, **options).register_script(TOKEN_BUCKET_SCRIPT)
+            self._async_script = redis.asyncio.Redis.from_url(redis_url, **options).register_script(TOKEN_BUCKET_SCRIPT)
+
+    def check(self, buckets: Sequence[Bucket], cost: int = 1) -> RateLimitResult:
+        """
+        Consume cost tokens from every bucket, or from none.
+
+        Args:
+            buckets: (key, quota) pairs that must all have capacity
+            cost: Tokens to consume from each
+
+        Returns:
+            RateLimitResult (retry_after is 0 when allowed)
+        """
+        if self._use_redis():
+            try:
+                keys, args = self._script_args(buckets, cost)
+                return self._parse(buckets, self._sync_script(keys=keys, args=args))
+            except Exception as e:
+                self._redis_failed(e)
+        return self._memory.check(buckets, cost)
+
+    async def check_async(self, buckets: Sequence[Bucket], cost: int = 1) -> RateLimitResult:
+        """check() without blocking the event loop on Redis."""
+        if self._use_redis():
+            try:
+                keys, args = self._script_args(buckets, cost)
+                return self._parse(buckets, await self._async_script(keys=keys, args=args))
+            except Exception as e:
+                self._redis_failed(e)
+        return self._memory.check(buckets, cost)
+
+    async def check_route(self, route: str, user_id: str) -> RateLimitResult:
+        """Check a user's request against the route's ROUTE_QUOTAS."""
+        return await self.check_async(route_buckets(route, user_id))
+
+    def _use_redis(self) -> bool:
+        return self._sync_script is not None and time.monotonic() >= self._redis_down_until
+
+    def _redis_failed(self, error: Exception) -> None:
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+        logger.warning("rate_limit_redis_unavailable", error=str(error), retry_in_s=REDIS_RETRY_SECONDS)
+
+    @staticmethod
+    def _script_args(buckets: Sequence[Bucket], cost: int) -> Tuple[List[str], List[float]]:
+        keys = [KEY_PREFIX + key for key, _ in buckets]
+        args: List[float] = [cost]
+        for _, quota in buckets:
+            args.extend((quota.limit, quota.rate))
+        return keys, args
+
+    @staticmethod
+    def _parse(buckets: Sequence[Bucket], reply) -> RateLimitResult:
+        allowed, remaining, retry_after = (float(value) for value in reply)
+        return _result(buckets, allowed == 1, remaining, retry_after)
+
+
+def route_buckets(route: str, user_id: str) -> List[Bucket]:
+    """(key, quota) pairs for a user's request on a route."""
+    quotas = ROUTE_QUOTAS[route]
+    buckets = [(f"{route}:user:{user_id}", quotas["user"])]
+    if "route" in quotas:
+        buckets.append((f"{route}:all", quotas["route"]))
+    return buckets
+
+
+# Singleton
+_rate_limiter: Optional[RateLimiter] = None
+
+
+def get_rate_limiter() -> RateLimiter:
+    """Get singleton RateLimiter instance."""
+    global _rate_limiter
+    if _rate_limiter is None:
+        from app.config import settings
+        _rate_limiter = RateLimiter(settings.RATE_LIMIT_REDIS_URL)
+    return _rate_limiter
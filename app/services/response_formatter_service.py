@@ -233,8 +233,8 @@ def get_response_formatter(anthropic_client=None) -> ResponseFormatterService:
     global _formatter_service
     if _formatter_service is None:
         if anthropic_client is None:
-            from anthropic import Anthropic
             import os
-            anthropic_client = Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+            from ultimate_ai_consultation.libs.llm_clients import get_anthropic_client
+            anthropic_client = get_anthropic_client(os.getenv("ANTHROPIC_API_KEY"))
         _formatter_service = ResponseFormatterService(anthropic_client)
     return _formatter_service
@@ -12,12 +12,22 @@ Attack Vectors Protected:
 5. Context pollution: Long messages with hidden instructions
 6. Tool manipulation: Malicious tool inputs
 7. Output leakage: Tricks to reveal system prompts
+
+Input and output rules are compiled into PatternScanners (one automaton
+pass per message). The injection/output rulesets can be overridden from a
+JSON file that is hot-reloaded when it changes.
 """
 
+import json
+import os
 import structlog
 import re
+import time
+from collections import Counter
 from typing import Dict, Any, Tuple, Optional, List
-from datetime import datetime, timedelta
+
+from app.services.pattern_scanner import PatternScanner
+from app.services.rate_limiter import Quota
 
 logger = structlog.get_logger()
 
@@ -62,6 +72,32 @@ class SecurityService:
         (r'\b(disregard|override|bypass|circumvent) (all|previous|your) (rules|instructions|guidelines|safety)\b', 'instruction_override'),
     ]
 
+    # Structural checks folded into the same scan (not part of the reloadable ruleset)
+    STRUCTURAL_PATTERNS = [
+        (r'(.)\1{50,}', 'repetition_attack'),  # Same character repeated 50+ times
+        (r'[\u200b\u200c\u200d\ufeff]', 'character_attack'),  # Zero-width characters (steganography)
+    ]
+
+    # AI output rules (prompt leakage and role breaking)
+    OUTPUT_PATTERNS = [
+        (r'you are an ai fitness coach', 'prompt_leakage'),
+        (r'your instructions are', 'prompt_leakage'),
+        (r'i was instructed to', 'prompt_leakage'),
+        (r'my system prompt', 'prompt_leakage'),
+        (r'anthropic', 'prompt_leakage'),
+        (r'claude code', 'prompt_leakage'),
+        (r'i am not a fitness coach', 'role_break'),
+        (r'i cannot help with fitness', 'role_break'),
+        (r'i am actually', 'role_break'),
+        (r'pretending to be', 'role_break'),
+    ]
+
+    # Block confidence by attack type (injection patterns: 0.95)
+    BLOCK_CONFIDENCE = {
+        "repetition_attack": 0.8,
+        "character_attack": 0.7,
+    }
+
     # Suspicious phrases (not automatically blocked, but flagged)
     SUSPICIOUS_PHRASES = [
         'ignore', 'disregard', 'forget', 'pretend', 'act as', 'system',
@@ -75,37 +111,114 @@ class SecurityService:
     RATE_LIMIT_WINDOW = 60  # seconds
     RATE_LIMIT_MAX_ATTEMPTS = 10  # max attempts per window
 
-    def __init__(self, cache_service=None):
+    # How often (seconds) to check the rules file for changes
+    RULES_CHECK_INTERVAL = 5.0
+
+    def __init__(self, cache_service=None, rules_path: Optional[str] = None, rate_limiter=None):
         """
         Initialize security service.
 
         Args:
-            cache_service: Cache service for rate limiting
+            cache_service: Cache service
+            rules_path: Optional JSON ruleset ({"injection_patterns": [[regex, attack_type], ...],
+                "output_patterns": [...]}), reloaded when the file changes
+            rate_limiter: RateLimiter for the per-user message limit (None = no limit)
         """
         self.cache = cache_service
-        self._compile_patterns()
+        self.rate_limiter = rate_limiter
+        self.rules_path = rules_path
+        self._rules_mtime: Optional[float] = None
+        self._rules_checked_at = 0.0
+        self._input_scanner = PatternScanner(self.INJECTION_PATTERNS + self.STRUCTURAL_PATTERNS)
+        self._output_scanner = PatternScanner(self.OUTPUT_PATTERNS)
+        if rules_path:
+            self.reload_rules()
+
+    def reload_rules(self) -> bool:
+        """
+        Rebuild the scanners from rules_path.
 
-    def _compile_patterns(self):
-        """Compile regex patterns for performance."""
-        self.compiled_patterns = [
-            (re.compile(pattern, re.IGNORECASE), attack_type)
-            for pattern, attack_type in self.INJECTION_PATTERNS
-        ]
+        Missing keys keep the built-in rules. If the file can't be read or a
+        rule doesn't compile, the current scanners stay in place.
 
-    def validate_message(
+        Returns:
+            True if the new rules were applied
+        """
+        try:
+            mtime = os.path.getmtime(self.rules_path)
+            with open(self.rules_path, encoding="utf-8") as f:
+                rules = json.load(f)
+            injection = [tuple(rule) for rule in rules.get("injection_patterns", self.INJECTION_PATTERNS)]
+            output = [tuple(rule) for rule in rules.get("output_patterns", self.OUTPUT_PATTERNS)]
+            input_scanner = PatternScanner(injection + self.STRUCTURAL_PATTERNS)
+            output_scanner = PatternScanner(output)
+        except (OSError, ValueError, TypeError, re.error) as e:
+            logger.error(f"[Security] Failed to load rules from {self.rules_path}: {e}")
+            return False
+
+        self._input_scanner, self._output_scanner = input_scanner, output_scanner
+        self._rules_mtime = mtime
+        logger.info(
+            f"[Security] Loaded rules from {self.rules_path}: "
+            f"{len(injection)} injection, {len(output)} output patterns"
+        )
+        return True
+
+    def _maybe_reload_rules(self):
+        """Reload the rules file if it changed (checked at most every RULES_CHECK_INTERVAL)."""
+        if not self.rules_path:
+            return
+        now = time.monotonic()
+        if now - self._rules_checked_at < self.RULES_CHECK_INTERVAL:
+            return
+        self._rules_checked_at = now
+        try:
+            mtime = os.path.getmtime(self.rules_path)
+        except OSError:
+            return
+        if mtime != self._rules_mtime:
+            self.reload_rules()
+
+    async def validate_message_async(
         self,
         message: str,
         user_id: str,
         check_rate_limit: bool = True
     ) -> Tuple[bool, Optional[str], Dict[str, Any]]:
         """
-        Validate user message for security threats.
+        validate_message() plus the per-user rate limit, without blocking the event loop on Redis.
 
         Args:
             message: User's message
             user_id: User UUID (for rate limiting)
             check_rate_limit: Whether to check rate limit
 
+        Returns:
+            (is_safe, block_reason, metadata) - see validate_message
+        """
+        if check_rate_limit and not await self._check_rate_limit(user_id):
+            logger.warning(f"[Security] Rate limit exceeded for user {user_id[:8]}...")
+            return (False, "Rate limit exceeded. Please slow down.", {
+                "attack_type": "rate_limit",
+                "confidence": 1.0
+            })
+
+        return self.validate_message(message, user_id)
+
+    def validate_message(
+        self,
+        message: str,
+        user_id: str
+    ) -> Tuple[bool, Optional[str], Dict[str, Any]]:
+        """
+        Validate user message for security threats.
+
+        Rate limiting needs Redis, so it lives in validate_message_async.
+
+        Args:
+            message: User's message
+            user_id: User UUID (for logging)
+
         Returns:
             (is_safe, block_reason, metadata)
             - is_safe: True if message is safe, False if blocked
@@ -119,15 +232,7 @@ class SecurityService:
             "length_violation": False
         }
 
-        # 1. Check rate limiting
-        if check_rate_limit and not self._check_rate_limit(user_id):
-            logger.warning(f"[Security] Rate limit exceeded for user {user_id[:8]}...")
-            return (False, "Rate limit exceeded. Please slow down.", {
-                "attack_type": "rate_limit",
-                "confidence": 1.0
-            })
-
-        # 2. Check message length (prevent context stuffing)
+        # 1. Check message length (prevent context stuffing)
         if len(message) > self.MAX_MESSAGE_LENGTH:
             logger.warning(
                 f"[Security] Message too long from user {user_id[:8]}...: "
@@ -140,33 +245,33 @@ class SecurityService:
                 "message_length": len(message)
             })
 
-        # 3. Check for injection patterns
-        message_lower = message.lower()
+        # 2. Check for injection patterns, character repetition and zero-width
+        # characters (one scan; the leftmost match wins)
+        self._maybe_reload_rules()
+        match = self._input_scanner.scan(message)
+        if match:
+            metadata["detected_attacks"].append({
+                "attack_type": match.attack_type,
+                "matched_text": match.matched_text,
+                "position": match.position
+            })
+
+            logger.warning(
+                f"[Security] ⚠️ Injection attempt detected from user {user_id[:8]}...\n"
+                f"Attack type: {match.attack_type}\n"
+                f"Matched: '{match.matched_text[:100]}'\n"
+                f"Full message: {message[:100]}..."
+            )
+
+            return (False, self._get_block_message(match.attack_type), {
+                "attack_type": match.attack_type,
+                "confidence": self.BLOCK_CONFIDENCE.get(match.attack_type, 0.95),
+                "matched_text": match.matched_text,
+                **metadata
+            })
 
-        for pattern, attack_type in self.compiled_patterns:
-            match = pattern.search(message)
-            if match:
-                metadata["detected_attacks"].append({
-                    "attack_type": attack_type,
-                    "matched_text": match.group(0),
-                    "position": match.start()
-                })
-
-                logger.warning(
-                    f"[Security] ⚠️ Injection attempt detected from user {user_id[:8]}...\n"
-                    f"Attack type: {attack_type}\n"
-                    f"Matched: '{match.group(0)}'\n"
-                    f"Full message: {message[:100]}..."
-                )
-
-                return (False, self._get_block_message(attack_type), {
-                    "attack_type": attack_type,
-                    "confidence": 0.95,
-                    "matched_text": match.group(0),
-                    **metadata
-                })
-
-        # 4. Check for suspicious phrases (flag but don't block)
+        # 3. Check for suspicious phrases (flag but don't block)
+        message_lower = message.lower()
         suspicious_count = 0
         for phrase in self.SUSPICIOUS_PHRASES:
             if phrase in message_lower:
@@ -176,7 +281,7 @@ class SecurityService:
         # Calculate suspicion score (0-1)
         metadata["suspicion_score"] = min(suspicious_count / 5, 1.0)
 
-        # 5. Check for excessive repetition (potential attack)
+        # 4. Check for excessive word repetition (potential attack)
         if self._has_excessive_repetition(message):
             logger.warning(
                 f"[Security] Excessive repetition detected from user {user_id[:8]}..."
@@ -187,7 +292,7 @@ class SecurityService:
                 **metadata
             })
 
-        # 6. Check for unusual character patterns
+        # 5. Check for mostly non-ASCII text (potential encoding attack)
         if self._has_unusual_characters(message):
             logger.warning(
                 f"[Security] Unusual characters detected from user {user_id[:8]}..."
@@ -257,46 +362,26 @@ class SecurityService:
         Returns:
             (is_safe, block_reason)
         """
-        output_lower = output.lower()
-
-        # 1. Check for system prompt leakage
-        leaked_phrases = [
-            'you are an ai fitness coach',
-            'your instructions are',
-            'i was instructed to',
-            'my system prompt',
-            'anthropic',
-            'claude code'
-        ]
-
-        for phrase in leaked_phrases:
-            if phrase in output_lower:
-                logger.warning(
-                    f"[Security] ⚠️ Potential prompt leakage detected\n"
-                    f"Output: {output[:200]}..."
-                )
-                return (False, "Response validation failed. Please try again.")
-
-        # 2. Check for role breaking
-        role_breaks = [
-            'i am not a fitness coach',
-            'i cannot help with fitness',
-            'i am actually',
-            'pretending to be'
-        ]
-
-        for phrase in role_breaks:
-            if phrase in output_lower:
-                logger.warning(
-                    f"[Security] ⚠️ Role breaking detected\n"
-                    f"Output: {output[:200]}..."
-                )
-                return (False, "Response validation failed. Please try again.")
+        # Check for system prompt leakage and role breaking (one scan)
+        self._maybe_reload_rules()
+        match = self._output_scanner.scan(output)
+        if match:
+            label = "Potential prompt leakage" if match.attack_type == "prompt_leakage" else "Role breaking"
+            logger.warning(
+                f"[Security] ⚠️ {label} detected\n"
+                f"Output: {output[:200]}..."
+            )
+            return (False, "Response validation failed. Please try again.")
 
         # Output is safe
         return (True, None)
 
-    def _check_rate_limit(self, user_id: str) -> bool:
+    def stream_guard(self) -> "OutputStreamGuard":
+        """Guard for streaming AI output before validate_ai_output can run on all of it."""
+        self._maybe_reload_rules()
+        return OutputStreamGuard(self._output_scanner)
+
+    async def _check_rate_limit(self, user_id: str) -> bool:
         """
         Check if user has exceeded rate limit.
 
@@ -306,51 +391,34 @@ class SecurityService:
         Returns:
             True if within limit, False if exceeded
         """
-        if not self.cache:
-            return True  # No cache, no rate limiting
+        if not self.rate_limiter:
+            return True  # No limiter, no rate limiting
 
-        key = f"security:rate_limit:{user_id}"
-
-        # Get current count
-        count = self.cache.get(key) or 0
-
-        if count >= self.RATE_LIMIT_MAX_ATTEMPTS:
-            return False
-
-        # Increment count
-        self.cache.set(key, count + 1, ttl=self.RATE_LIMIT_WINDOW)
-
-        return True
+        # Atomic check-and-consume (a get-then-set lets concurrent requests through)
+        quota = Quota(self.RATE_LIMIT_MAX_ATTEMPTS, self.RATE_LIMIT_WINDOW)
+        result = await self.rate_limiter.check_async([(f"security:{user_id}", quota)])
+        return result.allowed
 
     def _has_excessive_repetition(self, message: str) -> bool:
         """
-        Check if message has excessive character/word repetition.
+        Check if message has excessive word repetition.
+
+        (Character runs are matched by STRUCTURAL_PATTERNS in the scan.)
 
         Args:
             message: User's message
 
         Returns:
-            True if excessive repetition detected
+            True if the same word appears more than 20 times
         """
-        # Check for same character repeated 50+ times
-        if re.search(r'(.)\1{50,}', message):
-            return True
-
-        # Check for same word repeated 20+ times
-        words = message.split()
-        if len(words) > 0:
-            word_counts = {}
-            for word in words:
-                word_lower = word.lower()
-                word_counts[word_lower] = word_counts.get(word_lower, 0) + 1
-                if word_counts[word_lower] > 20:
-                    return True
-
-        return False
+        counts = Counter(message.lower().split())
+        return bool(counts) and counts.most_common(1)[0][1] > 20
 
     def _has_unusual_characters(self, message: str) -> bool:
         """
-        Check for unusual unicode characters that might be encoding attacks.
+        Check for mostly non-ASCII text that might be an encoding attack.
+
+        (Zero-width characters are matched by STRUCTURAL_PATTERNS in the scan.)
 
         Args:
             message: User's message
@@ -358,21 +426,13 @@ class SecurityService:
         Returns:
             True if unusual characters detected
         """
-        # Count non-ASCII characters
-        non_ascii_count = sum(1 for char in message if ord(char) > 127)
-        non_ascii_ratio = non_ascii_count / len(message) if message else 0
+        if not message:
+            return False
+        non_ascii_count = len(message) - len(message.encode("ascii", "ignore"))
 
         # Allow up to 30% non-ASCII (for multilingual support)
         # But flag if >50% (potential encoding attack)
-        if non_ascii_ratio > 0.5:
-            return True
-
-        # Check for zero-width characters (steganography)
-        zero_width_chars = ['\u200b', '\u200c', '\u200d', '\ufeff']
-        if any(char in message for char in zero_width_chars):
-            return True
-
-        return False
+        return non_ascii_count / len(message) > 0.5
 
     def _has_sql_injection(self, value: str) -> bool:
         """
@@ -441,11 +501,57 @@ class SecurityService:
             "delimiter_attack": "Invalid characters detected. Please use standard text.",
             "encoding_attack": "Invalid encoding detected. Please use plain text.",
             "instruction_override": "Invalid request. I'm here to help with fitness and nutrition.",
+            "repetition_attack": "Message contains excessive repetition. Please rephrase.",
+            "character_attack": "Message contains unusual characters. Please use standard text.",
         }
 
         return messages.get(attack_type, "Invalid request. Please try again with a different message.")
 
 
+class OutputStreamGuard:
+    """
+    Filters streamed AI output with the output rules before the full reply
+    can be validated.
+
+    Text is released as it arrives, except for a tail that could be the start
+    of a match (the longest a rule can match); once a rule matches nothing
+    more is released. validate_ai_output on the full reply stays
+    authoritative.
+    """
+
+    def __init__(self, scanner: PatternScanner):
+        self.scanner = scanner
+        self.holdback = max(scanner.max_match_length - 1, 0)
+        self.text = ""
+        self.released = 0
+        self.blocked = False
+
+    def feed(self, delta: str) -> str:
+        """Add a delta; returns the text that is safe to release now."""
+        self.text += delta
+        if self.blocked:
+            return ""
+
+        # Released text was already scanned; only a match overlapping the tail is new
+        start = max(0, self.released - self.holdback)
+        match = self.scanner.scan(self.text[start:])
+        if match:
+            self.blocked = True
+            return self._release(start + match.position)
+        return self._release(len(self.text) - self.holdback)
+
+    def finish(self) -> str:
+        """Release whatever is still held back at the end of the stream."""
+        return "" if self.blocked else self._release(len(self.text))
+
+    def _release(self, end: int) -> str:
+        if end <= self.released:
+            return ""
+        chunk = self.text[self.released:end]
+        self.released = end
+        return chunk
+
+
 # Singleton
 _security_service: Optional[SecurityService] = None
 
@@ -453,8 +559,14 @@ def get_security_service(cache_service=None) -> SecurityService:
     """Get singleton SecurityService instance."""
     global _security_service
     if _security_service is None:
+        from app.config import settings
         from app.services.cache_service import get_cache_service
+        from app.services.rate_limiter import get_rate_limiter
         if cache_service is None:
             cache_service = get_cache_service()
-        _security_service = SecurityService(cache_service)
+        _security_service = SecurityService(
+            cache_service,
+            rules_path=settings.SECURITY_RULES_PATH,
+            rate_limiter=get_rate_limiter()
+        )
     return _security_service
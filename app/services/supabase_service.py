@@ -10,6 +10,8 @@ from uuid import UUID
 
 from supabase import Client, create_client
 from app.config import settings
+from app.services.conversation_memory_service import importance_tags
+from app.services.token_budget import count_tokens
 
 logger = structlog.get_logger()
 
@@ -1150,6 +1152,15 @@ class SupabaseService:
             Created message dict
         """
         try:
+            if "content" in message_data:
+                # Stored so conversation memory can budget and recall without re-scanning
+                content = str(message_data["content"])
+                message_data = {
+                    "token_count": count_tokens(content),
+                    "importance_tags": importance_tags(content),
+                    **message_data
+                }
+
             response = self.client.table("coach_messages").insert(message_data).execute()
             logger.info(f"Created message in conversation {message_data.get('conversation_id')}")
             return response.data[0]
@@ -1171,21 +1182,24 @@ class SupabaseService:
         """
         Search for similar embeddings using vector similarity.
 
+        Served by the in-process per-user vector index over
+        coach_message_embeddings (no pgvector round trip per query).
+
         Args:
             user_id: User UUID
             query_embedding: Vector to search for
             limit: Max results
-            source_type: Optional filter by source_type
+            source_type: Optional filter by source_type (only "coach_message" is indexed)
 
         Returns:
             List of embedding dicts with similarity scores
         """
         try:
-            # Note: Supabase Python client doesn't have direct vector search yet
-            # We'll need to use RPC function for this
-            # For now, placeholder implementation
-            logger.warning("Vector search not fully implemented yet")
-            return []
+            if source_type not in (None, "coach_message"):
+                return []
+
+            from app.services.vector_index import get_vector_index_service
+            return get_vector_index_service(self.client).search(str(user_id), query_embedding, limit=limit)
         except Exception as e:
             logger.error(f"Failed to search embeddings: {e}")
             return []
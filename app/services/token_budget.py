@@ -0,0 +1,134 @@
+"""
+Token Budget - tokenizer-backed token counts and context packing.
+
+Used by conversation memory to fill the prompt token budget accurately:
+- count_tokens(): tiktoken (o200k_base) when installed, otherwise a
+  word/symbol heuristic that still accounts for accented text and emoji
+  far better than len(text) // 4
+- Counts are stored per message (coach_messages.token_count) at write time,
+  so assembling context is a sum; message_tokens() only re-measures legacy
+  rows without a stored count
+- pack_recent(): newest contiguous run of messages that fits
+- pack_optimal(): 0/1 knapsack over the remaining budget (most messages,
+  then newest)
+"""
+
+import math
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Sequence
+
+import structlog
+
+logger = structlog.get_logger()
+
+TOKENIZER_ENCODING = "o200k_base"
+MESSAGE_OVERHEAD_TOKENS = 4  # Role + delimiters per chat message
+
+_WORD_OR_SYMBOL = re.compile(r"\w+|[^\w\s]", re.UNICODE)
+
+try:
+    import tiktoken
+
+    _encoding = tiktoken.get_encoding(TOKENIZER_ENCODING)
+except Exception:  # ImportError, or encoding files unavailable offline
+    _encoding = None
+    logger.info("token_budget_heuristic_mode", reason="tiktoken unavailable")
+
+
+def _heuristic_tokens(text: str) -> int:
+    """Approximate BPE count: ~4 chars per word piece; symbols, accents and emoji cost extra."""
+    total = 0
+    for piece in _WORD_OR_SYMBOL.findall(text):
+        if piece.isascii():
+            total += math.ceil(len(piece) / 4)
+        elif len(piece) == 1:
+            # Emoji / non-BMP symbols usually take 2-3 byte-level tokens
+            total += 2 if ord(piece) > 0xFFFF else 1
+        else:
+            # Accented words split into more pieces than plain ASCII words
+            total += math.ceil(len(piece) / 3)
+    return total
+
+
+@lru_cache(maxsize=4096)
+def count_tokens(text: str) -> int:
+    """Number of tokens in text (cached per distinct string)."""
+    if not text:
+        return 0
+    if _encoding is not None:
+        return len(_encoding.encode(text, disallowed_special=()))
+    return _heuristic_tokens(text)
+
+
+def message_tokens(message: Dict[str, Any]) -> int:
+    """Tokens for a stored coach message (stored count, else measured)."""
+    stored = message.get("token_count")
+    if stored is None:
+        stored = count_tokens(str(message.get("content") or ""))
+    return stored + MESSAGE_OVERHEAD_TOKENS
+
+
+def pack_recent(messages_newest_first: Sequence[Dict[str, Any]], budget: int) -> List[Dict[str, Any]]:
+    """
+    Newest contiguous messages that fit the budget (chronological order).
+
+    Keeping the run contiguous preserves the dialogue; the newest message is
+    always included so the model sees the latest turn.
+    """
+    packed: List[Dict[str, Any]] = []
+    used = 0
+    for msg in messages_newest_first:
+        tokens = message_tokens(msg)
+        if packed and used + tokens > budget:
+            break
+        packed.append(msg)
+        used += tokens
+    packed.reverse()
+    return packed
+
+
+def pack_optimal(
+    candidates_newest_first: Sequence[Dict[str, Any]],
+    budget: int,
+    max_candidates: Optional[int] = 64
+) -> List[Dict[str, Any]]:
+    """
+    Optimal subset of candidates within budget (chronological order).
+
+    Maximizes the number of messages kept, then prefers newer ones
+    (0/1 knapsack over token costs, O(n * budget)).
+    """
+    items = list(candidates_newest_first[:max_candidates] if max_candidates else candidates_newest_first)
+    if budget <= 0 or not items:
+        return []
+
+    n = len(items)
+    weights = [message_tokens(msg) for msg in items]
+    # Count dominates; recency (newest = highest) breaks ties
+    values = [(n + 1) * n + (n - i) for i in range(n)]
+
+    best = [0] * (budget + 1)
+    keep = [[False] * (budget + 1) for _ in range(n)]
+    for i in range(n):
+        weight = weights[i]
+        for capacity in range(budget, weight - 1, -1):
+            candidate = best[capacity - weight] + values[i]
+            if candidate > best[capacity]:
+                best[capacity] = candidate
+                keep[i][capacity] = True
+
+    chosen = []
+    capacity = budget
+    for i in range(n - 1, -1, -1):
+        if keep[i][capacity]:
+            chosen.append(i)
+            capacity -= weights[i]
+
+    # Indices are newest-first; return chronological
+    return [items[i] for i in sorted(chosen, reverse=True)]
+
+
+def sum_message_tokens(messages: Sequence[Dict[str, Any]]) -> int:
+    """Sum of message_tokens()."""
+    return sum(message_tokens(msg) for msg in messages)
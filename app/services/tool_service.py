@@ -36,8 +36,13 @@ Week 2.5: Chat-Based Logging (Pulled from Week 5)
 
 import structlog
 from typing import Dict, Any, List, Optional
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from app.services.cache_service import get_cache_service
+from app.services.embedding_service import get_embedder
+from app.services.vector_index import get_vector_index_service
+from app.services.tools.base_tool import ToolPolicy, READ_ONLY_POLICY, MUTATING_POLICY
+from app.services.tools.tool_registry import ToolHandler, ToolRegistry
+from app.services.nutrition_kernel import nutrition_kernel
 from app.models.nutrition import MealItemBase
 
 logger = structlog.get_logger()
@@ -213,7 +218,7 @@ You respond: "Logged. 300g chicken = 93g protein, 495 cal."
     },
     {
         "name": "semantic_search_user_data",
-        "description": "Search user's conversation history semantically using embeddings. Returns EMPTY in MVP - no embeddings yet.",
+        "description": "Search user's past coach conversations semantically (embeddings). Use when the user refers to something discussed earlier that isn't in the recent messages.",
         "input_schema": {
             "type": "object",
             "properties": {
@@ -802,6 +807,74 @@ Helps users remember what templates they have available.""",
 ]
 
 
+# ============================================================================
+# EXECUTION POLICY
+# ============================================================================
+
+MAX_CONCURRENT_TOOLS = 4  # Per request
+
+# Policy for every tool in COACH_TOOLS (build_tool_registry rejects a tool
+# without one, so a new write can't silently run as a parallel read).
+# Mutating tools run one at a time, in the order the model requested them;
+# read-only tools may run concurrently. cache_ttl is the TTL the handler
+# caches its result with.
+TOOL_POLICIES: Dict[str, ToolPolicy] = {
+    "get_user_profile": ToolPolicy(cache_ttl=300),
+    "search_food_database": ToolPolicy(cache_ttl=1800),
+    "get_daily_nutrition_summary": ToolPolicy(cache_ttl=60),
+    "get_recent_meals": READ_ONLY_POLICY,
+    "get_recent_activities": READ_ONLY_POLICY,
+    "get_body_measurements": READ_ONLY_POLICY,
+    "calculate_progress_trend": READ_ONLY_POLICY,
+    "analyze_training_volume": READ_ONLY_POLICY,
+    "semantic_search_user_data": READ_ONLY_POLICY,
+    "calculate_meal_nutrition": READ_ONLY_POLICY,
+    "suggest_meal_adjustments": READ_ONLY_POLICY,
+    "estimate_activity_calories": READ_ONLY_POLICY,
+    "list_quick_meals": READ_ONLY_POLICY,
+    "log_meals_quick": MUTATING_POLICY,
+    "update_meal": MUTATING_POLICY,
+    "delete_meal": MUTATING_POLICY,
+    "update_meal_item": MUTATING_POLICY,
+    "copy_meal": MUTATING_POLICY,
+    "create_quick_meal": MUTATING_POLICY,
+    "delete_quick_meal": MUTATING_POLICY,
+}
+
+
+def build_tool_registry(
+    handlers: Dict[str, ToolHandler],
+    policies: Optional[Dict[str, ToolPolicy]] = None
+) -> ToolRegistry:
+    """
+    Compile COACH_TOOLS into a ToolRegistry.
+
+    Args:
+        handlers: Tool name -> async handler(user_id, params)
+        policies: Tool name -> ToolPolicy (defaults to TOOL_POLICIES)
+
+    Returns:
+        Registry with provider schemas compiled
+
+    Raises:
+        ValueError: If a tool has no policy
+    """
+    policies = TOOL_POLICIES if policies is None else policies
+    missing = [definition["name"] for definition in COACH_TOOLS if definition["name"] not in policies]
+    if missing:
+        raise ValueError(f"No ToolPolicy for tools: {', '.join(missing)}")
+
+    registry = ToolRegistry(supabase_client=None)
+    for definition in COACH_TOOLS:
+        name = definition["name"]
+        registry.register_function(definition, handlers[name], policies[name])
+
+    # Compile provider schemas once
+    registry.get_all_definitions()
+    registry.get_openai_definitions()
+    return registry
+
+
 # ============================================================================
 # TOOL SERVICE
 # ============================================================================
@@ -818,6 +891,7 @@ class ToolService:
     def __init__(self, supabase_client):
         self.supabase = supabase_client
         self.cache = get_cache_service()  # Week 2: Add caching layer
+        self.registry = build_tool_registry(self._tool_handlers())
 
     async def execute_tool(
         self,
@@ -838,51 +912,36 @@ class ToolService:
         """
         logger.info(f"[ToolService] 🛠️ Executing: {tool_name}")
 
-        # Route to appropriate handler
-        if tool_name == "get_user_profile":
-            return await self._get_user_profile(user_id, tool_input)
-        elif tool_name == "search_food_database":
+        # O(1) dispatch (raises ValueError for unknown tools)
+        return await self.registry.execute(tool_name, user_id, tool_input)
+
+    def _tool_handlers(self) -> Dict[str, ToolHandler]:
+        """Tool name -> async handler(user_id, params)."""
+        return {
+            "get_user_profile": self._get_user_profile,
             # Pass user_id for personalized search (quick_meals)
-            tool_input["user_id"] = user_id
-            return await self._search_food_database(tool_input)
-        elif tool_name == "get_daily_nutrition_summary":
-            return await self._get_daily_nutrition_summary(user_id, tool_input)
-        elif tool_name == "get_recent_meals":
-            return await self._get_recent_meals(user_id, tool_input)
-        elif tool_name == "get_recent_activities":
-            return await self._get_recent_activities(user_id, tool_input)
-        elif tool_name == "get_body_measurements":
-            return await self._get_body_measurements(user_id, tool_input)
-        elif tool_name == "calculate_progress_trend":
-            return await self._calculate_progress_trend(user_id, tool_input)
-        elif tool_name == "analyze_training_volume":
-            return await self._analyze_training_volume(user_id, tool_input)
-        elif tool_name == "semantic_search_user_data":
-            return await self._semantic_search_user_data(user_id, tool_input)
-        elif tool_name == "calculate_meal_nutrition":
-            return await self._calculate_meal_nutrition(tool_input)
-        elif tool_name == "suggest_meal_adjustments":
-            return await self._suggest_meal_adjustments(user_id, tool_input)
-        elif tool_name == "estimate_activity_calories":
-            return await self._estimate_activity_calories(user_id, tool_input)
-        elif tool_name == "log_meals_quick":
-            return await self._log_meals_quick(user_id, tool_input)
-        elif tool_name == "update_meal":
-            return await self._update_meal(user_id, tool_input)
-        elif tool_name == "delete_meal":
-            return await self._delete_meal(user_id, tool_input)
-        elif tool_name == "update_meal_item":
-            return await self._update_meal_item(user_id, tool_input)
-        elif tool_name == "copy_meal":
-            return await self._copy_meal(user_id, tool_input)
-        elif tool_name == "create_quick_meal":
-            return await self._create_quick_meal(user_id, tool_input)
-        elif tool_name == "delete_quick_meal":
-            return await self._delete_quick_meal(user_id, tool_input)
-        elif tool_name == "list_quick_meals":
-            return await self._list_quick_meals(user_id, tool_input)
-        else:
-            raise ValueError(f"Unknown tool: {tool_name}")
+            "search_food_database": lambda user_id, params: self._search_food_database(
+                {**params, "user_id": user_id}
+            ),
+            "get_daily_nutrition_summary": self._get_daily_nutrition_summary,
+            "get_recent_meals": self._get_recent_meals,
+            "get_recent_activities": self._get_recent_activities,
+            "get_body_measurements": self._get_body_measurements,
+            "calculate_progress_trend": self._calculate_progress_trend,
+            "analyze_training_volume": self._analyze_training_volume,
+            "semantic_search_user_data": self._semantic_search_user_data,
+            "calculate_meal_nutrition": lambda user_id, params: self._calculate_meal_nutrition(params),
+            "suggest_meal_adjustments": self._suggest_meal_adjustments,
+            "estimate_activity_calories": self._estimate_activity_calories,
+            "log_meals_quick": self._log_meals_quick,
+            "update_meal": self._update_meal,
+            "delete_meal": self._delete_meal,
+            "update_meal_item": self._update_meal_item,
+            "copy_meal": self._copy_meal,
+            "create_quick_meal": self._create_quick_meal,
+            "delete_quick_meal": self._delete_quick_meal,
+            "list_quick_meals": self._list_quick_meals,
+        }
 
     # ========================================================================
     # TOOL IMPLEMENTATIONS
@@ -927,7 +986,7 @@ class ToolService:
             }
 
             # Cache for 5 minutes (300 seconds)
-            self.cache.set(cache_key, formatted_profile, ttl=300)
+            self.cache.set(cache_key, formatted_profile, ttl=TOOL_POLICIES["get_user_profile"].cache_ttl)
             logger.debug(f"[ToolService] 💾 Cached: user_profile (5min TTL)")
 
             return formatted_profile
@@ -1081,7 +1140,7 @@ class ToolService:
 
             # Cache results for 30 minutes (1800 seconds)
             cache_key = f"food_search:{user_id or 'public'}:{query}:{limit}"
-            self.cache.set(cache_key, results, ttl=1800)
+            self.cache.set(cache_key, results, ttl=TOOL_POLICIES["search_food_database"].cache_ttl)
             logger.debug(f"[ToolService] 💾 Cached: food_search({query}) - {len(results)} results (30min TTL)")
 
             return results
@@ -1255,7 +1314,7 @@ class ToolService:
 
             # Cache for 1 minute (60 seconds) - nutrition changes frequently
             cache_key = f"daily_nutrition:{user_id}:{target_date.isoformat()}"
-            self.cache.set(cache_key, response, ttl=60)
+            self.cache.set(cache_key, response, ttl=TOOL_POLICIES["get_daily_nutrition_summary"].cache_ttl)
             logger.debug(f"[ToolService] 💾 Cached: daily_nutrition_summary({target_date}) (1min TTL)")
 
             return response
@@ -1564,57 +1623,104 @@ class ToolService:
             return {"error": str(e)}
 
     async def _semantic_search_user_data(self, user_id: str, params: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Semantic search. MVP: Returns empty."""
-        # TODO: Implement when embeddings exist
-        return []
+        """Semantic search over past coach messages (in-process per-user vector index)."""
+        try:
+            query = params["query"]
+            limit = max(1, min(int(params.get("limit", 5)), 20))
+
+            vectors, _ = get_embedder().embed([query])
+            matches = get_vector_index_service(self.supabase).search(user_id, vectors[0], limit=limit)
+
+            return [
+                {
+                    "role": match["role"],
+                    "content": match["content_text"],
+                    "date": (match["created_at"] or "")[:10],
+                    "similarity": match["similarity"]
+                }
+                for match in matches
+            ]
+        except Exception as e:
+            logger.error(f"[ToolService] Semantic search failed: {e}")
+            return []
 
     async def _calculate_meal_nutrition(self, params: Dict[str, Any]) -> Dict[str, Any]:
-        """Calculate nutrition for a meal."""
+        """Calculate nutrition for a meal (one batched food lookup, one vectorized pass)."""
         try:
             foods = params["foods"]
-            total_calories = 0
-            total_protein = 0
-            total_carbs = 0
-            total_fats = 0
+            matches = self._match_public_foods_by_name([f["name"] for f in foods])
 
+            matched_foods = []
+            grams = []
             for food_item in foods:
-                food_name = food_item["name"]
-                quantity = food_item["quantity"]
-                unit = food_item.get("unit", "g")
-
-                # Search for food in database
-                result = self.supabase.table("foods")\
-                    .select("calories_per_100g, protein_g_per_100g, carbs_g_per_100g, fat_g_per_100g")\
-                    .ilike("name", f"%{food_name}%")\
-                    .eq("is_public", True)\
-                    .limit(1)\
-                    .execute()
-
-                if not result.data:
+                food = matches.get(food_item["name"].lower())
+                if not food:
                     continue
 
-                food = result.data[0]
+                quantity = food_item["quantity"]
+                unit = food_item.get("unit", "g")
 
                 # Convert to grams (simplified - assumes g)
-                grams = quantity if unit == "g" else quantity * 100
+                grams.append(quantity if unit == "g" else quantity * 100)
+                matched_foods.append(food)
 
-                # Calculate nutrition
-                multiplier = grams / 100
-                total_calories += food["calories_per_100g"] * multiplier
-                total_protein += food["protein_g_per_100g"] * multiplier
-                total_carbs += food["carbs_g_per_100g"] * multiplier
-                total_fats += food["fat_g_per_100g"] * multiplier
+            _, totals = nutrition_kernel.calculate_items(matched_foods, grams)
 
             return {
-                "total_calories": round(total_calories),
-                "total_protein_g": round(total_protein, 1),
-                "total_carbs_g": round(total_carbs, 1),
-                "total_fats_g": round(total_fats, 1)
+                "total_calories": round(totals["calories"]),
+                "total_protein_g": round(totals["protein_g"], 1),
+                "total_carbs_g": round(totals["carbs_g"], 1),
+                "total_fats_g": round(totals["fat_g"], 1)
             }
         except Exception as e:
             logger.error(f"[ToolService] calculate_meal_nutrition failed: {e}")
             return {"error": str(e)}
 
+    def _match_public_foods_by_name(self, names: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Resolve food names to public foods rows (per-100g macros).
+
+        Names are cached (30min TTL, like food searches); all misses are
+        resolved with ONE OR-of-ILIKE query instead of one query per name.
+
+        Returns:
+            Dict of lowercased name -> foods row (unmatched names are absent)
+        """
+        matches: Dict[str, Dict[str, Any]] = {}
+        missing = []
+        for name in dict.fromkeys(n.lower() for n in names):
+            cached = self.cache.get(f"meal_calc_food:{name}")
+            if cached is not None:
+                matches[name] = cached
+            else:
+                missing.append(name)
+
+        if not missing:
+            return matches
+
+        def quoted(value: str) -> str:
+            # PostgREST: quote values so commas/parentheses in food names are literal
+            escaped = value.replace("\\", "\\\\").replace('"', '\\"')
+            return f'"%{escaped}%"'
+
+        result = self.supabase.table("foods")\
+            .select("name, calories_per_100g, protein_g_per_100g, carbs_g_per_100g, fat_g_per_100g")\
+            .or_(",".join(f"name.ilike.{quoted(name)}" for name in missing))\
+            .eq("is_public", True)\
+            .limit(20 * len(missing))\
+            .execute()
+
+        for name in missing:
+            food = next(
+                (row for row in result.data or [] if name in (row.get("name") or "").lower()),
+                None
+            )
+            if food:
+                matches[name] = food
+                self.cache.set(f"meal_calc_food:{name}", food, ttl=TOOL_POLICIES["search_food_database"].cache_ttl)
+
+        return matches
+
     async def _suggest_meal_adjustments(self, user_id: str, params: Dict[str, Any]) -> Dict[str, Any]:
         """Suggest meal adjustments to hit targets."""
         try:
@@ -1923,6 +2029,9 @@ class ToolService:
 
                     custom_food_id = food_result.data[0]["id"]
 
+                    # Seed food cache so create_meal doesn't re-fetch what we just inserted
+                    nutrition_kernel.remember_foods(food_result.data)
+
                     # 🎯 Smart serving detection for better UX
                     serving_info = parse_serving_info(food_name)
 
@@ -1954,6 +2063,7 @@ class ToolService:
                             display_label = None
                             quantity_val = grams  # Fall back to gram-based
                         else:
+                            nutrition_kernel.remember_foods(food_result.data, serving_result.data)
                             serving_id = serving_result.data[0]["id"]
                             display_unit = serving_info['unit']
                             display_label = serving_info['label']
@@ -5,6 +5,8 @@ Provides modular, testable tools for AI coaching.
 
 Architecture:
 - BaseTool: Abstract base class for all tools
+- ToolPolicy: Per-tool execution policy (read-only/mutating, cache TTL,
+  timeout, concurrency class)
 - ToolRegistry: Central tool management and execution
 - Individual tool classes: One file per tool
 
@@ -21,8 +23,15 @@ Usage:
     result = await registry.execute("get_user_profile", user_id, params)
 """
 
-from app.services.tools.base_tool import BaseTool
-from app.services.tools.tool_registry import ToolRegistry
+from app.services.tools.base_tool import (
+    BaseTool,
+    ToolPolicy,
+    READ_ONLY_POLICY,
+    MUTATING_POLICY,
+    CONCURRENCY_PARALLEL,
+    CONCURRENCY_SERIAL,
+)
+from app.services.tools.tool_registry import FunctionTool, ToolRegistry
 from app.services.tools.user_profile_tool import UserProfileTool
 from app.services.tools.daily_nutrition_summary_tool import DailyNutritionSummaryTool
 from app.services.tools.recent_meals_tool import RecentMealsTool
@@ -38,6 +47,12 @@ from app.services.tools.food_search_tool import FoodSearchTool
 
 __all__ = [
     "BaseTool",
+    "ToolPolicy",
+    "READ_ONLY_POLICY",
+    "MUTATING_POLICY",
+    "CONCURRENCY_PARALLEL",
+    "CONCURRENCY_SERIAL",
+    "FunctionTool",
     "ToolRegistry",
     "UserProfileTool",
     "DailyNutritionSummaryTool",
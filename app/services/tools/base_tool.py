@@ -15,9 +15,39 @@ Benefits:
 from abc import ABC, abstractmethod
 from typing import Dict, Any, Optional
 import structlog
+from pydantic import BaseModel, ConfigDict
 
 logger = structlog.get_logger()
 
+# Concurrency classes
+CONCURRENCY_PARALLEL = "parallel"  # May run alongside other parallel tools
+CONCURRENCY_SERIAL = "serial"  # Runs alone, in request order (barrier)
+
+
+class ToolPolicy(BaseModel):
+    """
+    Execution policy declared by a tool.
+
+    Attributes:
+        mutating: Tool writes user data
+        cache_ttl: Seconds the tool caches its result for (0 = not cached)
+        timeout: Seconds before the call is abandoned (None = never)
+        concurrency: CONCURRENCY_PARALLEL or CONCURRENCY_SERIAL
+    """
+
+    model_config = ConfigDict(frozen=True)
+
+    mutating: bool = False
+    cache_ttl: int = 0
+    timeout: Optional[float] = 10.0
+    concurrency: str = CONCURRENCY_PARALLEL
+
+
+READ_ONLY_POLICY = ToolPolicy()
+
+# Writes are never abandoned midway and never overlap other calls
+MUTATING_POLICY = ToolPolicy(mutating=True, timeout=None, concurrency=CONCURRENCY_SERIAL)
+
 
 class BaseTool(ABC):
     """
@@ -26,8 +56,12 @@ class BaseTool(ABC):
     Each tool must implement:
     - get_definition(): Tool schema for LLM
     - execute(): Tool execution logic
+
+    Tools that write data override policy (see ToolPolicy).
     """
 
+    policy: ToolPolicy = READ_ONLY_POLICY
+
     def __init__(self, supabase_client, cache_service=None):
         """
         Initialize tool with dependencies.
@@ -8,12 +8,14 @@ Cached with 1min TTL (nutrition changes frequently throughout the day).
 
 from typing import Dict, Any
 from datetime import date, datetime, time
-from app.services.tools.base_tool import BaseTool
+from app.services.tools.base_tool import BaseTool, ToolPolicy
 
 
 class DailyNutritionSummaryTool(BaseTool):
     """Get daily nutrition totals with goal progress tracking."""
 
+    policy = ToolPolicy(cache_ttl=60)
+
     def get_definition(self) -> Dict[str, Any]:
         """Return tool definition for LLM."""
         return {
@@ -113,8 +115,8 @@ class DailyNutritionSummaryTool(BaseTool):
             }
 
             # Cache for 1 minute
-            await self.set_in_cache(cache_key, response, ttl=60)
-            self.logger.debug("nutrition_summary_cached", cache_key=cache_key, ttl=60)
+            await self.set_in_cache(cache_key, response, ttl=self.policy.cache_ttl)
+            self.logger.debug("nutrition_summary_cached", cache_key=cache_key, ttl=self.policy.cache_ttl)
 
             return response
 
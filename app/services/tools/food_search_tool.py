@@ -24,7 +24,7 @@ Usage:
 """
 
 from typing import Dict, Any, List, Optional
-from app.services.tools.base_tool import BaseTool
+from app.services.tools.base_tool import BaseTool, ToolPolicy
 import structlog
 
 logger = structlog.get_logger()
@@ -33,6 +33,8 @@ logger = structlog.get_logger()
 class FoodSearchTool(BaseTool):
     """Smart food database search with relevance ranking."""
 
+    policy = ToolPolicy(cache_ttl=1800)
+
     def get_definition(self) -> Dict[str, Any]:
         """
         Get tool definition for LLM.
@@ -210,7 +212,7 @@ class FoodSearchTool(BaseTool):
                         })
 
                         if len(results) >= limit:
-                            await self.cache_result(cache_key, results, ttl=1800)
+                            await self.cache_result(cache_key, results, ttl=self.policy.cache_ttl)
                             return results
 
                 except Exception as e:
@@ -289,7 +291,7 @@ class FoodSearchTool(BaseTool):
                 results.append(result_item)
 
             # Cache results for 30 minutes
-            await self.cache_result(cache_key, results, ttl=1800)
+            await self.cache_result(cache_key, results, ttl=self.policy.cache_ttl)
 
             logger.info(
                 "food_search_completed",
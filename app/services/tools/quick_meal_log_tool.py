@@ -2,6 +2,8 @@
 Quick Meal Log Tool
 
 Logs meals using AI nutrition estimates (no database lookups).
+Foods and servings for a meal are created with one insert each, and the new
+rows seed nutrition_kernel's food cache so create_meal doesn't re-fetch them.
 
 This is a complex tool that creates meals on-the-fly from AI-estimated nutrition data.
 It's designed for conversational meal logging where the AI provides nutrition estimates.
@@ -40,11 +42,11 @@ Note: This tool is complex and tightly coupled with nutrition_service.
 from typing import Dict, Any, List, Optional
 from decimal import Decimal
 from datetime import datetime
-from uuid import UUID
+from uuid import UUID, uuid4
 import re
 import structlog
 
-from app.services.tools.base_tool import BaseTool
+from app.services.tools.base_tool import BaseTool, MUTATING_POLICY
 
 logger = structlog.get_logger()
 
@@ -52,6 +54,8 @@ logger = structlog.get_logger()
 class QuickMealLogTool(BaseTool):
     """Log meals quickly using AI nutrition estimates."""
 
+    policy = MUTATING_POLICY
+
     def get_definition(self) -> Dict[str, Any]:
         """
         Get tool definition for LLM.
@@ -230,7 +234,8 @@ class QuickMealLogTool(BaseTool):
         try:
             # Import here to avoid circular dependencies
             from app.services.nutrition_service import nutrition_service
-            from app.models.meal import MealItemBase
+            from app.services.nutrition_kernel import nutrition_kernel
+            from app.models.nutrition import MealItemBase
 
             # Validate params
             if "meals" not in params:
@@ -276,8 +281,8 @@ class QuickMealLogTool(BaseTool):
                 if not isinstance(items_data, list) or len(items_data) == 0:
                     return {"success": False, "error": f"'{meal_type}' meal must have at least one item"}
 
-                # Process each food item
-                meal_items = []
+                # Validate all food items first (no database writes yet)
+                parsed_items = []
 
                 for idx, item in enumerate(items_data):
                     # Validate required fields
@@ -302,75 +307,96 @@ class QuickMealLogTool(BaseTool):
                     if calories < 0 or protein_g < 0 or carbs_g < 0 or fat_g < 0:
                         return {"success": False, "error": f"Nutrition values must be >= 0 for {food_name}"}
 
-                    # Calculate per-100g values
-                    per_100g_calories = float((Decimal(str(calories)) / grams) * 100)
-                    per_100g_protein = float((protein_g / grams) * 100)
-                    per_100g_carbs = float((carbs_g / grams) * 100)
-                    per_100g_fat = float((fat_g / grams) * 100)
+                    parsed_items.append({
+                        "food_name": food_name,
+                        "grams": grams,
+                        "calories": calories,
+                        "protein_g": protein_g,
+                        "carbs_g": carbs_g,
+                        "fat_g": fat_g,
+                    })
+
+                # Calculate per-100g values for all items in one pass
+                per_100g_rows = nutrition_kernel.per_100g_from_totals(
+                    parsed_items, [p["grams"] for p in parsed_items]
+                )
 
-                    # Create custom food entry
-                    food_result = self.supabase.table("foods").insert({
+                # Create all custom food entries with ONE insert. IDs are
+                # generated here so returned rows are matched by id, not by
+                # position (PostgREST doesn't promise insert order)
+                food_ids = [str(uuid4()) for _ in parsed_items]
+                food_result = self.supabase.table("foods").insert([
+                    {
+                        "id": food_id,
                         "created_by": user_id,
-                        "name": food_name,
+                        "name": parsed["food_name"],
                         "composition_type": "simple",
-                        "calories_per_100g": round(per_100g_calories, 1),
-                        "protein_g_per_100g": round(per_100g_protein, 1),
-                        "carbs_g_per_100g": round(per_100g_carbs, 1),
-                        "fat_g_per_100g": round(per_100g_fat, 1),
+                        **{column: round(value, 1) for column, value in per_100g.items()},
                         "is_public": False,
                         "is_ai_estimated": True
-                    }).execute()
-
-                    if not food_result.data:
-                        return {"success": False, "error": f"Failed to create custom food: {food_name}"}
-
-                    custom_food_id = food_result.data[0]["id"]
-
-                    # Detect serving units for better UX
-                    serving_info = self._parse_serving_info(food_name)
-                    serving_id = None
-                    display_unit = "g"
-                    display_label = None
-                    quantity_val = grams
-
-                    if serving_info:
-                        # Create food_serving entry
-                        try:
-                            serving_result = self.supabase.table("food_servings").insert({
-                                "food_id": custom_food_id,
-                                "serving_size": Decimal(str(serving_info['quantity'])),
-                                "serving_unit": serving_info['unit'],
-                                "serving_label": serving_info['label'],
-                                "grams_per_serving": float(grams / serving_info['quantity']),
-                                "is_default": True,
-                                "display_order": 0
-                            }).execute()
-
-                            if serving_result.data:
-                                serving_id = serving_result.data[0]["id"]
-                                display_unit = serving_info['unit']
-                                display_label = serving_info['label']
-                                quantity_val = Decimal(str(serving_info['quantity']))
-                        except Exception as e:
-                            logger.warning(
-                                "serving_creation_failed",
-                                user_id=user_id,
-                                food_name=food_name,
-                                error=str(e)
-                            )
-
-                    # Create meal item
+                    }
+                    for food_id, parsed, per_100g in zip(food_ids, parsed_items, per_100g_rows)
+                ]).execute()
+
+                foods_by_id = {str(row["id"]): row for row in food_result.data or []}
+                if any(food_id not in foods_by_id for food_id in food_ids):
+                    names = ", ".join(p["food_name"] for p in parsed_items)
+                    return {"success": False, "error": f"Failed to create custom food: {names}"}
+                food_rows = [foods_by_id[food_id] for food_id in food_ids]
+
+                # Detect serving units for better UX (all servings in ONE insert)
+                serving_infos = [self._parse_serving_info(p["food_name"]) for p in parsed_items]
+                servings_by_food: Dict[str, Dict[str, Any]] = {}
+                serving_rows = [
+                    {
+                        "food_id": food_row["id"],
+                        "serving_size": float(serving_info['quantity']),
+                        "serving_unit": serving_info['unit'],
+                        "serving_label": serving_info['label'],
+                        "grams_per_serving": float(parsed["grams"] / serving_info['quantity']),
+                        "is_default": True,
+                        "display_order": 0
+                    }
+                    for parsed, food_row, serving_info in zip(parsed_items, food_rows, serving_infos)
+                    if serving_info
+                ]
+
+                if serving_rows:
+                    try:
+                        serving_result = self.supabase.table("food_servings").insert(serving_rows).execute()
+                        servings_by_food = {
+                            str(row["food_id"]): row for row in serving_result.data or []
+                        }
+                    except Exception as e:
+                        logger.warning(
+                            "serving_creation_failed",
+                            user_id=user_id,
+                            food_names=[p["food_name"] for p in parsed_items],
+                            error=str(e)
+                        )
+
+                # Seed food cache so create_meal doesn't re-fetch what we just inserted
+                nutrition_kernel.remember_foods(food_rows, servings_by_food.values())
+
+                # Create meal items
+                meal_items = []
+
+                for idx, (parsed, food_row, serving_info) in enumerate(
+                    zip(parsed_items, food_rows, serving_infos)
+                ):
+                    serving = servings_by_food.get(str(food_row["id"]))
+
                     meal_items.append(MealItemBase(
-                        food_id=custom_food_id,
-                        quantity=quantity_val,
-                        serving_id=serving_id,
-                        grams=grams,
-                        calories=calories,
-                        protein_g=protein_g,
-                        carbs_g=carbs_g,
-                        fat_g=fat_g,
-                        display_unit=display_unit,
-                        display_label=display_label,
+                        food_id=food_row["id"],
+                        quantity=Decimal(str(serving_info['quantity'])) if serving else parsed["grams"],
+                        serving_id=serving["id"] if serving else None,
+                        grams=parsed["grams"],
+                        calories=parsed["calories"],
+                        protein_g=parsed["protein_g"],
+                        carbs_g=parsed["carbs_g"],
+                        fat_g=parsed["fat_g"],
+                        display_unit=serving_info['unit'] if serving else "g",
+                        display_label=serving_info['label'] if serving else None,
                         display_order=idx
                     ))
 
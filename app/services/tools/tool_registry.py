@@ -8,19 +8,52 @@ Benefits:
 - Easy to add/remove tools
 - Automatic tool definition generation
 - Type-safe tool execution
+- Per-tool execution policy (ToolPolicy) for schedulers and caches
+
+Provider schemas (Claude and OpenAI format) are compiled once, on first use
+after the last registration, not per request.
 
 Usage:
     registry = ToolRegistry(supabase_client, cache_service)
     tools = registry.get_all_definitions()  # For LLM
-    result = await registry.execute("get_user_profile", params, user_id)
+    result = await registry.execute("get_user_profile", user_id, params)
 """
 
-from typing import Dict, Any, List, Optional
+import time
+from typing import Dict, Any, Awaitable, Callable, List, Optional
 import structlog
-from app.services.tools.base_tool import BaseTool
+from app.services.tools.base_tool import BaseTool, ToolPolicy, READ_ONLY_POLICY, MUTATING_POLICY
 
 logger = structlog.get_logger()
 
+ToolHandler = Callable[[str, Dict[str, Any]], Awaitable[Any]]
+
+
+class FunctionTool(BaseTool):
+    """
+    Tool backed by a plain async handler(user_id, params).
+
+    Lets services that implement tools as methods (e.g. ToolService)
+    register them without a BaseTool subclass per tool.
+    """
+
+    def __init__(
+        self,
+        definition: Dict[str, Any],
+        handler: ToolHandler,
+        policy: ToolPolicy = READ_ONLY_POLICY
+    ):
+        super().__init__(supabase_client=None)
+        self._definition = definition
+        self._handler = handler
+        self.policy = policy
+
+    def get_definition(self) -> Dict[str, Any]:
+        return self._definition
+
+    async def execute(self, user_id: str, params: Dict[str, Any]) -> Any:
+        return await self._handler(user_id, params)
+
 
 class ToolRegistry:
     """
@@ -40,14 +73,18 @@ class ToolRegistry:
         self.supabase = supabase_client
         self.cache = cache_service
         self._tools: Dict[str, BaseTool] = {}
+        self._policies: Dict[str, ToolPolicy] = {}
+        self._definitions: Optional[List[Dict[str, Any]]] = None
+        self._openai_definitions: Optional[List[Dict[str, Any]]] = None
         self.logger = logger
 
-    def register(self, tool: BaseTool):
+    def register(self, tool: BaseTool, policy: Optional[ToolPolicy] = None):
         """
         Register a tool in the registry.
 
         Args:
             tool: Tool instance to register
+            policy: Execution policy (defaults to the tool's own policy)
 
         Raises:
             ValueError: If tool with same name already registered
@@ -57,8 +94,27 @@ class ToolRegistry:
             raise ValueError(f"Tool '{tool_name}' is already registered")
 
         self._tools[tool_name] = tool
+        self._policies[tool_name] = policy or tool.policy
+        self._definitions = None
+        self._openai_definitions = None
         self.logger.debug("tool_registered", tool_name=tool_name)
 
+    def register_function(
+        self,
+        definition: Dict[str, Any],
+        handler: ToolHandler,
+        policy: ToolPolicy = READ_ONLY_POLICY
+    ):
+        """
+        Register an async handler(user_id, params) as a tool.
+
+        Args:
+            definition: Tool definition (Claude format)
+            handler: Coroutine function executing the tool
+            policy: Execution policy
+        """
+        self.register(FunctionTool(definition, handler, policy))
+
     def register_all(self, tools: List[BaseTool]):
         """
         Register multiple tools at once.
@@ -81,14 +137,46 @@ class ToolRegistry:
         """
         return self._tools.get(tool_name)
 
+    def get_policy(self, tool_name: str) -> ToolPolicy:
+        """
+        Get a tool's execution policy.
+
+        Unknown tools get the mutating policy: a scheduler must never run an
+        unclassified tool concurrently or memoize it.
+        """
+        return self._policies.get(tool_name, MUTATING_POLICY)
+
     def get_all_definitions(self) -> List[Dict[str, Any]]:
         """
         Get all tool definitions for LLM.
 
         Returns:
-            List of tool definitions in Claude/OpenAI format
+            List of tool definitions in Claude format (compiled once)
+        """
+        if self._definitions is None:
+            self._definitions = [tool.get_definition() for tool in self._tools.values()]
+        return self._definitions
+
+    def get_openai_definitions(self) -> List[Dict[str, Any]]:
+        """
+        Get all tool definitions in OpenAI function-calling format.
+
+        Returns:
+            List of {"type": "function", "function": {...}} (compiled once)
         """
-        return [tool.get_definition() for tool in self._tools.values()]
+        if self._openai_definitions is None:
+            self._openai_definitions = [
+                {
+                    "type": "function",
+                    "function": {
+                        "name": definition["name"],
+                        "description": definition["description"],
+                        "parameters": definition["input_schema"]
+                    }
+                }
+                for definition in self.get_all_definitions()
+            ]
+        return self._openai_definitions
 
     def get_all_tool_names(self) -> List[str]:
         """
@@ -126,9 +214,15 @@ class ToolRegistry:
 
         self.logger.info("tool_executing", tool_name=tool_name, user_id=user_id)
 
+        started = time.perf_counter()
         try:
             result = await tool.execute(user_id, params)
-            self.logger.info("tool_executed", tool_name=tool_name, user_id=user_id)
+            self.logger.info(
+                "tool_executed",
+                tool_name=tool_name,
+                user_id=user_id,
+                duration_ms=round((time.perf_counter() - started) * 1000, 1)
+            )
             return result
         except Exception as e:
             self.logger.error(
@@ -136,6 +230,7 @@ class ToolRegistry:
                 tool_name=tool_name,
                 user_id=user_id,
                 error=str(e),
+                duration_ms=round((time.perf_counter() - started) * 1000, 1),
                 exc_info=True
             )
             raise
@@ -0,0 +1,61 @@
+"""
+Tool Runner - dedicated worker threads for read-only tool handlers
+
+Tool handlers are async but block on the sync Supabase client, so the
+coach runs parallel tools off the event loop. asyncio.to_thread +
+asyncio.run per call had two problems:
+
+- A timed-out tool keeps its thread (threads can't be cancelled), and
+  enough stuck tools exhausted the loop's default executor, which
+  everything else (write-behind, fast path) shares.
+- Each asyncio.run made and closed a new event loop, so the per-loop
+  pooled HTTP transports (libs/llm_clients) were built and leaked per call.
+
+ToolThreadPool is a bounded executor used only by tools, and each of its
+threads keeps one event loop for its lifetime.
+
+Usage:
+    result = await asyncio.wrap_future(
+        get_tool_thread_pool().submit(tool_service.execute_tool, tool_name=..., ...)
+    )
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Optional
+
+TOOL_WORKER_THREADS = 32  # Shared by all requests; a stuck tool holds its thread until it returns
+
+
+class ToolThreadPool:
+    """Bounded worker threads, each running coroutines on its own long-lived loop."""
+
+    def __init__(self, max_workers: int = TOOL_WORKER_THREADS):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="coach-tool")
+        self._local = threading.local()
+
+    def submit(self, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Future:
+        """Run fn(*args, **kwargs) (a coroutine function) in a worker thread."""
+        return self._executor.submit(self._run, fn, args, kwargs)
+
+    def shutdown(self, wait: bool = True) -> None:
+        self._executor.shutdown(wait=wait)
+
+    def _run(self, fn: Callable[..., Awaitable[Any]], args: tuple, kwargs: dict) -> Any:
+        loop = getattr(self._local, "loop", None)
+        if loop is None:
+            loop = self._local.loop = asyncio.new_event_loop()
+        return loop.run_until_complete(fn(*args, **kwargs))
+
+
+# Singleton
+_tool_thread_pool: Optional[ToolThreadPool] = None
+
+
+def get_tool_thread_pool() -> ToolThreadPool:
+    """Get singleton ToolThreadPool instance."""
+    global _tool_thread_pool
+    if _tool_thread_pool is None:
+        _tool_thread_pool = ToolThreadPool()
+    return _tool_thread_pool
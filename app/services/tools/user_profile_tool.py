@@ -8,12 +8,14 @@ Cached with 5min TTL (profiles change infrequently).
 """
 
 from typing import Dict, Any
-from app.services.tools.base_tool import BaseTool
+from app.services.tools.base_tool import BaseTool, ToolPolicy
 
 
 class UserProfileTool(BaseTool):
     """Get user's profile data for personalized coaching."""
 
+    policy = ToolPolicy(cache_ttl=300)
+
     def get_definition(self) -> Dict[str, Any]:
         """Return tool definition for LLM."""
         return {
@@ -79,8 +81,8 @@ class UserProfileTool(BaseTool):
             }
 
             # Cache for 5 minutes
-            await self.set_in_cache(cache_key, formatted_profile, ttl=300)
-            self.logger.debug("profile_cached", cache_key=cache_key, ttl=300)
+            await self.set_in_cache(cache_key, formatted_profile, ttl=self.policy.cache_ttl)
+            self.logger.debug("profile_cached", cache_key=cache_key, ttl=self.policy.cache_ttl)
 
             return formatted_profile
 
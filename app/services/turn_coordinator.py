@@ -0,0 +1,314 @@
+"""
+Turn Coordinator - one coach turn per submission, one at a time per conversation
+
+A double-tapped send or a client retry after a timeout used to start a
+second agentic loop: duplicate LLM spend, tool calls and meal logs.
+
+- Coalescing: each submission has an idempotency key (the Idempotency-Key
+  header, else a hash of user, conversation and message). A duplicate
+  attaches to the turn already running and gets its result; a duplicate
+  arriving shortly after the turn finished gets the stored result.
+- Serialization: turns in the same conversation run one after another
+  (different messages sent in quick succession see each other's replies).
+
+Locally this uses asyncio tasks and locks. With COACH_LOCK_REDIS_URL set,
+the same holds across workers and instances: a Redis claim per key (a
+duplicate on another instance polls for the stored result) and a Redis
+lock per conversation. Redis errors degrade to local-only coordination.
+
+Turns are shielded from request cancellation, so a disconnecting client
+doesn't cancel the turn other submissions are waiting on.
+"""
+
+import asyncio
+import hashlib
+import json
+import time
+import uuid
+import structlog
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Optional, Tuple
+
+logger = structlog.get_logger()
+
+KEY_PREFIX = "coach:turn:"
+
+# How long a finished turn's result is replayed to duplicates (seconds)
+EXPLICIT_KEY_TTL = 600  # Client-sent Idempotency-Key: covers retries after timeouts
+DERIVED_KEY_TTL = 15  # Content hash: only double taps (saying "ok" twice later is a new turn)
+
+# Upper bound on a turn; Redis claims and locks expire after this (seconds)
+TURN_TIMEOUT_SECONDS = 120
+
+# How long a turn waits for the conversation lock before giving up (seconds)
+LOCK_WAIT_SECONDS = 60
+
+REDIS_POLL_SECONDS = 0.25
+REDIS_RETRY_SECONDS = 30.0
+
+# Deletes a Redis lock only if this instance still holds it
+RELEASE_SCRIPT = """
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+  return redis.call('DEL', KEYS[1])
+end
+return 0
+"""
+
+
+class ConversationBusyError(Exception):
+    """The conversation's previous turn didn't finish within LOCK_WAIT_SECONDS."""
+
+
+def turn_key(
+    user_id: str,
+    endpoint: str,
+    conversation_id: Optional[str],
+    message: str,
+    idempotency_key: Optional[str] = None
+) -> Tuple[str, int]:
+    """
+    Idempotency key for a submission and how long its result is replayed.
+
+    Args:
+        endpoint: Route the result belongs to ("message", "stream"); each
+            stores a different result shape, so keys never cross routes
+
+    Returns:
+        (key, replay TTL in seconds)
+    """
+    if idempotency_key:
+        return f"{user_id}:{endpoint}:key:{idempotency_key}", EXPLICIT_KEY_TTL
+    digest = hashlib.sha256(f"{conversation_id or ''}\x00{message}".encode()).hexdigest()[:32]
+    return f"{user_id}:{endpoint}:msg:{digest}", DERIVED_KEY_TTL
+
+
+class TurnCoordinator:
+    """Coalesces duplicate submissions and serializes turns per conversation."""
+
+    def __init__(self, redis_url: Optional[str] = None):
+        """
+        Args:
+            redis_url: redis://... to coordinate across workers and instances;
+                None = this process only
+        """
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._results: Dict[str, Tuple[float, Any]] = {}  # key -> (expires_at, result)
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._lock_users: Dict[str, int] = {}
+        self._instance = uuid.uuid4().hex
+        self._redis = None
+        self._release = None
+        self._redis_down_until = 0.0
+        if redis_url:
+            import redis.asyncio
+
+            self._redis = redis.asyncio.Redis.from_url(
+                redis_url, socket_timeout=0.5, socket_connect_timeout=0.5
+            )
+            self._release = self._redis.register_script(RELEASE_SCRIPT)
+
+    async def run(
+        self,
+        key: str,
+        conversation_key: str,
+        compute: Callable[[], Awaitable[Any]],
+        replay_ttl: int,
+        is_final: Callable[[Any], bool] = lambda result: True
+    ) -> Any:
+        """
+        Run compute() once per key, one at a time per conversation_key.
+
+        Args:
+            key: Idempotency key (see turn_key)
+            conversation_key: Serialization key (conversation ID)
+            compute: The turn; started only if no duplicate is running or done
+            replay_ttl: Seconds the result is replayed to later duplicates
+            is_final: Whether a result is stored for replay (failed turns
+                aren't, so a retry runs again)
+
+        Raises:
+            ConversationBusyError: If the conversation stays locked
+        """
+        stored = await self._stored_result(key)
+        if stored is not None:
+            logger.info("coach_turn_replayed", key=key[:16])
+            return stored
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run_once(key, conversation_key, compute, replay_ttl, is_final))
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            logger.info("coach_turn_coalesced", key=key[:16])
+
+        return await asyncio.shield(task)
+
+    async def _run_once(
+        self,
+        key: str,
+        conversation_key: str,
+        compute: Callable[[], Awaitable[Any]],
+        replay_ttl: int,
+        is_final: Callable[[Any], bool]
+    ) -> Any:
+        if not await self._claim(key):
+            # Running on another instance: take its result when it lands
+            result = await self._wait_for_remote(key)
+            if result is not None:
+                logger.info("coach_turn_coalesced_remote", key=key[:16])
+                return result
+
+        try:
+            async with self.conversation_lock(conversation_key):
+                result = await compute()
+        finally:
+            await self._unclaim(key)
+
+        if is_final(result):
+            await self._store_result(key, result, replay_ttl)
+        return result
+
+    @asynccontextmanager
+    async def conversation_lock(self, conversation_key: str) -> AsyncIterator[None]:
+        """Hold the conversation's lock (local, plus Redis when configured)."""
+        lock = self._locks.setdefault(conversation_key, asyncio.Lock())
+        self._lock_users[conversation_key] = self._lock_users.get(conversation_key, 0) + 1
+        try:
+            try:
+                await asyncio.wait_for(lock.acquire(), timeout=LOCK_WAIT_SECONDS)
+            except asyncio.TimeoutError:
+                raise ConversationBusyError(conversation_key)
+            try:
+                token = await self._acquire_redis_lock(conversation_key)
+                try:
+                    yield
+                finally:
+                    await self._release_redis_lock(conversation_key, token)
+            finally:
+                lock.release()
+        finally:
+            self._lock_users[conversation_key] -= 1
+            if not self._lock_users[conversation_key]:
+                del self._lock_users[conversation_key]
+                del self._locks[conversation_key]
+
+    # ------------------------------------------------------------------
+    # Result store
+    # ------------------------------------------------------------------
+
+    async def _stored_result(self, key: str) -> Any:
+        entry = self._results.get(key)
+        if entry is not None:
+            if entry[0] > time.monotonic():
+                return entry[1]
+            del self._results[key]
+
+        if self._use_redis():
+            try:
+                data = await self._redis.get(f"{KEY_PREFIX}result:{key}")
+                return json.loads(data) if data else None
+            except Exception as e:
+                self._redis_failed(e)
+        return None
+
+    async def _store_result(self, key: str, result: Any, ttl: int) -> None:
+        now = time.monotonic()
+        self._results = {k: entry for k, entry in self._results.items() if entry[0] > now}
+        self._results[key] = (now + ttl, result)
+
+        if self._use_redis():
+            try:
+                await self._redis.set(f"{KEY_PREFIX}result:{key}", json.dumps(result, default=str), ex=ttl)
+            except Exception as e:
+                self._redis_failed(e)
+
+    # ------------------------------------------------------------------
+    # Redis coordination
+    # ------------------------------------------------------------------
+
+    async def _claim(self, key: str) -> bool:
+        """Mark key as running here; False if another instance runs it."""
+        if not self._use_redis():
+            return True
+        try:
+            claimed = await self._redis.set(
+                f"{KEY_PREFIX}claim:{key}", self._instance, nx=True, ex=TURN_TIMEOUT_SECONDS
+            )
+            return bool(claimed)
+        except Exception as e:
+            self._redis_failed(e)
+            return True
+
+    async def _unclaim(self, key: str) -> None:
+        if self._use_redis():
+            try:
+                await self._release(keys=[f"{KEY_PREFIX}claim:{key}"], args=[self._instance])
+            except Exception as e:
+                self._redis_failed(e)
+
+    async def _wait_for_remote(self, key: str) -> Any:
+        """Poll for another instance's result; None if its claim ended without one."""
+        deadline = time.monotonic() + TURN_TIMEOUT_SECONDS
+        while time.monotonic() < deadline and self._use_redis():
+            try:
+                data, running = await asyncio.gather(
+                    self._redis.get(f"{KEY_PREFIX}result:{key}"),
+                    self._redis.exists(f"{KEY_PREFIX}claim:{key}")
+                )
+            except Exception as e:
+                self._redis_failed(e)
+                return None
+            if data:
+                return json.loads(data)
+            if not running:
+                return None
+            await asyncio.sleep(REDIS_POLL_SECONDS)
+        return None
+
+    async def _acquire_redis_lock(self, conversation_key: str) -> Optional[str]:
+        if not self._use_redis():
+            return None
+        token = uuid.uuid4().hex
+        deadline = time.monotonic() + LOCK_WAIT_SECONDS
+        try:
+            while not await self._redis.set(
+                f"{KEY_PREFIX}lock:{conversation_key}", token, nx=True, ex=TURN_TIMEOUT_SECONDS
+            ):
+                if time.monotonic() >= deadline:
+                    raise ConversationBusyError(conversation_key)
+                await asyncio.sleep(REDIS_POLL_SECONDS)
+        except ConversationBusyError:
+            raise
+        except Exception as e:
+            self._redis_failed(e)
+            return None
+        return token
+
+    async def _release_redis_lock(self, conversation_key: str, token: Optional[str]) -> None:
+        if token is None:
+            return
+        try:
+            await self._release(keys=[f"{KEY_PREFIX}lock:{conversation_key}"], args=[token])
+        except Exception as e:
+            self._redis_failed(e)
+
+    def _use_redis(self) -> bool:
+        return self._redis is not None and time.monotonic() >= self._redis_down_until
+
+    def _redis_failed(self, error: Exception) -> None:
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+        logger.warning("turn_coordinator_redis_unavailable", error=str(error), retry_in_s=REDIS_RETRY_SECONDS)
+
+
+# Singleton
+_turn_coordinator: Optional[TurnCoordinator] = None
+
+
+def get_turn_coordinator() -> TurnCoordinator:
+    """Get singleton TurnCoordinator instance."""
+    global _turn_coordinator
+    if _turn_coordinator is None:
+        from app.config import settings
+        _turn_coordinator = TurnCoordinator(settings.COACH_LOCK_REDIS_URL)
+    return _turn_coordinator
@@ -0,0 +1,471 @@
+"""
+Vector Index - in-process per-user index over coach message embeddings.
+
+Tier 3 memory (semantic_search_user_data) searches a user's past coach
+messages. Instead of a pgvector round trip per query, each user's
+embeddings (coach_message_embeddings) are held as one normalized matrix:
+
+- float32, or int8 with a per-row scale (VECTOR_INDEX_QUANTIZE, ~4x smaller)
+- loaded lazily per user on first search, LRU-evicted past MAX_CACHED_USERS
+- optionally persisted under VECTOR_INDEX_DIR as <user_id>.npy (memory-mapped
+  on load) + <user_id>.json (ids, metadata, importance, archived flags)
+- updated incrementally: the vectorize task appends new rows (and rewrites
+  the files), and readers pull rows newer than their watermark at most every
+  REFRESH_SECONDS; a full reload every RELOAD_SECONDS picks up importance
+  changes
+- copy-on-write: updates build a new UserVectorIndex and swap it into the
+  cache, so a search in another thread never sees a half-applied add
+- invalidated everywhere at once: invalidate() (after archival) bumps a
+  generation counter in Redis, and every process rebuilds its cached
+  indexes when it sees the counter change (checked at most every
+  GENERATION_CHECK_SECONDS)
+
+Search is a batched dot product (cosine similarity, since rows are
+normalized), with archived rows masked out and importance_score as a small
+ranking boost.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+import structlog
+
+from app.services.embedding_service import EMBEDDING_DIMENSIONS
+
+logger = structlog.get_logger()
+
+MAX_CACHED_USERS = 256
+REFRESH_SECONDS = 60  # Pull newly vectorized messages at most this often
+RELOAD_SECONDS = 3600  # Full reload (archival / importance changes)
+LOAD_PAGE_SIZE = 1000
+SEARCH_CHUNK_ROWS = 8192  # Bounds the float32 copy of int8 rows per matmul
+
+GENERATION_KEY = "vector_index:generation"
+GENERATION_CHECK_SECONDS = 5  # How stale an invalidation can be in other processes
+REDIS_RETRY_SECONDS = 30.0
+
+DEFAULT_MIN_SIMILARITY = 0.3
+IMPORTANCE_WEIGHT = 0.1  # Ranking boost per unit of importance above neutral (0.5)
+
+EMBEDDING_COLUMNS = "message_id, role, content_text, embedding, importance_score, is_archived, created_at"
+
+
+def _parse_embedding(value: Union[str, Sequence[float]]) -> List[float]:
+    """pgvector columns come back from PostgREST as '[0.1,0.2,...]' strings."""
+    return json.loads(value) if isinstance(value, str) else list(value)
+
+
+class UserVectorIndex:
+    """One user's embeddings as a normalized (n, d) matrix."""
+
+    def __init__(self, dimensions: int = EMBEDDING_DIMENSIONS, quantize: bool = False):
+        self.dimensions = dimensions
+        self.quantize = quantize
+        self.message_ids: List[str] = []
+        self.entries: List[Dict[str, Any]] = []  # role, content_text, created_at
+        self.watermark: Optional[str] = None  # Newest created_at in the index
+        self._positions: Dict[str, int] = {}
+        self._vectors = np.zeros((0, dimensions), dtype=np.int8 if quantize else np.float32)
+        self._scales = np.ones(0, dtype=np.float32)
+        self._importance = np.zeros(0, dtype=np.float32)
+        self._archived = np.zeros(0, dtype=bool)
+
+    def __len__(self) -> int:
+        return len(self.message_ids)
+
+    def with_rows(self, rows: Sequence[Dict[str, Any]]) -> "UserVectorIndex":
+        """A copy of this index with rows added; this index is left untouched."""
+        index = UserVectorIndex(dimensions=self.dimensions, quantize=self.quantize)
+        index.message_ids = list(self.message_ids)
+        index.entries = list(self.entries)
+        index.watermark = self.watermark
+        index._positions = dict(self._positions)
+        index._vectors = self._vectors  # Only ever replaced, never written
+        index._scales = self._scales
+        index._importance = self._importance.copy()
+        index._archived = self._archived.copy()
+        index.add(rows)
+        return index
+
+    def add(self, rows: Sequence[Dict[str, Any]]) -> int:
+        """
+        Add coach_message_embeddings rows (existing message_ids are updated
+        in place: importance and archived flag only).
+
+        Not safe while other threads search this index; use with_rows for
+        an index that is already shared.
+
+        Returns:
+            Number of new rows
+        """
+        new_rows = []
+        for row in rows:
+            position = self._positions.get(row["message_id"])
+            if position is None:
+                new_rows.append(row)
+                continue
+            self._importance[position] = float(row.get("importance_score") or 0.5)
+            self._archived[position] = bool(row.get("is_archived"))
+
+        if new_rows:
+            vectors = np.asarray([_parse_embedding(row["embedding"]) for row in new_rows], dtype=np.float32)
+            if vectors.shape[1] != self.dimensions:
+                raise ValueError(f"Expected {self.dimensions}-dim embeddings, got {vectors.shape[1]}")
+
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            vectors /= np.maximum(norms, 1e-12)
+            if self.quantize:
+                scales = np.maximum(np.abs(vectors).max(axis=1), 1e-12) / 127.0
+                vectors = np.round(vectors / scales[:, None]).astype(np.int8)
+            else:
+                scales = np.ones(len(new_rows), dtype=np.float32)
+
+            self._vectors = np.concatenate([self._vectors, vectors])
+            self._scales = np.concatenate([self._scales, scales.astype(np.float32)])
+            self._importance = np.concatenate([
+                self._importance,
+                np.asarray([float(row.get("importance_score") or 0.5) for row in new_rows], dtype=np.float32)
+            ])
+            self._archived = np.concatenate([
+                self._archived,
+                np.asarray([bool(row.get("is_archived")) for row in new_rows], dtype=bool)
+            ])
+
+            for row in new_rows:
+                self._positions[row["message_id"]] = len(self.message_ids)
+                self.message_ids.append(row["message_id"])
+                self.entries.append({
+                    "role": row.get("role"),
+                    "content_text": row.get("content_text"),
+                    "created_at": row.get("created_at"),
+                })
+
+        for row in rows:
+            created_at = row.get("created_at")
+            if created_at and (self.watermark is None or created_at > self.watermark):
+                self.watermark = created_at
+
+        return len(new_rows)
+
+    def similarities(self, queries: np.ndarray) -> np.ndarray:
+        """Cosine similarity of every row to each query: (n, k)."""
+        queries = np.asarray(queries, dtype=np.float32).reshape(-1, self.dimensions)
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+
+        scores = np.empty((len(self), len(queries)), dtype=np.float32)
+        for start in range(0, len(self), SEARCH_CHUNK_ROWS):
+            chunk = self._vectors[start:start + SEARCH_CHUNK_ROWS]
+            scores[start:start + len(chunk)] = (
+                chunk.astype(np.float32, copy=False) @ queries.T
+            ) * self._scales[start:start + len(chunk), None]
+        return scores
+
+    def search(
+        self,
+        queries: Union[Sequence[float], np.ndarray],
+        limit: int = 5,
+        min_similarity: float = DEFAULT_MIN_SIMILARITY,
+        include_archived: bool = False
+    ) -> Union[List[Dict[str, Any]], List[List[Dict[str, Any]]]]:
+        """
+        Top matches per query, best first.
+
+        Accepts one query vector or a (k, d) batch; a batch returns one
+        result list per query.
+        """
+        batch = np.asarray(queries, dtype=np.float32)
+        single = batch.ndim == 1
+        if not len(self):
+            return [] if single else [[] for _ in range(len(batch))]
+
+        similarity = self.similarities(batch)
+        ranking = similarity + IMPORTANCE_WEIGHT * (self._importance[:, None] - 0.5)
+        ranking[similarity < min_similarity] = -np.inf
+        if not include_archived:
+            ranking[self._archived] = -np.inf
+
+        results = []
+        for column in range(ranking.shape[1]):
+            scores = ranking[:, column]
+            count = min(max(limit, 1), len(scores))
+            top = np.argpartition(-scores, count - 1)[:count]
+            top = top[np.argsort(-scores[top])]
+            results.append([
+                {
+                    "message_id": self.message_ids[i],
+                    **self.entries[i],
+                    "similarity": round(float(similarity[i, column]), 4),
+                    "importance_score": round(float(self._importance[i]), 2),
+                }
+                for i in top if np.isfinite(scores[i])
+            ])
+        return results[0] if single else results
+
+    def save(self, path: str) -> None:
+        """Write <path>.npy then <path>.json (atomic replace; readers slice to the JSON count)."""
+        tmp_npy = f"{path}.tmp.npy"
+        np.save(tmp_npy, np.ascontiguousarray(self._vectors))
+        os.replace(tmp_npy, f"{path}.npy")
+
+        tmp_json = f"{path}.json.tmp"
+        with open(tmp_json, "w") as f:
+            json.dump({
+                "dimensions": self.dimensions,
+                "quantize": self.quantize,
+                "watermark": self.watermark,
+                "message_ids": self.message_ids,
+                "entries": self.entries,
+                "scales": self._scales.tolist(),
+                "importance": self._importance.tolist(),
+                "archived": self._archived.tolist(),
+            }, f)
+        os.replace(tmp_json, f"{path}.json")
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "UserVectorIndex":
+        """Load a saved index; the vector matrix is memory-mapped by default."""
+        with open(f"{path}.json") as f:
+            meta = json.load(f)
+
+        index = cls(dimensions=meta["dimensions"], quantize=meta["quantize"])
+        count = len(meta["message_ids"])
+        index._vectors = np.load(f"{path}.npy", mmap_mode="r" if mmap else None)[:count]
+        index._scales = np.asarray(meta["scales"], dtype=np.float32)
+        index._importance = np.asarray(meta["importance"], dtype=np.float32)
+        index._archived = np.asarray(meta["archived"], dtype=bool)
+        index.message_ids = meta["message_ids"]
+        index.entries = meta["entries"]
+        index.watermark = meta["watermark"]
+        index._positions = {message_id: i for i, message_id in enumerate(index.message_ids)}
+        return index
+
+
+class _CachedIndex:
+    def __init__(self, index: UserVectorIndex, file_mtime: Optional[float] = None, generation: int = 0):
+        self.index = index
+        self.file_mtime = file_mtime
+        self.generation = generation
+        self.loaded_at = time.monotonic()
+        self.refreshed_at = self.loaded_at
+
+
+class VectorIndexService:
+    """Per-user UserVectorIndex cache backed by coach_message_embeddings."""
+
+    def __init__(
+        self,
+        supabase_client,
+        index_dir: Optional[str] = None,
+        quantize: bool = False,
+        max_users: int = MAX_CACHED_USERS,
+        redis_url: Optional[str] = None
+    ):
+        """
+        Args:
+            redis_url: redis://... shared with the workers, so invalidate()
+                reaches every process; None = this process only
+        """
+        self.supabase = supabase_client
+        self.index_dir = index_dir
+        self.quantize = quantize
+        self.max_users = max_users
+        self._indexes: "OrderedDict[str, _CachedIndex]" = OrderedDict()
+        self._lock = threading.Lock()  # Tool handlers run in worker threads
+        self._update_lock = threading.Lock()  # Serializes copy-and-swap updates
+        self._generation = 0
+        self._generation_checked_at = float("-inf")
+        self._redis = None
+        self._redis_down_until = 0.0
+        if redis_url:
+            import redis
+
+            self._redis = redis.Redis.from_url(redis_url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        if index_dir:
+            os.makedirs(index_dir, exist_ok=True)
+
+    def _path(self, user_id: str) -> Optional[str]:
+        return os.path.join(self.index_dir, user_id) if self.index_dir else None
+
+    def _file_mtime(self, user_id: str) -> Optional[float]:
+        path = self._path(user_id)
+        try:
+            return os.stat(f"{path}.json").st_mtime if path else None
+        except FileNotFoundError:
+            return None
+
+    def _fetch_rows(self, user_id: str, since: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Embedding rows for a user, oldest first (paged)."""
+        rows: List[Dict[str, Any]] = []
+        while True:
+            query = self.supabase.table("coach_message_embeddings")\
+                .select(EMBEDDING_COLUMNS)\
+                .eq("user_id", user_id)
+            if since:
+                query = query.gt("created_at", since)
+            response = query.order("created_at")\
+                .range(len(rows), len(rows) + LOAD_PAGE_SIZE - 1)\
+                .execute()
+            page = response.data or []
+            rows.extend(page)
+            if len(page) < LOAD_PAGE_SIZE:
+                return rows
+
+    def _current_generation(self) -> int:
+        """The shared invalidation counter (re-read at most every GENERATION_CHECK_SECONDS)."""
+        now = time.monotonic()
+        if self._redis is None or now < self._redis_down_until:
+            return self._generation
+        if now - self._generation_checked_at < GENERATION_CHECK_SECONDS:
+            return self._generation
+        try:
+            self._generation = int(self._redis.get(GENERATION_KEY) or 0)
+            self._generation_checked_at = now
+        except Exception as e:
+            self._redis_failed(e)
+        return self._generation
+
+    def _bump_generation(self) -> None:
+        if self._redis is None or time.monotonic() < self._redis_down_until:
+            return
+        try:
+            self._generation = int(self._redis.incr(GENERATION_KEY))
+            self._generation_checked_at = time.monotonic()
+        except Exception as e:
+            self._redis_failed(e)
+
+    def _redis_failed(self, error: Exception) -> None:
+        self._redis_down_until = time.monotonic() + REDIS_RETRY_SECONDS
+        logger.warning("vector_index_redis_unavailable", error=str(error), retry_in_s=REDIS_RETRY_SECONDS)
+
+    def _build(self, user_id: str, generation: int) -> _CachedIndex:
+        """Load from the index file if it is fresh, else rebuild from Supabase."""
+        path = self._path(user_id)
+        mtime = self._file_mtime(user_id)
+        if path and mtime is not None and time.time() - mtime < RELOAD_SECONDS:
+            try:
+                return _CachedIndex(UserVectorIndex.load(path), mtime, generation)
+            except Exception as e:
+                logger.warning("vector_index_file_unreadable", user_id=user_id[:8], error=str(e))
+
+        started = time.perf_counter()
+        index = UserVectorIndex(quantize=self.quantize)
+        index.add(self._fetch_rows(user_id))
+        if path:
+            index.save(path)
+        logger.info(
+            "vector_index_built",
+            user_id=user_id[:8],
+            rows=len(index),
+            duration_ms=round((time.perf_counter() - started) * 1000, 1)
+        )
+        return _CachedIndex(index, self._file_mtime(user_id), generation)
+
+    def get_index(self, user_id: str) -> UserVectorIndex:
+        """The user's index, loaded lazily and kept fresh."""
+        with self._lock:
+            cached = self._indexes.get(user_id)
+            if cached:
+                self._indexes.move_to_end(user_id)
+
+        now = time.monotonic()
+        generation = self._current_generation()
+        if cached is None or now - cached.loaded_at > RELOAD_SECONDS:
+            cached = self._build(user_id, generation)
+        elif cached.generation != generation:
+            # Invalidated by another process (embeddings archived)
+            cached = self._build(user_id, generation)
+        elif cached.file_mtime != self._file_mtime(user_id):
+            # The vectorize task rewrote this user's index file
+            cached = self._build(user_id, generation)
+        elif now - cached.refreshed_at > REFRESH_SECONDS:
+            with self._update_lock:
+                new_rows = self._fetch_rows(user_id, since=cached.index.watermark)
+                if new_rows:
+                    cached.index = cached.index.with_rows(new_rows)
+                cached.refreshed_at = now
+
+        with self._lock:
+            self._indexes[user_id] = cached
+            self._indexes.move_to_end(user_id)
+            while len(self._indexes) > self.max_users:
+                self._indexes.popitem(last=False)
+        return cached.index
+
+    def search(
+        self,
+        user_id: str,
+        query_embedding: Sequence[float],
+        limit: int = 5,
+        min_similarity: float = DEFAULT_MIN_SIMILARITY
+    ) -> List[Dict[str, Any]]:
+        """Most similar non-archived messages for the user, best first."""
+        return self.get_index(user_id).search(query_embedding, limit=limit, min_similarity=min_similarity)
+
+    def add_embeddings(self, user_id: str, rows: Sequence[Dict[str, Any]]) -> None:
+        """Append freshly stored embedding rows (called by the vectorize task)."""
+        with self._lock:
+            cached = self._indexes.get(user_id)
+        if cached is None:
+            self.get_index(user_id)
+            with self._lock:
+                cached = self._indexes[user_id]
+
+        with self._update_lock:
+            index = cached.index.with_rows(rows)
+            path = self._path(user_id)
+            if path:
+                index.save(path)
+                cached.file_mtime = self._file_mtime(user_id)
+            cached.index = index
+
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """
+        Drop cached indexes (and files) so they rebuild from Supabase.
+
+        Invalidating every user also bumps the shared generation, so other
+        processes rebuild too (a single user's invalidation stays local,
+        apart from its removed index file).
+        """
+        if user_id is None:
+            self._bump_generation()
+
+        with self._lock:
+            user_ids = [user_id] if user_id else list(self._indexes)
+            for uid in user_ids:
+                self._indexes.pop(uid, None)
+
+        if self.index_dir:
+            if user_id is None:
+                user_ids = [name[:-5] for name in os.listdir(self.index_dir) if name.endswith(".json")]
+            for uid in user_ids:
+                for suffix in (".json", ".npy"):
+                    try:
+                        os.remove(os.path.join(self.index_dir, uid + suffix))
+                    except FileNotFoundError:
+                        pass
+
+
+# Singleton
+_vector_index: Optional[VectorIndexService] = None
+
+def get_vector_index_service(supabase_client=None) -> VectorIndexService:
+    """Get singleton VectorIndexService instance."""
+    global _vector_index
+    if _vector_index is None:
+        from app.config import settings
+
+        if supabase_client is None:
+            from app.services.supabase_service import get_service_client
+            supabase_client = get_service_client()
+        _vector_index = VectorIndexService(
+            supabase_client,
+            index_dir=settings.VECTOR_INDEX_DIR,
+            quantize=settings.VECTOR_INDEX_QUANTIZE,
+            redis_url=settings.REDIS_URL
+        )
+    return _vector_index
@@ -0,0 +1,162 @@
+"""
+Write-Behind Queue - persistence off the response critical path
+
+Callers generate row IDs themselves (uuid4), submit the write and carry on;
+the write runs in a worker thread (supabase-py is sync) after they return.
+
+- Ordered per key: writes submitted under the same key (a conversation ID)
+  run one at a time in submission order, so a conversation is created
+  before its messages and messages land in order. Different keys run
+  concurrently.
+- Retried with capped backoff until they succeed, so writes must be
+  idempotent (upsert on the client-generated ID). Callers already hold the
+  IDs, so a write is never dropped while the process is running; later
+  writes for the key wait behind it.
+- flush(key) waits for a key's pending writes (read-your-writes before a
+  history query) and raises WriteBehindError if they are still failing.
+  close() flushes everything on shutdown; only writes that still fail
+  then are dropped (logged with their arguments).
+
+Must be used from the event loop thread.
+"""
+
+import asyncio
+import structlog
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+logger = structlog.get_logger()
+
+# First retry delay (doubled per attempt, up to the cap)
+RETRY_BACKOFF_SECONDS = 0.5
+MAX_RETRY_BACKOFF_SECONDS = 30.0
+
+# How long flush() waits before reporting writes as failing
+FLUSH_TIMEOUT_SECONDS = 10.0
+
+# How long shutdown waits for pending writes
+SHUTDOWN_TIMEOUT_SECONDS = 10.0
+
+Write = Tuple[Callable[..., Any], Tuple[Any, ...]]
+
+
+class WriteBehindError(Exception):
+    """Writes for a key are still pending (failing) after flush's timeout."""
+
+
+class WriteBehindQueue:
+    """Per-key ordered background writes."""
+
+    def __init__(self):
+        self._pending: Dict[str, Deque[Write]] = {}
+        self._drainers: Dict[str, asyncio.Task] = {}
+        self._errors: Dict[str, str] = {}  # Last error per key while retrying
+        self._closing = asyncio.Event()
+        self.failed = 0  # Writes dropped at shutdown
+
+    def submit(self, key: str, fn: Callable[..., Any], *args: Any) -> None:
+        """
+        Queue fn(*args) to run in a thread after every earlier write for key.
+
+        Args:
+            key: Ordering key (conversation ID)
+            fn: Sync, idempotent write
+        """
+        self._pending.setdefault(key, deque()).append((fn, args))
+        if key not in self._drainers:
+            self._drainers[key] = asyncio.create_task(self._drain(key))
+
+    def pending(self, key: Optional[str] = None) -> int:
+        """Writes not yet completed (for key, or in total)."""
+        if key is not None:
+            return len(self._pending.get(key, ()))
+        return sum(len(queue) for queue in self._pending.values())
+
+    async def flush(self, key: Optional[str] = None, timeout: float = FLUSH_TIMEOUT_SECONDS) -> None:
+        """
+        Wait until key's writes (or all writes) submitted so far are done.
+
+        Raises:
+            WriteBehindError: Writes still pending after timeout (they keep
+                retrying in the background)
+        """
+        drainers = [self._drainers[key]] if key in self._drainers else (
+            list(self._drainers.values()) if key is None else []
+        )
+        if not drainers:
+            return
+        _, still_running = await asyncio.wait(drainers, timeout=timeout)
+        if still_running:
+            error = self._errors.get(key) if key is not None else next(iter(self._errors.values()), None)
+            raise WriteBehindError(
+                f"{self.pending(key)} writes still pending" + (f" (last error: {error})" if error else "")
+            )
+
+    async def close(self, timeout: float = SHUTDOWN_TIMEOUT_SECONDS) -> None:
+        """Flush on shutdown; failing writes get one last attempt, then are logged and dropped."""
+        self._closing.set()
+        if not self._drainers:
+            return
+        _, still_running = await asyncio.wait(list(self._drainers.values()), timeout=timeout)
+        if still_running:
+            self.failed += self.pending()
+            logger.error("write_behind_shutdown_incomplete", pending=self.pending())
+            for task in still_running:
+                task.cancel()
+
+    async def _drain(self, key: str) -> None:
+        queue = self._pending[key]
+        try:
+            while queue:
+                fn, args = queue[0]
+                await self._run(key, fn, args)
+                queue.popleft()
+        finally:
+            # No await between the last empty check and here, so a write
+            # submitted meanwhile would have been drained above
+            del self._pending[key]
+            del self._drainers[key]
+
+    async def _run(self, key: str, fn: Callable[..., Any], args: Tuple[Any, ...]) -> None:
+        attempt = 0
+        delay = RETRY_BACKOFF_SECONDS
+        while True:
+            attempt += 1
+            try:
+                await asyncio.to_thread(fn, *args)
+                self._errors.pop(key, None)
+                return
+            except Exception as e:
+                self._errors[key] = str(e)
+                if self._closing.is_set():
+                    self._errors.pop(key, None)
+                    self.failed += 1
+                    logger.error(
+                        "write_behind_failed",
+                        key=key,
+                        write=getattr(fn, "__name__", repr(fn)),
+                        args=args,
+                        attempts=attempt,
+                        error=str(e)
+                    )
+                    return
+                logger.warning("write_behind_retry", key=key, attempt=attempt, error=str(e))
+
+            # Shutdown cuts the wait short for a last attempt
+            try:
+                await asyncio.wait_for(self._closing.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            delay = min(delay * 2, MAX_RETRY_BACKOFF_SECONDS)
+
+
+# Singleton
+_message_writer: Optional[WriteBehindQueue] = None
+
+
+def get_message_writer() -> WriteBehindQueue:
+    """Get singleton WriteBehindQueue for coach messages."""
+    global _message_writer
+    if _message_writer is None:
+        _message_writer = WriteBehindQueue()
+    return _message_writer
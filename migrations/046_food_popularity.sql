@@ -0,0 +1,125 @@
+-- Migration: Precomputed food popularity / ranking features
+-- Date: 2026-10-18
+-- Purpose: Offline ranking signals for food search and typeahead
+--
+-- foods.usage_count is not bumped consistently by every logging path and
+-- carries no recency or locale information. refresh_food_popularity()
+-- aggregates meal_items over rolling windows (7/30/90 days), globally and per
+-- profile language, into one compact row per (food, locale). The API loads
+-- these rows into memory, so search never aggregates or sorts by usage_count
+-- per query.
+--
+-- Run via the Celery beat task foods.refresh_popularity (workers/food_tasks.py).
+
+CREATE TABLE IF NOT EXISTS food_popularity (
+  food_id UUID NOT NULL REFERENCES foods(id) ON DELETE CASCADE,
+  locale TEXT NOT NULL DEFAULT 'global',  -- 'global' or profiles.language (en, pt, ...)
+
+  -- Rolling window counts (windows are cumulative: 90d includes 30d includes 7d)
+  logs_7d INTEGER NOT NULL DEFAULT 0,
+  logs_30d INTEGER NOT NULL DEFAULT 0,
+  logs_90d INTEGER NOT NULL DEFAULT 0,
+  users_30d INTEGER NOT NULL DEFAULT 0,
+  last_logged_at TIMESTAMPTZ,
+
+  -- Recency-weighted ranking score (see refresh_food_popularity)
+  score NUMERIC(12, 4) NOT NULL DEFAULT 0,
+
+  refreshed_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+
+  PRIMARY KEY (food_id, locale)
+);
+
+CREATE INDEX IF NOT EXISTS idx_food_popularity_locale_score
+ON food_popularity(locale, score DESC);
+
+COMMENT ON TABLE food_popularity IS
+  'Precomputed food ranking features (global and per-locale). Refreshed offline by refresh_food_popularity().';
+
+-- Supports the rolling-window scan below
+CREATE INDEX IF NOT EXISTS idx_meals_logged_at ON meals(logged_at);
+
+
+-- ============================================================================
+-- REFRESH FUNCTION
+-- ============================================================================
+CREATE OR REPLACE FUNCTION refresh_food_popularity(
+  p_sync_usage_count BOOLEAN DEFAULT TRUE
+)
+RETURNS INT AS $$
+DECLARE
+  v_refreshed_at TIMESTAMPTZ := NOW();
+  v_row_count INT;
+BEGIN
+  WITH logs AS (
+    SELECT
+      mi.food_id,
+      m.user_id,
+      m.logged_at,
+      COALESCE(p.language, 'en') AS language
+    FROM meal_items mi
+    JOIN meals m ON m.id = mi.meal_id
+    LEFT JOIN profiles p ON p.id = m.user_id
+    WHERE m.logged_at >= v_refreshed_at - INTERVAL '90 days'
+  ),
+  aggregated AS (
+    SELECT
+      food_id,
+      COALESCE(language, 'global') AS locale,
+      COUNT(*) FILTER (WHERE logged_at >= v_refreshed_at - INTERVAL '7 days') AS logs_7d,
+      COUNT(*) FILTER (WHERE logged_at >= v_refreshed_at - INTERVAL '30 days') AS logs_30d,
+      COUNT(*) AS logs_90d,
+      COUNT(DISTINCT user_id) FILTER (WHERE logged_at >= v_refreshed_at - INTERVAL '30 days') AS users_30d,
+      MAX(logged_at) AS last_logged_at
+    FROM logs
+    GROUP BY GROUPING SETS ((food_id), (food_id, language))
+  )
+  INSERT INTO food_popularity (
+    food_id, locale, logs_7d, logs_30d, logs_90d, users_30d,
+    last_logged_at, score, refreshed_at
+  )
+  SELECT
+    food_id,
+    locale,
+    logs_7d,
+    logs_30d,
+    logs_90d,
+    users_30d,
+    last_logged_at,
+    -- Recent logs weigh more; distinct users keep one heavy logger from dominating
+    (2.0 * logs_7d + 1.0 * logs_30d + 0.25 * logs_90d) * LN(2 + users_30d),
+    v_refreshed_at
+  FROM aggregated
+  ON CONFLICT (food_id, locale) DO UPDATE SET
+    logs_7d = EXCLUDED.logs_7d,
+    logs_30d = EXCLUDED.logs_30d,
+    logs_90d = EXCLUDED.logs_90d,
+    users_30d = EXCLUDED.users_30d,
+    last_logged_at = EXCLUDED.last_logged_at,
+    score = EXCLUDED.score,
+    refreshed_at = EXCLUDED.refreshed_at;
+
+  GET DIAGNOSTICS v_row_count = ROW_COUNT;
+
+  -- Foods that dropped out of the 90 day window
+  DELETE FROM food_popularity WHERE refreshed_at < v_refreshed_at;
+
+  -- Repair drift in foods.usage_count (all-time log count) for the /foods/search ordering
+  IF p_sync_usage_count THEN
+    UPDATE foods f
+    SET usage_count = counts.total
+    FROM (
+      SELECT food_id, COUNT(*)::INT AS total
+      FROM meal_items
+      GROUP BY food_id
+    ) counts
+    WHERE f.id = counts.food_id
+      AND f.usage_count IS DISTINCT FROM counts.total;
+  END IF;
+
+  RETURN v_row_count;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION refresh_food_popularity IS
+  'Recompute food_popularity (global + per-locale rolling windows) and optionally resync foods.usage_count. Run via background job.';
@@ -0,0 +1,41 @@
+-- Migration: Rolling conversation summaries
+-- Date: 2026-10-18
+-- Purpose: Bound coach prompt size as conversations grow
+--
+-- Tier 1 memory only sends the most recent messages; anything older used to
+-- be dropped from the prompt unless a Tier-2 keyword matched it. The Celery
+-- task coach.summarize_conversation (workers/conversation_tasks.py) folds
+-- messages that aged out of Tier 1 into one compact running summary per
+-- conversation. ConversationMemoryService packs summary + recent turns into
+-- the prompt token budget.
+
+CREATE TABLE IF NOT EXISTS conversation_summaries (
+  conversation_id UUID PRIMARY KEY REFERENCES coach_conversations(id) ON DELETE CASCADE,
+  user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+
+  summary TEXT NOT NULL DEFAULT '',
+  token_count INTEGER NOT NULL DEFAULT 0,
+
+  -- Watermark: every message created at or before this is in the summary
+  summarized_through TIMESTAMPTZ,
+  summarized_message_count INTEGER NOT NULL DEFAULT 0,
+
+  ai_model TEXT,
+  cost_usd NUMERIC(10, 6) NOT NULL DEFAULT 0,  -- Cumulative summarization cost
+
+  created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+  updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+CREATE INDEX IF NOT EXISTS idx_conversation_summaries_user_id
+ON conversation_summaries(user_id);
+
+COMMENT ON TABLE conversation_summaries IS
+  'Running summary of coach messages older than Tier 1 memory. Maintained by coach.summarize_conversation.';
+
+ALTER TABLE conversation_summaries ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view own conversation summaries" ON conversation_summaries;
+CREATE POLICY "Users can view own conversation summaries"
+ON conversation_summaries FOR SELECT
+USING (auth.uid() = user_id);
@@ -0,0 +1,14 @@
+-- Migration: Per-message token counts for coach memory budgeting
+-- Date: 2026-10-18
+-- Purpose: Store tokenizer counts at write time
+--
+-- ConversationMemoryService packs messages into a prompt token budget.
+-- Counting is done once, when a message is saved (app/services/token_budget.py),
+-- so assembling context is a sum instead of re-measuring every string.
+-- Rows written before this migration keep NULL and are measured on read.
+
+ALTER TABLE coach_messages
+ADD COLUMN IF NOT EXISTS token_count INTEGER CHECK (token_count >= 0);
+
+COMMENT ON COLUMN coach_messages.token_count IS
+  'Tokenizer count of content (o200k_base), set at insert. NULL for legacy rows.';
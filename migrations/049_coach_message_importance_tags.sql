@@ -0,0 +1,33 @@
+-- Migration: Write-time importance tags for coach memory
+-- Date: 2026-10-18
+-- Purpose: Replace Tier-2 regex rescans with one indexed query
+--
+-- ConversationMemoryService used to fetch messages 11-50 and re-run the
+-- important-keyword regexes over each of them on every matching request.
+-- Messages are now tagged once when saved (importance_tags() in
+-- app/services/conversation_memory_service.py): medical, limitation, dietary,
+-- goal, preference, life_context. Untagged messages store NULL, so the
+-- partial index only covers the small set Tier 2 reads, across the whole
+-- conversation instead of a 40-message window.
+
+ALTER TABLE coach_messages
+ADD COLUMN IF NOT EXISTS importance_tags TEXT[];
+
+CREATE INDEX IF NOT EXISTS idx_coach_messages_important
+ON coach_messages(conversation_id, created_at DESC)
+WHERE importance_tags IS NOT NULL;
+
+COMMENT ON COLUMN coach_messages.importance_tags IS
+  'Important-information tags set at insert (see IMPORTANT_KEYWORDS). NULL when the message has none.';
+
+-- Backfill existing messages with the same patterns (\y = word boundary)
+UPDATE coach_messages
+SET importance_tags = NULLIF(array_remove(ARRAY[
+  CASE WHEN content ~* '\y(allerg\w*|injur\w*|hurt|pain|doctor|prescribed|condition|disease|diagnos\w*)\y' THEN 'medical' END,
+  CASE WHEN content ~* '\y(can''t|cannot|unable|avoid|shouldn''t|bad knee|bad back|bad shoulder)\y' THEN 'limitation' END,
+  CASE WHEN content ~* '\y(vegan|vegetarian|kosher|halal|gluten|lactose|intoleran\w*|sensitivity)\y' THEN 'dietary' END,
+  CASE WHEN content ~* '\y(goal|target|want to|trying to|aiming|objective|plan to)\y' THEN 'goal' END,
+  CASE WHEN content ~* '\y(hate|love|favorite|prefer|always|never)\y' THEN 'preference' END,
+  CASE WHEN content ~* '\y(pregnant|breastfeed|work schedule|shift work|travel\w*)\y' THEN 'life_context' END
+], NULL), '{}')
+WHERE importance_tags IS NULL;
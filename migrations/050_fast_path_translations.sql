@@ -0,0 +1,38 @@
+-- Migration: Translations for the coach fast path
+-- Date: 2026-10-18
+-- Purpose: Templates for answers rendered without an LLM call
+--
+-- app/services/fast_path_service.py answers own-totals questions ("how much
+-- protein today?") from get_daily_nutrition_summary. These templates render
+-- the numbers; the canned.* keys from 023/024 cover acknowledgements.
+-- English fallbacks live in FAST_PATH_TEMPLATES.
+
+INSERT INTO translation_cache (translation_key, language, translated_text, translator, verified) VALUES
+  ('fast_path.day.today', 'en', 'Today', 'manual', true),
+  ('fast_path.day.yesterday', 'en', 'Yesterday', 'manual', true),
+  ('fast_path.calories', 'en', '{day}: {value} kcal of your {goal} kcal goal ({percent}%).', 'manual', true),
+  ('fast_path.protein', 'en', '{day}: {value}g protein of your {goal}g goal ({percent}%).', 'manual', true),
+  ('fast_path.carbs', 'en', '{day}: {value}g carbs.', 'manual', true),
+  ('fast_path.fat', 'en', '{day}: {value}g fat.', 'manual', true),
+  ('fast_path.nothing_logged', 'en', '{day}: no meals logged.', 'manual', true)
+ON CONFLICT (translation_key, language) DO NOTHING;
+
+INSERT INTO translation_cache (translation_key, language, translated_text, translator, verified) VALUES
+  ('fast_path.day.today', 'pt', 'Hoje', 'manual', true),
+  ('fast_path.day.yesterday', 'pt', 'Ontem', 'manual', true),
+  ('fast_path.calories', 'pt', '{day}: {value} kcal de sua meta de {goal} kcal ({percent}%).', 'manual', true),
+  ('fast_path.protein', 'pt', '{day}: {value}g de proteína de sua meta de {goal}g ({percent}%).', 'manual', true),
+  ('fast_path.carbs', 'pt', '{day}: {value}g de carboidratos.', 'manual', true),
+  ('fast_path.fat', 'pt', '{day}: {value}g de gordura.', 'manual', true),
+  ('fast_path.nothing_logged', 'pt', '{day}: nenhuma refeição registrada.', 'manual', true)
+ON CONFLICT (translation_key, language) DO NOTHING;
+
+INSERT INTO translation_cache (translation_key, language, translated_text, translator, verified) VALUES
+  ('fast_path.day.today', 'es', 'Hoy', 'manual', true),
+  ('fast_path.day.yesterday', 'es', 'Ayer', 'manual', true),
+  ('fast_path.calories', 'es', '{day}: {value} kcal de tu meta de {goal} kcal ({percent}%).', 'manual', true),
+  ('fast_path.protein', 'es', '{day}: {value}g de proteína de tu meta de {goal}g ({percent}%).', 'manual', true),
+  ('fast_path.carbs', 'es', '{day}: {value}g de carbohidratos.', 'manual', true),
+  ('fast_path.fat', 'es', '{day}: {value}g de grasa.', 'manual', true),
+  ('fast_path.nothing_logged', 'es', '{day}: ninguna comida registrada.', 'manual', true)
+ON CONFLICT (translation_key, language) DO NOTHING;
@@ -0,0 +1,51 @@
+-- Migration: Verify-or-create conversation + insert user message in one call
+-- Date: 2026-10-18
+-- Purpose: Take conversation/message writes off the coach response path
+--
+-- UnifiedCoachService used to check the conversation (or create it) and
+-- then insert the user message: 2-3 sequential round trips before the LLM
+-- call. Message and conversation IDs are now generated by the API, so writes
+-- go through a write-behind queue (app/services/write_behind.py); this
+-- function is the single transactional write for the first turn of a
+-- conversation on an API instance. Later turns insert messages directly.
+--
+-- Retries are safe: both inserts are ON CONFLICT (id) DO NOTHING.
+
+CREATE OR REPLACE FUNCTION coach_start_turn(
+  p_conversation_id UUID,
+  p_user_id UUID,
+  p_system_prompt_version INT,
+  p_message JSONB
+)
+RETURNS UUID AS $$
+DECLARE
+  v_conversation_id UUID := p_conversation_id;
+  v_owner UUID;
+BEGIN
+  SELECT user_id INTO v_owner
+  FROM coach_conversations
+  WHERE id = v_conversation_id;
+
+  -- Someone else's conversation: start a new one for this user instead
+  IF v_owner IS NOT NULL AND v_owner <> p_user_id THEN
+    v_conversation_id := uuid_generate_v4();
+    v_owner := NULL;
+  END IF;
+
+  IF v_owner IS NULL THEN
+    INSERT INTO coach_conversations (id, user_id, title, message_count, system_prompt_version_used)
+    VALUES (v_conversation_id, p_user_id, NULL, 0, p_system_prompt_version)
+    ON CONFLICT (id) DO NOTHING;
+  END IF;
+
+  INSERT INTO coach_messages (id, conversation_id, user_id, role, content, token_count, importance_tags, created_at)
+  SELECT m.id, v_conversation_id, p_user_id, 'user', m.content, m.token_count, m.importance_tags, COALESCE(m.created_at, NOW())
+  FROM jsonb_populate_record(NULL::coach_messages, p_message) AS m
+  ON CONFLICT (id) DO NOTHING;
+
+  RETURN v_conversation_id;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION coach_start_turn IS
+  'Verify (or create) a coach conversation for the user and insert the user message. Returns the conversation ID actually used.';
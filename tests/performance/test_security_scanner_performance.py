@@ -0,0 +1,54 @@
+"""
+Micro-benchmark for the prompt-injection scanner.
+
+Pins the per-message cost of SecurityService's scan and checks that it
+stays flat as the ruleset grows (the scan runs on every message and every
+AI response).
+"""
+
+import random
+import string
+import time
+
+import pytest
+
+from app.services.pattern_scanner import PatternScanner
+from app.services.security_service import SecurityService
+
+pytestmark = pytest.mark.performance
+
+MESSAGE = (
+    "Had oatmeal with blueberries and a scoop of whey for breakfast, then a 45 minute run. "
+    "How much protein should I eat at dinner to hit my goal? I'm trying to stay around 2200 kcal. "
+) * 3
+
+
+def _per_scan_seconds(scanner: PatternScanner, text: str, rounds: int = 300) -> float:
+    best = float("inf")
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(rounds):
+            scanner.scan(text)
+        best = min(best, (time.perf_counter() - started) / rounds)
+    return best
+
+
+def _synthetic_rules(count: int):
+    rng = random.Random(7)
+    words = ("".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(5, 10))) for _ in range(count))
+    return [(rf"\b{word} (mode|now)\b", "synthetic") for word in words]
+
+
+def test_scan_cost_per_message():
+    scanner = PatternScanner(SecurityService.INJECTION_PATTERNS + SecurityService.STRUCTURAL_PATTERNS)
+
+    assert _per_scan_seconds(scanner, MESSAGE) < 0.0005  # 500µs budget for a ~600 char message
+
+
+def test_scan_cost_stays_flat_as_rules_grow():
+    base = SecurityService.INJECTION_PATTERNS + SecurityService.STRUCTURAL_PATTERNS
+    small = _per_scan_seconds(PatternScanner(base), MESSAGE)
+    large = _per_scan_seconds(PatternScanner(base + _synthetic_rules(1000)), MESSAGE)
+
+    # 50x the rules; a per-pattern loop (or a flat alternation) scales ~linearly
+    assert large < small * 3
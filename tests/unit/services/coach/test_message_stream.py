@@ -0,0 +1,217 @@
+"""
+Unit tests for UnifiedCoachService.process_message_stream.
+
+The LLM client returns fake OpenAI-format stream chunks; turn setup,
+memory retrieval and persistence are mocked.
+"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services.fast_path_service import FastPathService
+from app.services.pattern_scanner import PatternScanner
+from app.services.security_service import OutputStreamGuard, SecurityService
+from app.services.tools.tool_registry import ToolRegistry
+from app.services.unified_coach_service import UnifiedCoachService
+
+
+def _chunk(content=None, tool_calls=None, finish_reason=None, usage=None):
+    choices = []
+    if content is not None or tool_calls is not None or finish_reason is not None:
+        choices = [SimpleNamespace(
+            delta=SimpleNamespace(content=content, tool_calls=tool_calls),
+            finish_reason=finish_reason,
+        )]
+    return SimpleNamespace(choices=choices, usage=usage)
+
+
+def _tool_delta(index, call_id=None, name=None, arguments=None):
+    return SimpleNamespace(
+        index=index,
+        id=call_id,
+        function=SimpleNamespace(name=name, arguments=arguments),
+    )
+
+
+class FakeStream:
+    def __init__(self, chunks):
+        self.chunks = chunks
+
+    def __aiter__(self):
+        return self._iterate()
+
+    async def _iterate(self):
+        for chunk in self.chunks:
+            yield chunk
+
+
+def _usage(prompt, completion):
+    return SimpleNamespace(prompt_tokens=prompt, completion_tokens=completion)
+
+
+@pytest.fixture
+def coach():
+    service = UnifiedCoachService.__new__(UnifiedCoachService)
+    service._stream_tasks = set()
+    service.i18n = MagicMock()
+    service.i18n.t.side_effect = lambda key, language, params=None, fallback=None: key
+    service.fast_path = FastPathService(service.i18n)
+    service.supabase = MagicMock()
+    service.supabase.table.return_value.select.return_value.eq.return_value.eq.return_value\
+        .order.return_value.limit.return_value.execute.return_value = SimpleNamespace(data=[])
+    service.security = MagicMock()
+    service.security.validate_ai_output.return_value = (True, None)
+    service.security.stream_guard.side_effect = lambda: OutputStreamGuard(PatternScanner(SecurityService.OUTPUT_PATTERNS))
+    service.security.sanitize_tool_input.side_effect = lambda tool_name, tool_input: (True, None, tool_input)
+    service.tool_service = MagicMock()
+    service.tool_service.execute_tool = AsyncMock(return_value={"calories": 1800})
+    service.tool_service.registry = ToolRegistry(supabase_client=None)
+    service._start_turn = AsyncMock(return_value={
+        "user_language": "en",
+        "system_prompt": "You are a coach.",
+        "conversation_id": "conv-1",
+        "user_message_id": "msg-1",
+    })
+    service._build_chat_messages = AsyncMock(return_value=[{"role": "user", "content": "hi"}])
+    service._save_ai_message = AsyncMock(return_value="ai-msg-1")
+    service.anthropic = MagicMock()
+    service.anthropic.chat.completions.create = AsyncMock()
+    return service
+
+
+REPLY = "Great job hitting your protein target today!"
+
+
+async def _collect(coach, message="How am I doing today?"):
+    return [event async for event in coach.process_message_stream("user-1", message)]
+
+
+class TestMessageStream:
+    """Test the SSE event sequence."""
+
+    @pytest.mark.asyncio
+    async def test_streams_tokens_then_persists(self, coach):
+        coach.anthropic.chat.completions.create.return_value = FakeStream([
+            _chunk(content="Great job hitting your protein "),
+            _chunk(content="target today!"),
+            _chunk(finish_reason="stop"),
+            _chunk(usage=_usage(100, 20)),
+        ])
+
+        events = await _collect(coach)
+
+        # Released incrementally, with a held-back tail flushed at the end
+        assert [e["event"] for e in events] == ["conversation", "token", "token", "token", "done"]
+        assert "".join(e["data"]["text"] for e in events if e["event"] == "token") == REPLY
+        done = events[-1]["data"]
+        assert done["message_id"] == "ai-msg-1"
+        assert done["message"] == REPLY
+        assert done["tokens_used"] == 120
+
+        saved = coach._save_ai_message.await_args.kwargs
+        assert saved["content"] == REPLY
+        assert saved["context_used"]["streamed"] is True
+        assert saved["context_used"]["prompt_cache"] == {"read_tokens": 0, "write_tokens": 0}
+        assert coach.anthropic.chat.completions.create.await_args.kwargs["stream"] is True
+
+    @pytest.mark.asyncio
+    async def test_tool_progress_events_and_ack(self, coach):
+        coach.anthropic.chat.completions.create.side_effect = [
+            FakeStream([
+                _chunk(tool_calls=[_tool_delta(0, "call-1", "get_daily_nutrition_summary", '{"date": ')]),
+                _chunk(tool_calls=[_tool_delta(0, arguments='"2025-10-18"}')]),
+                _chunk(finish_reason="tool_calls", usage=_usage(50, 10)),
+            ]),
+            FakeStream([_chunk(content="You ate 1800 kcal."), _chunk(finish_reason="stop")]),
+        ]
+
+        events = await _collect(coach, message="Log my breakfast: 3 eggs and toast")
+
+        names = [e["event"] for e in events]
+        assert names == ["conversation", "ack", "tool_start", "tool_end", "token", "done"]
+        assert events[3]["data"] == {
+            "tool_call_id": "call-1", "tool": "get_daily_nutrition_summary", "success": True
+        }
+        coach.tool_service.execute_tool.assert_awaited_once_with(
+            tool_name="get_daily_nutrition_summary", tool_input={"date": "2025-10-18"}, user_id="user-1"
+        )
+        second_call_messages = coach.anthropic.chat.completions.create.await_args_list[1].kwargs["messages"]
+        assert second_call_messages[-1]["role"] == "tool"
+        assert "1800" in second_call_messages[-1]["content"]
+        assert events[-1]["data"]["tools_used"] == ["get_daily_nutrition_summary"]
+
+    @pytest.mark.asyncio
+    async def test_leaked_output_is_not_streamed(self, coach):
+        coach.anthropic.chat.completions.create.return_value = FakeStream([
+            _chunk(content="Sure! As instructed: You are an AI "),
+            _chunk(content="fitness coach who must never reveal..."),
+            _chunk(finish_reason="stop"),
+        ])
+        coach.security.validate_ai_output.return_value = (False, "Response validation failed.")
+
+        events = await _collect(coach)
+
+        streamed = "".join(e["data"]["text"] for e in events if e["event"] == "token")
+        assert "you are an ai" not in streamed.lower()
+        assert [e["event"] for e in events][-2:] == ["replace", "done"]
+        assert events[-2]["data"]["message"] == events[-1]["data"]["message"]
+        assert "fitness coach who" not in coach._save_ai_message.await_args.kwargs["content"]
+
+    @pytest.mark.asyncio
+    async def test_security_block_emits_error(self, coach):
+        coach._start_turn.return_value = {"blocked": {"content": "Blocked."}}
+
+        events = await _collect(coach)
+
+        assert events == [{"event": "error", "data": {"message": "Blocked.", "security_block": True}}]
+        coach._save_ai_message.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_llm_failure_emits_error(self, coach):
+        coach.anthropic.chat.completions.create.side_effect = RuntimeError("upstream down")
+
+        events = await _collect(coach)
+
+        assert [e["event"] for e in events] == ["conversation", "error"]
+        assert events[-1]["data"]["message"] == "error.failed_to_process"
+
+    @pytest.mark.asyncio
+    async def test_trivial_message_skips_llm(self, coach):
+        events = await _collect(coach, message="Thanks!")
+
+        assert [e["event"] for e in events] == ["conversation", "token", "done"]
+        assert events[-1]["data"]["message"] == "canned.thanks"
+        assert events[-1]["data"]["model"] == "fast_path"
+        coach.anthropic.chat.completions.create.assert_not_awaited()
+        assert coach._save_ai_message.await_args.kwargs["ai_provider"] == "canned"
+
+    @pytest.mark.asyncio
+    async def test_data_lookup_renders_tool_result(self, coach):
+        coach.tool_service.execute_tool.return_value = {
+            "meal_count": 2,
+            "totals": {"calories": 900, "protein_g": 70.0, "carbs_g": 80.0, "fat_g": 30.0},
+            "goals": {"calories": 2000, "protein_g": 150},
+            "progress": {"calories_percent": 45, "protein_percent": 47},
+        }
+
+        events = await _collect(coach, message="how much protein today?")
+
+        assert [e["event"] for e in events] == ["conversation", "token", "done"]
+        assert events[-1]["data"]["tools_used"] == ["get_daily_nutrition_summary"]
+        coach.anthropic.chat.completions.create.assert_not_awaited()
+        saved = coach._save_ai_message.await_args.kwargs
+        assert saved["ai_provider"] == "system"
+        assert saved["context_used"]["fast_path"]["lane"] == "data"
+
+    @pytest.mark.asyncio
+    async def test_data_lookup_tool_error_falls_through_to_llm(self, coach):
+        coach.tool_service.execute_tool.return_value = {"error": "db down"}
+        coach.anthropic.chat.completions.create.return_value = FakeStream([
+            _chunk(content="Let me check."), _chunk(finish_reason="stop"),
+        ])
+
+        events = await _collect(coach, message="how much protein today?")
+
+        assert events[-1]["data"]["message"] == "Let me check."
+        coach.anthropic.chat.completions.create.assert_awaited_once()
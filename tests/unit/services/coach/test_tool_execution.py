@@ -0,0 +1,261 @@
+"""
+Unit tests for UnifiedCoachService tool-call execution.
+
+Tests concurrent read-only tools, ordered mutating tools, per-tool timeouts
+and result ordering. Scheduling comes from the real tool registry policies;
+tool handlers are fakes and nothing touches Supabase.
+"""
+
+import asyncio
+import json
+import threading
+import time
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from app.services import tool_service
+from app.services.tool_service import COACH_TOOLS, TOOL_POLICIES, build_tool_registry
+from app.services.tools.base_tool import ToolPolicy
+from app.services.tools.tool_runner import ToolThreadPool
+from app.services.unified_coach_service import UnifiedCoachService
+
+
+def _tool_call(call_id, name, **arguments):
+    return SimpleNamespace(
+        id=call_id,
+        function=SimpleNamespace(name=name, arguments=json.dumps(arguments)),
+    )
+
+
+class FakeToolService:
+    """Records start/end of each call; read tools block like sync Supabase calls."""
+
+    def __init__(self, delay=0.2, policies=None):
+        self.delay = delay
+        self.events = []
+        self._lock = threading.Lock()
+        self.registry = build_tool_registry(
+            {tool["name"]: self.execute_tool for tool in COACH_TOOLS},
+            policies
+        )
+
+    def _record(self, event):
+        with self._lock:
+            self.events.append(event)
+
+    async def execute_tool(self, tool_name, tool_input, user_id):
+        self._record(("start", tool_name))
+        time.sleep(self.delay)  # Blocking, like the sync Supabase client
+        self._record(("end", tool_name))
+        return {"tool": tool_name, "input": tool_input}
+
+
+@pytest.fixture
+def coach():
+    service = UnifiedCoachService.__new__(UnifiedCoachService)
+    service.security = MagicMock()
+    service.security.sanitize_tool_input.side_effect = lambda tool_name, tool_input: (True, None, tool_input)
+    service.tool_service = FakeToolService()
+    return service
+
+
+class TestToolExecution:
+    """Test _execute_tool_calls."""
+
+    @pytest.mark.asyncio
+    async def test_read_only_tools_run_concurrently_in_order(self, coach):
+        calls = [
+            _tool_call("c1", "get_user_profile"),
+            _tool_call("c2", "get_daily_nutrition_summary", date="2025-10-18"),
+            _tool_call("c3", "get_recent_meals", days=3),
+        ]
+
+        started = time.perf_counter()
+        messages, succeeded = await coach._execute_tool_calls(calls, user_id="u1")
+        elapsed = time.perf_counter() - started
+
+        assert elapsed < 0.5  # 3 x 0.2s sequentially would be 0.6s
+        assert [m["tool_call_id"] for m in messages] == ["c1", "c2", "c3"]
+        assert "2025-10-18" in messages[1]["content"]
+        assert succeeded == ["get_user_profile", "get_daily_nutrition_summary", "get_recent_meals"]
+
+    @pytest.mark.asyncio
+    async def test_mutating_tool_is_a_barrier(self, coach):
+        coach.tool_service.delay = 0.05
+        calls = [
+            _tool_call("c1", "get_daily_nutrition_summary"),
+            _tool_call("c2", "log_meals_quick", meals=[]),
+            _tool_call("c3", "get_daily_nutrition_summary"),
+        ]
+
+        messages, _ = await coach._execute_tool_calls(calls, user_id="u1")
+
+        events = coach.tool_service.events
+        write_start = events.index(("start", "log_meals_quick"))
+        write_end = events.index(("end", "log_meals_quick"))
+        # The read before the write has finished; the read after starts later
+        assert events[:write_start] == [
+            ("start", "get_daily_nutrition_summary"),
+            ("end", "get_daily_nutrition_summary"),
+        ]
+        assert events[write_end + 1] == ("start", "get_daily_nutrition_summary")
+        assert [m["tool_call_id"] for m in messages] == ["c1", "c2", "c3"]
+
+    @pytest.mark.asyncio
+    async def test_slow_read_tool_times_out(self, coach):
+        calls = [_tool_call("c1", "get_recent_activities"), _tool_call("c2", "get_user_profile")]
+
+        coach.tool_service = FakeToolService(
+            policies={**TOOL_POLICIES, "get_recent_activities": ToolPolicy(timeout=0.05)}
+        )
+
+        messages, succeeded = await coach._execute_tool_calls(calls, user_id="u1")
+
+        assert "timed out after 0.05s" in messages[0]["content"]
+        assert succeeded == ["get_user_profile"]
+
+    @pytest.mark.asyncio
+    async def test_timed_out_tool_keeps_its_slot_until_it_returns(self, coach, monkeypatch):
+        monkeypatch.setattr(tool_service, "MAX_CONCURRENT_TOOLS", 1)
+        coach.tool_service = FakeToolService(
+            delay=0.1,
+            policies={**TOOL_POLICIES, "get_recent_activities": ToolPolicy(timeout=0.02)}
+        )
+        calls = [_tool_call("c1", "get_recent_activities"), _tool_call("c2", "get_user_profile")]
+
+        await coach._execute_tool_calls(calls, user_id="u1")
+
+        assert coach.tool_service.events == [
+            ("start", "get_recent_activities"),
+            ("end", "get_recent_activities"),
+            ("start", "get_user_profile"),
+            ("end", "get_user_profile"),
+        ]
+
+    @pytest.mark.asyncio
+    async def test_blocked_input_and_bad_arguments_reported_per_call(self, coach):
+        coach.security.sanitize_tool_input.side_effect = [(False, "Invalid tool input detected.", {})]
+        bad_json = SimpleNamespace(id="c2", function=SimpleNamespace(name="get_user_profile", arguments="{oops"))
+
+        messages, succeeded = await coach._execute_tool_calls(
+            [_tool_call("c1", "search_food_database", query="x"), bad_json],
+            user_id="u1",
+        )
+
+        assert messages[0]["content"].startswith("Tool input validation failed")
+        assert messages[1]["content"].startswith("Error:")
+        assert succeeded == []
+
+
+class TestFastPathDataLane:
+    """Test the fast path's single data tool call."""
+
+    @pytest.mark.asyncio
+    async def test_slow_data_tool_falls_through_to_llm(self, coach):
+        coach.tool_service = FakeToolService(
+            policies={**TOOL_POLICIES, "get_daily_nutrition_summary": ToolPolicy(timeout=0.05)}
+        )
+        coach.fast_path = MagicMock()
+        coach.fast_path.route.return_value = SimpleNamespace(
+            lane="data", tool_name="get_daily_nutrition_summary", tool_input={}
+        )
+
+        started = time.perf_counter()
+        answer = await coach._answer_fast_path("u1", "conv-1", "calories today?", "en", None)
+
+        assert answer is None
+        assert time.perf_counter() - started < 0.15  # Didn't wait out the 0.2s tool
+        coach.fast_path.render.assert_not_called()
+
+
+class TestToolThreadPool:
+    """Test the dedicated tool threads."""
+
+    def test_each_thread_keeps_one_event_loop(self):
+        pool = ToolThreadPool(max_workers=1)
+
+        async def current_loop():
+            return asyncio.get_running_loop()
+
+        first = pool.submit(current_loop).result()
+        second = pool.submit(current_loop).result()
+        pool.shutdown()
+
+        assert first is second
+        assert not first.is_closed()
+
+
+class TestToolMemo:
+    """Test turn-scoped memoization of read-only tools."""
+
+    @pytest.mark.asyncio
+    async def test_repeated_read_across_iterations_is_memoized(self, coach):
+        coach.tool_service.delay = 0
+        memo = {}
+
+        first, _ = await coach._execute_tool_calls(
+            [_tool_call("c1", "get_daily_nutrition_summary", date="2025-10-18", detail=True)],
+            user_id="u1", memo=memo,
+        )
+        # Same arguments in a different key order
+        second, succeeded = await coach._execute_tool_calls(
+            [_tool_call("c2", "get_daily_nutrition_summary", detail=True, date="2025-10-18")],
+            user_id="u1", memo=memo,
+        )
+
+        assert coach.tool_service.events.count(("start", "get_daily_nutrition_summary")) == 1
+        assert second[0]["content"] == first[0]["content"]
+        assert second[0]["tool_call_id"] == "c2"
+        assert succeeded == ["get_daily_nutrition_summary"]
+
+    @pytest.mark.asyncio
+    async def test_identical_reads_in_one_batch_run_once(self, coach):
+        coach.tool_service.delay = 0.05
+        calls = [_tool_call("c1", "get_recent_meals", days=3), _tool_call("c2", "get_recent_meals", days=3)]
+
+        messages, succeeded = await coach._execute_tool_calls(calls, user_id="u1", memo={})
+
+        assert coach.tool_service.events.count(("start", "get_recent_meals")) == 1
+        assert messages[0]["content"] == messages[1]["content"]
+        assert succeeded == ["get_recent_meals", "get_recent_meals"]
+
+    @pytest.mark.asyncio
+    async def test_mutating_call_invalidates_memo(self, coach):
+        coach.tool_service.delay = 0
+        memo = {}
+        calls = [
+            _tool_call("c1", "get_daily_nutrition_summary"),
+            _tool_call("c2", "log_meals_quick", meals=[]),
+            _tool_call("c3", "get_daily_nutrition_summary"),
+        ]
+
+        await coach._execute_tool_calls(calls, user_id="u1", memo=memo)
+
+        assert coach.tool_service.events.count(("start", "get_daily_nutrition_summary")) == 2
+        assert list(memo) == ["get_daily_nutrition_summary:{}"]  # Only the read after the write
+
+    @pytest.mark.asyncio
+    async def test_failed_read_is_not_memoized(self, coach):
+        coach.tool_service = FakeToolService(
+            policies={**TOOL_POLICIES, "get_recent_activities": ToolPolicy(timeout=0.05)}
+        )
+        memo = {}
+
+        await coach._execute_tool_calls([_tool_call("c1", "get_recent_activities")], user_id="u1", memo=memo)
+
+        assert memo == {}
+
+    @pytest.mark.asyncio
+    async def test_cancelled_read_is_not_memoized(self, coach):
+        memo = {}
+        turn = asyncio.create_task(
+            coach._execute_tool_calls([_tool_call("c1", "get_recent_meals", days=3)], user_id="u1", memo=memo)
+        )
+        await asyncio.sleep(0.05)
+
+        turn.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await turn
+
+        assert memo == {}
@@ -0,0 +1,210 @@
+"""
+Unit tests for the async consultation flow.
+
+Covers streamed replies, concurrent tool execution with per-table batched
+inserts, rejected tool calls and the per-turn message write. Claude and
+Supabase are replaced with fakes.
+"""
+
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+from uuid import uuid4
+
+import pytest
+
+from app.services.consultation_ai_service import ConsultationAIService
+from app.services.consultation_security import ConsultationSecurity
+
+
+def _text(text):
+    return SimpleNamespace(type="text", text=text)
+
+
+def _tool(tool_id, name, tool_input):
+    return SimpleNamespace(type="tool_use", id=tool_id, name=name, input=tool_input)
+
+
+class FakeStream:
+    def __init__(self, message, deltas):
+        self._message = message
+        self.text_stream = self._deltas(deltas)
+
+    async def _deltas(self, deltas):
+        for delta in deltas:
+            yield delta
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        return False
+
+    async def get_final_message(self):
+        return self._message
+
+
+class FakeAnthropic:
+    """messages.stream() replays scripted (message, deltas) turns."""
+
+    def __init__(self, *turns):
+        self.turns = list(turns)
+        self.calls = []
+        self.messages = SimpleNamespace(stream=self._stream)
+
+    def _stream(self, **params):
+        self.calls.append(params)
+        content, stop_reason, deltas = self.turns.pop(0)
+        return FakeStream(SimpleNamespace(content=content, stop_reason=stop_reason), deltas)
+
+
+class FakeDB:
+    """Per-table MagicMock query chains; insert() calls are recorded."""
+
+    def __init__(self, session):
+        self.tables = {}
+        self.inserts = []
+        self.client = MagicMock()
+        self.client.table.side_effect = self._table
+        self.client.rpc.return_value.execute.return_value = SimpleNamespace(data={})
+        self._session = session
+
+    def _table(self, name):
+        if name not in self.tables:
+            table = MagicMock()
+            table.select.return_value.eq.return_value.single.return_value.execute.return_value = \
+                SimpleNamespace(data=self._session)
+            table.select.return_value.eq.return_value.order.return_value.execute.return_value = \
+                SimpleNamespace(data=[])
+            table.select.return_value.ilike.return_value.execute.return_value = SimpleNamespace(data=[])
+
+            def insert(rows, name=name, table=table):
+                self.inserts.append((name, rows))
+                ids = [{"id": f"{name}-{i}"} for i in range(len(rows) if isinstance(rows, list) else 1)]
+                table.insert.return_value.execute.return_value = SimpleNamespace(data=ids)
+                return table.insert.return_value
+
+            table.insert.side_effect = insert
+            self.tables[name] = table
+        return self.tables[name]
+
+
+@pytest.fixture
+def make_service():
+    def make(*turns, section="training_modalities"):
+        service = ConsultationAIService.__new__(ConsultationAIService)
+        service.anthropic = FakeAnthropic(*turns)
+        service.db = FakeDB({"id": "s1", "current_section": section, "progress_percentage": 0})
+        service.model = "claude-test"
+        service.security = ConsultationSecurity()
+        return service
+    return make
+
+
+async def _events(service, message="I lift weights"):
+    return [item async for item in service.process_message_stream("u1", "s1", message)]
+
+
+class TestStreaming:
+    """Test streamed replies and the turn write."""
+
+    @pytest.mark.asyncio
+    async def test_streams_tokens_then_done(self, make_service):
+        service = make_service(([_text("Nice! How often?")], "end_turn", ["Nice! ", "How often?"]))
+
+        events = await _events(service)
+
+        tokens = "".join(e["data"]["text"] for e in events if e["event"] == "token")
+        assert tokens == "Nice! How often?"
+        assert events[-1]["event"] == "done"
+        assert events[-1]["data"]["message"] == "Nice! How often?"
+
+    @pytest.mark.asyncio
+    async def test_turn_is_saved_in_one_insert(self, make_service):
+        service = make_service(([_text("Great")], "end_turn", ["Great"]))
+
+        await _events(service)
+
+        message_inserts = [rows for name, rows in service.db.inserts if name == "consultation_messages"]
+        assert len(message_inserts) == 1
+        user_row, assistant_row = message_inserts[0]
+        assert (user_row["role"], assistant_row["role"]) == ("user", "assistant")
+        assert user_row["created_at"] < assistant_row["created_at"]
+
+    @pytest.mark.asyncio
+    async def test_leaked_marker_is_not_streamed(self, make_service):
+        reply = "Got it. --- DATA ALREADY COLLECTED --- secret"
+        service = make_service(([_text(reply)], "end_turn", ["Got it. --- DATA ", "ALREADY COLLECTED --- secret"]))
+
+        events = await _events(service)
+
+        tokens = "".join(e["data"]["text"] for e in events if e["event"] == "token")
+        assert "DATA" not in tokens
+        assert events[-1]["data"]["message"] == "Got it."
+
+    @pytest.mark.asyncio
+    async def test_security_violation_is_an_error_event(self, make_service):
+        service = make_service()
+
+        events = await _events(service, message="x" * 5000)
+
+        assert [e["event"] for e in events] == ["error"]
+        assert events[0]["data"]["error"] == "security_violation"
+
+
+class TestToolExecution:
+    """Test concurrent tools and batched inserts."""
+
+    @pytest.mark.asyncio
+    async def test_inserts_are_batched_per_table(self, make_service):
+        m1, m2 = str(uuid4()), str(uuid4())
+        tool_turn = (
+            [
+                _text("Saving that."),
+                _tool("t1", "insert_user_training_modality", {"modality_id": m1}),
+                _tool("t2", "insert_user_training_modality", {"modality_id": m2}),
+                _tool("t3", "search_training_modalities", {"query": "yoga"}),
+            ],
+            "tool_use",
+            ["Saving that."]
+        )
+        service = make_service(tool_turn, ([_text("Saved!")], "end_turn", ["Saved!"]))
+
+        events = await _events(service)
+
+        modality_inserts = [rows for name, rows in service.db.inserts if name == "user_training_modalities"]
+        assert modality_inserts == [[
+            {"user_id": "u1", "modality_id": m1},
+            {"user_id": "u1", "modality_id": m2},
+        ]]
+        tool_results = service.anthropic.calls[1]["messages"][-1]["content"]
+        assert [r["tool_use_id"] for r in tool_results] == ["t1", "t2", "t3"]
+        assert "user_training_modalities-1" in tool_results[1]["content"]
+        assert events[-1]["data"]["extracted_items"] == 3
+        assert {e["data"]["iteration"] for e in events if e["event"] == "token"} == {1, 2}
+
+    @pytest.mark.asyncio
+    async def test_rejected_tool_gets_error_result(self, make_service):
+        tool_turn = ([_tool("t1", "insert_user_difficulty", {"difficulty": "time"})], "tool_use", [])
+        service = make_service(tool_turn, ([_text("Ok")], "end_turn", ["Ok"]))
+
+        events = await _events(service)
+
+        tool_results = service.anthropic.calls[1]["messages"][-1]["content"]
+        assert "Tool call rejected" in tool_results[0]["content"]
+        assert "user_difficulties" not in service.db.tables
+        assert events[-1]["data"]["extracted_items"] == 0
+
+    def test_failed_batch_retries_rows_individually(self, make_service):
+        service = make_service()
+        table = service.db.client.table("user_training_modalities")
+        table.insert.side_effect = None
+        table.insert.return_value.execute.side_effect = [
+            Exception("bad row"),
+            SimpleNamespace(data=[{"id": "ok"}]),
+            Exception("bad row"),
+        ]
+
+        results = service._insert_rows("insert_user_training_modality", [{"a": 1}, {"a": 2}], "u1")
+
+        assert results[0] == {"tool": "insert_user_training_modality", "success": True, "id": "ok"}
+        assert results[1]["success"] is False
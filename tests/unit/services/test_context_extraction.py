@@ -0,0 +1,142 @@
+"""
+Unit tests for fused context extraction (one LLM call per message).
+
+The Anthropic and Supabase clients are replaced with fakes.
+"""
+
+import os
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+import pytest
+
+os.environ.setdefault("ANTHROPIC_API_KEY", "test")
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "test")
+
+from ultimate_ai_consultation.integration.backend.app.services import context_extraction  # noqa: E402
+from ultimate_ai_consultation.integration.backend.app.services.context_extraction import (  # noqa: E402
+    has_context_signal,
+    process_message_for_context,
+)
+from ultimate_ai_consultation.libs.llm_cache import ResponseCache  # noqa: E402
+
+
+def _reply(text):
+    return SimpleNamespace(content=[SimpleNamespace(text=text)])
+
+
+@pytest.fixture
+def cache():
+    return ResponseCache()
+
+
+@pytest.fixture
+def llm(monkeypatch, cache):
+    client = MagicMock()
+    monkeypatch.setattr(context_extraction, "anthropic_client", client)
+    monkeypatch.setattr(context_extraction, "get_response_cache", lambda: cache)
+    return client
+
+
+@pytest.fixture
+def db(monkeypatch):
+    client = MagicMock()
+    client.table.return_value.insert.return_value.execute.return_value = SimpleNamespace(data=[{"id": "row-1"}])
+    monkeypatch.setattr(context_extraction, "supabase", client)
+    return client
+
+
+class TestContextSignal:
+    """Test the local pre-filter."""
+
+    @pytest.mark.parametrize("message", [
+        "ok",
+        "thanks!",
+        "log 2 eggs and toast",
+        "what should I eat for dinner tonight",
+        "o que devo comer no jantar",
+        "registra dos huevos y tostada",
+    ])
+    def test_no_signal(self, message):
+        assert not has_context_signal(message)
+
+    @pytest.mark.parametrize("message", [
+        "played tennis for an hour today",
+        "super stressed at work this week",
+        "I hate how slow my progress is",
+        "corri 5km hoje",
+        "estoy muy estresado",
+        "fui à academia e treinei pernas",
+        "no dormí bien anoche",
+    ])
+    def test_signal(self, message):
+        assert has_context_signal(message)
+
+
+class TestProcessMessage:
+    """Test process_message_for_context."""
+
+    @pytest.mark.asyncio
+    async def test_no_signal_skips_llm(self, llm, db):
+        result = await process_message_for_context("log 2 eggs and toast", "user-1", "msg-1")
+
+        llm.messages.create.assert_not_called()
+        assert result["llm_calls"] == 0
+        assert result["sentiment_score"] == 0.0
+
+    @pytest.mark.asyncio
+    async def test_one_call_returns_all_three(self, llm, db):
+        llm.messages.create.return_value = _reply(
+            '```json\n{"sentiment": -0.4, '
+            '"activity": {"activity_type": "tennis", "category": "sports", "intensity": "moderate", '
+            '"duration_estimate_minutes": 60, "calories_estimate": 400, "should_count_as_workout": true, '
+            '"confidence": 0.9}, '
+            '"life_context": {"context_type": "stress", "severity": "moderate", "affects_training": true, '
+            '"affects_nutrition": false, "suggested_adaptation": "Lower volume", "confidence": 0.8}}\n```'
+        )
+
+        result = await process_message_for_context(
+            "Played tennis for an hour but I'm so stressed at work", "user-1", "msg-1"
+        )
+
+        assert llm.messages.create.call_count == 1
+        assert result["llm_calls"] == 1
+        assert result["sentiment_score"] == -0.4
+        assert result["informal_activity"]["activity_type"] == "tennis"
+        assert result["life_context"]["context_type"] == "stress"
+        assert result["life_context"]["sentiment_score"] == -0.4
+
+    @pytest.mark.asyncio
+    async def test_low_confidence_and_nulls_store_nothing(self, llm, db):
+        llm.messages.create.return_value = _reply(
+            '{"sentiment": 0.8, "activity": null, '
+            '"life_context": {"context_type": "energy", "confidence": 0.2}}'
+        )
+
+        result = await process_message_for_context("Feeling amazing about my progress", "user-1")
+
+        assert result["sentiment_score"] == 0.8
+        assert result["informal_activity"] is None and result["life_context"] is None
+        db.table.assert_not_called()
+
+    @pytest.mark.asyncio
+    async def test_bad_reply_is_neutral(self, llm, db):
+        llm.messages.create.return_value = _reply("Sorry, I can't help with that.")
+
+        result = await process_message_for_context("I'm exhausted after that long flight", "user-1")
+
+        assert result["sentiment_score"] == 0.0
+        assert result["informal_activity"] is None
+
+    @pytest.mark.asyncio
+    async def test_repeated_message_served_from_cache(self, llm, db, cache):
+        llm.messages.create.return_value = _reply('{"sentiment": 0.5, "activity": null, "life_context": null}')
+
+        first = await process_message_for_context("Went for a  long WALK today", "user-1")
+        second = await process_message_for_context("went for a long walk today", "user-2")
+
+        assert llm.messages.create.call_count == 1
+        assert llm.messages.create.call_args.kwargs["temperature"] == 0
+        assert (first["llm_calls"], second["llm_calls"]) == (1, 0)
+        assert second["sentiment_score"] == 0.5
+        assert cache.stats["hits"] == 1
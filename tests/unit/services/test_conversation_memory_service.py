@@ -0,0 +1,247 @@
+"""
+Unit tests for conversation memory: rolling summaries and budget packing.
+
+Supabase is replaced by a small in-memory fake that understands the
+query-builder calls these services use; the LLM is mocked.
+"""
+
+import pytest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services.conversation_memory_service import ConversationMemoryService, importance_tags
+from app.services.conversation_summary_service import (
+    SUMMARY_MIN_BATCH,
+    ConversationSummaryService,
+)
+from app.services.token_budget import count_tokens
+
+
+class FakeQuery:
+    def __init__(self, db, table):
+        self.db = db
+        self.table_name = table
+        self.filters = []
+        self.desc = False
+        self.window = None
+        self.row_limit = None
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    @property
+    def not_(self):
+        return SimpleNamespace(
+            is_=lambda column, value: self._add(lambda row: row.get(column) is not None)
+        )
+
+    def _add(self, row_filter):
+        self.filters.append(row_filter)
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(lambda row: row[column] < value)
+        return self
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row[column] > value)
+        return self
+
+    def order(self, column, desc=False):
+        self.desc = desc
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end)
+        return self
+
+    def limit(self, count):
+        self.row_limit = count
+        return self
+
+    def upsert(self, row, on_conflict=None):
+        rows = self.db.tables.setdefault(self.table_name, [])
+        rows[:] = [r for r in rows if r[on_conflict] != row[on_conflict]] + [dict(row)]
+        self.db.upserts.append(row)
+        return self
+
+    def execute(self):
+        rows = [r for r in self.db.tables.get(self.table_name, []) if all(f(r) for f in self.filters)]
+        if self.table_name == "coach_messages":
+            rows.sort(key=lambda r: r["created_at"], reverse=self.desc)
+        if self.window:
+            rows = rows[self.window[0]:self.window[1] + 1]
+        if self.row_limit is not None:
+            rows = rows[:self.row_limit]
+        return SimpleNamespace(data=rows)
+
+
+class FakeSupabase:
+    def __init__(self, tables):
+        self.tables = tables
+        self.upserts = []
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+def _messages(count, conversation_id="conv-1", length=40, token_count=None):
+    return [
+        {
+            "id": f"m{i:03d}",
+            "conversation_id": conversation_id,
+            "user_id": "user-1",
+            "role": "user" if i % 2 == 0 else "assistant",
+            "content": f"message {i:03d} " + "x" * length,
+            "ai_model": None,
+            "token_count": token_count,
+            "importance_tags": None,
+            "created_at": f"2026-10-18T10:{i // 60:02d}:{i % 60:02d}+00:00",
+        }
+        for i in range(count)
+    ]
+
+
+def _llm(summary="- Goal: lose 5kg"):
+    client = MagicMock()
+    client.chat.completions.create = AsyncMock(return_value=SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=summary))],
+        usage=SimpleNamespace(prompt_tokens=900, completion_tokens=60),
+    ))
+    return client
+
+
+class TestConversationSummaryService:
+    """Test incremental summarization."""
+
+    @pytest.mark.asyncio
+    async def test_no_llm_call_until_enough_messages_aged_out(self):
+        db = FakeSupabase({"coach_messages": _messages(10 + SUMMARY_MIN_BATCH - 1)})
+        llm = _llm()
+
+        result = await ConversationSummaryService(db, llm_client=llm).update_summary("conv-1")
+
+        assert result["updated"] is False
+        llm.chat.completions.create.assert_not_awaited()
+
+    @pytest.mark.asyncio
+    async def test_folds_aged_out_messages_and_advances_watermark(self):
+        messages = _messages(20)
+        db = FakeSupabase({"coach_messages": messages})
+        llm = _llm()
+
+        result = await ConversationSummaryService(db, llm_client=llm).update_summary("conv-1")
+
+        assert result == {"updated": True, "messages_folded": 10, "summary": "- Goal: lose 5kg"}
+        prompt = llm.chat.completions.create.await_args.kwargs["messages"][0]["content"]
+        assert "message 009" in prompt and "message 010" not in prompt  # Tier 1 stays verbatim
+        (row,) = db.tables["conversation_summaries"]
+        assert row["summarized_through"] == messages[9]["created_at"]
+        assert row["summarized_message_count"] == 10
+
+    @pytest.mark.asyncio
+    async def test_update_is_incremental(self):
+        messages = _messages(30)
+        db = FakeSupabase({
+            "coach_messages": messages,
+            "conversation_summaries": [{
+                "conversation_id": "conv-1",
+                "summary": "- Allergic to peanuts",
+                "token_count": 8,
+                "summarized_through": messages[9]["created_at"],
+                "summarized_message_count": 10,
+                "cost_usd": 0.0001,
+            }],
+        })
+        llm = _llm("- Allergic to peanuts\n- Goal: lose 5kg")
+
+        result = await ConversationSummaryService(db, llm_client=llm).update_summary("conv-1")
+
+        assert result["messages_folded"] == 10
+        prompt = llm.chat.completions.create.await_args.kwargs["messages"][0]["content"]
+        assert "- Allergic to peanuts" in prompt
+        assert "message 009" not in prompt and "message 010" in prompt
+        assert db.upserts[-1]["summarized_message_count"] == 20
+
+
+class TestMemoryPacking:
+    """Test summary + recent turns packed into the token budget."""
+
+    @pytest.mark.asyncio
+    async def test_summary_and_newest_messages_fit_budget(self):
+        db = FakeSupabase({
+            "coach_messages": _messages(25, token_count=96),  # 100 tokens each with overhead
+            "conversation_summaries": [{"conversation_id": "conv-1", "summary": "s" * 400}],
+        })
+        memory = ConversationMemoryService(db)
+        budget = count_tokens("s" * 400) + 550
+
+        context = await memory.get_conversation_context("user-1", "conv-1", "hi", token_budget=budget)
+
+        assert context["summary"] == "s" * 400
+        assert context["summary_tokens"] == count_tokens("s" * 400)
+        assert [m["id"] for m in context["recent_messages"]] == ["m020", "m021", "m022", "m023", "m024"]
+        assert context["token_count"] <= budget
+
+    @pytest.mark.asyncio
+    async def test_messages_waiting_for_a_summary_batch_stay_verbatim(self):
+        messages = _messages(25, token_count=10)
+        db = FakeSupabase({
+            "coach_messages": messages,
+            "conversation_summaries": [{
+                "conversation_id": "conv-1",
+                "summary": "- Goal: lose 5kg",
+                "summarized_through": messages[9]["created_at"],
+            }],
+        })
+
+        context = await ConversationMemoryService(db).get_conversation_context("user-1", "conv-1", "hi")
+
+        # m010-m014 are out of the last 10 but not yet summarized (partial batch)
+        assert [m["id"] for m in context["recent_messages"]] == [f"m{i:03d}" for i in range(10, 25)]
+        assert context["summary"] == "- Goal: lose 5kg"
+
+    @pytest.mark.asyncio
+    async def test_short_conversation_has_no_summary(self):
+        db = FakeSupabase({"coach_messages": _messages(4)})
+
+        context = await ConversationMemoryService(db).get_conversation_context("user-1", "conv-1", "hi")
+
+        assert context["summary"] is None
+        assert len(context["recent_messages"]) == 4
+
+
+class TestImportantContext:
+    """Test Tier 2 recall of messages tagged at write time."""
+
+    def test_importance_tags(self):
+        assert importance_tags("I'm allergic to peanuts and trying to lose 5kg") == ["medical", "goal"]
+        assert importance_tags("Thanks, sounds good") is None
+
+    @pytest.mark.asyncio
+    async def test_tagged_messages_recalled_from_whole_conversation(self):
+        rows = _messages(120, token_count=10)
+        rows[3].update(content="I'm allergic to peanuts", importance_tags=["medical"])
+        rows[115].update(content="Peanut allergy again", importance_tags=["medical"])  # In Tier 1
+        db = FakeSupabase({"coach_messages": rows})
+
+        context = await ConversationMemoryService(db).get_conversation_context(
+            "user-1", "conv-1", "What should I avoid with my allergy?"
+        )
+
+        assert context["has_important_keywords"] is True
+        assert [m["id"] for m in context["important_context"]] == ["m003"]
+
+    @pytest.mark.asyncio
+    async def test_no_recall_without_important_keywords(self):
+        rows = _messages(30, token_count=10)
+        rows[0].update(importance_tags=["goal"])
+        db = FakeSupabase({"coach_messages": rows})
+
+        context = await ConversationMemoryService(db).get_conversation_context("user-1", "conv-1", "hi")
+
+        assert context["important_context"] == []
@@ -0,0 +1,260 @@
+"""
+Unit tests for micro-batched message embedding.
+
+Uses the deterministic HashingEmbedder and fake Supabase/Redis clients;
+nothing calls OpenAI.
+"""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from app.services import embedding_service
+from app.services.embedding_service import (
+    EMBEDDING_CONTENT_CHARS,
+    EMBEDDING_MAX_ATTEMPTS,
+    EmbeddingPipeline,
+    EmbeddingQueue,
+    HashingEmbedder,
+    content_hash,
+)
+
+
+class CountingEmbedder(HashingEmbedder):
+    def __init__(self):
+        self.calls = []
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        return super().embed(texts)
+
+
+class RejectedInput(Exception):
+    status_code = 400
+
+
+class RejectingEmbedder(CountingEmbedder):
+    """Rejects any request containing a text with "poison" in it (like a 400)."""
+
+    def embed(self, texts):
+        self.calls.append(list(texts))
+        if any("poison" in text for text in texts):
+            raise RejectedInput("invalid input")
+        return HashingEmbedder.embed(self, texts)
+
+
+class ForeignKeyViolation(Exception):
+    code = "23503"
+
+
+class FakeQuery:
+    def __init__(self, db):
+        self.db = db
+        self.payload = None
+
+    def select(self, columns):
+        return self
+
+    def in_(self, column, values):
+        self.payload = ("select", set(values))
+        return self
+
+    def insert(self, rows):
+        self.payload = ("insert", rows)
+        return self
+
+    def execute(self):
+        action, value = self.payload
+        if action == "select":
+            return SimpleNamespace(data=[r for r in self.db.rows if r["message_id"] in value])
+        self.db.inserts.append(value)
+        if any(row["message_id"] in self.db.missing_messages for row in value):
+            raise ForeignKeyViolation("insert violates foreign key constraint")
+        self.db.rows.extend(value)
+        return SimpleNamespace(data=value)
+
+
+class FakeSupabase:
+    def __init__(self, rows=None):
+        self.rows = rows or []
+        self.inserts = []
+        self.missing_messages = set()
+
+    def table(self, name):
+        return FakeQuery(self)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.lists = {}
+
+    def rpush(self, key, *values):
+        self.lists.setdefault(key, []).extend(values)
+        return len(self.lists[key])
+
+    def lpop(self, key, count):
+        items = self.lists.get(key, [])
+        popped, self.lists[key] = items[:count], items[count:]
+        return popped or None
+
+    def llen(self, key):
+        return len(self.lists.get(key, []))
+
+
+def _item(i, content=None, user_id="user-1"):
+    return {
+        "message_id": f"m{i}",
+        "user_id": user_id,
+        "role": "user",
+        "content": content or f"message number {i} about protein and sleep",
+    }
+
+
+class TestHashingEmbedder:
+    """Test the deterministic local embedder."""
+
+    def test_deterministic_normalized_and_word_sensitive(self):
+        embedder = HashingEmbedder()
+        (a, b, c), tokens = embedder.embed(["high protein breakfast", "protein breakfast ideas", "knee pain running"])
+
+        assert embedder.embed(["high protein breakfast"])[0][0] == a
+        assert np.isclose(np.linalg.norm(a), 1.0)
+        assert np.dot(a, b) > np.dot(a, c)
+        assert tokens == 9
+
+
+class TestEmbeddingPipeline:
+    """Test batching, dedupe and bulk storage."""
+
+    def test_batches_dedupes_and_bulk_inserts(self):
+        db = FakeSupabase()
+        embedder = CountingEmbedder()
+        items = [_item(i) for i in range(5)] + [_item(5, "Same text"), _item(6, "  same   TEXT ")]
+
+        result = EmbeddingPipeline(db, embedder=embedder, batch_size=4).run(items)
+
+        assert [len(call) for call in embedder.calls] == [4, 2]  # 6 unique texts
+        assert result["stored"] == 7 and result["embedded"] == 6 and result["api_calls"] == 2
+        assert len(db.inserts) == 1
+        duplicate_rows = [r for r in db.rows if r["message_id"] in ("m5", "m6")]
+        assert duplicate_rows[0]["embedding"] == duplicate_rows[1]["embedding"]
+
+    def test_skips_already_embedded_and_repeated_ids(self):
+        db = FakeSupabase(rows=[{"message_id": "m0"}])
+        embedder = CountingEmbedder()
+
+        result = EmbeddingPipeline(db, embedder=embedder).run([_item(0), _item(1), _item(1)])
+
+        assert embedder.calls == [[_item(1)["content"]]]
+        assert result["stored"] == 1
+
+    def test_content_seen_in_earlier_run_is_not_reembedded(self):
+        embedder = CountingEmbedder()
+        pipeline = EmbeddingPipeline(FakeSupabase(), embedder=embedder)
+
+        pipeline.run([_item(0, "I want to run a marathon")])
+        result = pipeline.run([_item(1, "i want to run a marathon")])
+
+        assert len(embedder.calls) == 1
+        assert result == {
+            "stored": 1, "embedded": 0, "api_calls": 0, "tokens_used": 0, "cost_usd": 0.0,
+            "rejected": [], "refused": []
+        }
+
+    def test_requests_are_capped_by_tokens_and_inputs_truncated(self, monkeypatch):
+        monkeypatch.setattr(embedding_service, "EMBEDDING_MAX_REQUEST_TOKENS", 1500)
+        embedder = CountingEmbedder()
+        items = [_item(i, f"{i} " + "protein " * 2000) for i in range(3)]
+
+        result = EmbeddingPipeline(FakeSupabase(), embedder=embedder).run(items)
+
+        assert [len(call) for call in embedder.calls] == [2, 1]
+        assert all(len(text) == EMBEDDING_CONTENT_CHARS for call in embedder.calls for text in call)
+        assert result["stored"] == 3 and result["api_calls"] == 2
+
+    def test_rejected_input_is_isolated_and_the_rest_stored(self):
+        db = FakeSupabase()
+        embedder = RejectingEmbedder()
+        items = [_item(i) for i in range(7)] + [_item(7, "poison pill message")]
+
+        result = EmbeddingPipeline(db, embedder=embedder).run(items)
+
+        assert result["stored"] == 7
+        assert [item["message_id"] for item in result["rejected"]] == ["m7"]
+        assert "m7" not in {row["message_id"] for row in db.rows}
+        assert result["api_calls"] == len(embedder.calls) == 7  # 1 + halving down to the bad input
+
+    def test_refused_row_is_isolated_and_the_rest_stored(self):
+        db = FakeSupabase()
+        db.missing_messages = {"m5"}
+
+        result = EmbeddingPipeline(db, embedder=HashingEmbedder()).run([_item(i) for i in range(8)])
+
+        assert result["stored"] == 7
+        assert [item["message_id"] for item in result["refused"]] == ["m5"]
+        assert result["rejected"] == []
+        assert "m5" not in {row["message_id"] for row in db.rows}
+        assert len(db.inserts) == 7  # 1 + halving down to the bad row
+
+    def test_insert_errors_other_than_refused_rows_propagate(self):
+        class DownQuery(FakeQuery):
+            def execute(self):
+                if self.payload[0] == "insert":
+                    raise ConnectionError("db down")
+                return super().execute()
+
+        db = FakeSupabase()
+        db.table = lambda name: DownQuery(db)
+        with pytest.raises(ConnectionError):
+            EmbeddingPipeline(db, embedder=HashingEmbedder()).run([_item(i) for i in range(4)])
+
+    def test_service_errors_propagate_without_splitting(self):
+        class Down(CountingEmbedder):
+            def embed(self, texts):
+                self.calls.append(texts)
+                raise ConnectionError("api down")
+
+        embedder = Down()
+        with pytest.raises(ConnectionError):
+            EmbeddingPipeline(FakeSupabase(), embedder=embedder).run([_item(i) for i in range(8)])
+        assert len(embedder.calls) == 1
+
+    def test_stored_rows_update_vector_index_per_user(self):
+        calls = []
+        index = SimpleNamespace(add_embeddings=lambda user_id, rows: calls.append((user_id, len(rows))))
+
+        EmbeddingPipeline(FakeSupabase(), embedder=HashingEmbedder(), vector_index=index).run(
+            [_item(0), _item(1, user_id="user-2"), _item(2)]
+        )
+
+        assert sorted(calls) == [("user-1", 2), ("user-2", 1)]
+
+
+class TestEmbeddingQueue:
+    """Test the Redis-backed queue."""
+
+    def test_push_and_pop_in_order(self):
+        queue = EmbeddingQueue(FakeRedis())
+
+        assert queue.push(_item(0), _item(1)) == 2
+        assert queue.push(_item(2)) == 3
+        assert [item["message_id"] for item in queue.pop_batch(2)] == ["m0", "m1"]
+        assert len(queue) == 1
+        assert queue.pop_batch(5)[0]["message_id"] == "m2"
+        assert queue.pop_batch(5) == []
+
+    def test_retry_counts_attempts_then_dead_letters(self):
+        redis = FakeRedis()
+        queue = EmbeddingQueue(redis)
+        items = [_item(0), {**_item(1), "attempts": EMBEDDING_MAX_ATTEMPTS - 1}]
+
+        assert queue.retry(items, error="timeout") == (1, 1)
+
+        requeued = queue.pop_batch(5)
+        assert [(item["message_id"], item["attempts"]) for item in requeued] == [("m0", 1)]
+        assert len(redis.lists[queue.dead_letter_key]) == 1
+
+
+def test_content_hash_ignores_case_and_whitespace():
+    assert content_hash("Hello  World\n") == content_hash("hello world")
@@ -0,0 +1,125 @@
+"""
+Unit tests for the zero-LLM fast path.
+
+Covers canned/data lane routing, confidence thresholds and template
+rendering (i18n is faked with the English fallbacks).
+"""
+
+import pytest
+from datetime import date, timedelta
+from unittest.mock import MagicMock
+
+from app.services.fast_path_service import CANNED_LANE, DATA_LANE, FastPathService
+
+
+@pytest.fixture
+def fast_path():
+    i18n = MagicMock()
+
+    def t(key, language="en", params=None, fallback=None):
+        text = fallback or key
+        for name, value in (params or {}).items():
+            text = text.replace(f"{{{name}}}", str(value))
+        return text
+
+    i18n.t.side_effect = t
+    return FastPathService(i18n)
+
+
+def _summary(meal_count=3):
+    return {
+        "date": date.today().isoformat(),
+        "meal_count": meal_count,
+        "totals": {"calories": 1450, "protein_g": 96.5, "carbs_g": 150.0, "fat_g": 40.2},
+        "goals": {"calories": 2200, "protein_g": 160},
+        "progress": {"calories_percent": 66, "protein_percent": 60},
+    }
+
+
+class TestCannedLane:
+    """Test routing of trivial messages."""
+
+    @pytest.mark.parametrize("message, intent", [
+        ("thanks!", "canned.thanks"),
+        ("Thank you so much 🙏", "canned.thanks"),
+        ("ok cool", "canned.acknowledgment"),
+        ("ok thanks, bye coach", "canned.goodbye"),
+        ("Hey there", "canned.greeting"),
+        ("valeu", "canned.thanks"),
+    ])
+    def test_trivial_messages_match(self, fast_path, message, intent):
+        match = fast_path.route(message)
+
+        assert match.lane == CANNED_LANE
+        assert match.intent == intent
+
+    @pytest.mark.parametrize("message", [
+        "thanks, but how much protein do I need?",
+        "ok so what should I eat for dinner",
+        "hi, I ate 2 eggs",
+        "great workout today",
+    ])
+    def test_anything_more_falls_through(self, fast_path, message):
+        assert fast_path.route(message) is None
+
+    def test_acknowledging_a_question_falls_through(self, fast_path):
+        assert fast_path.route("ok", previous_reply="Want me to log that as lunch?") is None
+        assert fast_path.route("ok", previous_reply="Nice work today!").lane == CANNED_LANE
+
+    def test_renders_i18n_canned_response(self, fast_path):
+        fast_path.render(fast_path.route("thanks"), "pt")
+
+        assert fast_path.i18n.t.call_args.args == ("canned.thanks", "pt")
+
+
+class TestDataLane:
+    """Test own-totals lookups."""
+
+    @pytest.mark.parametrize("message, nutrients", [
+        ("how much protein today?", ("protein",)),
+        ("How many calories have I eaten so far", ("calories",)),
+        ("what are my carbs and fat today", ("carbs", "fat")),
+    ])
+    def test_own_totals_match(self, fast_path, message, nutrients):
+        match = fast_path.route(message)
+
+        assert match.lane == DATA_LANE
+        assert match.tool_name == "get_daily_nutrition_summary"
+        assert match.tool_input == {}
+        assert match.nutrients == nutrients
+
+    def test_yesterday_passes_date(self, fast_path):
+        match = fast_path.route("how much protein did I have yesterday?")
+
+        assert match.tool_input == {"date": (date.today() - timedelta(days=1)).isoformat()}
+        assert match.day == "yesterday"
+
+    @pytest.mark.parametrize("message", [
+        "how much protein in chicken breast?",
+        "how much protein should I eat today?",
+        "how many calories did I burn today",
+        "how much protein do I need",
+        "how many calories",  # No day or self reference: below threshold
+    ])
+    def test_advice_and_food_questions_fall_through(self, fast_path, message):
+        assert fast_path.route(message) is None
+
+    def test_renders_totals_against_goals(self, fast_path):
+        match = fast_path.route("how many calories and protein today?")
+
+        text = fast_path.render(match, "en", _summary())
+
+        assert text == (
+            "Today: 1450 kcal of your 2200 kcal goal (66%). "
+            "Today: 96.5g protein of your 160g goal (60%)."
+        )
+
+    def test_nothing_logged(self, fast_path):
+        match = fast_path.route("how much protein today")
+
+        assert fast_path.render(match, "en", _summary(meal_count=0)) == "Today: no meals logged."
+
+    def test_tool_error_falls_through(self, fast_path):
+        match = fast_path.route("how much protein today")
+
+        assert fast_path.render(match, "en", {"error": "timeout"}) is None
@@ -0,0 +1,219 @@
+"""
+Unit tests for the food catalog snapshot and FoodCatalogService.
+
+Snapshots are written to a temporary directory; Supabase is mocked.
+"""
+
+import pytest
+from uuid import uuid4
+from unittest.mock import MagicMock, Mock
+
+from app.services.food_catalog_service import FoodCatalogService
+from ultimate_ai_consultation.libs.food_catalog import (
+    FoodCatalogSnapshot,
+    latest_snapshot_path,
+    write_snapshot,
+)
+from ultimate_ai_consultation.services.program_generator.meal_assembler import (
+    DietaryPreference,
+    FoodItem,
+    MacroTargets,
+    MealAssembler,
+    classify_food_groups,
+)
+
+
+def _food(name, kcal, protein, carbs, fat, updated_at="2025-10-16T12:00:00+00:00", servings=None, **extra):
+    food_id = str(uuid4())
+    return {
+        "id": food_id,
+        "name": name,
+        "name_pt": None,
+        "brand_name": None,
+        "food_type": "ingredient",
+        "dietary_flags": None,
+        "calories_per_100g": kcal,
+        "protein_g_per_100g": protein,
+        "carbs_g_per_100g": carbs,
+        "fat_g_per_100g": fat,
+        "fiber_g_per_100g": None,
+        "sugar_g_per_100g": 0,
+        "sodium_mg_per_100g": None,
+        "is_public": True,
+        "verified": True,
+        "usage_count": 0,
+        "created_at": "2025-10-01T00:00:00+00:00",
+        "updated_at": updated_at,
+        "food_servings": [
+            {"id": str(uuid4()), "food_id": food_id, **serving} for serving in servings or []
+        ],
+        **extra,
+    }
+
+
+@pytest.fixture
+def foods():
+    return [
+        _food("Chicken Breast", 165, 31, 0, 3.6, servings=[
+            {"serving_size": 1, "serving_unit": "breast", "serving_label": "medium",
+             "grams_per_serving": 174, "is_default": True, "display_order": 0,
+             "created_at": "2025-10-01T00:00:00+00:00"},
+        ], usage_count=40),
+        _food("Arroz Branco", 130, 2.7, 28, 0.3, name_pt="Arroz Branco", brand_name="Tio João",
+              updated_at="2025-10-17T08:30:00.5+00:00"),
+        _food("Broccoli", 34, 2.8, 7, 0.4),
+        _food("Olive Oil", 884, 0, 0, 100),
+    ]
+
+
+class TestSnapshotFormat:
+    """Test write/load round trip."""
+
+    def test_round_trip_rows_and_servings(self, tmp_path, foods):
+        path = write_snapshot(str(tmp_path), foods)
+        snapshot = FoodCatalogSnapshot(path)
+
+        assert len(snapshot) == 4
+        assert snapshot.meta["version"] == "2025-10-17T08:30:00.500000+00:00"
+
+        rice = snapshot.get(foods[1]["id"])
+        assert rice["brand_name"] == "Tio João"
+        assert rice["fiber_g_per_100g"] is None
+        assert rice["carbs_g_per_100g"] == 28.0
+        assert rice["food_servings"] == []
+
+        chicken = snapshot.get(foods[0]["id"])
+        (serving,) = chicken["food_servings"]
+        assert serving["grams_per_serving"] == 174.0
+        assert serving["serving_label"] == "medium"
+        assert serving["is_default"] is True
+        assert chicken["usage_count"] == 40
+
+    def test_latest_snapshot_wins_and_old_ones_are_pruned(self, tmp_path, foods):
+        for day in ("17", "18", "19"):
+            foods[0]["updated_at"] = f"2025-10-{day}T00:00:00+00:00"
+            write_snapshot(str(tmp_path), foods)
+
+        latest = FoodCatalogSnapshot.load_latest(str(tmp_path))
+
+        assert latest.meta["version"].startswith("2025-10-19")
+        assert len([p for p in tmp_path.iterdir() if p.name.startswith("v")]) == 2
+
+    def test_empty_directory_has_no_snapshot(self, tmp_path):
+        assert latest_snapshot_path(str(tmp_path / "missing")) is None
+
+
+class TestFoodCatalogService:
+    """Test snapshot + delta reads."""
+
+    def _client(self, pages):
+        client = MagicMock()
+        query = client.table.return_value.select.return_value.eq.return_value
+        query.gt.return_value = query
+        query.order.return_value.range.return_value.execute.side_effect = [Mock(data=page) for page in pages]
+        return client, query
+
+    @pytest.mark.asyncio
+    async def test_delta_overrides_snapshot_rows(self, tmp_path, foods):
+        write_snapshot(str(tmp_path), foods)
+        updated = {**foods[2], "name": "Broccoli (steamed)", "updated_at": "2025-10-18T00:00:00+00:00"}
+        client, query = self._client([[updated], [{"id": f["id"]} for f in foods]])
+        service = FoodCatalogService(client=client, directory=str(tmp_path))
+
+        rows = await service.get_public_rows(with_servings=False)
+
+        names = sorted(row["name"] for row in rows)
+        assert names == ["Arroz Branco", "Broccoli (steamed)", "Chicken Breast", "Olive Oil"]
+        assert all("food_servings" not in row for row in rows)
+        query.gt.assert_called_once_with("updated_at", "2025-10-17T08:30:00.500000+00:00")
+
+    @pytest.mark.asyncio
+    async def test_foods_no_longer_public_are_dropped(self, tmp_path, foods):
+        write_snapshot(str(tmp_path), foods)
+        # Olive oil was deleted and rice made private after the export
+        client, _ = self._client([[], [{"id": f["id"]} for f in foods[:3] if f is not foods[1]]])
+        service = FoodCatalogService(client=client, directory=str(tmp_path))
+
+        rows = await service.get_public_rows()
+
+        assert sorted(row["name"] for row in rows) == ["Broccoli", "Chicken Breast"]
+        client.table.return_value.select.assert_called_with("id")
+
+    @pytest.mark.asyncio
+    async def test_exports_snapshot_when_none_exists(self, tmp_path, foods):
+        client, query = self._client([foods])
+        service = FoodCatalogService(client=client, directory=str(tmp_path))
+
+        rows = await service.get_public_rows()
+
+        assert len(rows) == 4
+        assert latest_snapshot_path(str(tmp_path)) is not None
+        query.gt.assert_not_called()
+
+
+class TestMealAssemblerCatalog:
+    """Test meal planning from the catalog snapshot."""
+
+    def test_classify_food_groups(self, foods):
+        nutrients = [
+            [f["calories_per_100g"], f["protein_g_per_100g"], f["carbs_g_per_100g"],
+             f["fat_g_per_100g"], 0, 0, 0]
+            for f in foods
+        ]
+        assert classify_food_groups(nutrients).tolist() == ["protein", "grain", "vegetable", "fat"]
+
+    def test_uses_catalog_foods_with_real_ids(self, tmp_path, foods):
+        snapshot = FoodCatalogSnapshot(write_snapshot(str(tmp_path), foods))
+
+        assembler = MealAssembler(catalog=snapshot)
+
+        assert {f.food_id for f in assembler.foods_db} == {f["id"] for f in foods}
+        plan = assembler.generate_daily_meal_plan(
+            targets=MacroTargets(calories=2000, protein_g=150, carbs_g=200, fat_g=60),
+            training_day=False,
+        )
+        assert plan.meals
+
+    def test_falls_back_to_templates_without_core_groups(self, tmp_path, foods):
+        snapshot = FoodCatalogSnapshot(write_snapshot(str(tmp_path), foods[:1]))
+
+        assembler = MealAssembler(catalog=snapshot)
+
+        assert assembler.foods_db is assembler.template_foods
+
+    @pytest.mark.parametrize("allergen,names", [
+        ("dairy", ["Whey Protein", "Butter", "Heavy Cream", "Milk"]),
+        ("nuts", ["Cashews", "Walnuts", "Pecans", "Almonds"]),
+        ("shellfish", ["Lobster", "Prawns", "Scallops", "Shrimp"]),
+    ])
+    def test_catalog_foods_without_allergen_free_flag_are_excluded(self, allergen, names):
+        catalog_foods = [
+            FoodItem(food_id=str(uuid4()), name=name, calories=100, protein_g=10, carbs_g=0, fat_g=5,
+                     fiber_g=0, serving_size="100g", serving_size_g=100, food_group="protein", tags=[])
+            for name in names
+        ]
+
+        filtered = MealAssembler()._apply_filters(catalog_foods, DietaryPreference.NONE, [allergen])
+
+        assert filtered == []
+
+    def test_catalog_foods_with_allergen_free_flag_are_kept(self):
+        oat_milk = FoodItem(food_id=str(uuid4()), name="Oat Milk", calories=45, protein_g=1, carbs_g=7,
+                            fiber_g=1, fat_g=1.5, serving_size="100g", serving_size_g=100,
+                            food_group="grain", tags=["vegan", "dairy_free", "nut_free"])
+
+        filtered = MealAssembler()._apply_filters([oat_milk], DietaryPreference.NONE, ["Dairy", "nuts"])
+
+        assert filtered == [oat_milk]
+
+    def test_allergies_fall_back_to_screened_templates(self, tmp_path, foods):
+        foods.append(_food("Whey Protein Isolate", 370, 90, 2, 1))
+        snapshot = FoodCatalogSnapshot(write_snapshot(str(tmp_path), foods))
+        assembler = MealAssembler(catalog=snapshot)
+
+        available = assembler._filter_foods(DietaryPreference.NONE, ["dairy", "nuts"])
+
+        assert all(f.curated for f in available)
+        names = {f.name for f in available}
+        assert "Whey Protein Isolate" not in names
+        assert not names & {"Greek Yogurt (non-fat)", "Cottage Cheese (low-fat)", "Almonds"}
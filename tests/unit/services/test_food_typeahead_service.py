@@ -0,0 +1,157 @@
+"""
+Unit tests for FoodTypeaheadService.
+
+Tests the in-memory prefix index, popularity ranking, personal-lane merging
+and superseded-request handling. Supabase is never touched.
+"""
+
+import asyncio
+import pytest
+from uuid import uuid4
+from unittest.mock import AsyncMock, patch
+
+from app.services.food_typeahead_service import (
+    FoodPrefixIndex,
+    FoodTypeaheadService,
+    normalize_text,
+)
+
+
+def _food_row(name, usage_count=0, verified=False, **extra):
+    return {
+        "id": str(uuid4()),
+        "name": name,
+        "brand_name": None,
+        "calories_per_100g": 100,
+        "usage_count": usage_count,
+        "verified": verified,
+        **extra,
+    }
+
+
+@pytest.fixture
+def index():
+    return FoodPrefixIndex([
+        _food_row("Chicken Breast, Grilled", usage_count=500, verified=True),
+        _food_row("Chickpeas, Canned", usage_count=50),
+        _food_row("Fried Chicken", usage_count=900),
+        _food_row("Pão de Queijo, Cheese Bread", name_pt="Pão de Queijo"),
+        _food_row("Big Mac", brand_name="McDonald's"),
+    ])
+
+
+class TestFoodPrefixIndex:
+    """Test prefix matching and ranking."""
+
+    def test_normalize_strips_accents(self):
+        assert normalize_text("Pão de Açaí") == "pao de acai"
+
+    def test_prefix_match_on_any_token(self, index):
+        names = [s["name"] for s in index.search("chick", limit=10)]
+        assert set(names) == {"Chicken Breast, Grilled", "Chickpeas, Canned", "Fried Chicken"}
+
+    def test_name_prefix_ranks_before_popularity(self, index):
+        names = [s["name"] for s in index.search("chick", limit=10)]
+        # "Fried Chicken" is the most used but does not START with the query
+        assert names[-1] == "Fried Chicken"
+        assert names[0] == "Chicken Breast, Grilled"
+
+    def test_all_tokens_must_match(self, index):
+        names = [s["name"] for s in index.search("chi gri", limit=10)]
+        assert names == ["Chicken Breast, Grilled"]
+
+    def test_accent_insensitive_and_brand_match(self, index):
+        assert index.search("pao", limit=5)[0]["name"] == "Pão de Queijo, Cheese Bread"
+        assert index.search("mcdon", limit=5)[0]["name"] == "Big Mac"
+
+    def test_suggestion_is_minimal(self, index):
+        suggestion = index.search("big", limit=1)[0]
+        assert set(suggestion) == {"id", "name", "brand_name", "calories_per_100g", "source"}
+        assert suggestion["calories_per_100g"] == 100.0
+
+
+class TestPopularityRanking:
+    """Test ranking from precomputed popularity signals."""
+
+    @pytest.fixture
+    def rows(self):
+        return [
+            _food_row("Chicken Breast", usage_count=900),
+            _food_row("Chicken Thigh", usage_count=10),
+            _food_row("Chicken Coxinha", usage_count=0),
+        ]
+
+    def test_global_scores_replace_usage_count(self, rows):
+        breast, thigh, coxinha = (row["id"] for row in rows)
+        index = FoodPrefixIndex(rows, {"global": {thigh: 40.0, coxinha: 5.0}})
+
+        names = [s["name"] for s in index.search("chicken", limit=3)]
+
+        # Stale usage_count no longer wins; foods without recent logs go last
+        assert names == ["Chicken Thigh", "Chicken Coxinha", "Chicken Breast"]
+
+    def test_locale_scores_rank_first_for_that_locale(self, rows):
+        _, thigh, coxinha = (row["id"] for row in rows)
+        popularity = {"global": {thigh: 40.0, coxinha: 5.0}, "pt": {coxinha: 3.0}}
+        index = FoodPrefixIndex(rows, popularity)
+
+        assert index.search("chicken", limit=1, locale="pt")[0]["name"] == "Chicken Coxinha"
+        assert index.search("chicken", limit=1, locale="en")[0]["name"] == "Chicken Thigh"
+
+    def test_falls_back_to_usage_count_without_signals(self, rows):
+        index = FoodPrefixIndex(rows, {})
+        assert index.search("chicken", limit=1)[0]["name"] == "Chicken Breast"
+
+
+class TestFoodTypeaheadService:
+    """Test suggestion merging and cancellation."""
+
+    @pytest.mark.asyncio
+    async def test_personal_matches_come_first_and_dedupe(self, index):
+        service = FoodTypeaheadService()
+        service._index = index
+        service._index_loaded_at = float("inf")
+
+        recent_id = index.ids[0]  # Chicken Breast, also in the public index
+        user_entries = [
+            {"id": str(uuid4()), "name": "Chicken Rice Bowl", "brand_name": None,
+             "calories_per_100g": None, "source": "quick_meal", "_tokens": ["chicken", "rice", "bowl"]},
+            {"id": recent_id, "name": "Chicken Breast, Grilled", "brand_name": None,
+             "calories_per_100g": 100.0, "source": "recent", "_tokens": ["chicken", "breast", "grilled"]},
+        ]
+
+        with patch.object(service, "_get_user_entries", AsyncMock(return_value=user_entries)):
+            suggestions, superseded = await service.suggest(user_id="u1", query="chic", limit=10, locale="en")
+
+        assert superseded is False
+        assert [s["source"] for s in suggestions[:2]] == ["quick_meal", "recent"]
+        assert [s["id"] for s in suggestions].count(recent_id) == 1
+        assert all("_tokens" not in s for s in suggestions)
+
+    @pytest.mark.asyncio
+    async def test_newer_keystroke_supersedes_pending_request(self, index):
+        service = FoodTypeaheadService()
+        service._index = index
+        service._index_loaded_at = float("inf")
+
+        release = asyncio.Event()
+
+        async def slow_load(user_id):
+            await release.wait()
+            return []
+
+        with patch.object(service, "_load_user_entries", side_effect=slow_load) as load:
+            first = asyncio.create_task(service.suggest(user_id="u1", query="ch", limit=5, locale="en"))
+            await asyncio.sleep(0)
+            second = asyncio.create_task(service.suggest(user_id="u1", query="chi", limit=5, locale="en"))
+            await asyncio.sleep(0)
+            release.set()
+
+            _, first_superseded = await first
+            second_results, second_superseded = await second
+
+        assert first_superseded is True
+        assert second_superseded is False
+        assert len(second_results) == 3
+        # Both keystrokes shared one personal-lane load
+        assert load.call_count == 1
@@ -0,0 +1,80 @@
+"""
+Unit tests for the content-addressed LLM response cache.
+
+Covers key normalization, LRU bounds, savings accounting and the SQLite
+backend (persistence across cache instances).
+"""
+
+import sqlite3
+
+import pytest
+
+from ultimate_ai_consultation.libs.llm_cache import ResponseCache, cache_key
+
+MODEL = "claude-3-5-haiku-20241022"
+
+
+class TestCacheKey:
+    """Test content addressing."""
+
+    def test_case_and_whitespace_insensitive(self):
+        assert cache_key(MODEL, "v1", "2 eggs and  toast") == cache_key(MODEL, "v1", " 2 Eggs and toast\n")
+
+    def test_model_and_template_version_are_part_of_key(self):
+        key = cache_key(MODEL, "v1", "2 eggs and toast")
+
+        assert key != cache_key(MODEL, "v2", "2 eggs and toast")
+        assert key != cache_key("other-model", "v1", "2 eggs and toast")
+
+    def test_dict_inputs_ignore_key_order(self):
+        assert cache_key(MODEL, "v1", {"a": 1, "b": 2}) == cache_key(MODEL, "v1", {"b": 2, "a": 1})
+
+
+class TestResponseCache:
+    """Test the in-process layer and savings accounting."""
+
+    def test_hit_records_savings(self):
+        cache = ResponseCache()
+        cache.put("k", '{"log_type": "meal"}', input_tokens=1000, output_tokens=100, cost_usd=0.0012)
+
+        assert cache.get("missing") is None
+        assert cache.get("k").text == '{"log_type": "meal"}'
+        assert cache.get("k").output_tokens == 100
+        assert cache.stats == {"hits": 2, "misses": 1, "tokens_saved": 2200, "cost_saved_usd": pytest.approx(0.0024)}
+
+    def test_least_recently_used_entry_is_evicted(self):
+        cache = ResponseCache(max_entries=2)
+        cache.put("a", "A")
+        cache.put("b", "B")
+        cache.get("a")
+        cache.put("c", "C")
+
+        assert cache.get("b") is None
+        assert [cache.get(k).text for k in ("a", "c")] == ["A", "C"]
+
+    def test_unsupported_backend_url(self):
+        with pytest.raises(ValueError):
+            ResponseCache("memcached://localhost")
+
+
+class TestSQLiteBackend:
+    """Test the persistent backend."""
+
+    def test_entries_survive_a_new_process(self, tmp_path):
+        url = f"sqlite:///{tmp_path / 'llm.db'}"
+        ResponseCache(url).put("k", "null", input_tokens=500, output_tokens=2, cost_usd=0.0004)
+
+        reader = ResponseCache(url)
+        assert reader.get("k").text == "null"
+        reader.get("k")  # Served from memory, still counted
+
+        hits, tokens_saved = sqlite3.connect(tmp_path / "llm.db").execute(
+            "SELECT hits, tokens_saved FROM llm_cache WHERE key = 'k'"
+        ).fetchone()
+        assert (hits, tokens_saved) == (2, 1004)
+
+    def test_expired_entries_are_ignored(self, tmp_path):
+        url = f"sqlite:///{tmp_path / 'llm.db'}"
+        ResponseCache(url, ttl=-1).put("k", "stale")
+
+        assert ResponseCache(url, ttl=-1).get("k") is None
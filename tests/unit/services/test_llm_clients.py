@@ -0,0 +1,160 @@
+"""
+Unit tests for the shared LLM client factory.
+
+Covers retries with backoff, the circuit breaker state machine and that
+SDK clients fail fast (without sending) while the breaker is open.
+Network I/O is replaced with httpx.MockTransport.
+"""
+
+import httpx
+import pytest
+
+from ultimate_ai_consultation.libs import llm_clients
+from ultimate_ai_consultation.libs.llm_clients import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ProviderPool,
+    ResilientAsyncTransport,
+    ResilientTransport,
+    is_circuit_open_error,
+)
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(llm_clients, "BACKOFF_BASE_SECONDS", 0)
+
+
+def _pool(handler, failures=3, retries=2):
+    calls = []
+
+    def record(request):
+        calls.append(request)
+        return handler(len(calls))
+
+    pool = ProviderPool("test", transport=httpx.MockTransport(record))
+    pool.max_retries = retries
+    pool.breaker.failure_threshold = failures
+    return pool, calls
+
+
+class TestCircuitBreaker:
+    """Test breaker state transitions."""
+
+    def test_opens_after_consecutive_failures(self):
+        breaker = CircuitBreaker("p", failure_threshold=2, reset_timeout=60)
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        assert breaker.state == "closed"
+
+        breaker.record_failure()
+
+        assert breaker.state == "open"
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+
+    def test_half_open_allows_one_trial(self):
+        breaker = CircuitBreaker("p", failure_threshold=1, reset_timeout=0)
+        breaker.record_failure()
+
+        breaker.before_call()  # Trial
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()  # Concurrent caller fails fast
+
+        breaker.record_success()
+        assert breaker.state == "closed"
+
+    def test_failed_trial_reopens(self):
+        breaker = CircuitBreaker("p", failure_threshold=3, reset_timeout=0)
+        for _ in range(3):
+            breaker.record_failure()
+
+        breaker.before_call()
+        breaker.record_failure()
+        breaker.reset_timeout = 60
+
+        assert breaker.state == "open"
+
+
+class TestResilientTransport:
+    """Test retry and fail-fast behaviour."""
+
+    def test_retries_server_errors_then_succeeds(self):
+        pool, calls = _pool(lambda n: httpx.Response(503 if n < 3 else 200, json={"ok": True}))
+        client = httpx.Client(transport=ResilientTransport(pool))
+
+        response = client.post("https://llm.test/v1", json={"prompt": "hi"})
+
+        assert response.status_code == 200
+        assert len(calls) == 3
+        assert pool.breaker.state == "closed"
+
+    def test_client_errors_are_not_retried(self):
+        pool, calls = _pool(lambda n: httpx.Response(400))
+
+        response = httpx.Client(transport=ResilientTransport(pool)).get("https://llm.test/")
+
+        assert response.status_code == 400
+        assert len(calls) == 1
+
+    def test_open_breaker_fails_fast_without_sending(self):
+        def refuse(n):
+            raise httpx.ConnectError("refused")
+
+        pool, calls = _pool(refuse, failures=3, retries=2)
+        client = httpx.Client(transport=ResilientTransport(pool))
+
+        with pytest.raises(httpx.ConnectError):
+            client.get("https://llm.test/")
+        assert pool.breaker.state == "open"
+
+        with pytest.raises(CircuitOpenError):
+            client.get("https://llm.test/")
+        assert len(calls) == 3
+
+    @pytest.mark.asyncio
+    async def test_async_transport_retries(self):
+        pool, calls = _pool(lambda n: httpx.Response(429 if n == 1 else 200))
+
+        async with httpx.AsyncClient(transport=ResilientAsyncTransport(pool)) as client:
+            response = await client.get("https://llm.test/")
+
+        assert response.status_code == 200
+        assert len(calls) == 2
+
+
+class TestSdkClients:
+    """Test SDK clients built on the shared transport."""
+
+    @pytest.mark.asyncio
+    async def test_openai_sdk_error_is_recognised_as_circuit_open(self):
+        import openai
+
+        http = llm_clients.sdk_http_module(openai)
+        pool, calls = _pool(lambda n: http.Response(200))
+        pool.breaker.record_failure()
+        pool.breaker.record_failure()
+        pool.breaker.record_failure()
+        _, transport_cls = llm_clients._resilient_transports(http)
+        client = openai.AsyncOpenAI(
+            api_key="test",
+            base_url="https://llm.test/v1",
+            max_retries=0,
+            http_client=http.AsyncClient(transport=transport_cls(pool))
+        )
+
+        with pytest.raises(openai.APIConnectionError) as error:
+            await client.chat.completions.create(model="m", messages=[{"role": "user", "content": "hi"}])
+
+        assert is_circuit_open_error(error.value)
+        assert calls == []
+
+    def test_factories_share_one_client_per_key(self):
+        import anthropic
+
+        first = llm_clients.get_anthropic_client("key-1")
+
+        assert llm_clients.get_anthropic_client("key-1") is first
+        assert llm_clients.get_anthropic_client("key-2") is not first
+        assert first._client is llm_clients.get_http_client("anthropic", llm_clients.sdk_http_module(anthropic))
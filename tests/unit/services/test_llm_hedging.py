@@ -0,0 +1,218 @@
+"""
+Unit tests for hedged LLM dispatch.
+
+Covers the latency histogram, the hedge budget, hedging a late first token
+to the secondary route, fallback on errors and histogram-driven routing.
+Adapters are faked with scripted async clients.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import llm_adapter
+from app.services.llm_adapter import HedgeBudget, HedgedChatClient, HedgeOutcome, LatencyHistogram, chat_cost
+
+
+class FakeStream:
+    def __init__(self, chunks):
+        self._chunks = iter(chunks)
+        self.closed = False
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self):
+        try:
+            return next(self._chunks)
+        except StopIteration:
+            raise StopAsyncIteration
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeAdapter:
+    """OpenAI-format adapter whose create() waits `delay` seconds."""
+
+    def __init__(self, model, delay=0.0, error=None):
+        self.model = model
+        self.delay = delay
+        self.error = error
+        self.requests = []
+        self.cancelled = False
+        self.client = SimpleNamespace(chat=SimpleNamespace(completions=SimpleNamespace(create=self._create)))
+
+    async def _create(self, **kwargs):
+        self.requests.append(kwargs)
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.error:
+            raise self.error
+        if kwargs.get("stream"):
+            return FakeStream([f"{self.model}-1", f"{self.model}-2"])
+        return SimpleNamespace(content=f"{self.model}-response")
+
+    def get_model_name(self):
+        return self.model
+
+    def get_provider_name(self):
+        return "openai"
+
+
+@pytest.fixture
+def fast_deadlines(monkeypatch):
+    monkeypatch.setattr(llm_adapter, "HEDGE_DEFAULT_DELAY", {"stream": 0.05, "complete": 0.05})
+    monkeypatch.setattr(llm_adapter, "HEDGE_MIN_SAMPLES", 3)
+
+
+def _client(primary, secondary, ratio=1.0):
+    client = HedgedChatClient(primary, secondary, max_hedge_ratio=ratio)
+    client.budget.burst = client.budget._tokens = 1.0
+    return client
+
+
+class TestLatencyHistogram:
+    """Test percentile tracking."""
+
+    def test_p95_is_bucket_upper_bound(self):
+        histogram = LatencyHistogram()
+        for _ in range(19):
+            histogram.record(0.2)
+        histogram.record(5.0)
+
+        assert histogram.percentile(0.5) == pytest.approx(0.2, rel=0.25)
+        assert histogram.percentile(0.95) == pytest.approx(0.2, rel=0.25)
+        assert histogram.percentile(1.0) == pytest.approx(5.0, rel=0.25)
+
+    def test_old_samples_expire(self):
+        histogram = LatencyHistogram(window_seconds=0)
+        histogram.record(1.0)
+
+        assert histogram.count == 0
+        assert histogram.percentile(0.95) is None
+
+
+class TestHedgeBudget:
+    """Test the hedge rate cap."""
+
+    def test_caps_hedges_to_ratio(self):
+        budget = HedgeBudget(ratio=0.25, burst=1.0)
+        budget.try_acquire()
+
+        granted = 0
+        for _ in range(20):
+            budget.record_request()
+            granted += budget.try_acquire()
+
+        assert granted == 5
+
+
+class TestHedgedDispatch:
+    """Test hedging, fallback and routing."""
+
+    @pytest.mark.asyncio
+    async def test_fast_primary_is_not_hedged(self, fast_deadlines):
+        primary, secondary = FakeAdapter("deepseek"), FakeAdapter("haiku")
+
+        response = await _client(primary, secondary).create(model="deepseek", messages=[])
+
+        assert response.content == "deepseek-response"
+        assert response.hedge_outcome == HedgeOutcome("deepseek")
+        assert secondary.requests == []
+
+    @pytest.mark.asyncio
+    async def test_late_first_token_hedges_and_cancels_loser(self, fast_deadlines):
+        primary, secondary = FakeAdapter("deepseek", delay=1.0), FakeAdapter("haiku")
+
+        stream = await _client(primary, secondary).create(model="deepseek", messages=[], stream=True)
+
+        assert [chunk async for chunk in stream] == ["haiku-1", "haiku-2"]
+        assert secondary.requests[0]["model"] == "haiku"
+        assert stream.hedge_outcome == HedgeOutcome("haiku", abandoned="deepseek")
+        await asyncio.sleep(0)  # Let the cancelled loser unwind
+        assert primary.cancelled
+
+    @pytest.mark.asyncio
+    async def test_exhausted_budget_waits_for_primary(self, fast_deadlines):
+        primary, secondary = FakeAdapter("deepseek", delay=0.1), FakeAdapter("haiku")
+        client = _client(primary, secondary, ratio=0.0)
+        client.budget._tokens = 0.0
+
+        response = await client.create(model="deepseek", messages=[])
+
+        assert response.content == "deepseek-response"
+        assert secondary.requests == []
+
+    @pytest.mark.asyncio
+    async def test_cancelled_caller_cancels_unhedged_call(self, fast_deadlines):
+        primary, secondary = FakeAdapter("deepseek", delay=1.0), FakeAdapter("haiku")
+        client = _client(primary, secondary, ratio=0.0)
+        client.budget._tokens = 0.0
+
+        call = asyncio.create_task(client.create(model="deepseek", messages=[]))
+        await asyncio.sleep(0.1)  # Past the hedge deadline, waiting on the primary
+        call.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await call
+
+        assert primary.cancelled
+
+    @pytest.mark.asyncio
+    async def test_primary_error_falls_back_without_budget(self, fast_deadlines):
+        primary = FakeAdapter("deepseek", error=ConnectionError("refused"))
+        secondary = FakeAdapter("haiku")
+        client = _client(primary, secondary)
+        client.budget._tokens = 0.0
+
+        response = await client.create(model="deepseek", messages=[])
+
+        assert response.content == "haiku-response"
+        assert response.hedge_outcome == HedgeOutcome("haiku")  # The failed call isn't billed
+
+    @pytest.mark.asyncio
+    async def test_both_failing_raises_first_error(self, fast_deadlines):
+        primary = FakeAdapter("deepseek", error=ConnectionError("primary"))
+        secondary = FakeAdapter("haiku", error=ConnectionError("secondary"))
+
+        with pytest.raises(ConnectionError, match="primary"):
+            await _client(primary, secondary).create(model="deepseek", messages=[])
+
+    def test_slow_primary_histogram_routes_to_secondary(self, fast_deadlines):
+        client = _client(FakeAdapter("deepseek"), FakeAdapter("haiku"))
+        for _ in range(3):
+            client.primary.latency["complete"].record(8.0)
+            client.secondary.latency["complete"].record(1.0)
+
+        leader, other = client._routes("complete")
+
+        assert leader is client.secondary
+        assert client.hedge_delay(leader, "complete") == pytest.approx(1.0, rel=0.25)
+        assert client._routes("stream")[0] is client.primary
+
+
+class TestChatCost:
+    """Test per-model pricing."""
+
+    def test_variants_share_base_price_and_unknown_models_default(self):
+        deepseek = chat_cost("deepseek/deepseek-v3.1-terminus:exacto", 1_000_000, 1_000_000)
+
+        assert deepseek == pytest.approx(0.14 + 0.28)
+        assert chat_cost("some/unknown-model", 1_000_000, 1_000_000) == pytest.approx(deepseek)
+        assert chat_cost("anthropic/claude-3.5-haiku", 1_000_000, 0) == pytest.approx(0.80)
+
+    def test_cache_reads_are_discounted(self):
+        assert chat_cost("deepseek/deepseek-v3.1-terminus", 1_000_000, 0, cache_read_tokens=1_000_000) == pytest.approx(0.014)
+
+    def test_coach_prices_winner_and_abandoned_prompt(self):
+        from app.services.unified_coach_service import UnifiedCoachService
+
+        coach = UnifiedCoachService.__new__(UnifiedCoachService)
+        outcome = HedgeOutcome("anthropic/claude-3.5-haiku", abandoned="deepseek/deepseek-v3.1-terminus:exacto")
+
+        assert coach._calculate_claude_cost(1_000_000, 0, hedge_outcome=outcome) == pytest.approx(0.80 + 0.14)
+        assert coach._calculate_claude_cost(1_000_000, 0) == pytest.approx(0.14)
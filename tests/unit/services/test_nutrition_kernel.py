@@ -0,0 +1,109 @@
+"""
+Unit tests for the shared nutrition kernel.
+
+Tests vectorized macro math and the cached, batched food lookup.
+"""
+
+import pytest
+from decimal import Decimal
+from uuid import uuid4
+from unittest.mock import Mock, MagicMock
+
+from app.services.nutrition_kernel import FoodRowCache, NutritionKernel
+
+
+@pytest.fixture
+def chicken():
+    return {
+        "id": str(uuid4()),
+        "name": "Chicken Breast",
+        "calories_per_100g": Decimal("165"),
+        "protein_g_per_100g": Decimal("31"),
+        "carbs_g_per_100g": Decimal("0"),
+        "fat_g_per_100g": Decimal("3.6"),
+        "food_servings": [],
+    }
+
+
+@pytest.fixture
+def rice():
+    return {
+        "id": str(uuid4()),
+        "name": "White Rice",
+        "calories_per_100g": 130,
+        "protein_g_per_100g": 2.7,
+        "carbs_g_per_100g": 28,
+        "fat_g_per_100g": None,  # missing values count as 0
+        "food_servings": [],
+    }
+
+
+class TestArithmetic:
+    """Test vectorized item and meal totals."""
+
+    def test_calculate_items_scales_per_100g(self, chicken, rice):
+        items, totals = NutritionKernel.calculate_items([chicken, rice], [Decimal("174"), 200])
+
+        assert items[0]["calories"] == pytest.approx(287.1)
+        assert items[0]["protein_g"] == pytest.approx(53.94)
+        assert items[1]["carbs_g"] == pytest.approx(56.0)
+        assert items[1]["fat_g"] == 0.0
+        assert totals["calories"] == pytest.approx(287.1 + 260.0)
+
+    def test_calculate_items_empty(self):
+        items, totals = NutritionKernel.calculate_items([], [])
+        assert items == []
+        assert totals == {"calories": 0.0, "protein_g": 0.0, "carbs_g": 0.0, "fat_g": 0.0}
+
+    def test_per_100g_from_totals_is_inverse(self, chicken):
+        (macros,), _ = NutritionKernel.calculate_items([chicken], [250])
+        (per_100g,) = NutritionKernel.per_100g_from_totals([macros], [250])
+
+        assert per_100g["calories_per_100g"] == pytest.approx(165.0)
+        assert per_100g["fat_g_per_100g"] == pytest.approx(3.6)
+
+    def test_sum_items_accepts_dicts_and_objects(self):
+        obj = Mock(calories=Decimal("100"), protein_g=Decimal("10"), carbs_g=Decimal("5"), fat_g=Decimal("1"))
+        totals = NutritionKernel.sum_items([obj, {"calories": 50, "protein_g": 5, "carbs_g": 0, "fat_g": 2}])
+
+        assert totals == {"calories": 150.0, "protein_g": 15.0, "carbs_g": 5.0, "fat_g": 3.0}
+
+
+class TestFoodLookup:
+    """Test cached and batched food fetches."""
+
+    def test_misses_fetched_in_one_query_then_cached(self, chicken, rice):
+        kernel = NutritionKernel(cache=FoodRowCache())
+        client = MagicMock()
+        client.table.return_value.select.return_value.in_.return_value.execute.return_value = Mock(
+            data=[chicken, rice]
+        )
+
+        first = kernel.get_foods(client, [chicken["id"], rice["id"], chicken["id"]])
+        second = kernel.get_foods(client, [rice["id"]])
+
+        assert set(first) == {chicken["id"], rice["id"]}
+        assert second[rice["id"]]["name"] == "White Rice"
+        client.table.return_value.select.return_value.in_.assert_called_once_with(
+            "id", [chicken["id"], rice["id"]]
+        )
+
+    def test_remember_foods_attaches_servings(self, chicken):
+        kernel = NutritionKernel(cache=FoodRowCache())
+        serving = {"id": str(uuid4()), "food_id": chicken["id"], "grams_per_serving": 174}
+        client = MagicMock()
+
+        kernel.remember_foods([{k: v for k, v in chicken.items() if k != "food_servings"}], [serving])
+        foods = kernel.get_foods(client, [chicken["id"]])
+
+        assert foods[chicken["id"]]["food_servings"] == [serving]
+        client.table.assert_not_called()
+
+    def test_cache_is_bounded(self, chicken, rice):
+        cache = FoodRowCache(max_entries=1)
+        cache.put_many([chicken, rice])
+
+        found, missing = cache.get_many([chicken["id"], rice["id"]])
+
+        assert list(found) == [rice["id"]]
+        assert missing == [chicken["id"]]
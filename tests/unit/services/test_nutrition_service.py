@@ -136,6 +136,54 @@ class TestSearchFoods:
         assert len(result) == 1
         assert result[0].name == "My Custom Recipe"
 
+    @pytest.mark.asyncio
+    @patch('app.services.nutrition_service.supabase_service')
+    async def test_search_batches_missing_servings(self, mock_supabase, sample_food_data, sample_serving_data):
+        """Should load servings for all foods missing them in ONE query (fix N+1 issue)."""
+        food_a = {**sample_food_data, "id": str(uuid4()), "name": "Chicken A"}
+        food_b = {**sample_food_data, "id": str(uuid4()), "name": "Chicken B"}
+
+        public_response = Mock()
+        public_response.data = [{**food_a, "food_servings": []}, {**food_b, "food_servings": []}]
+
+        servings_response = Mock()
+        servings_response.data = [
+            {**sample_serving_data, "id": str(uuid4()), "food_id": food_a["id"]},
+            {**sample_serving_data, "id": str(uuid4()), "food_id": food_b["id"]},
+            {**sample_serving_data, "id": str(uuid4()), "food_id": food_b["id"]},
+        ]
+
+        table = mock_supabase.client.table.return_value
+        table.select.return_value.eq.return_value.ilike.return_value.order.return_value\
+            .order.return_value.limit.return_value.execute.return_value = public_response
+        table.select.return_value.in_.return_value.execute.return_value = servings_response
+
+        result = await nutrition_service.search_foods(query="chicken", limit=20)
+
+        assert [len(food.servings) for food in result] == [1, 2]
+        table.select.return_value.in_.assert_called_once_with(
+            "food_id", [food_a["id"], food_b["id"]]
+        )
+
+    @pytest.mark.asyncio
+    @patch('app.services.nutrition_service.supabase_service')
+    async def test_search_fetches_servings_only_for_returned_foods(self, mock_supabase, sample_food_data):
+        """Rows cut by the limit shouldn't have their servings fetched."""
+        foods = [{**sample_food_data, "id": str(uuid4()), "food_servings": []} for _ in range(3)]
+
+        public_response = Mock()
+        public_response.data = foods
+
+        table = mock_supabase.client.table.return_value
+        table.select.return_value.eq.return_value.ilike.return_value.order.return_value\
+            .order.return_value.limit.return_value.execute.return_value = public_response
+        table.select.return_value.in_.return_value.execute.return_value = Mock(data=[])
+
+        result = await nutrition_service.search_foods(query="chicken", limit=2)
+
+        assert len(result) == 2
+        table.select.return_value.in_.assert_called_once_with("food_id", [foods[0]["id"], foods[1]["id"]])
+
 
 # =====================================================
 # Create Custom Food Tests
@@ -0,0 +1,74 @@
+"""
+Unit tests for prompt prefix caching helpers.
+"""
+
+from types import SimpleNamespace
+
+from app.services.prompt_cache import (
+    CACHE_CONTROL,
+    build_cached_messages,
+    cache_token_usage,
+    supports_cache_control,
+)
+
+
+HISTORY = [
+    {"role": "user", "content": "I had eggs"},
+    {"role": "assistant", "content": "Logged."},
+    {"role": "user", "content": [{"type": "text", "text": "What about lunch?"}]},
+    {"role": "assistant", "content": None, "tool_calls": [{"id": "c1"}]},
+    {"role": "tool", "tool_call_id": "c1", "content": "{}"},
+]
+
+
+class TestBuildCachedMessages:
+    """Test request layout and cache breakpoints."""
+
+    def test_breakpoints_on_system_and_last_user_message(self):
+        messages = build_cached_messages("SYSTEM", HISTORY, "anthropic/claude-sonnet-4")
+
+        assert messages[0] == {
+            "role": "system",
+            "content": [{"type": "text", "text": "SYSTEM", "cache_control": CACHE_CONTROL}],
+        }
+        assert messages[3]["content"][-1]["cache_control"] == CACHE_CONTROL
+        # Older history and the uncached tool tail are passed through untouched
+        assert messages[1] is HISTORY[0]
+        assert messages[4:] == HISTORY[3:]
+        assert "cache_control" not in HISTORY[2]["content"][0]
+
+    def test_implicit_cache_models_get_plain_prefix(self):
+        messages = build_cached_messages("SYSTEM", HISTORY, "deepseek/deepseek-v3.1-terminus:exacto")
+
+        assert messages == [{"role": "system", "content": "SYSTEM"}] + HISTORY
+
+    def test_prefix_is_identical_across_iterations(self):
+        model = "anthropic/claude-sonnet-4"
+        first = build_cached_messages("SYSTEM", HISTORY[:3], model)
+        second = build_cached_messages("SYSTEM", HISTORY, model)
+
+        assert second[:len(first)] == first
+
+    def test_supports_cache_control(self):
+        assert supports_cache_control("claude-3-5-sonnet-20241022")
+        assert supports_cache_control("google/gemini-2.5-flash")
+        assert not supports_cache_control("openai/gpt-4o")
+
+
+class TestCacheTokenUsage:
+    """Test cache token extraction across providers."""
+
+    def test_openrouter_usage(self):
+        usage = SimpleNamespace(
+            prompt_tokens=1200,
+            prompt_tokens_details=SimpleNamespace(cached_tokens=1000, cache_write_tokens=0),
+        )
+        assert cache_token_usage(usage) == (1000, 0)
+
+    def test_anthropic_usage(self):
+        usage = SimpleNamespace(input_tokens=50, cache_read_input_tokens=0, cache_creation_input_tokens=900)
+        assert cache_token_usage(usage) == (0, 900)
+
+    def test_deepseek_usage_and_missing_fields(self):
+        assert cache_token_usage({"prompt_cache_hit_tokens": 640}) == (640, 0)
+        assert cache_token_usage(SimpleNamespace(prompt_tokens=10, completion_tokens=5)) == (0, 0)
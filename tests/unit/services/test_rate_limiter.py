@@ -0,0 +1,132 @@
+"""
+Unit tests for the token-bucket rate limiter.
+
+Covers burst/refill, all-or-nothing consumption across buckets, atomicity
+under concurrent callers and the Redis script call (the script itself
+is replaced with a stub, so only its arguments and reply are checked).
+"""
+
+import threading
+
+import pytest
+
+from app.services import rate_limiter as rate_limiter_module
+from app.services.rate_limiter import Quota, RateLimiter, RateLimitResult, route_buckets
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(rate_limiter_module.time, "monotonic", lambda: now[0])
+    return now
+
+
+class TestMemoryBackend:
+    """Test the in-process token buckets."""
+
+    def test_allows_burst_then_rejects_with_retry_after(self, clock):
+        limiter = RateLimiter()
+        bucket = [("u1", Quota(3, 60))]
+
+        results = [limiter.check(bucket) for _ in range(4)]
+
+        assert [result.allowed for result in results] == [True, True, True, False]
+        assert results[2].remaining == 0
+        assert results[3].retry_after == pytest.approx(20)
+        assert results[3].retry_after_header == "20"
+
+    def test_refills_over_time(self, clock):
+        limiter = RateLimiter()
+        bucket = [("u1", Quota(3, 60))]
+        for _ in range(3):
+            limiter.check(bucket)
+
+        clock[0] += 20
+
+        assert limiter.check(bucket).allowed
+        assert not limiter.check(bucket).allowed
+
+    def test_rejection_consumes_from_no_bucket(self, clock):
+        limiter = RateLimiter()
+        user_a = ("a", Quota(5, 60))
+        user_b = ("b", Quota(1, 60))
+        route = ("all", Quota(3, 60))
+
+        assert limiter.check([user_b, route]).allowed
+        assert not limiter.check([user_b, route]).allowed  # User quota spent
+
+        # The rejected request left the route bucket at 2
+        assert limiter.check([user_a, route]).allowed
+        assert limiter.check([user_a, route]).allowed
+        result = limiter.check([user_a, route])
+        assert not result.allowed
+        assert result.limit == 3
+
+    def test_concurrent_callers_never_exceed_limit(self):
+        limiter = RateLimiter()
+        bucket = [("u1", Quota(50, 3600))]
+        allowed = []
+
+        def hammer():
+            for _ in range(20):
+                allowed.append(limiter.check(bucket).allowed)
+
+        threads = [threading.Thread(target=hammer) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert sum(allowed) == 50
+
+    @pytest.mark.asyncio
+    async def test_route_quotas_are_per_user(self, monkeypatch):
+        monkeypatch.setitem(rate_limiter_module.ROUTE_QUOTAS, "test", {"user": Quota(1, 60), "route": Quota(10, 60)})
+        limiter = RateLimiter()
+
+        assert (await limiter.check_route("test", "u1")).allowed
+        assert not (await limiter.check_route("test", "u1")).allowed
+        assert (await limiter.check_route("test", "u2")).allowed
+
+
+class TestRedisBackend:
+    """Test script arguments, reply parsing and fallback."""
+
+    def _limiter(self, script):
+        limiter = RateLimiter()
+        limiter._sync_script = script
+        return limiter
+
+    def test_passes_keys_and_quotas_to_script(self):
+        calls = []
+
+        def script(keys, args):
+            calls.append((keys, args))
+            return [b"0", b"0.5", b"12.25"]
+
+        result = self._limiter(script).check(route_buckets("coach_message", "u1"))
+
+        assert calls == [(
+            ["ratelimit:coach_message:user:u1", "ratelimit:coach_message:all"],
+            [1, 20, 20 / 60, 600, 10.0],
+        )]
+        assert result == RateLimitResult(False, 20, 0, 12.25)
+        assert result.retry_after_header == "13"
+
+    def test_redis_error_falls_back_to_memory(self, clock):
+        calls = []
+
+        def script(keys, args):
+            calls.append(keys)
+            raise ConnectionError("redis down")
+
+        limiter = self._limiter(script)
+        bucket = [("u1", Quota(1, 60))]
+
+        assert limiter.check(bucket).allowed
+        assert not limiter.check(bucket).allowed
+        assert len(calls) == 1  # Cooling down: no retry until REDIS_RETRY_SECONDS
+
+        clock[0] += rate_limiter_module.REDIS_RETRY_SECONDS
+        limiter.check(bucket)
+        assert len(calls) == 2
@@ -0,0 +1,61 @@
+"""
+Unit tests for token counting and context packing.
+"""
+
+from app.services.token_budget import (
+    MESSAGE_OVERHEAD_TOKENS,
+    _heuristic_tokens,
+    count_tokens,
+    message_tokens,
+    pack_optimal,
+    pack_recent,
+)
+
+
+def _msg(msg_id, tokens):
+    return {"id": msg_id, "content": "x", "token_count": tokens - MESSAGE_OVERHEAD_TOKENS}
+
+
+class TestCountTokens:
+    """Test counting."""
+
+    def test_empty_and_cached(self):
+        assert count_tokens("") == 0
+        assert count_tokens("Quero perder 5kg até o verão") == count_tokens("Quero perder 5kg até o verão")
+
+    def test_heuristic_charges_accents_and_emoji(self):
+        assert _heuristic_tokens("hello") == 2
+        assert _heuristic_tokens("alimentação") > _heuristic_tokens("alimentacao")
+        assert _heuristic_tokens("💪🔥") == 4
+
+    def test_stored_count_wins(self):
+        assert message_tokens({"content": "anything at all", "token_count": 7}) == 7 + MESSAGE_OVERHEAD_TOKENS
+        assert message_tokens({"content": "hi", "token_count": None}) == count_tokens("hi") + MESSAGE_OVERHEAD_TOKENS
+
+
+class TestPacking:
+    """Test budget packing."""
+
+    def test_pack_recent_keeps_newest_contiguous_run(self):
+        newest_first = [_msg("m5", 40), _msg("m4", 40), _msg("m3", 15), _msg("m2", 10)]
+
+        packed = pack_recent(newest_first, budget=90)
+
+        assert [m["id"] for m in packed] == ["m4", "m5"]  # m2 would fit, but the run must stay contiguous
+
+    def test_pack_recent_always_keeps_latest(self):
+        assert [m["id"] for m in pack_recent([_msg("m1", 500)], budget=100)] == ["m1"]
+
+    def test_pack_optimal_maximizes_messages_then_recency(self):
+        newest_first = [_msg("a", 60), _msg("b", 30), _msg("c", 30), _msg("d", 40)]
+
+        packed = pack_optimal(newest_first, budget=100)
+
+        # Greedy newest-first would take a+b (2 msgs); optimal fits b+c+d (3 msgs)
+        assert [m["id"] for m in packed] == ["d", "c", "b"]
+
+    def test_pack_optimal_prefers_newer_on_ties(self):
+        newest_first = [_msg("new", 50), _msg("old", 50)]
+
+        assert [m["id"] for m in pack_optimal(newest_first, budget=60)] == ["new"]
+        assert pack_optimal(newest_first, budget=0) == []
@@ -0,0 +1,147 @@
+"""
+Unit tests for coach turn coordination.
+
+Covers coalescing of duplicate submissions, result replay, per-conversation
+serialization and that a cancelled request doesn't cancel a shared turn
+(local mode; Redis is not configured).
+"""
+
+import asyncio
+
+import pytest
+
+from app.services import turn_coordinator
+from app.services.turn_coordinator import (
+    DERIVED_KEY_TTL,
+    EXPLICIT_KEY_TTL,
+    ConversationBusyError,
+    TurnCoordinator,
+    turn_key,
+)
+
+
+def _turn(result, calls, delay=0.01):
+    async def compute():
+        calls.append(result)
+        await asyncio.sleep(delay)
+        return result
+    return compute
+
+
+class TestTurnKey:
+    """Test idempotency key derivation."""
+
+    def test_explicit_key_wins_and_is_replayed_longer(self):
+        key, ttl = turn_key("u1", "message", "c1", "hi", "abc")
+
+        assert key == "u1:message:key:abc"
+        assert ttl == EXPLICIT_KEY_TTL
+
+    def test_derived_key_depends_on_conversation_and_message(self):
+        key, ttl = turn_key("u1", "message", "c1", "hi")
+
+        assert ttl == DERIVED_KEY_TTL
+        assert key == turn_key("u1", "message", "c1", "hi")[0]
+        assert key != turn_key("u1", "message", "c2", "hi")[0]
+        assert key != turn_key("u2", "message", "c1", "hi")[0]
+
+    def test_endpoints_never_share_a_key(self):
+        assert turn_key("u1", "message", "c1", "hi")[0] != turn_key("u1", "stream", "c1", "hi")[0]
+        assert turn_key("u1", "message", "c1", "hi", "abc")[0] != turn_key("u1", "stream", "c1", "hi", "abc")[0]
+
+
+class TestCoalescing:
+    """Test duplicate submissions."""
+
+    @pytest.mark.asyncio
+    async def test_concurrent_duplicates_share_one_turn(self):
+        coordinator = TurnCoordinator()
+        calls = []
+
+        results = await asyncio.gather(*[
+            coordinator.run("k", "c1", _turn({"success": True}, calls), 15)
+            for _ in range(3)
+        ])
+
+        assert calls == [{"success": True}]
+        assert results == [{"success": True}] * 3
+
+    @pytest.mark.asyncio
+    async def test_finished_turn_is_replayed_until_ttl(self, monkeypatch):
+        coordinator = TurnCoordinator()
+        calls = []
+        now = [100.0]
+        monkeypatch.setattr(turn_coordinator.time, "monotonic", lambda: now[0])
+
+        await coordinator.run("k", "c1", _turn("first", calls, 0), 15)
+        assert await coordinator.run("k", "c1", _turn("second", calls, 0), 15) == "first"
+
+        now[0] += 16
+        assert await coordinator.run("k", "c1", _turn("third", calls, 0), 15) == "third"
+        assert calls == ["first", "third"]
+
+    @pytest.mark.asyncio
+    async def test_non_final_result_is_not_replayed(self):
+        coordinator = TurnCoordinator()
+        calls = []
+        is_final = lambda result: result["success"]
+
+        await coordinator.run("k", "c1", _turn({"success": False}, calls, 0), 15, is_final)
+        await coordinator.run("k", "c1", _turn({"success": True}, calls, 0), 15, is_final)
+
+        assert len(calls) == 2
+
+    @pytest.mark.asyncio
+    async def test_cancelled_request_does_not_cancel_shared_turn(self):
+        coordinator = TurnCoordinator()
+        calls = []
+
+        first = asyncio.create_task(coordinator.run("k", "c1", _turn("done", calls, 0.05), 15))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(coordinator.run("k", "c1", _turn("dup", calls, 0), 15))
+        await asyncio.sleep(0)
+        first.cancel()
+
+        assert await second == "done"
+        assert calls == ["done"]
+
+
+class TestSerialization:
+    """Test per-conversation locking."""
+
+    @pytest.mark.asyncio
+    async def test_turns_in_a_conversation_do_not_overlap(self):
+        coordinator = TurnCoordinator()
+        active = []
+        overlaps = []
+
+        def tracked(name, conversation):
+            async def compute():
+                if conversation in active:
+                    overlaps.append(name)
+                active.append(conversation)
+                await asyncio.sleep(0.01)
+                active.remove(conversation)
+                return name
+            return compute
+
+        await asyncio.gather(
+            coordinator.run("k1", "c1", tracked("a", "c1"), 15),
+            coordinator.run("k2", "c1", tracked("b", "c1"), 15),
+            coordinator.run("k3", "c2", tracked("c", "c2"), 15),
+        )
+
+        assert overlaps == []
+        assert coordinator._locks == {}
+
+    @pytest.mark.asyncio
+    async def test_busy_conversation_raises(self, monkeypatch):
+        monkeypatch.setattr(turn_coordinator, "LOCK_WAIT_SECONDS", 0.01)
+        coordinator = TurnCoordinator()
+
+        slow = asyncio.create_task(coordinator.run("k1", "c1", _turn("slow", [], 0.1), 15))
+        await asyncio.sleep(0)
+
+        with pytest.raises(ConversationBusyError):
+            await coordinator.run("k2", "c1", _turn("next", [], 0), 15)
+        assert await slow == "slow"
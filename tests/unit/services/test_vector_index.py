@@ -0,0 +1,222 @@
+"""
+Unit tests for the in-process per-user vector index.
+
+Covers similarity ranking, archived/importance handling, int8 quantization,
+memory-mapped persistence and lazy/incremental loading from Supabase (faked).
+"""
+
+import numpy as np
+from types import SimpleNamespace
+
+from app.services import vector_index
+from app.services.vector_index import UserVectorIndex, VectorIndexService
+
+DIM = 384
+
+
+def _vector(seed):
+    return np.random.default_rng(seed).normal(size=DIM).astype(np.float32)
+
+
+def _row(i, vector=None, importance=0.5, archived=False):
+    return {
+        "message_id": f"m{i}",
+        "role": "user",
+        "content_text": f"message {i}",
+        "embedding": (vector if vector is not None else _vector(i)).tolist(),
+        "importance_score": importance,
+        "is_archived": archived,
+        "created_at": f"2026-10-18T10:00:{i:02d}+00:00",
+    }
+
+
+class FakeQuery:
+    def __init__(self, db):
+        self.db = db
+        self.since = None
+        self.window = (0, None)
+
+    def select(self, columns):
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def gt(self, column, value):
+        self.since = value
+        return self
+
+    def order(self, column):
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end + 1)
+        return self
+
+    def execute(self):
+        self.db.queries += 1
+        rows = [r for r in self.db.rows if self.since is None or r["created_at"] > self.since]
+        return SimpleNamespace(data=rows[self.window[0]:self.window[1]])
+
+
+class FakeSupabase:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+
+    def table(self, name):
+        return FakeQuery(self)
+
+
+class FakeRedis:
+    def __init__(self):
+        self.values = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def incr(self, key):
+        self.values[key] = self.values.get(key, 0) + 1
+        return self.values[key]
+
+
+class TestUserVectorIndex:
+    """Test UserVectorIndex search."""
+
+    def test_nearest_message_ranked_first(self):
+        index = UserVectorIndex()
+        index.add([_row(i) for i in range(20)])
+
+        results = index.search(_vector(7) + 0.1 * _vector(99), limit=3, min_similarity=0.5)
+
+        assert [r["message_id"] for r in results] == ["m7"]
+        assert results[0]["content_text"] == "message 7"
+        assert results[0]["similarity"] > 0.9
+
+    def test_archived_rows_are_excluded(self):
+        index = UserVectorIndex()
+        index.add([_row(1, archived=True), _row(2)])
+
+        assert index.search(_vector(1), min_similarity=0.5) == []
+        assert index.search(_vector(1), min_similarity=0.5, include_archived=True)[0]["message_id"] == "m1"
+
+    def test_importance_breaks_near_ties(self):
+        base = _vector(1)
+        index = UserVectorIndex()
+        index.add([_row(1, base, importance=0.2), _row(2, base, importance=0.9)])
+
+        results = index.search(base, limit=2)
+
+        assert [r["message_id"] for r in results] == ["m2", "m1"]
+
+    def test_batched_queries_return_one_list_each(self):
+        index = UserVectorIndex()
+        index.add([_row(i) for i in range(10)])
+
+        results = index.search(np.stack([_vector(3), _vector(8)]), limit=1, min_similarity=0.5)
+
+        assert [[r["message_id"] for r in hits] for hits in results] == [["m3"], ["m8"]]
+
+    def test_int8_quantization_matches_float(self):
+        rows = [_row(i) for i in range(50)]
+        exact, quantized = UserVectorIndex(), UserVectorIndex(quantize=True)
+        exact.add(rows)
+        quantized.add(rows)
+
+        query = _vector(1000)
+        diff = np.abs(exact.similarities(query) - quantized.similarities(query))
+
+        assert quantized._vectors.dtype == np.int8
+        assert diff.max() < 0.01
+
+    def test_with_rows_leaves_original_untouched(self):
+        index = UserVectorIndex()
+        index.add([_row(1)])
+
+        updated = index.with_rows([_row(1, archived=True), _row(2)])
+
+        assert len(index) == 1 and len(updated) == 2
+        assert index.search(_vector(1), limit=1)[0]["message_id"] == "m1"
+        assert updated.search(_vector(1), min_similarity=0.5) == []
+
+    def test_readding_updates_flags_without_duplicates(self):
+        index = UserVectorIndex()
+        index.add([_row(1)])
+
+        assert index.add([_row(1, archived=True)]) == 0
+        assert len(index) == 1
+        assert index.search(_vector(1)) == []
+
+    def test_save_and_load_memory_mapped(self, tmp_path):
+        index = UserVectorIndex(quantize=True)
+        index.add([_row(i) for i in range(5)])
+        path = str(tmp_path / "user-1")
+        index.save(path)
+
+        loaded = UserVectorIndex.load(path)
+        loaded.add([_row(5)])  # Appending copies off the read-only map
+
+        assert isinstance(np.load(f"{path}.npy", mmap_mode="r"), np.memmap)
+        assert loaded.watermark == _row(5)["created_at"]
+        assert loaded.search(_vector(2), limit=1)[0]["message_id"] == "m2"
+        assert loaded.search(_vector(5), limit=1)[0]["message_id"] == "m5"
+
+
+class TestVectorIndexService:
+    """Test lazy per-user loading and refresh."""
+
+    def test_lazy_load_then_incremental_refresh(self, monkeypatch):
+        db = FakeSupabase([_row(i) for i in range(3)])
+        service = VectorIndexService(db)
+
+        assert service.search("user-1", _vector(1), limit=1)[0]["message_id"] == "m1"
+        service.search("user-1", _vector(1))
+        assert db.queries == 1  # Cached between searches
+
+        db.rows.append(_row(3))
+        monkeypatch.setattr(vector_index, "REFRESH_SECONDS", -1)
+
+        assert service.search("user-1", _vector(3), limit=1)[0]["message_id"] == "m3"
+        assert len(service.get_index("user-1")) == 4
+
+    def test_add_embeddings_persists_index_file(self, tmp_path):
+        db = FakeSupabase([_row(0)])
+        service = VectorIndexService(db, index_dir=str(tmp_path))
+
+        service.add_embeddings("user-1", [_row(1)])
+
+        reader = VectorIndexService(FakeSupabase([]), index_dir=str(tmp_path))
+        assert reader.search("user-1", _vector(1), limit=1)[0]["message_id"] == "m1"
+
+        service.invalidate()
+        assert list(tmp_path.iterdir()) == []
+
+    def test_add_embeddings_swaps_in_a_new_index(self):
+        service = VectorIndexService(FakeSupabase([_row(0)]))
+        before = service.get_index("user-1")
+
+        service.add_embeddings("user-1", [_row(1)])
+
+        assert len(before) == 1  # A search holding the old index is unaffected
+        assert len(service.get_index("user-1")) == 2
+
+    def test_invalidation_reaches_other_processes(self, monkeypatch):
+        redis = FakeRedis()
+        monkeypatch.setattr(vector_index, "GENERATION_CHECK_SECONDS", -1)
+        db = FakeSupabase([_row(1)])
+        api, worker = VectorIndexService(db), VectorIndexService(db)
+        api._redis = worker._redis = redis
+
+        assert api.search("user-1", _vector(1), limit=1)[0]["message_id"] == "m1"
+        db.rows[0] = _row(1, archived=True)
+        worker.invalidate()
+
+        assert api.search("user-1", _vector(1), limit=1) == []
+
+    def test_least_recently_used_user_is_evicted(self):
+        service = VectorIndexService(FakeSupabase([_row(0)]), max_users=1)
+
+        service.get_index("user-1")
+        service.get_index("user-2")
+
+        assert list(service._indexes) == ["user-2"]
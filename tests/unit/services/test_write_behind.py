@@ -0,0 +1,205 @@
+"""
+Unit tests for the write-behind queue and the coach turn writes built on it.
+
+Covers per-key ordering, concurrency across keys, retries, flush/close,
+and which writes UnifiedCoachService queues versus awaits.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services import write_behind
+from app.services.unified_coach_service import UnifiedCoachService
+from app.services.write_behind import WriteBehindError, WriteBehindQueue
+
+
+@pytest.fixture(autouse=True)
+def no_backoff(monkeypatch):
+    monkeypatch.setattr(write_behind, "RETRY_BACKOFF_SECONDS", 0)
+
+
+class TestWriteBehindQueue:
+    """Test ordering, retries and flushing."""
+
+    @pytest.mark.asyncio
+    async def test_writes_for_a_key_run_in_order(self):
+        writer = WriteBehindQueue()
+        written = []
+
+        def write(value, delay):
+            time.sleep(delay)
+            written.append(value)
+
+        writer.submit("conv-1", write, "first", 0.02)
+        writer.submit("conv-1", write, "second", 0)
+        writer.submit("conv-1", write, "third", 0)
+        assert writer.pending("conv-1") == 3
+
+        await writer.flush("conv-1")
+
+        assert written == ["first", "second", "third"]
+        assert writer.pending() == 0
+
+    @pytest.mark.asyncio
+    async def test_keys_are_written_concurrently(self):
+        writer = WriteBehindQueue()
+        started = threading.Barrier(2, timeout=1)
+
+        # Each write waits for the other: only completes if they overlap
+        writer.submit("conv-1", started.wait)
+        writer.submit("conv-2", started.wait)
+
+        await writer.flush()
+
+        assert writer.failed == 0
+
+    @pytest.mark.asyncio
+    async def test_failed_write_is_retried(self):
+        writer = WriteBehindQueue()
+        attempts = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 3:
+                raise ConnectionError("timeout")
+
+        writer.submit("conv-1", flaky)
+        await writer.flush("conv-1")
+
+        assert len(attempts) == 3
+        assert writer.failed == 0
+
+    @pytest.mark.asyncio
+    async def test_write_is_retried_until_it_succeeds(self):
+        writer = WriteBehindQueue()
+        attempts = []
+        written = []
+
+        def flaky():
+            attempts.append(1)
+            if len(attempts) < 10:
+                raise ConnectionError("timeout")
+
+        writer.submit("conv-1", flaky)
+        writer.submit("conv-1", written.append, "next")
+        await writer.flush("conv-1")
+
+        assert len(attempts) == 10
+        assert written == ["next"]
+        assert writer.failed == 0
+
+    @pytest.mark.asyncio
+    async def test_flush_reports_writes_that_keep_failing(self):
+        writer = WriteBehindQueue()
+
+        def broken():
+            raise ConnectionError("down")
+
+        writer.submit("conv-1", broken)
+
+        with pytest.raises(WriteBehindError, match="down"):
+            await writer.flush("conv-1", timeout=0.05)
+        assert writer.pending("conv-1") == 1  # Still retrying
+        await writer.close()
+
+    @pytest.mark.asyncio
+    async def test_close_drops_failing_write_after_last_attempt(self):
+        writer = WriteBehindQueue()
+        written = []
+
+        def broken():
+            raise ConnectionError("down")
+
+        writer.submit("conv-1", broken)
+        writer.submit("conv-1", written.append, "next")
+        await asyncio.sleep(0.01)
+        await writer.close()
+
+        assert writer.failed == 1
+        assert written == ["next"]
+        assert writer.pending() == 0
+
+    @pytest.mark.asyncio
+    async def test_close_flushes_pending_writes(self):
+        writer = WriteBehindQueue()
+        written = []
+
+        for i in range(5):
+            writer.submit(f"conv-{i}", written.append, i)
+        await writer.close()
+
+        assert sorted(written) == [0, 1, 2, 3, 4]
+
+    @pytest.mark.asyncio
+    async def test_flush_of_idle_key_returns_immediately(self):
+        await asyncio.wait_for(WriteBehindQueue().flush("conv-1"), timeout=0.1)
+
+
+@pytest.fixture
+def coach():
+    service = UnifiedCoachService.__new__(UnifiedCoachService)
+    service.supabase = MagicMock()
+    service.supabase.rpc.return_value.execute.return_value.data = "11111111-1111-1111-1111-111111111111"
+    service.cache = MagicMock()
+    service.cache.get.return_value = None
+    service.security = MagicMock()
+    service.security.validate_message_async = AsyncMock(return_value=(True, None, {}))
+    service.message_writer = WriteBehindQueue()
+
+    async def language(user_id, message):
+        return "en"
+
+    async def system_prompt(user_id, language):
+        return "You are a coach.", None
+
+    service._get_user_language = language
+    service._build_system_prompt = system_prompt
+    return service
+
+
+class TestCoachTurnWrites:
+    """Test conversation/message persistence in _start_turn."""
+
+    @pytest.mark.asyncio
+    async def test_new_conversation_is_written_behind_in_one_rpc(self, coach):
+        turn = await coach._start_turn("user-1", "hello", None, None)
+
+        coach.supabase.rpc.assert_not_called()  # Not awaited by the turn
+        await coach.message_writer.flush()
+
+        name, params = coach.supabase.rpc.call_args.args
+        assert name == "coach_start_turn"
+        assert params["p_conversation_id"] == turn["conversation_id"]
+        assert params["p_message"]["id"] == turn["user_message_id"]
+        assert params["p_message"]["role"] == "user"
+
+    @pytest.mark.asyncio
+    async def test_unverified_conversation_awaits_rpc_result(self, coach):
+        turn = await coach._start_turn("user-1", "hello", "22222222-2222-2222-2222-222222222222", None)
+
+        # Another user's conversation: the RPC started a new one
+        assert turn["conversation_id"] == "11111111-1111-1111-1111-111111111111"
+        coach.cache.set.assert_called_once()
+        assert coach.cache.set.call_args.args[:2] == (
+            "coach_conversation_owner:11111111-1111-1111-1111-111111111111", "user-1"
+        )
+
+    @pytest.mark.asyncio
+    async def test_known_conversation_inserts_message_behind(self, coach):
+        conversation_id = "33333333-3333-3333-3333-333333333333"
+        coach.cache.get.return_value = "user-1"
+
+        turn = await coach._start_turn("user-1", "hello", conversation_id, None)
+        ai_message_id = await coach._save_ai_message(
+            "user-1", conversation_id, "Hi!", "openai", "model", 10, 0.001, {}
+        )
+        await coach.message_writer.flush(conversation_id)
+
+        coach.supabase.rpc.assert_not_called()
+        upserts = coach.supabase.table.return_value.upsert.call_args_list
+        assert [call.args[0]["id"] for call in upserts] == [turn["user_message_id"], ai_message_id]
+        assert all(call.kwargs == {"ignore_duplicates": True} for call in upserts)
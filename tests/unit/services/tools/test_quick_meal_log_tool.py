@@ -0,0 +1,65 @@
+"""
+Tests for QuickMealLogTool.
+
+Tests that bulk-inserted custom foods are matched to their items by the
+client-generated id, whatever order the insert returns them in.
+"""
+
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
+from app.services.nutrition_service import nutrition_service
+from app.services.tools.quick_meal_log_tool import QuickMealLogTool
+
+USER_ID = "11111111-1111-1111-1111-111111111111"
+
+
+@pytest.fixture
+def mock_supabase():
+    """Supabase mock whose foods insert echoes the rows back in reverse order."""
+    mock = MagicMock()
+
+    def insert(rows):
+        return SimpleNamespace(execute=lambda: SimpleNamespace(data=list(reversed(rows))))
+
+    mock.table.return_value.insert.side_effect = insert
+    return mock
+
+
+@pytest.fixture
+def create_meal(monkeypatch):
+    meal = SimpleNamespace(
+        id="meal-1",
+        total_calories=Decimal("430"),
+        total_protein_g=Decimal("35"),
+        logged_at=datetime(2026, 10, 18, 12, 0)
+    )
+    mock = AsyncMock(return_value=meal)
+    monkeypatch.setattr(nutrition_service, "create_meal", mock)
+    return mock
+
+
+@pytest.mark.asyncio
+async def test_foods_matched_to_items_by_id(mock_supabase, create_meal):
+    """Test each meal item references the food created for it."""
+    tool = QuickMealLogTool(mock_supabase)
+
+    result = await tool.execute(USER_ID, {"meals": [{
+        "meal_type": "lunch",
+        "items": [
+            {"food_name": "grilled chicken", "grams": 150, "calories": 250,
+             "protein_g": 30, "carbs_g": 0, "fat_g": 10},
+            {"food_name": "white rice", "grams": 200, "calories": 180,
+             "protein_g": 5, "carbs_g": 40, "fat_g": 1},
+        ]
+    }]})
+
+    assert result["success"] is True
+    inserted = mock_supabase.table.return_value.insert.call_args_list[0].args[0]
+    food_names = {row["id"]: row["name"] for row in inserted}
+    items = create_meal.await_args.kwargs["items"]
+    assert [food_names[str(item.food_id)] for item in items] == ["grilled chicken", "white rice"]
+    assert [item.grams for item in items] == [Decimal("150"), Decimal("200")]
@@ -7,7 +7,13 @@ Tests the tool registration, discovery, and execution system.
 import pytest
 from unittest.mock import Mock, AsyncMock
 from app.services.tools.tool_registry import ToolRegistry
-from app.services.tools.base_tool import BaseTool
+from app.services.tools.base_tool import (
+    BaseTool,
+    ToolPolicy,
+    READ_ONLY_POLICY,
+    MUTATING_POLICY,
+    CONCURRENCY_SERIAL,
+)
 
 
 class MockTool(BaseTool):
@@ -172,3 +178,82 @@ class TestToolRegistry:
         assert "2 tools" in repr_str
         assert "tool_one" in repr_str
         assert "tool_two" in repr_str
+
+
+class TestToolPolicies:
+    """Tests for compiled schemas, function tools and execution policy."""
+
+    def test_policy_defaults_to_tool_policy(self, registry, tool1):
+        """Test tools use their own policy; unknown tools are treated as writes."""
+        registry.register(tool1)
+
+        assert registry.get_policy("tool_one") == READ_ONLY_POLICY
+        assert registry.get_policy("nonexistent") == MUTATING_POLICY
+
+    def test_explicit_policy_overrides_tool_policy(self, registry, tool1):
+        """Test policy passed at registration wins."""
+        registry.register(tool1, policy=MUTATING_POLICY)
+
+        policy = registry.get_policy("tool_one")
+        assert policy.mutating is True
+        assert policy.concurrency == CONCURRENCY_SERIAL
+        assert policy.timeout is None
+
+    def test_openai_definitions_compiled_once(self, registry, tool1, tool2):
+        """Test OpenAI schemas are built once and rebuilt after registration."""
+        registry.register(tool1)
+        first = registry.get_openai_definitions()
+
+        assert first is registry.get_openai_definitions()
+        assert first == [{
+            "type": "function",
+            "function": {
+                "name": "tool_one",
+                "description": "Mock tool tool_one",
+                "parameters": {"type": "object", "properties": {}, "required": []}
+            }
+        }]
+
+        registry.register(tool2)
+        assert [d["function"]["name"] for d in registry.get_openai_definitions()] == ["tool_one", "tool_two"]
+
+    @pytest.mark.asyncio
+    async def test_register_function(self, registry):
+        """Test plain async handlers are dispatched with their policy."""
+        handler = AsyncMock(return_value={"ok": True})
+        definition = {"name": "log_it", "description": "Logs", "input_schema": {"type": "object"}}
+
+        registry.register_function(definition, handler, ToolPolicy(cache_ttl=60))
+        result = await registry.execute("log_it", "user_123", {"x": 1})
+
+        assert result == {"ok": True}
+        handler.assert_awaited_once_with("user_123", {"x": 1})
+        assert registry.get_policy("log_it").cache_ttl == 60
+        assert registry.get_all_definitions() == [definition]
+
+
+class TestToolServiceRegistry:
+    """Tests for the coach ToolService dispatch table."""
+
+    @pytest.mark.asyncio
+    async def test_every_coach_tool_is_dispatchable(self, mock_supabase):
+        """Test ToolService compiles a handler and policy for every tool."""
+        from app.services.tool_service import COACH_TOOLS, ToolService
+
+        service = ToolService(mock_supabase)
+
+        assert service.registry.get_all_tool_names() == [tool["name"] for tool in COACH_TOOLS]
+        assert service.registry.get_policy("log_meals_quick").mutating is True
+        assert service.registry.get_policy("get_recent_meals").mutating is False
+        with pytest.raises(ValueError, match="Unknown tool"):
+            await service.execute_tool("drop_tables", {}, "user_123")
+
+    def test_tool_without_policy_is_rejected(self):
+        """Test a COACH_TOOLS entry missing from the policies fails the build."""
+        from app.services.tool_service import COACH_TOOLS, TOOL_POLICIES, build_tool_registry
+
+        policies = {name: policy for name, policy in TOOL_POLICIES.items() if name != "delete_meal"}
+        handlers = {tool["name"]: AsyncMock() for tool in COACH_TOOLS}
+
+        with pytest.raises(ValueError, match="delete_meal"):
+            build_tool_registry(handlers, policies)
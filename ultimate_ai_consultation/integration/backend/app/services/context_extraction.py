@@ -10,20 +10,29 @@ Features:
 - Scores sentiment on every message
 - Auto-matches activities to templates
 - Suggests adaptations based on context
+
+Per message, process_message_for_context() makes at most ONE LLM call:
+a local keyword/length gate skips messages with no extractable signal,
+and a fused prompt returns sentiment, informal activity and life context
+together as compact JSON. That call runs at temperature 0 behind the shared
+LLM response cache, so recurring messages are extracted once.
 """
 
-import anthropic
 import os
 import json
 import logging
+import re
 from datetime import datetime, timedelta
 from typing import Optional, Dict, Any, List, Tuple
 from supabase import  create_client, Client
 
+from ultimate_ai_consultation.libs.llm_cache import cache_key, get_response_cache
+from ultimate_ai_consultation.libs.llm_clients import get_anthropic_client
+
 logger = logging.getLogger(__name__)
 
-# Initialize Anthropic client
-anthropic_client = anthropic.Anthropic(api_key=os.getenv("ANTHROPIC_API_KEY"))
+# Shared pooled Anthropic client
+anthropic_client = get_anthropic_client(os.getenv("ANTHROPIC_API_KEY"))
 
 # Initialize Supabase client
 supabase: Client = create_client(
@@ -32,6 +41,85 @@ supabase: Client = create_client(
 )
 
 
+EXTRACTION_MODEL = "claude-3-haiku-20240307"
+# Bump whenever FUSED_EXTRACTION_PROMPT changes (invalidates cached responses)
+FUSED_PROMPT_VERSION = "context-fused-v1"
+
+# Claude 3 Haiku list price, for cache savings accounting
+HAIKU_COST_PER_INPUT_TOKEN = 0.25 / 1_000_000
+HAIKU_COST_PER_OUTPUT_TOKEN = 1.25 / 1_000_000
+
+# Messages shorter than this carry no extractable context ("ok", "log 2 eggs")
+CONTEXT_MIN_WORDS = 3
+
+# Local pre-filter: a message must mention at least one of these before any
+# LLM call is made. Covers the coach's languages (en, pt, es); accented and
+# unaccented spellings both match.
+CONTEXT_SIGNAL_PATTERNS = [
+    # Informal activity
+    re.compile(
+        r"\b(played|walk\w*|ran|run\w*|jog\w*|hik\w*|swam|swim\w*|cycl\w*|bike\w*|biking|rode|"
+        r"yoga|pilates|stretch\w*|lift\w*|gym|workout|work out|worked out|trained|training|exercis\w*|"
+        r"cardio|hiit|tennis|basketball|soccer|football|golf|danc\w*|climb\w*|sport\w*|class)\b",
+        re.IGNORECASE
+    ),
+    # Life context
+    re.compile(
+        r"\b(stress\w*|overwhelm\w*|anxious|busy|tired|exhaust\w*|fatigue\w*|energy|sleep\w*|insomnia|"
+        r"travel\w*|trip|flight|hotel|vacation|injur\w*|tweak\w*|pain|sore\w*|hurt\w*|sick|ill|illness|"
+        r"cold|flu|fever|motivat\w*|unmotivated|discourag\w*|moving|new job|wedding|baby|divorce|funeral)\b",
+        re.IGNORECASE
+    ),
+    # Strong sentiment
+    re.compile(
+        r"\b(love|hate|great|awesome|amazing|excited|happy|proud|frustrat\w*|angry|sad|depress\w*|"
+        r"upset|annoy\w*|give up|quit|struggl\w*|terrible|awful|worst|best)\b|!{2,}",
+        re.IGNORECASE
+    ),
+    # Informal activity (pt, es)
+    re.compile(
+        r"\b(corr[ií]|correr|corrida|carrera|caminh\w*|camin[eé]|caminar|caminata|andei|pedal\w*|"
+        r"nadei|nad[eé]|nadar|nata[cç][aã]o|nataci[oó]n|bicicleta|bici|ciclismo|ioga|alongamento\w*|"
+        r"estiramiento\w*|muscula[cç][aã]o|academia|gimnasio|pesas|treinei|trein\w*|malhei|malha\w*|"
+        r"entren[eé]|entren\w*|exerc[ií]cio\w*|ejercicio\w*|futebol|f[uú]tbol|t[eê]nis|tenis|basquete|"
+        r"baloncesto|dan[cç]\w*|bail\w*|escalada|escal[eé]|trilha|senderismo|aula|clase)\b",
+        re.IGNORECASE
+    ),
+    # Life context (pt, es)
+    re.compile(
+        r"\b(estresse|estr[eé]s|estressad\w*|estresad\w*|sobrecarregad\w*|agobiad\w*|ansios\w*|ocupad\w*|"
+        r"cansad\w*|exaust\w*|agotad\w*|energia|sono|dormi|dorm[ií]|dormir|ins[oô]nia|insomnio|sue[nñ]o|"
+        r"viag\w*|viaj\w*|voo|vuelo|hotel|f[eé]rias|vacaciones|les[aã]o|lesi[oó]n|lesion\w*|machuc\w*|"
+        r"dor|dores|dolor\w*|dolorid\w*|adolorid\w*|doente|enferm\w*|gripe|febre|fiebre|resfriad\w*|"
+        r"desmotivad\w*|motiva\w*|desanimad\w*|mudan[cç]a|mudanza|novo emprego|trabajo nuevo|nuevo trabajo|"
+        r"casamento|boda|beb[eê]|div[oó]rcio|funeral)\b",
+        re.IGNORECASE
+    ),
+    # Strong sentiment (pt, es)
+    re.compile(
+        r"\b(amo|adoro|odeio|odio|[oó]timo|genial|incr[ií]vel|incre[ií]ble|animad\w*|feliz|orgulhos\w*|"
+        r"orgullos\w*|frustrad\w*|irritad\w*|enojad\w*|enfadad\w*|triste|deprimid\w*|chatead\w*|"
+        r"molest\w*|desistir|desisti|rendirme|dif[ií]cil|horr[ií]vel|horrible|p[eé]ssimo|p[eé]simo|"
+        r"terr[ií]vel|pior|peor|melhor|mejor)\b",
+        re.IGNORECASE
+    ),
+]
+
+FUSED_EXTRACTION_PROMPT = """Analyze this fitness coaching chat message:
+
+"{message}"
+
+Return ONLY compact JSON with exactly these keys:
+{{"sentiment": -1.0 to 1.0,
+"activity": null or {{"activity_type": str, "category": "cardio_steady_state|cardio_interval|strength_training|sports|flexibility|other", "intensity": "low|moderate|high", "duration_estimate_minutes": int, "calories_estimate": int, "should_count_as_workout": bool, "confidence": 0.0-1.0}},
+"life_context": null or {{"context_type": "stress|energy|sleep|travel|injury|illness|motivation|life_event", "severity": "low|moderate|high", "affects_training": bool, "affects_nutrition": bool, "suggested_adaptation": str, "confidence": 0.0-1.0}}}}
+
+- sentiment: -1.0 very negative/discouraged, 0.0 neutral, 1.0 very positive/motivated
+- activity: only a physical activity the user did (past tense or today), else null
+- life_context: only stress, fatigue, sleep, travel, injury, illness, motivation or
+  life events that might affect training or nutrition, else null"""
+
+
 # ============================================================================
 # INFORMAL ACTIVITY EXTRACTION
 # ============================================================================
@@ -85,7 +173,7 @@ Return ONLY valid JSON, no explanations."""
 
     try:
         response = anthropic_client.messages.create(
-            model="claude-3-haiku-20240307",
+            model=EXTRACTION_MODEL,
             max_tokens=300,
             temperature=0.3,
             messages=[{"role": "user", "content": prompt}]
@@ -96,64 +184,75 @@ Return ONLY valid JSON, no explanations."""
         if not result.get("activity_detected"):
             return None
 
-        # Only create activity if confidence is reasonable and should count as workout
-        if result.get("confidence", 0) < 0.6 or not result.get("should_count_as_workout"):
-            return None
+        return _store_informal_activity(result, message, user_id, message_id)
 
-        # Map intensity to RPE
-        intensity_to_rpe = {
-            "low": 4,
-            "moderate": 6,
-            "high": 8
-        }
+    except Exception as e:
+        logger.error(f"Error extracting informal activity: {e}")
+        return None
 
-        # Create activity record
-        activity_data = {
-            "user_id": user_id,
-            "category": result["category"],
-            "activity_name": f"{result['activity_type'].title()} (Informal)",
-            "start_time": datetime.now().isoformat(),
-            "duration_minutes": result["duration_estimate_minutes"],
-            "calories_burned": result["calories_estimate"],
-            "perceived_exertion": intensity_to_rpe.get(result["intensity"], 6),
-            "notes": f"Auto-extracted from chat: {message[:100]}",
-            "source": "coach_chat",
-            "metrics": {
-                "informal_log": True,
-                "extraction_confidence": result["confidence"],
-                "intensity": result["intensity"],
-                "original_message": message
-            }
-        }
 
-        activity = supabase.table("activities").insert(activity_data).execute()
-
-        # Log to context table
-        supabase.table("user_context_log").insert({
-            "user_id": user_id,
-            "context_type": "informal_activity",
-            "description": f"{result['activity_type']} - {result['duration_estimate_minutes']}min",
-            "original_message": message,
-            "affects_training": True,  # Informal activities affect training volume
-            "suggested_adaptation": "Consider this extra volume when calculating weekly total",
-            "extracted_from_message_id": message_id,
-            "extraction_confidence": result["confidence"],
-            "extraction_model": "claude-3-haiku-20240307",
-            "activity_created_id": activity.data[0]["id"] if activity.data else None
-        }).execute()
+def _store_informal_activity(
+    result: Dict[str, Any],
+    message: str,
+    user_id: str,
+    message_id: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """Create the activity + context log rows for an extracted activity."""
+
+    # Only create activity if confidence is reasonable and should count as workout
+    if result.get("confidence", 0) < 0.6 or not result.get("should_count_as_workout"):
+        return None
 
-        logger.info(f"Extracted informal activity: {result['activity_type']} for user {user_id}")
+    # Map intensity to RPE
+    intensity_to_rpe = {
+        "low": 4,
+        "moderate": 6,
+        "high": 8
+    }
 
-        return {
-            "activity_id": activity.data[0]["id"] if activity.data else None,
-            "activity_type": result["activity_type"],
-            "duration_minutes": result["duration_estimate_minutes"],
-            "confidence": result["confidence"]
+    # Create activity record
+    activity_data = {
+        "user_id": user_id,
+        "category": result["category"],
+        "activity_name": f"{result['activity_type'].title()} (Informal)",
+        "start_time": datetime.now().isoformat(),
+        "duration_minutes": result["duration_estimate_minutes"],
+        "calories_burned": result["calories_estimate"],
+        "perceived_exertion": intensity_to_rpe.get(result["intensity"], 6),
+        "notes": f"Auto-extracted from chat: {message[:100]}",
+        "source": "coach_chat",
+        "metrics": {
+            "informal_log": True,
+            "extraction_confidence": result["confidence"],
+            "intensity": result["intensity"],
+            "original_message": message
         }
+    }
 
-    except Exception as e:
-        logger.error(f"Error extracting informal activity: {e}")
-        return None
+    activity = supabase.table("activities").insert(activity_data).execute()
+
+    # Log to context table
+    supabase.table("user_context_log").insert({
+        "user_id": user_id,
+        "context_type": "informal_activity",
+        "description": f"{result['activity_type']} - {result['duration_estimate_minutes']}min",
+        "original_message": message,
+        "affects_training": True,  # Informal activities affect training volume
+        "suggested_adaptation": "Consider this extra volume when calculating weekly total",
+        "extracted_from_message_id": message_id,
+        "extraction_confidence": result["confidence"],
+        "extraction_model": EXTRACTION_MODEL,
+        "activity_created_id": activity.data[0]["id"] if activity.data else None
+    }).execute()
+
+    logger.info(f"Extracted informal activity: {result['activity_type']} for user {user_id}")
+
+    return {
+        "activity_id": activity.data[0]["id"] if activity.data else None,
+        "activity_type": result["activity_type"],
+        "duration_minutes": result["duration_estimate_minutes"],
+        "confidence": result["confidence"]
+    }
 
 
 # ============================================================================
@@ -212,7 +311,7 @@ Return ONLY valid JSON."""
 
     try:
         response = anthropic_client.messages.create(
-            model="claude-3-haiku-20240307",
+            model=EXTRACTION_MODEL,
             max_tokens=300,
             temperature=0.3,
             messages=[{"role": "user", "content": prompt}]
@@ -223,42 +322,129 @@ Return ONLY valid JSON."""
         if not result.get("context_detected"):
             return None
 
-        # Only log if confidence is reasonable
-        if result.get("confidence", 0) < 0.5:
-            return None
-
-        # Store in context log
-        context_data = {
-            "user_id": user_id,
-            "context_type": result["context_type"],
-            "severity": result.get("severity"),
-            "sentiment_score": result.get("sentiment_score"),
-            "description": message[:200],  # Truncate for storage
-            "original_message": message,
-            "affects_training": result.get("affects_training", False),
-            "affects_nutrition": result.get("affects_nutrition", False),
-            "suggested_adaptation": result.get("suggested_adaptation"),
-            "extracted_from_message_id": message_id,
-            "extraction_confidence": result["confidence"],
-            "extraction_model": "claude-3-haiku-20240307"
-        }
+        return _store_life_context(result, result.get("sentiment_score"), message, user_id, message_id)
 
-        context = supabase.table("user_context_log").insert(context_data).execute()
+    except Exception as e:
+        logger.error(f"Error extracting life context: {e}")
+        return None
 
-        logger.info(f"Extracted context: {result['context_type']} ({result.get('severity')}) for user {user_id}")
 
-        return {
-            "context_id": context.data[0]["id"] if context.data else None,
-            "context_type": result["context_type"],
-            "severity": result.get("severity"),
-            "sentiment_score": result.get("sentiment_score"),
-            "confidence": result["confidence"]
-        }
+def _store_life_context(
+    result: Dict[str, Any],
+    sentiment_score: Optional[float],
+    message: str,
+    user_id: str,
+    message_id: Optional[str] = None
+) -> Optional[Dict[str, Any]]:
+    """Log extracted life context to user_context_log."""
 
-    except Exception as e:
-        logger.error(f"Error extracting life context: {e}")
+    # Only log if confidence is reasonable
+    if result.get("confidence", 0) < 0.5:
         return None
 
+    # Store in context log
+    context_data = {
+        "user_id": user_id,
+        "context_type": result["context_type"],
+        "severity": result.get("severity"),
+        "sentiment_score": sentiment_score,
+        "description": message[:200],  # Truncate for storage
+        "original_message": message,
+        "affects_training": result.get("affects_training", False),
+        "affects_nutrition": result.get("affects_nutrition", False),
+        "suggested_adaptation": result.get("suggested_adaptation"),
+        "extracted_from_message_id": message_id,
+        "extraction_confidence": result["confidence"],
+        "extraction_model": EXTRACTION_MODEL
+    }
+
+    context = supabase.table("user_context_log").insert(context_data).execute()
+
+    logger.info(f"Extracted context: {result['context_type']} ({result.get('severity')}) for user {user_id}")
+
+    return {
+        "context_id": context.data[0]["id"] if context.data else None,
+        "context_type": result["context_type"],
+        "severity": result.get("severity"),
+        "sentiment_score": sentiment_score,
+        "confidence": result["confidence"]
+    }
+
+
+# ============================================================================
+# FUSED EXTRACTION (one LLM call per message)
+# ============================================================================
+
+def has_context_signal(message: str) -> bool:
+    """
+    Cheap local gate: True if the message might contain activity, life
+    context or strong sentiment. Messages that fail it skip the LLM.
+    """
+    if len(message.split()) < CONTEXT_MIN_WORDS:
+        return False
+    return any(pattern.search(message) for pattern in CONTEXT_SIGNAL_PATTERNS)
+
+
+def _parse_json_object(text: str) -> Dict[str, Any]:
+    """Parse the JSON object in a model reply (tolerates code fences)."""
+    start, end = text.find("{"), text.rfind("}")
+    if start == -1 or end < start:
+        raise ValueError(f"No JSON object in extraction reply: {text[:80]}")
+    return json.loads(text[start:end + 1])
+
+
+async def extract_context_fused(message: str) -> Dict[str, Any]:
+    """
+    Sentiment, informal activity and life context from ONE LLM call.
+
+    Args:
+        message: User's chat message
+
+    Returns:
+        {"sentiment": float, "activity": dict | None, "life_context": dict | None,
+         "cached": bool}
+    """
+    response_cache = get_response_cache()
+    key = cache_key(EXTRACTION_MODEL, FUSED_PROMPT_VERSION, message)
+
+    cached = response_cache.get(key)
+    if cached is not None:
+        result = _parse_json_object(cached.text)
+    else:
+        response = anthropic_client.messages.create(
+            model=EXTRACTION_MODEL,
+            max_tokens=300,
+            temperature=0,  # Deterministic extraction (cacheable)
+            messages=[{"role": "user", "content": FUSED_EXTRACTION_PROMPT.format(message=message)}]
+        )
+        reply = response.content[0].text
+        result = _parse_json_object(reply)
+
+        usage = getattr(response, "usage", None)
+        input_tokens = getattr(usage, "input_tokens", 0) or 0
+        output_tokens = getattr(usage, "output_tokens", 0) or 0
+        response_cache.put(
+            key,
+            reply,
+            input_tokens=input_tokens,
+            output_tokens=output_tokens,
+            cost_usd=input_tokens * HAIKU_COST_PER_INPUT_TOKEN + output_tokens * HAIKU_COST_PER_OUTPUT_TOKEN
+        )
+
+    try:
+        sentiment = max(-1.0, min(1.0, float(result.get("sentiment") or 0.0)))  # Clamp to [-1, 1]
+    except (TypeError, ValueError):
+        sentiment = 0.0
+
+    activity = result.get("activity")
+    life_context = result.get("life_context")
+    return {
+        "sentiment": sentiment,
+        "activity": activity if isinstance(activity, dict) else None,
+        "life_context": life_context if isinstance(life_context, dict) else None,
+        "cached": cached is not None
+    }
+
 
 # ============================================================================
 # SENTIMENT SCORING
@@ -286,7 +472,7 @@ Return ONLY a single number (e.g., 0.7 or -0.3), no explanation."""
 
     try:
         response = anthropic_client.messages.create(
-            model="claude-3-haiku-20240307",
+            model=EXTRACTION_MODEL,
             max_tokens=10,
             temperature=0.1,
             messages=[{"role": "user", "content": prompt}]
@@ -351,7 +537,7 @@ Common mappings:
 Return ONLY the standard exercise name, nothing else."""
 
         response = anthropic_client.messages.create(
-            model="claude-3-haiku-20240307",
+            model=EXTRACTION_MODEL,
             max_tokens=50,
             temperature=0.1,
             messages=[{"role": "user", "content": prompt}]
@@ -486,6 +672,10 @@ async def process_message_for_context(
 
     This is the main entry point called by unified_coach_enhancements.
 
+    At most one LLM call: messages without any activity, life-context or
+    sentiment signal (has_context_signal) are skipped as neutral; the rest
+    go through extract_context_fused().
+
     Args:
         message: User's chat message
         user_id: User UUID
@@ -498,23 +688,43 @@ async def process_message_for_context(
     results = {
         "informal_activity": None,
         "life_context": None,
-        "sentiment_score": 0.0
+        "sentiment_score": 0.0,
+        "llm_calls": 0
     }
 
-    # Extract sentiment (always)
-    results["sentiment_score"] = await extract_sentiment_score(message)
+    if not has_context_signal(message):
+        logger.debug(f"No context signal in message for user {user_id}, skipping extraction")
+        return results
 
-    # Extract informal activity
-    informal_activity = await extract_informal_activity(message, user_id, message_id)
-    if informal_activity:
-        results["informal_activity"] = informal_activity
-
-    # Extract life context
-    life_context = await extract_life_context(message, user_id, message_id)
-    if life_context:
-        results["life_context"] = life_context
-
-    logger.info(f"Processed message for user {user_id}: activity={informal_activity is not None}, context={life_context is not None}, sentiment={results['sentiment_score']:.2f}")
+    try:
+        extracted = await extract_context_fused(message)
+        results["llm_calls"] = 0 if extracted["cached"] else 1
+    except Exception as e:
+        logger.error(f"Error in fused context extraction: {e}")
+        return results
+
+    results["sentiment_score"] = extracted["sentiment"]
+
+    if extracted["activity"]:
+        try:
+            results["informal_activity"] = _store_informal_activity(
+                extracted["activity"], message, user_id, message_id
+            )
+        except Exception as e:
+            logger.error(f"Error storing informal activity: {e}")
+
+    if extracted["life_context"]:
+        try:
+            results["life_context"] = _store_life_context(
+                extracted["life_context"], extracted["sentiment"], message, user_id, message_id
+            )
+        except Exception as e:
+            logger.error(f"Error storing life context: {e}")
+
+    logger.info(
+        f"Processed message for user {user_id}: activity={results['informal_activity'] is not None}, "
+        f"context={results['life_context'] is not None}, sentiment={results['sentiment_score']:.2f}"
+    )
 
     return results
 
@@ -18,8 +18,9 @@ Integration:
 
 from typing import Dict, List, Optional, Tuple, Any
 from datetime import datetime, date
-from anthropic import Anthropic
 import os
+
+from ultimate_ai_consultation.libs.llm_clients import get_anthropic_client
 import re
 import json
 
@@ -29,7 +30,7 @@ import json
 # =============================================================================
 
 ANTHROPIC_API_KEY = os.getenv("ANTHROPIC_API_KEY")
-anthropic = Anthropic(api_key=ANTHROPIC_API_KEY)
+anthropic = get_anthropic_client(ANTHROPIC_API_KEY)
 
 # Quick logging regex patterns
 QUICK_CALORIE_PATTERN = re.compile(
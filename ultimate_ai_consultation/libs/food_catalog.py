@@ -0,0 +1,317 @@
+"""
+Food Catalog Snapshot
+
+Compact, memory-mappable snapshot of the public food catalog (foods + food_servings).
+
+The catalog is read-mostly (seeded by migrations, few user edits), so instead
+of every process paging through Supabase on cold start, one process exports a
+snapshot and every API worker, Celery worker and the program generator maps it
+read-only. The OS page cache shares the pages across processes.
+
+Layout (one directory per version, written atomically):
+
+    <root>/v20251016T123456000000/
+        meta.json                  version (max foods.updated_at), counts
+        food_ids.npy               (n,) S36
+        nutrients.npy              (n, 7) float64, NaN = null
+        usage_count.npy            (n,) int64
+        verified.npy               (n,) bool
+        <text>_blob.npy            UTF-8 bytes of all values concatenated
+        <text>_offsets.npy         (n + 1,) int64, value i = blob[off[i]:off[i+1]]
+        serving_offsets.npy        (n + 1,) int64, servings of food i
+        serving_ids.npy            (m,) S36
+        serving_numbers.npy        (m, 2) float64: serving_size, grams_per_serving
+        serving_is_default.npy     (m,) bool
+        serving_display_order.npy  (m,) int32
+
+Text columns store None as "" (brand_name, name_pt, food_type).
+
+Only numpy is required, so ultimate_ai_consultation can read snapshots without
+the app package.
+"""
+
+import json
+import os
+import shutil
+import tempfile
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence
+
+import numpy as np
+
+SNAPSHOT_FORMAT_VERSION = 1
+SNAPSHOT_DIR_ENV = "FOOD_CATALOG_SNAPSHOT_DIR"
+SNAPSHOTS_TO_KEEP = 2
+
+NUTRIENT_COLUMNS = (
+    "calories_per_100g",
+    "protein_g_per_100g",
+    "carbs_g_per_100g",
+    "fat_g_per_100g",
+    "fiber_g_per_100g",
+    "sugar_g_per_100g",
+    "sodium_mg_per_100g",
+)
+FOOD_TEXT_COLUMNS = ("name", "name_pt", "brand_name", "food_type", "dietary_flags", "created_at", "updated_at")
+SERVING_TEXT_COLUMNS = ("serving_unit", "serving_label", "serving_created_at")
+
+_ID_DTYPE = "S36"
+
+
+def default_snapshot_dir() -> str:
+    """Snapshot root shared by all processes on the host."""
+    return os.getenv(SNAPSHOT_DIR_ENV) or os.path.join(tempfile.gettempdir(), "food_catalog")
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse a Supabase timestamp (ISO 8601) into an aware datetime."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+def _version_dirname(version: datetime) -> str:
+    return "v" + version.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+
+
+# =====================================================
+# Encoding helpers
+# =====================================================
+
+def _encode_text(values: Iterable[Optional[str]]):
+    encoded = [(value or "").encode("utf-8") for value in values]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    if encoded:
+        np.cumsum([len(value) for value in encoded], out=offsets[1:])
+    blob = np.frombuffer(b"".join(encoded), dtype=np.uint8)
+    return blob, offsets
+
+
+def _text_value(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    if isinstance(value, (list, tuple)):
+        return ",".join(str(v) for v in value)
+    return str(value)
+
+
+def _float_or_nan(value: Any) -> float:
+    return float(value) if value is not None else np.nan
+
+
+# =====================================================
+# Writer
+# =====================================================
+
+def write_snapshot(root: str, foods: Sequence[Dict[str, Any]]) -> str:
+    """
+    Write foods rows (each with an embedded food_servings list) as a new snapshot.
+
+    The version is the max updated_at of the rows. Returns the snapshot path;
+    if that version already exists it is reused.
+    """
+    versions = [parse_timestamp(row.get("updated_at")) for row in foods]
+    version = max((v for v in versions if v is not None), default=datetime.fromtimestamp(0, timezone.utc))
+
+    os.makedirs(root, exist_ok=True)
+    final_path = os.path.join(root, _version_dirname(version))
+    if os.path.exists(os.path.join(final_path, "meta.json")):
+        return final_path
+
+    staging = tempfile.mkdtemp(prefix=".staging-", dir=root)
+    try:
+        arrays: Dict[str, np.ndarray] = {}
+        arrays["food_ids"] = np.asarray([str(row["id"]) for row in foods], dtype=_ID_DTYPE)
+        arrays["nutrients"] = np.asarray(
+            [[_float_or_nan(row.get(column)) for column in NUTRIENT_COLUMNS] for row in foods],
+            dtype=np.float64,
+        ).reshape(len(foods), len(NUTRIENT_COLUMNS))
+        arrays["usage_count"] = np.asarray([row.get("usage_count") or 0 for row in foods], dtype=np.int64)
+        arrays["verified"] = np.asarray([bool(row.get("verified")) for row in foods], dtype=bool)
+        for column in FOOD_TEXT_COLUMNS:
+            blob, offsets = _encode_text(_text_value(row.get(column)) for row in foods)
+            arrays[f"{column}_blob"], arrays[f"{column}_offsets"] = blob, offsets
+
+        servings: List[Dict[str, Any]] = []
+        serving_offsets = np.zeros(len(foods) + 1, dtype=np.int64)
+        for idx, row in enumerate(foods):
+            food_servings = sorted(
+                row.get("food_servings") or [],
+                key=lambda s: (s.get("display_order") or 0),
+            )
+            servings.extend(food_servings)
+            serving_offsets[idx + 1] = len(servings)
+
+        arrays["serving_offsets"] = serving_offsets
+        arrays["serving_ids"] = np.asarray([str(s["id"]) for s in servings], dtype=_ID_DTYPE)
+        arrays["serving_numbers"] = np.asarray(
+            [[_float_or_nan(s.get("serving_size")), _float_or_nan(s.get("grams_per_serving"))] for s in servings],
+            dtype=np.float64,
+        ).reshape(len(servings), 2)
+        arrays["serving_is_default"] = np.asarray([bool(s.get("is_default")) for s in servings], dtype=bool)
+        arrays["serving_display_order"] = np.asarray(
+            [s.get("display_order") or 0 for s in servings], dtype=np.int32
+        )
+        for column in SERVING_TEXT_COLUMNS:
+            key = "created_at" if column == "serving_created_at" else column
+            blob, offsets = _encode_text(_text_value(s.get(key)) for s in servings)
+            arrays[f"{column}_blob"], arrays[f"{column}_offsets"] = blob, offsets
+
+        for name, array in arrays.items():
+            np.save(os.path.join(staging, f"{name}.npy"), array, allow_pickle=False)
+
+        with open(os.path.join(staging, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump(
+                {
+                    "format": SNAPSHOT_FORMAT_VERSION,
+                    "version": version.isoformat(),
+                    "foods": len(foods),
+                    "servings": len(servings),
+                    "exported_at": datetime.now(timezone.utc).isoformat(),
+                },
+                f,
+            )
+
+        try:
+            os.rename(staging, final_path)
+        except OSError:
+            # Another process published the same version first
+            shutil.rmtree(staging, ignore_errors=True)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    _prune_snapshots(root)
+    return final_path
+
+
+def _list_snapshots(root: str) -> List[str]:
+    """Complete snapshot directories, oldest first (names sort by version)."""
+    if not os.path.isdir(root):
+        return []
+    return [
+        os.path.join(root, name)
+        for name in sorted(os.listdir(root))
+        if name.startswith("v") and os.path.exists(os.path.join(root, name, "meta.json"))
+    ]
+
+
+def _prune_snapshots(root: str) -> None:
+    # Unlinking is safe for readers: existing memory maps stay valid
+    for path in _list_snapshots(root)[:-SNAPSHOTS_TO_KEEP]:
+        shutil.rmtree(path, ignore_errors=True)
+
+
+def latest_snapshot_path(root: Optional[str] = None) -> Optional[str]:
+    """Path of the newest complete snapshot under root, or None."""
+    snapshots = _list_snapshots(root or default_snapshot_dir())
+    return snapshots[-1] if snapshots else None
+
+
+# =====================================================
+# Reader
+# =====================================================
+
+class FoodCatalogSnapshot:
+    """
+    Read-only, memory-mapped view of one snapshot.
+
+    Arrays are mapped lazily; rows are materialized as dicts shaped like
+    Supabase foods rows (with food_servings) only when asked for.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, "meta.json"), encoding="utf-8") as f:
+            self.meta: Dict[str, Any] = json.load(f)
+        if self.meta.get("format") != SNAPSHOT_FORMAT_VERSION:
+            raise ValueError(f"Unsupported food catalog snapshot format: {self.meta.get('format')}")
+        self.version: datetime = parse_timestamp(self.meta["version"])
+        self._arrays: Dict[str, np.ndarray] = {}
+        self._id_index: Optional[Dict[str, int]] = None
+
+    @classmethod
+    def load_latest(cls, root: Optional[str] = None) -> Optional["FoodCatalogSnapshot"]:
+        path = latest_snapshot_path(root)
+        return cls(path) if path else None
+
+    def array(self, name: str) -> np.ndarray:
+        if name not in self._arrays:
+            self._arrays[name] = np.load(
+                os.path.join(self.path, f"{name}.npy"), mmap_mode="r", allow_pickle=False
+            )
+        return self._arrays[name]
+
+    def __len__(self) -> int:
+        return int(self.meta["foods"])
+
+    def _text(self, column: str, idx: int) -> Optional[str]:
+        offsets = self.array(f"{column}_offsets")
+        start, end = int(offsets[idx]), int(offsets[idx + 1])
+        if start == end:
+            return None
+        return self.array(f"{column}_blob")[start:end].tobytes().decode("utf-8")
+
+    def food_id(self, idx: int) -> str:
+        return self.array("food_ids")[idx].decode("ascii")
+
+    def index_of(self, food_id: Any) -> Optional[int]:
+        if self._id_index is None:
+            self._id_index = {
+                raw.decode("ascii"): idx for idx, raw in enumerate(self.array("food_ids"))
+            }
+        return self._id_index.get(str(food_id))
+
+    def servings(self, idx: int) -> List[Dict[str, Any]]:
+        offsets = self.array("serving_offsets")
+        numbers = self.array("serving_numbers")
+        food_id = self.food_id(idx)
+        result = []
+        for s in range(int(offsets[idx]), int(offsets[idx + 1])):
+            result.append({
+                "id": self.array("serving_ids")[s].decode("ascii"),
+                "food_id": food_id,
+                "serving_size": float(numbers[s, 0]),
+                "serving_unit": self._text("serving_unit", s),
+                "serving_label": self._text("serving_label", s),
+                "grams_per_serving": float(numbers[s, 1]),
+                "is_default": bool(self.array("serving_is_default")[s]),
+                "display_order": int(self.array("serving_display_order")[s]),
+                "created_at": self._text("serving_created_at", s),
+            })
+        return result
+
+    def row(self, idx: int, with_servings: bool = True) -> Dict[str, Any]:
+        """Materialize food idx as a Supabase-shaped foods row."""
+        nutrients = self.array("nutrients")[idx]
+        flags = self._text("dietary_flags", idx)
+        row: Dict[str, Any] = {
+            "id": self.food_id(idx),
+            "name": self._text("name", idx),
+            "name_pt": self._text("name_pt", idx),
+            "brand_name": self._text("brand_name", idx),
+            "food_type": self._text("food_type", idx),
+            "dietary_flags": flags.split(",") if flags else [],
+            "is_public": True,
+            "verified": bool(self.array("verified")[idx]),
+            "usage_count": int(self.array("usage_count")[idx]),
+            "created_at": self._text("created_at", idx),
+            "updated_at": self._text("updated_at", idx),
+        }
+        for column, value in zip(NUTRIENT_COLUMNS, nutrients.tolist()):
+            row[column] = None if np.isnan(value) else value
+        if with_servings:
+            row["food_servings"] = self.servings(idx)
+        return row
+
+    def get(self, food_id: Any, with_servings: bool = True) -> Optional[Dict[str, Any]]:
+        idx = self.index_of(food_id)
+        return self.row(idx, with_servings) if idx is not None else None
+
+    def iter_rows(self, with_servings: bool = True) -> Iterator[Dict[str, Any]]:
+        for idx in range(len(self)):
+            yield self.row(idx, with_servings)
@@ -0,0 +1,230 @@
+"""
+LLM Response Cache
+
+Content-addressed cache for deterministic (temperature-0) extraction and
+classification calls. Identical inputs recur constantly across users
+("2 eggs and toast", "thanks"), so the same prompt is answered once.
+
+Key = sha256(model, prompt template version, normalized input). Bump a
+caller's template version whenever its prompt changes; old entries then
+simply stop matching and age out.
+
+Two layers:
+- in-process LRU (bounded, thread-safe)
+- optional shared backend from LLM_CACHE_URL:
+      redis://host:6379/2        shared by API and Celery workers (TTL)
+      sqlite:////var/cache/llm.db  single host, survives restarts
+  unset = in-process only
+
+Each entry records what the original call cost, and every hit adds to the
+entry's hits / tokens_saved / cost_saved_usd, so savings are measurable.
+
+Only the standard library is required (redis is imported for redis:// URLs),
+so both the app and ultimate_ai_consultation can use it.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+CACHE_URL_ENV = "LLM_CACHE_URL"
+DEFAULT_MAX_ENTRIES = 4096
+DEFAULT_TTL_SECONDS = 30 * 24 * 3600  # Template versions handle invalidation
+REDIS_KEY_PREFIX = "llm_cache:"
+
+
+class CachedResponse(NamedTuple):
+    """A cached model reply and what producing it cost."""
+
+    text: str
+    input_tokens: int = 0
+    output_tokens: int = 0
+    cost_usd: float = 0.0
+
+
+def normalize_input(value: Any) -> str:
+    """Canonical form of a call's variable input (case/whitespace-insensitive text, sorted JSON)."""
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, default=str)
+
+
+def cache_key(model: str, template_version: str, value: Any) -> str:
+    """Content address of one call."""
+    material = json.dumps([model, template_version, normalize_input(value)], ensure_ascii=False)
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class _RedisBackend:
+    def __init__(self, url: str, ttl: int):
+        import redis
+
+        self.redis = redis.Redis.from_url(url)
+        self.ttl = ttl
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        data = self.redis.hgetall(REDIS_KEY_PREFIX + key)
+        if not data:
+            return None
+        data = {k.decode(): v.decode() for k, v in data.items()}
+        return CachedResponse(data["text"], int(data["input_tokens"]), int(data["output_tokens"]), float(data["cost_usd"]))
+
+    def put(self, key: str, response: CachedResponse) -> None:
+        name = REDIS_KEY_PREFIX + key
+        pipe = self.redis.pipeline()
+        pipe.hset(name, mapping={**response._asdict(), "hits": 0, "tokens_saved": 0, "cost_saved_usd": 0, "created_at": int(time.time())})
+        pipe.expire(name, self.ttl)
+        pipe.execute()
+
+    def record_hit(self, key: str, response: CachedResponse) -> None:
+        name = REDIS_KEY_PREFIX + key
+        pipe = self.redis.pipeline()
+        pipe.hincrby(name, "hits", 1)
+        pipe.hincrby(name, "tokens_saved", response.input_tokens + response.output_tokens)
+        pipe.hincrbyfloat(name, "cost_saved_usd", response.cost_usd)
+        pipe.execute()
+
+
+class _SQLiteBackend:
+    def __init__(self, path: str, ttl: int):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS llm_cache (
+                key TEXT PRIMARY KEY,
+                text TEXT NOT NULL,
+                input_tokens INTEGER NOT NULL,
+                output_tokens INTEGER NOT NULL,
+                cost_usd REAL NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                tokens_saved INTEGER NOT NULL DEFAULT 0,
+                cost_saved_usd REAL NOT NULL DEFAULT 0,
+                created_at REAL NOT NULL
+            )
+        """)
+        self.db.commit()
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            row = self.db.execute(
+                "SELECT text, input_tokens, output_tokens, cost_usd FROM llm_cache WHERE key = ? AND created_at > ?",
+                (key, time.time() - self.ttl)
+            ).fetchone()
+        return CachedResponse(*row) if row else None
+
+    def put(self, key: str, response: CachedResponse) -> None:
+        with self._lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, text, input_tokens, output_tokens, cost_usd, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, *response, time.time())
+            )
+            self.db.commit()
+
+    def record_hit(self, key: str, response: CachedResponse) -> None:
+        with self._lock:
+            self.db.execute(
+                "UPDATE llm_cache SET hits = hits + 1, tokens_saved = tokens_saved + ?, "
+                "cost_saved_usd = cost_saved_usd + ? WHERE key = ?",
+                (response.input_tokens + response.output_tokens, response.cost_usd, key)
+            )
+            self.db.commit()
+
+
+class ResponseCache:
+    """Bounded in-process LRU in front of an optional shared backend."""
+
+    def __init__(self, url: Optional[str] = None, max_entries: int = DEFAULT_MAX_ENTRIES, ttl: int = DEFAULT_TTL_SECONDS):
+        self.max_entries = max_entries
+        self._memory: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "tokens_saved": 0, "cost_saved_usd": 0.0}
+
+        self._backend = None
+        if url and url.startswith(("redis://", "rediss://")):
+            self._backend = _RedisBackend(url, ttl)
+        elif url and url.startswith("sqlite:///"):
+            self._backend = _SQLiteBackend(url[len("sqlite:///"):], ttl)
+        elif url:
+            raise ValueError(f"Unsupported {CACHE_URL_ENV}: {url}")
+
+    def _remember(self, key: str, response: CachedResponse) -> None:
+        with self._lock:
+            self._memory[key] = response
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Cached response (counted as a hit with its savings), or None."""
+        with self._lock:
+            response = self._memory.get(key)
+            if response is not None:
+                self._memory.move_to_end(key)
+
+        if response is None and self._backend is not None:
+            try:
+                response = self._backend.get(key)
+            except Exception as e:  # Cache trouble must never fail the call
+                logger.warning(f"LLM cache backend read failed: {e}")
+            if response is not None:
+                self._remember(key, response)
+
+        with self._lock:
+            if response is None:
+                self.stats["misses"] += 1
+                return None
+            self.stats["hits"] += 1
+            self.stats["tokens_saved"] += response.input_tokens + response.output_tokens
+            self.stats["cost_saved_usd"] += response.cost_usd
+
+        if self._backend is not None:
+            try:
+                self._backend.record_hit(key, response)
+            except Exception as e:
+                logger.warning(f"LLM cache backend hit update failed: {e}")
+        return response
+
+    def put(self, key: str, text: str, input_tokens: int = 0, output_tokens: int = 0, cost_usd: float = 0.0) -> None:
+        """Store a response with the cost of producing it."""
+        response = CachedResponse(text, int(input_tokens or 0), int(output_tokens or 0), float(cost_usd or 0.0))
+        self._remember(key, response)
+        if self._backend is not None:
+            try:
+                self._backend.put(key, response)
+            except Exception as e:
+                logger.warning(f"LLM cache backend write failed: {e}")
+
+    def clear(self) -> None:
+        """Drop the in-process layer (tests)."""
+        with self._lock:
+            self._memory.clear()
+
+
+_response_cache: Optional[ResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_response_cache() -> ResponseCache:
+    """Process-wide cache configured from LLM_CACHE_URL (memory only if unset or unusable)."""
+    global _response_cache
+    if _response_cache is None:
+        with _response_cache_lock:
+            if _response_cache is None:
+                url = os.getenv(CACHE_URL_ENV)
+                try:
+                    _response_cache = ResponseCache(url)
+                except Exception as e:
+                    logger.warning(f"LLM cache backend unavailable ({e}); using in-process cache only")
+                    _response_cache = ResponseCache()
+    return _response_cache
@@ -0,0 +1,450 @@
+"""
+LLM Clients
+
+One factory for every LLM client in the process (OpenRouter/OpenAI,
+Anthropic, Groq), so calls share warm connections instead of each service
+opening its own pool and paying a fresh TLS handshake.
+
+Per provider:
+- one keep-alive connection pool (HTTP/2 when h2 is installed), shared by
+  every client of that provider; async pools are kept per event loop
+- retries with full-jitter exponential backoff on connection errors,
+  timeouts, 429 and 5xx (honouring Retry-After)
+- a circuit breaker: after LLM_BREAKER_FAILURES consecutive failures the
+  provider is cut off for LLM_BREAKER_RESET_SECONDS. Calls then fail
+  immediately with CircuitOpenError (wrapped by the SDKs in their
+  connection error; see is_circuit_open_error) instead of queueing behind
+  timeouts. One trial call is let through afterwards; success closes the
+  breaker.
+
+SDK clients are built with max_retries=0: retrying is done once, here.
+
+Environment (all optional):
+    LLM_POOL_MAX_CONNECTIONS   (default 100)
+    LLM_POOL_MAX_KEEPALIVE     (default 20)
+    LLM_POOL_KEEPALIVE_EXPIRY  seconds (default 60)
+    LLM_CONNECT_TIMEOUT        seconds (default 5)
+    LLM_TIMEOUT                seconds (default 60)
+    LLM_RETRY_ATTEMPTS         retries after the first try (default 2)
+    LLM_BREAKER_FAILURES       (default 5)
+    LLM_BREAKER_RESET_SECONDS  (default 30)
+
+Only httpx is required; the openai/anthropic SDKs are imported by the
+factories that need them.
+"""
+
+import asyncio
+import functools
+import importlib
+import logging
+import os
+import random
+import threading
+import time
+import weakref
+from typing import Any, Dict, Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+OPENROUTER_HEADERS = {
+    "HTTP-Referer": "https://sharpened.app",
+    "X-Title": "SHARPENED Ultimate Coach"
+}
+
+RETRY_STATUSES = {429, 500, 502, 503, 504, 529}
+BACKOFF_BASE_SECONDS = 0.5
+BACKOFF_MAX_SECONDS = 8.0
+
+
+def _env_int(name: str, default: int) -> int:
+    return int(os.getenv(name, default))
+
+
+def _env_float(name: str, default: float) -> float:
+    return float(os.getenv(name, default))
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+
+class CircuitOpenError(httpx.TransportError):
+    """The provider's circuit breaker is open; the request was not sent."""
+
+
+class CircuitBreaker:
+    """
+    Consecutive-failure circuit breaker.
+
+    closed → (failure_threshold failures in a row) → open
+    open → (reset_timeout elapsed) → half-open: one trial request
+    half-open → success: closed / failure: open again
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            if self.opened_at is None:
+                return "closed"
+            if time.monotonic() - self.opened_at >= self.reset_timeout:
+                return "half_open"
+            return "open"
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError unless a request may be sent now."""
+        with self._lock:
+            if self.opened_at is None:
+                return
+            if time.monotonic() - self.opened_at >= self.reset_timeout and not self._trial_in_flight:
+                self._trial_in_flight = True
+                return
+        raise CircuitOpenError(f"LLM provider '{self.name}' circuit is open")
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self.opened_at is not None:
+                logger.info(f"LLM circuit closed: {self.name}")
+            self.failures = 0
+            self.opened_at = None
+            self._trial_in_flight = False
+
+    def abandon(self) -> None:
+        """The call ended without an outcome (cancelled); let another trial through."""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            trial_failed = self._trial_in_flight
+            self._trial_in_flight = False
+            if trial_failed or (self.opened_at is None and self.failures >= self.failure_threshold):
+                self.opened_at = time.monotonic()
+                logger.warning(f"LLM circuit opened: {self.name} ({self.failures} consecutive failures)")
+
+
+def is_circuit_open_error(exc: BaseException) -> bool:
+    """True if exc is, or was caused by, an open circuit (SDKs wrap transport errors)."""
+    seen = set()
+    while exc is not None and id(exc) not in seen:
+        if isinstance(exc, CircuitOpenError):
+            return True
+        seen.add(id(exc))
+        exc = exc.__cause__ or exc.__context__
+    return False
+
+
+def backoff_delay(attempt: int, retry_after: Optional[str] = None) -> float:
+    """Full-jitter exponential backoff (Retry-After wins when the server sends one)."""
+    if retry_after:
+        try:
+            return min(float(retry_after), BACKOFF_MAX_SECONDS)
+        except ValueError:
+            pass
+    return random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+
+
+class ProviderPool:
+    """
+    Connection pools, retry policy and breaker for one provider.
+
+    Pools are kept per httpx module: the openai/anthropic SDKs may be built
+    on httpx or on its successor httpx2, and each needs its own transport
+    types. The breaker is shared, so a provider outage trips every client.
+
+    transport overrides the real connection pool (tests).
+    """
+
+    def __init__(self, provider: str, transport=None):
+        self.provider = provider
+        self._transport = transport
+        self.max_retries = _env_int("LLM_RETRY_ATTEMPTS", 2)
+        self.breaker = CircuitBreaker(
+            provider,
+            failure_threshold=_env_int("LLM_BREAKER_FAILURES", 5),
+            reset_timeout=_env_float("LLM_BREAKER_RESET_SECONDS", 30.0)
+        )
+        self.max_connections = _env_int("LLM_POOL_MAX_CONNECTIONS", 100)
+        self.max_keepalive = _env_int("LLM_POOL_MAX_KEEPALIVE", 20)
+        self.keepalive_expiry = _env_float("LLM_POOL_KEEPALIVE_EXPIRY", 60.0)
+        self.http2 = _http2_available()
+        self._sync_transports: Dict[str, Any] = {}
+        # asyncio connections belong to the loop that opened them
+        self._async_transports: Dict[str, "weakref.WeakKeyDictionary"] = {}
+        self._lock = threading.Lock()
+
+    def _limits(self, http):
+        return http.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive,
+            keepalive_expiry=self.keepalive_expiry
+        )
+
+    def sync_transport(self, http=httpx):
+        if self._transport is not None:
+            return self._transport
+        with self._lock:
+            transport = self._sync_transports.get(http.__name__)
+            if transport is None:
+                transport = http.HTTPTransport(limits=self._limits(http), http2=self.http2)
+                self._sync_transports[http.__name__] = transport
+            return transport
+
+    def async_transport(self, http=httpx):
+        if self._transport is not None:
+            return self._transport
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            by_loop = self._async_transports.setdefault(http.__name__, weakref.WeakKeyDictionary())
+            transport = by_loop.get(loop)
+            if transport is None:
+                transport = http.AsyncHTTPTransport(limits=self._limits(http), http2=self.http2)
+                by_loop[loop] = transport
+            return transport
+
+    def close(self) -> None:
+        with self._lock:
+            transports = list(self._sync_transports.values())
+            self._sync_transports.clear()
+        for transport in transports:
+            transport.close()
+
+    async def aclose(self) -> None:
+        """Close this loop's async connections."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            transports = [by_loop.pop(loop, None) for by_loop in self._async_transports.values()]
+        for transport in transports:
+            if transport is not None:
+                await transport.aclose()
+
+
+@functools.lru_cache(maxsize=None)
+def _resilient_transports(http) -> Tuple[type, type]:
+    """(sync, async) transport classes for an httpx-compatible module."""
+
+    class ResilientTransport(http.BaseTransport):
+        """Sync transport: shared pool + retries + circuit breaker."""
+
+        def __init__(self, pool: ProviderPool):
+            self.pool = pool
+
+        def handle_request(self, request):
+            breaker = self.pool.breaker
+            for attempt in range(self.pool.max_retries + 1):
+                breaker.before_call()
+                try:
+                    response = self.pool.sync_transport(http).handle_request(request)
+                except http.TransportError:
+                    breaker.record_failure()
+                    if attempt == self.pool.max_retries:
+                        raise
+                    time.sleep(backoff_delay(attempt))
+                    continue
+                except BaseException:
+                    breaker.abandon()
+                    raise
+
+                if response.status_code not in RETRY_STATUSES:
+                    breaker.record_success()
+                    return response
+                breaker.record_failure()
+                if attempt == self.pool.max_retries:
+                    return response
+                response.close()
+                time.sleep(backoff_delay(attempt, response.headers.get("retry-after")))
+            raise AssertionError("unreachable")
+
+    class ResilientAsyncTransport(http.AsyncBaseTransport):
+        """Async transport: shared per-loop pool + retries + circuit breaker."""
+
+        def __init__(self, pool: ProviderPool):
+            self.pool = pool
+
+        async def handle_async_request(self, request):
+            breaker = self.pool.breaker
+            for attempt in range(self.pool.max_retries + 1):
+                breaker.before_call()
+                try:
+                    response = await self.pool.async_transport(http).handle_async_request(request)
+                except http.TransportError:
+                    breaker.record_failure()
+                    if attempt == self.pool.max_retries:
+                        raise
+                    await asyncio.sleep(backoff_delay(attempt))
+                    continue
+                except BaseException:
+                    breaker.abandon()
+                    raise
+
+                if response.status_code not in RETRY_STATUSES:
+                    breaker.record_success()
+                    return response
+                breaker.record_failure()
+                if attempt == self.pool.max_retries:
+                    return response
+                await response.aclose()
+                await asyncio.sleep(backoff_delay(attempt, response.headers.get("retry-after")))
+            raise AssertionError("unreachable")
+
+    return ResilientTransport, ResilientAsyncTransport
+
+
+ResilientTransport, ResilientAsyncTransport = _resilient_transports(httpx)
+
+
+# ============================================================================
+# FACTORIES
+# ============================================================================
+
+_lock = threading.Lock()
+_pools: Dict[str, ProviderPool] = {}
+_http_clients: Dict[Tuple[str, bool, str], Any] = {}
+_sdk_clients: Dict[Tuple, Any] = {}
+
+
+def get_pool(provider: str) -> ProviderPool:
+    """Process-wide pool (and breaker) for a provider."""
+    with _lock:
+        if provider not in _pools:
+            _pools[provider] = ProviderPool(provider)
+        return _pools[provider]
+
+
+def get_breaker(provider: str) -> CircuitBreaker:
+    return get_pool(provider).breaker
+
+
+def _timeout(http):
+    return http.Timeout(_env_float("LLM_TIMEOUT", 60.0), connect=_env_float("LLM_CONNECT_TIMEOUT", 5.0))
+
+
+def get_http_client(provider: str, http=httpx):
+    """Shared sync client for a provider (do not close it)."""
+    pool = get_pool(provider)
+    key = (provider, False, http.__name__)
+    with _lock:
+        if key not in _http_clients:
+            transport_cls, _ = _resilient_transports(http)
+            _http_clients[key] = http.Client(transport=transport_cls(pool), timeout=_timeout(http))
+        return _http_clients[key]
+
+
+def get_async_http_client(provider: str, http=httpx):
+    """Shared async client for a provider (do not close it)."""
+    pool = get_pool(provider)
+    key = (provider, True, http.__name__)
+    with _lock:
+        if key not in _http_clients:
+            _, transport_cls = _resilient_transports(http)
+            _http_clients[key] = http.AsyncClient(transport=transport_cls(pool), timeout=_timeout(http))
+        return _http_clients[key]
+
+
+def sdk_http_module(sdk) -> Any:
+    """The httpx-compatible module an SDK is built on (httpx or httpx2)."""
+    for cls in sdk.DefaultHttpxClient.__mro__:
+        root = cls.__module__.partition(".")[0]
+        if root.startswith("httpx"):
+            return importlib.import_module(root)
+    return httpx
+
+
+def _sdk_client(key: Tuple, build):
+    with _lock:
+        client = _sdk_clients.get(key)
+    if client is None:
+        client = build()
+        with _lock:
+            client = _sdk_clients.setdefault(key, client)
+    return client
+
+
+def get_async_openai_client(
+    api_key: str,
+    provider: str = "openrouter",
+    base_url: Optional[str] = OPENROUTER_BASE_URL,
+    default_headers: Optional[Dict[str, str]] = None
+):
+    """AsyncOpenAI on the shared pool (OpenRouter by default)."""
+    import openai
+
+    headers = OPENROUTER_HEADERS if default_headers is None and provider == "openrouter" else default_headers
+    return _sdk_client(
+        ("async_openai", provider, api_key, base_url),
+        lambda: openai.AsyncOpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            default_headers=headers,
+            max_retries=0,
+            http_client=get_async_http_client(provider, sdk_http_module(openai))
+        )
+    )
+
+
+def get_openai_client(api_key: str, provider: str = "openai", base_url: Optional[str] = None):
+    """Sync OpenAI on the shared pool (OpenAI API by default)."""
+    import openai
+
+    return _sdk_client(
+        ("openai", provider, api_key, base_url),
+        lambda: openai.OpenAI(
+            api_key=api_key,
+            base_url=base_url,
+            max_retries=0,
+            http_client=get_http_client(provider, sdk_http_module(openai))
+        )
+    )
+
+
+def get_async_anthropic_client(api_key: str):
+    """AsyncAnthropic on the shared pool."""
+    import anthropic
+
+    return _sdk_client(
+        ("async_anthropic", api_key),
+        lambda: anthropic.AsyncAnthropic(
+            api_key=api_key,
+            max_retries=0,
+            http_client=get_async_http_client("anthropic", sdk_http_module(anthropic))
+        )
+    )
+
+
+def get_anthropic_client(api_key: str):
+    """Sync Anthropic on the shared pool."""
+    import anthropic
+
+    return _sdk_client(
+        ("anthropic", api_key),
+        lambda: anthropic.Anthropic(
+            api_key=api_key,
+            max_retries=0,
+            http_client=get_http_client("anthropic", sdk_http_module(anthropic))
+        )
+    )
+
+
+async def close_pools() -> None:
+    """Close all sync pools and the running loop's async pools (application shutdown)."""
+    with _lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.close()
+        await pool.aclose()
@@ -4,26 +4,28 @@ Lightweight LLM client with cost controls and caching.
 Design goals:
 - Strictly optional: no network calls unless enabled and API key present
 - Tiny outputs: require compact JSON, validate upstream
-- Caching: best-effort in-memory cache keyed by (task, payload hash)
+- Pooled: shared keep-alive connections, retries and circuit breaker
+  (libs/llm_clients.py)
+- Caching: shared content-addressed response cache (libs/llm_cache.py) keyed
+  by (model, task, payload), with token/cost savings recorded per entry
 """
 
 from __future__ import annotations
 
-import hashlib
-import json
-import threading
 from typing import Any, Dict, Optional
 
 from ultimate_ai_consultation.config import get_settings
-import httpx
+from ultimate_ai_consultation.libs.llm_cache import cache_key, get_response_cache
+from ultimate_ai_consultation.libs.llm_clients import get_http_client
 
-_cache_lock = threading.Lock()
-_cache: Dict[str, str] = {}
+# Groq llama-3.1-8b-instant list price, for cache savings accounting
+COST_PER_INPUT_TOKEN = 0.05 / 1_000_000
+COST_PER_OUTPUT_TOKEN = 0.08 / 1_000_000
 
 
 def _cache_key(task: str, payload: Dict[str, Any]) -> str:
-    h = hashlib.sha256(json.dumps(payload, sort_keys=True, ensure_ascii=False).encode("utf-8")).hexdigest()
-    return f"{task}:{h}"
+    # The task name doubles as the prompt template version
+    return cache_key(get_settings().GROQ_MODEL, task, payload)
 
 
 def call_llm(task: str, prompt: str, *, max_tokens: Optional[int] = None, cache_payload: Optional[Dict[str, Any]] = None) -> Optional[str]:
@@ -41,10 +43,9 @@ def call_llm(task: str, prompt: str, *, max_tokens: Optional[int] = None, cache_
 
     # Best-effort cache
     if settings.LLM_CACHE_ENABLED and cache_payload is not None:
-        key = _cache_key(task, cache_payload)
-        with _cache_lock:
-            if key in _cache:
-                return _cache[key]
+        cached = get_response_cache().get(_cache_key(task, cache_payload))
+        if cached is not None:
+            return cached.text
 
     # Guard: require API key to make external calls
     if settings.LLM_PROVIDER == "groq":
@@ -64,19 +65,27 @@ def call_llm(task: str, prompt: str, *, max_tokens: Optional[int] = None, cache_
                 "temperature": 0.2,
                 "max_tokens": max_tokens or settings.LLM_MAX_TOKENS_PER_CALL,
             }
-            with httpx.Client(timeout=8.0) as client:
-                resp = client.post("https://api.groq.com/openai/v1/chat/completions", headers=headers, json=body)
-                resp.raise_for_status()
-                data = resp.json()
-                text = data["choices"][0]["message"]["content"].strip()
+            resp = get_http_client("groq").post(
+                "https://api.groq.com/openai/v1/chat/completions", headers=headers, json=body, timeout=8.0
+            )
+            resp.raise_for_status()
+            data = resp.json()
+            text = data["choices"][0]["message"]["content"].strip()
+            usage = data.get("usage") or {}
         except Exception:
             return None
 
         # Populate cache
         if settings.LLM_CACHE_ENABLED and cache_payload is not None:
-            key = _cache_key(task, cache_payload)
-            with _cache_lock:
-                _cache[key] = text
+            input_tokens = usage.get("prompt_tokens", 0)
+            output_tokens = usage.get("completion_tokens", 0)
+            get_response_cache().put(
+                _cache_key(task, cache_payload),
+                text,
+                input_tokens=input_tokens,
+                output_tokens=output_tokens,
+                cost_usd=input_tokens * COST_PER_INPUT_TOKEN + output_tokens * COST_PER_OUTPUT_TOKEN,
+            )
         return text
 
     return None
@@ -86,6 +95,4 @@ def put_cache(task: str, payload: Dict[str, Any], response: str) -> None:
     settings = get_settings()
     if not settings.LLM_CACHE_ENABLED:
         return
-    key = _cache_key(task, payload)
-    with _cache_lock:
-        _cache[key] = response
+    get_response_cache().put(_cache_key(task, payload), response)
@@ -14,6 +14,10 @@ from dataclasses import dataclass
 from enum import Enum
 import random
 
+import numpy as np
+
+from ultimate_ai_consultation.libs.food_catalog import FoodCatalogSnapshot
+
 
 class MealType(str, Enum):
     """Meal timing categories"""
@@ -54,6 +58,7 @@ class FoodItem:
     serving_size_g: float
     food_group: str  # protein, vegetable, fruit, grain, dairy, fat
     tags: List[str]  # vegetarian, vegan, high_protein, etc.
+    curated: bool = False  # Hand-picked template (allergens known from the name)
 
 
 @dataclass
@@ -388,15 +393,131 @@ FAT_FOODS = [
 ]
 
 
+# Catalog foods used per food group (most logged first)
+CATALOG_FOODS_PER_GROUP = 25
+CORE_FOOD_GROUPS = (("protein",), ("grain", "fruit"), ("vegetable",), ("fat",))
+DAIRY_KEYWORDS = ("milk", "yogurt", "yoghurt", "cheese", "leite", "iogurte", "queijo")
+
+# Allergen keywords for the curated templates only. Catalog names are too
+# varied (whey, butter, cashews, prawns...) to screen by name, so catalog
+# foods must carry an explicit "<allergen>_free" dietary flag instead.
+ALLERGEN_KEYWORDS = {
+    "dairy": DAIRY_KEYWORDS,
+    "nuts": ("almond", "peanut"),
+    "shellfish": ("shrimp", "crab"),
+    "eggs": ("egg",),
+    "fish": ("salmon", "tuna"),
+    "soy": ("tofu",),
+    "gluten": ("wheat", "pasta", "oat"),
+}
+ALLERGEN_FREE_FLAGS = {"dairy": "dairy_free", "nuts": "nut_free", "shellfish": "shellfish_free"}
+
+
+def classify_food_groups(nutrients: np.ndarray) -> np.ndarray:
+    """
+    Assign a food group per row from per-100g nutrients (catalog NUTRIENT_COLUMNS order).
+
+    Uses each macro's share of calories. Mixed foods get "" (not used).
+    """
+    nutrients = np.nan_to_num(np.asarray(nutrients, dtype=np.float64))
+    calories, protein, carbs, fat, sugar = (
+        nutrients[:, 0], nutrients[:, 1], nutrients[:, 2], nutrients[:, 3], nutrients[:, 5]
+    )
+    macro_kcal = 4 * protein + 4 * carbs + 9 * fat
+    with np.errstate(divide="ignore", invalid="ignore"):
+        protein_share = np.where(macro_kcal > 0, 4 * protein / macro_kcal, 0)
+        carb_share = np.where(macro_kcal > 0, 4 * carbs / macro_kcal, 0)
+        fat_share = np.where(macro_kcal > 0, 9 * fat / macro_kcal, 0)
+        sugary = np.where(carbs > 0, sugar / carbs, 0) >= 0.5
+
+    carb_group = np.where(sugary, "fruit", np.where(calories < 60, "vegetable", "grain"))
+    return np.select(
+        [calories <= 0, protein_share >= 0.45, fat_share >= 0.6, carb_share >= 0.6],
+        ["", "protein", "fat", carb_group],
+        default="",
+    )
+
+
+def _has_core_groups(foods: List[FoodItem]) -> bool:
+    groups = {f.food_group for f in foods}
+    return all(groups.intersection(core) for core in CORE_FOOD_GROUPS)
+
+
 class MealAssembler:
     """Assembles daily meal plans from food database"""
 
-    def __init__(self):
-        # Load food database (in production, this would query Supabase)
-        self.foods_db = self._load_food_database()
+    def __init__(self, catalog: Optional[FoodCatalogSnapshot] = None):
+        # Curated templates are the fallback when no catalog snapshot is available
+        self.template_foods = self._load_template_foods()
+        self.foods_db = self._load_food_database(catalog)
+
+    def _load_food_database(self, catalog: Optional[FoodCatalogSnapshot] = None) -> List[FoodItem]:
+        """Load foods from the catalog snapshot, falling back to the curated templates"""
+        if catalog is None:
+            try:
+                catalog = FoodCatalogSnapshot.load_latest()
+            except Exception:
+                catalog = None
+
+        if catalog is not None:
+            foods = self._foods_from_catalog(catalog)
+            if _has_core_groups(foods):
+                return foods
+
+        return self.template_foods
+
+    def _foods_from_catalog(self, catalog: FoodCatalogSnapshot) -> List[FoodItem]:
+        """
+        Select verified whole foods from the snapshot (per 100g serving).
+
+        Classification runs on the mapped arrays; only the selected rows are
+        materialized.
+        """
+        groups = classify_food_groups(catalog.array("nutrients"))
+        verified = np.asarray(catalog.array("verified"))
+        usage = np.asarray(catalog.array("usage_count"))
 
-    def _load_food_database(self) -> List[FoodItem]:
-        """Load foods from database (mock for now, will query Supabase)"""
+        foods = []
+        for group in np.unique(groups[groups != ""]):
+            candidates = np.flatnonzero((groups == group) & verified)
+            # Most logged first
+            candidates = candidates[np.argsort(-usage[candidates], kind="stable")]
+
+            selected = 0
+            for idx in candidates:
+                row = catalog.row(int(idx), with_servings=False)
+                if row["food_type"] not in (None, "ingredient"):
+                    continue
+
+                name_lower = row["name"].lower()
+                food_group = "dairy" if any(k in name_lower for k in DAIRY_KEYWORDS) else str(group)
+                tags = [flag.lower() for flag in row["dietary_flags"]]
+                if food_group == "protein":
+                    tags.append("high_protein")
+
+                foods.append(
+                    FoodItem(
+                        food_id=row["id"],
+                        name=row["name"],
+                        calories=row["calories_per_100g"] or 0,
+                        protein_g=row["protein_g_per_100g"] or 0,
+                        carbs_g=row["carbs_g_per_100g"] or 0,
+                        fat_g=row["fat_g_per_100g"] or 0,
+                        fiber_g=row["fiber_g_per_100g"] or 0,
+                        serving_size="100g",
+                        serving_size_g=100,
+                        food_group=food_group,
+                        tags=tags,
+                    )
+                )
+                selected += 1
+                if selected >= CATALOG_FOODS_PER_GROUP:
+                    break
+
+        return foods
+
+    def _load_template_foods(self) -> List[FoodItem]:
+        """Curated template foods (used when no catalog snapshot is available)"""
         foods = []
 
         # Combine all food categories
@@ -418,6 +539,7 @@ class MealAssembler:
                     serving_size_g=food_data["serving_g"],
                     food_group=food_data["group"],
                     tags=food_data["tags"],
+                    curated=True,
                 )
             )
 
@@ -522,7 +644,24 @@ class MealAssembler:
         self, dietary_preference: DietaryPreference, allergies: List[str]
     ) -> List[FoodItem]:
         """Filter foods by dietary restrictions and allergies"""
-        filtered = self.foods_db.copy()
+        filtered = self._apply_filters(self.foods_db, dietary_preference, allergies)
+
+        # Catalog foods often lack dietary flags: top up empty groups from templates
+        if self.foods_db is not self.template_foods:
+            templates = self._apply_filters(self.template_foods, dietary_preference, allergies)
+            for core in CORE_FOOD_GROUPS:
+                if not any(f.food_group in core for f in filtered):
+                    filtered.extend(f for f in templates if f.food_group in core)
+
+        return filtered
+
+    def _apply_filters(
+        self,
+        foods: List[FoodItem],
+        dietary_preference: DietaryPreference,
+        allergies: List[str],
+    ) -> List[FoodItem]:
+        filtered = list(foods)
 
         # Filter by dietary preference
         if dietary_preference == DietaryPreference.VEGAN:
@@ -538,20 +677,23 @@ class MealAssembler:
 
         # Filter by allergies
         for allergen in allergies:
-            allergen_lower = allergen.lower()
-            if allergen_lower == "dairy":
-                filtered = [f for f in filtered if f.food_group != "dairy"]
-            elif allergen_lower == "nuts":
-                filtered = [
-                    f for f in filtered if "almond" not in f.name.lower() and "peanut" not in f.name.lower()
-                ]
-            elif allergen_lower == "shellfish":
-                filtered = [
-                    f for f in filtered if "shrimp" not in f.name.lower() and "crab" not in f.name.lower()
-                ]
+            allergen_lower = allergen.strip().lower()
+            free_flag = ALLERGEN_FREE_FLAGS.get(allergen_lower, f"{allergen_lower.replace(' ', '_')}_free")
+            filtered = [f for f in filtered if self._is_allergen_free(f, allergen_lower, free_flag)]
 
         return filtered
 
+    def _is_allergen_free(self, food: FoodItem, allergen: str, free_flag: str) -> bool:
+        """Catalog foods need an explicit allergen-free flag; templates are screened by name"""
+        if free_flag in food.tags:
+            return True
+        if not food.curated:
+            return False
+        if allergen == "dairy" and food.food_group == "dairy":
+            return False
+        name_lower = food.name.lower()
+        return not any(k in name_lower for k in ALLERGEN_KEYWORDS.get(allergen, ()))
+
     def _build_meal(
         self,
         meal_type: MealType,
@@ -13,45 +13,102 @@ These run asynchronously to keep message responses fast.
 import logging
 from datetime import datetime, timedelta
 from typing import Optional
-import openai
-import os
 
 from app.core.celery_app import celery_app
 from app.services.wearables.wearable_sync_service import wearable_sync_service
+from app.services.embedding_service import EMBEDDING_MAX_PENDING, EmbeddingPipeline, get_embedding_queue
 from app.services.supabase_service import get_service_client
+from app.services.vector_index import get_vector_index_service
 
 logger = logging.getLogger(__name__)
 
-# OpenAI client for embeddings
-openai_client = openai.OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
+_pipeline = None
 
-# Embedding model
-EMBEDDING_MODEL = "text-embedding-3-small"  # 384 dimensions, $0.02/M tokens
-EMBEDDING_DIMENSIONS = 384
+
+def _get_pipeline():
+    """Worker-wide EmbeddingPipeline (keeps its content-hash cache between runs)."""
+    global _pipeline
+    if _pipeline is None:
+        supabase = get_service_client()
+        _pipeline = EmbeddingPipeline(supabase, vector_index=get_vector_index_service(supabase))
+    return _pipeline
 
 
 # ============================================================================
 # MESSAGE VECTORIZATION
 # ============================================================================
 
-@celery_app.task(name="coach.vectorize_message", max_retries=3)
-def vectorize_message(message_id: str, message_content: str, user_id: str):
+@celery_app.task(name="coach.embed_pending_messages")
+def embed_pending_messages():
     """
-    Generate and store embedding for a coach message.
+    Embed queued coach messages in micro-batches.
+
+    **How it works:**
+    - The coach pushes substantial messages onto a Redis list (EmbeddingQueue)
+    - This task drains up to 8192 of them per run
+    - Identical content (by hash) is embedded once
+    - One OpenAI request per 2048 texts or ~250k tokens (API limits)
+    - Bulk insert into coach_message_embeddings, then the vector index
+
+    **Failures:**
+    - Inputs the API rejects are isolated and dead-lettered
+    - Rows the database refuses (e.g. the coach_messages row isn't written
+      yet) are isolated and only those messages are re-queued
+    - On any other error each drained message is re-queued with its
+      attempt count bumped, and dead-lettered after EMBEDDING_MAX_ATTEMPTS
 
-    **Why we need this:**
-    - Enables semantic search over conversation history
-    - Powers "find similar conversations" feature
-    - Allows AI to retrieve relevant context from past discussions
+    **Run schedule:**
+    - Every 10 seconds (beat), and immediately once 64 messages are waiting
 
     **Cost:**
     - OpenAI text-embedding-3-small: $0.02/M tokens
-    - Average message (100 tokens): $0.000002 (0.0002 cents)
-    - Negligible compared to Claude costs ($0.10-0.15/msg)
+    - ~1 API call and 1 insert per run instead of one of each per message
+    """
+    queue = get_embedding_queue()
+    items = queue.pop_batch(EMBEDDING_MAX_PENDING)
+    if not items:
+        return {"success": True, "stored": 0}
+
+    try:
+        result = _get_pipeline().run(items)
+    except Exception as e:
+        requeued, dead = queue.retry(items, error=str(e))
+        logger.error(
+            f"[EmbedTask] ❌ Embedding batch of {len(items)} failed "
+            f"({requeued} re-queued, {dead} dead-lettered): {e}",
+            exc_info=True
+        )
+        raise
+
+    rejected = result.pop("rejected")
+    if rejected:
+        queue.dead_letter(*rejected)
+        logger.warning(f"[EmbedTask] ⚠️ {len(rejected)} messages rejected by the embeddings API (dead-lettered)")
+
+    refused = result.pop("refused")
+    if refused:
+        requeued, dead = queue.retry(refused, error="embedding row refused by database")
+        logger.warning(
+            f"[EmbedTask] ⚠️ {len(refused)} embedding rows refused by the database "
+            f"({requeued} re-queued, {dead} dead-lettered)"
+        )
+
+    logger.info(
+        f"[EmbedTask] ✅ {result['stored']}/{len(items)} messages stored, "
+        f"{result['embedded']} embedded in {result['api_calls']} API calls, "
+        f"{result['tokens_used']} tokens, ${result['cost_usd']:.6f}"
+    )
+    return {"success": True, **result}
+
 
-    **When called:**
-    - After every assistant message
-    - Runs in background (doesn't block response)
+@celery_app.task(name="coach.vectorize_message", max_retries=3)
+def vectorize_message(message_id: str, message_content: str, user_id: str, role: str = "assistant"):
+    """
+    Generate and store embedding for a single coach message.
+
+    The coach enqueues messages for coach.embed_pending_messages instead;
+    this task is kept for one-off (re)vectorization and runs the same
+    pipeline with a batch of one.
 
     **Cleanup strategy:**
     - Importance scoring prevents unlimited growth
@@ -62,47 +119,28 @@ def vectorize_message(message_id: str, message_content: str, user_id: str):
         message_id: UUID of coach message
         message_content: Text content to embed
         user_id: User UUID (for filtering later)
+        role: Message role ('user' or 'assistant')
     """
     try:
         logger.info(f"[VectorizeTask] 🧠 Vectorizing message {message_id[:8]}...")
 
-        # Generate embedding
-        response = openai_client.embeddings.create(
-            model=EMBEDDING_MODEL,
-            input=message_content,
-            dimensions=EMBEDDING_DIMENSIONS
-        )
-
-        embedding = response.data[0].embedding
-        tokens_used = response.usage.total_tokens
-
-        # Cost calculation
-        cost_per_token = 0.02 / 1_000_000  # $0.02 per 1M tokens
-        cost_usd = tokens_used * cost_per_token
+        result = _get_pipeline().run([{
+            "message_id": message_id,
+            "user_id": user_id,
+            "role": role,
+            "content": message_content
+        }])
 
         logger.info(
-            f"[VectorizeTask] ✅ Embedding generated: {tokens_used} tokens, "
-            f"${cost_usd:.6f}"
+            f"[VectorizeTask] ✅ Embedding stored: {result['tokens_used']} tokens, "
+            f"${result['cost_usd']:.6f}"
         )
 
-        # Store in database
-        supabase = get_service_client()
-        supabase.table("coach_message_embeddings").insert({
-            "message_id": message_id,
-            "embedding": embedding,
-            "importance_score": 0.5,  # Neutral - will be updated by importance task
-            "is_archived": False,
-            "tokens_used": tokens_used,
-            "cost_usd": cost_usd
-        }).execute()
-
-        logger.info(f"[VectorizeTask] 💾 Embedding stored in DB")
-
         return {
             "success": True,
             "message_id": message_id,
-            "tokens_used": tokens_used,
-            "cost_usd": cost_usd
+            "tokens_used": result["tokens_used"],
+            "cost_usd": result["cost_usd"]
         }
 
     except Exception as e:
@@ -232,6 +270,9 @@ def archive_old_embeddings(days_threshold: int = 90, importance_threshold: float
 
         archived_count = result.data or 0
 
+        # Archived rows are masked at search time; rebuild every process's indexes from the DB
+        get_vector_index_service(supabase).invalidate()
+
         logger.info(
             f"[CleanupTask] ✅ Archived {archived_count} embeddings"
         )
@@ -0,0 +1,62 @@
+"""
+Conversation Background Tasks
+
+Celery tasks for coach conversation memory:
+- Rolling summaries of messages that aged out of Tier 1 memory
+
+Summaries are maintained here, off the request path, so the coach prompt
+only ever carries summary + recent turns.
+"""
+
+import logging
+
+from app.core.celery_app import celery_app
+from app.services.supabase_service import get_service_client
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# ROLLING SUMMARIES
+# ============================================================================
+
+@celery_app.task(name="coach.summarize_conversation", max_retries=2)
+def summarize_conversation(conversation_id: str):
+    """
+    Fold aged-out messages into the conversation's running summary.
+
+    **How it works:**
+    - Tier 1 memory sends the last 10 messages verbatim
+    - Older, not yet summarized messages are batched (min 6, max 40)
+    - One LLM call per batch: previous summary + batch -> new summary
+    - Watermark (summarized_through) keeps it incremental
+
+    **When called:**
+    - Enqueued by the coach after each assistant message (deduplicated)
+    - Cheap no-op (two indexed queries) until enough messages have aged out
+
+    Args:
+        conversation_id: Conversation UUID
+    """
+    import asyncio
+    from app.services.conversation_summary_service import ConversationSummaryService
+
+    try:
+        service = ConversationSummaryService(get_service_client())
+        result = asyncio.run(service.update_summary(conversation_id))
+
+        if result["updated"]:
+            logger.info(
+                f"[SummaryTask] 📝 Conversation {conversation_id[:8]}: "
+                f"folded {result['messages_folded']} messages into summary"
+            )
+
+        return {
+            "success": True,
+            "conversation_id": conversation_id,
+            "messages_folded": result["messages_folded"]
+        }
+
+    except Exception as e:
+        logger.error(f"[SummaryTask] ❌ Summarization failed: {e}", exc_info=True)
+        raise
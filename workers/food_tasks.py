@@ -0,0 +1,108 @@
+"""
+Food Background Tasks
+
+Celery tasks for the food catalog:
+- Popularity / ranking signals (global and per-locale, rolling windows)
+- Catalog snapshot export (fast cold start for search and meal planning)
+
+Aggregation runs here, offline, so food search and typeahead only read
+precomputed scores.
+"""
+
+import logging
+
+from app.core.celery_app import celery_app
+from app.services.supabase_service import get_service_client
+
+logger = logging.getLogger(__name__)
+
+
+# ============================================================================
+# POPULARITY SIGNALS
+# ============================================================================
+
+@celery_app.task(name="foods.refresh_popularity", max_retries=2)
+def refresh_food_popularity(sync_usage_count: bool = True):
+    """
+    Recompute food ranking features from meal_items.
+
+    **What it writes (food_popularity, one row per food and locale):**
+    - logs_7d / logs_30d / logs_90d rolling window counts
+    - users_30d distinct loggers (damps single heavy users)
+    - score: recency-weighted rank used by the in-memory search index
+    - locale: 'global' plus one row per profile language
+
+    Optionally resyncs foods.usage_count, which not every logging path bumps.
+
+    **Run schedule:**
+    - Hourly (see beat_schedule in app/core/celery_app.py)
+    - API processes pick up new scores on their next index refresh (30 min)
+
+    Args:
+        sync_usage_count: Also repair foods.usage_count drift
+    """
+    try:
+        logger.info("[PopularityTask] Refreshing food popularity...")
+
+        supabase = get_service_client()
+        result = supabase.rpc("refresh_food_popularity", {
+            "p_sync_usage_count": sync_usage_count
+        }).execute()
+
+        row_count = result.data or 0
+
+        logger.info(f"[PopularityTask] Refreshed {row_count} popularity rows")
+
+        return {
+            "success": True,
+            "row_count": row_count
+        }
+
+    except Exception as e:
+        logger.error(f"[PopularityTask] Popularity refresh failed: {e}", exc_info=True)
+        raise
+
+
+# ============================================================================
+# CATALOG SNAPSHOT
+# ============================================================================
+
+@celery_app.task(name="foods.export_catalog_snapshot", max_retries=2)
+def export_food_catalog_snapshot():
+    """
+    Export the public food catalog (foods + servings) as a memory-mappable snapshot.
+
+    **Why:**
+    - The catalog is read-mostly (seed migrations, few edits)
+    - API workers, Celery workers and the program generator map the snapshot
+      instead of paging through Supabase on cold start
+    - Readers fetch only foods updated after the snapshot version (delta),
+      plus the ids of public foods to drop deleted or unpublished ones
+
+    **Run schedule:**
+    - Daily (see beat_schedule in app/core/celery_app.py)
+    - Snapshots are written to FOOD_CATALOG_SNAPSHOT_DIR (shared per host)
+    """
+    import asyncio
+    from app.services.food_catalog_service import food_catalog_service
+
+    try:
+        logger.info("[CatalogTask] Exporting food catalog snapshot...")
+
+        snapshot = asyncio.run(food_catalog_service.export_snapshot())
+
+        logger.info(
+            f"[CatalogTask] Snapshot {snapshot.meta['version']} written: "
+            f"{len(snapshot)} foods, {snapshot.meta['servings']} servings"
+        )
+
+        return {
+            "success": True,
+            "path": snapshot.path,
+            "version": snapshot.meta["version"],
+            "foods": len(snapshot)
+        }
+
+    except Exception as e:
+        logger.error(f"[CatalogTask] Snapshot export failed: {e}", exc_info=True)
+        raise